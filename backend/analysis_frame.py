@@ -0,0 +1,432 @@
+"""
+AnalysisFrame - transactions preprocessed once for every analysis pass.
+
+The recurring-charge scanner, the subscription detective, the categorizer
+and the tax autopilot each used to walk raw transaction dicts, parse every
+date string again (the detective tried up to five strptime formats per
+row) and upper-case or clean every description again. An AnalysisFrame
+does that work once per distinct value and keeps the results as columns:
+
+1. Per row (read-only numpy arrays): day ordinal (-1 if the date didn't
+   parse), signed cents, amount as the source presented it, description
+   code and date code
+2. Per distinct description: the raw text, its upper-cased text, the
+   scanner's clean description and recurring keywords, and a merchant id
+   into `merchants` (the detective's normalized names)
+3. Per distinct date: the value as given (reported back by the scanner)
+   and its ordinal
+
+A frame is immutable: extend() and slice() return new frames. Frames
+extended from one another share their distinct-value tables (append-only,
+each frame sees the entries that existed when it was made) and their row
+chunks, so extend() preprocesses and stores only the appended rows and the
+descriptions and dates it hasn't seen. Sessions keep theirs next to the
+transactions (see backend/main.py), so repeated analyses never touch the
+raw records again.
+"""
+
+import pickle
+import threading
+from bisect import bisect_right
+from collections.abc import Sequence
+from datetime import date, datetime
+from itertools import islice
+
+from backend.lazy_imports import lazy_import
+from backend.merchant_normalizer import merchant_normalizer
+from backend.transactions import TransactionBatch, to_cents
+
+np = lazy_import("numpy")
+
+# Tried in order on date strings
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%d-%m-%Y", "%Y/%m/%d", "%m-%d-%Y")
+
+_ROW_COLUMNS = ("ordinals", "cents", "amounts", "codes", "date_codes")
+_DESCRIPTION_COLUMNS = ("descriptions", "upper", "clean", "keywords", "merchant_ids")
+_TABLES = _DESCRIPTION_COLUMNS + ("merchants", "date_values", "date_ordinals")
+# Numeric tables, kept as numpy arrays
+_ARRAY_TABLES = ("merchant_ids", "date_ordinals")
+
+
+def parse_date_ordinal(value):
+    """
+    Day ordinal of a datetime / date or of a string in one of DATE_FORMATS.
+
+    Returns:
+        int: The ordinal, or -1 if the value isn't a recognizable date
+    """
+    if isinstance(value, datetime):
+        return value.toordinal()
+    text = str(value)
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).toordinal()
+        except ValueError:
+            continue
+    return -1
+
+
+def _size_index(name):
+    """
+    Position of a table's size in _Tables.sizes().
+    """
+    return 0 if name in _DESCRIPTION_COLUMNS else 1 if name == "merchants" else 2
+
+
+def _frozen(values, dtype=None):
+    column = values.view() if isinstance(values, np.ndarray) else np.array(values, dtype=dtype)
+    column.flags.writeable = False
+    return column
+
+
+class _GrowingArray:
+    """
+    Append-only int64 column with amortized O(1) appends. Views of its first
+    n entries stay valid (and unchanged) as it grows.
+    """
+
+    def __init__(self, values=()):
+        self._data = np.array(values, dtype=np.int64)
+        self._size = len(self._data)
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value):
+        if self._size == len(self._data):
+            grown = np.empty(max(16, 2 * self._size), dtype=np.int64)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size] = value
+        self._size += 1
+
+    def view(self, size):
+        return _frozen(self._data[:size])
+
+    def entries(self, start, stop):
+        return self._data[start:stop].copy()
+
+
+class _TableView(Sequence):
+    """
+    Read-only view of the first `size` entries of a shared table.
+    """
+
+    __slots__ = ("_items", "_size")
+
+    def __init__(self, items, size):
+        self._items = items
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._items[:self._size][index])
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("table index out of range")
+        return self._items[index]
+
+    def __iter__(self):
+        return islice(self._items, self._size)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(tuple(self))
+
+
+class _Tables:
+    """
+    The distinct-value tables of a family of frames, append-only. A frame
+    records the table sizes it was built with (see sizes()) and sees only
+    those entries.
+    """
+
+    def __init__(self, base=None, sizes=None):
+        self.descriptions, self.upper, self.clean, self.keywords = [], [], [], []
+        self.merchants, self.date_values = [], []
+        self.merchant_ids, self.date_ordinals = _GrowingArray(), _GrowingArray()
+        if base is not None:
+            descriptions, merchants, dates = sizes
+            for name in ("descriptions", "upper", "clean", "keywords"):
+                setattr(self, name, list(islice(getattr(base, name), descriptions)))
+            self.merchants = list(islice(base.merchants, merchants))
+            self.date_values = list(islice(base.date_values, dates))
+            self.merchant_ids = _GrowingArray(base.merchant_ids.view(descriptions))
+            self.date_ordinals = _GrowingArray(base.date_ordinals.view(dates))
+        self._index()
+        # Held while a frame appends to the tables
+        self.lock = threading.Lock()
+
+    @classmethod
+    def restore(cls, state):
+        """
+        Tables holding the table lists in `state` (see AnalysisFrame.__getstate__).
+        """
+        tables = cls()
+        for name in _TABLES:
+            value = state[name]
+            setattr(tables, name, _GrowingArray(value) if name in _ARRAY_TABLES else list(value))
+        tables._index()
+        return tables
+
+    def _index(self):
+        self.description_index = {text: code for code, text in enumerate(self.descriptions)}
+        self.merchant_index = {name: merchant for merchant, name in enumerate(self.merchants)}
+        self.date_index = {value: code for code, value in enumerate(self.date_values)}
+
+    def sizes(self):
+        return len(self.descriptions), len(self.merchants), len(self.date_values)
+
+    def view(self, name, sizes):
+        size = sizes[_size_index(name)]
+        table = getattr(self, name)
+        return table.view(size) if name in _ARRAY_TABLES else _TableView(table, size)
+
+    def entries(self, name, start, stop):
+        """
+        Entries start:stop of a table, copying only those.
+        """
+        table = getattr(self, name)
+        return table.entries(start, stop) if name in _ARRAY_TABLES else table[start:stop]
+
+    def description(self, text):
+        code = self.description_index.get(text)
+        if code is None:
+            code = self.description_index[text] = len(self.descriptions)
+            self.descriptions.append(text)
+            self.upper.append(text.upper())
+            self.clean.append(merchant_normalizer.clean_description(text))
+            self.keywords.append(merchant_normalizer.recurring_keywords(text))
+            name = merchant_normalizer.merchant_name(text)
+            merchant = self.merchant_index.get(name)
+            if merchant is None:
+                merchant = self.merchant_index[name] = len(self.merchants)
+                self.merchants.append(name)
+            self.merchant_ids.append(merchant)
+        return code
+
+    def date(self, value, ordinal=None):
+        code = self.date_index.get(value)
+        if code is None:
+            code = self.date_index[value] = len(self.date_values)
+            self.date_values.append(value)
+            self.date_ordinals.append(parse_date_ordinal(value) if ordinal is None else ordinal)
+        return code
+
+
+class _RowColumn:
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, frame, owner=None):
+        if frame is None:
+            return self
+        return frame._column(self.name)
+
+
+class _TableColumn:
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, frame, owner=None):
+        if frame is None:
+            return self
+        return frame._tables.view(self.name, frame._sizes)
+
+
+class AnalysisFrame:
+    """
+    Immutable, preprocessed transactions (see the module docstring).
+
+    Attributes:
+        ordinals: Day ordinal per row, -1 where the date didn't parse
+        cents: Signed amount in cents per row (positive = money in)
+        amounts: Amount per row as the transactions presented it (positive
+                 for unsigned TransactionBatch styles)
+        codes: Index into the description tables per row
+        date_codes: Index into date_values per row
+        descriptions, upper, clean, keywords: Per distinct description, the
+                 raw text, upper-cased text, SubscriptionScanner clean
+                 description and recurring keywords found in it
+        merchant_ids: Per distinct description, index into `merchants`
+        merchants: Normalized merchant names (SubscriptionDetective's)
+        date_values, date_ordinals: Per distinct date, the value as given
+                 (ISO strings for batches) and its ordinal
+
+    Row columns are read-only numpy arrays, as are merchant_ids and
+    date_ordinals; the other tables are read-only sequences.
+    """
+
+    # Rows are stored as chunks (one per build / extend) and joined on first access
+    __slots__ = ("_tables", "_sizes", "_chunks", "_offsets", "_joined")
+
+    ordinals, cents, amounts, codes, date_codes = (_RowColumn(name) for name in _ROW_COLUMNS)
+    descriptions, upper, clean, keywords, merchant_ids, merchants, date_values, date_ordinals = (
+        _TableColumn(name) for name in _TABLES
+    )
+
+    @classmethod
+    def build(cls, transactions):
+        """
+        Preprocess transactions.
+
+        Args:
+            transactions: TransactionBatch, or list of dicts {date, description, amount}
+        """
+        tables = _Tables()
+        chunk = cls._preprocess(transactions, tables)
+        return cls._create(tables, tables.sizes(), (chunk,))
+
+    def extend(self, transactions):
+        """
+        New frame with `transactions` appended; only they are preprocessed,
+        and only their rows and new distinct values are stored.
+        """
+        tables = self._tables
+        with tables.lock:
+            if tables.sizes() != self._sizes:
+                # Another frame extended these tables already: branch off a copy
+                tables = _Tables(tables, self._sizes)
+            chunk = self._preprocess(transactions, tables)
+            sizes = tables.sizes()
+        chunks = (self._joined,) if self._joined is not None else self._chunks
+        return self._create(tables, sizes, chunks + (chunk,))
+
+    def slice(self, start, stop=None):
+        """
+        New frame with rows start:stop, sharing this frame's tables and
+        only the row chunks it covers.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        chunks = []
+        first = max(bisect_right(self._offsets, start) - 1, 0)
+        for index in range(first, len(self._chunks)):
+            offset = self._offsets[index]
+            if offset >= stop and chunks:
+                break
+            rows = slice(max(start - offset, 0), max(stop - offset, 0))
+            chunks.append({name: column[rows] for name, column in self._chunks[index].items()})
+        return self._create(self._tables, self._sizes, tuple(chunks))
+
+    @staticmethod
+    def _preprocess(transactions, tables):
+        """
+        Row columns for `transactions`, adding their new distinct values to `tables`.
+        """
+        if isinstance(transactions, TransactionBatch):
+            ordinals, inverse = np.unique(np.asarray(transactions.dates, dtype=np.int64), return_inverse=True)
+            date_map = [tables.date(date.fromordinal(ordinal).isoformat(), ordinal) for ordinal in ordinals.tolist()]
+            description_map = [tables.description(text) for text in transactions.descriptions]
+            rows = {
+                "cents": transactions.cents,
+                "amounts": transactions.amounts(),
+                "codes": np.array(description_map, dtype=np.int64)[np.asarray(transactions.codes, dtype=np.int64)],
+                "date_codes": np.array(date_map, dtype=np.int64)[inverse.reshape(-1)],
+            }
+        else:
+            rows = {"cents": [], "amounts": [], "codes": [], "date_codes": []}
+            for record in transactions:
+                amount = float(record['amount'])
+                cents = to_cents(amount)
+                if record.get("type") == "EXPENSE":
+                    cents = -abs(cents)
+                elif record.get("type") == "INCOME":
+                    cents = abs(cents)
+                rows["cents"].append(cents)
+                rows["amounts"].append(amount)
+                rows["codes"].append(tables.description(record.get('description', record.get('desc', '')) or ""))
+                rows["date_codes"].append(tables.date(record['date']))
+
+        rows = {
+            "cents": np.array(rows["cents"], dtype=np.int64),
+            "amounts": np.array(rows["amounts"], dtype=np.float64),
+            "codes": np.array(rows["codes"], dtype=np.int64),
+            "date_codes": np.array(rows["date_codes"], dtype=np.int64),
+        }
+        rows["ordinals"] = tables.date_ordinals.view(len(tables.date_ordinals))[rows["date_codes"]]
+        return {name: _frozen(rows[name]) for name in _ROW_COLUMNS}
+
+    @classmethod
+    def _create(cls, tables, sizes, chunks):
+        frame = object.__new__(cls)
+        offsets, total = [], 0
+        for chunk in chunks:
+            offsets.append(total)
+            total += len(chunk["codes"])
+        object.__setattr__(frame, "_tables", tables)
+        object.__setattr__(frame, "_sizes", sizes)
+        object.__setattr__(frame, "_chunks", chunks)
+        object.__setattr__(frame, "_offsets", offsets)
+        object.__setattr__(frame, "_joined", chunks[0] if len(chunks) == 1 else None)
+        return frame
+
+    def appended_size(self, base):
+        """
+        Approximate growth of the pickled frame over `base`, a frame it was
+        extended from: the pickled size of the rows and distinct values added
+        since. Costs time in proportion to those only.
+        """
+        rows = self.slice(len(base))
+        added = {name: getattr(rows, name) for name in _ROW_COLUMNS}
+        for name in _TABLES:
+            index = _size_index(name)
+            added[name] = self._tables.entries(name, base._sizes[index], self._sizes[index])
+        return len(pickle.dumps(added, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _column(self, name):
+        if self._joined is None:
+            joined = {
+                column: _frozen(np.concatenate([chunk[column] for chunk in self._chunks]))
+                for column in _ROW_COLUMNS
+            }
+            # A cache of what the chunks hold, not a change to the frame
+            object.__setattr__(self, "_joined", joined)
+        return self._joined[name]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AnalysisFrame is immutable")
+
+    def __len__(self):
+        return self._offsets[-1] + len(self._chunks[-1]["codes"])
+
+    def __repr__(self):
+        return f"AnalysisFrame({len(self)} transactions, {len(self.descriptions)} descriptions)"
+
+    def dates(self):
+        """
+        Date per row, as the transactions gave it.
+        """
+        values = self.date_values
+        return [values[code] for code in self.date_codes.tolist()]
+
+    def __getstate__(self):
+        state = {name: getattr(self, name) for name in _ROW_COLUMNS}
+        state.update({name: list(getattr(self, name)) for name in _TABLES})
+        return state
+
+    def __setstate__(self, state):
+        tables = _Tables.restore(state)
+        chunk = {name: _frozen(np.asarray(state[name])) for name in _ROW_COLUMNS}
+        restored = self._create(tables, tables.sizes(), (chunk,))
+        for name in self.__slots__:
+            object.__setattr__(self, name, getattr(restored, name))
+
+
+def as_frame(transactions):
+    """
+    Return `transactions` as an AnalysisFrame, preprocessing them if needed.
+    """
+    if isinstance(transactions, AnalysisFrame):
+        return transactions
+    return AnalysisFrame.build(transactions)
@@ -0,0 +1,159 @@
+"""
+Batch statement ingestion - parse many statements at once and merge them.
+
+Onboarding a year of history used to take one /upload-pdf round-trip per
+statement. A batch is parsed concurrently on the ParseExecutor pool, so wall
+time approaches that of the slowest file, and the per-file results are merged
+into one date-ordered transaction list with cross-statement de-duplication:
+a transaction that appears in two overlapping statements is kept once, while
+genuine repeats within one statement (two identical coffees on the same day)
+are preserved.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+import zipfile
+from collections import Counter
+
+from backend.ingest import UploadTooLargeError
+from backend.transactions import TransactionBatch, as_batch
+
+
+class BatchSource:
+    """
+    One statement in a batch: PDF bytes or a seekable file object, plus its hash.
+    """
+
+    def __init__(self, filename, data, sha256):
+        self.filename = filename
+        self.data = data
+        self.sha256 = sha256
+
+
+class BatchLimitError(ValueError):
+    """
+    Raised when an archive holds more PDFs than the batch allows.
+    """
+
+
+def iter_zip_pdfs(fileobj, max_member_bytes=None, max_members=None, max_total_bytes=None):
+    """
+    Yield a BatchSource for every PDF inside a zip archive.
+
+    Every limit is checked against the member's declared size before it is
+    inflated (zipfile never inflates past it), so an archive over a limit is
+    rejected at the first member that crosses it.
+
+    Raises:
+        BatchLimitError: If the archive holds more than max_members PDFs.
+        UploadTooLargeError: If its PDFs add up to more than max_total_bytes.
+        ValueError: If the archive is invalid or a member exceeds max_member_bytes.
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Invalid zip archive: {e}")
+
+    count = 0
+    total_bytes = 0
+    with archive:
+        for member in archive.infolist():
+            if member.is_dir() or not member.filename.lower().endswith(".pdf"):
+                continue
+            # Check the declared size first so a zip bomb is never inflated
+            if max_member_bytes and member.file_size > max_member_bytes:
+                raise ValueError(f"{member.filename} exceeds the {max_member_bytes} byte limit")
+            count += 1
+            total_bytes += member.file_size
+            if max_members is not None and count > max_members:
+                raise BatchLimitError(f"More than {max_members} PDFs")
+            if max_total_bytes is not None and total_bytes > max_total_bytes:
+                raise UploadTooLargeError(f"PDFs unpack to more than {max_total_bytes} bytes")
+
+            data = archive.read(member)
+            yield BatchSource(member.filename, data, hashlib.sha256(data).hexdigest())
+
+
+async def parse_batch(executor, sources, parser_name="pnc"):
+    """
+    Parse all sources concurrently on `executor`.
+
+    Returns:
+        List of per-file reports, in input order:
+        {"filename", "status": "ok"|"error", "seconds", "result" | "error"}
+    """
+    async def parse_one(source):
+        started = time.perf_counter()
+        report = {"filename": source.filename}
+        try:
+            report["result"] = await executor.run(parser_name, source.data, content_hash=source.sha256)
+            report["status"] = "ok"
+        except Exception as e:
+            report["status"] = "error"
+            report["error"] = str(e) or type(e).__name__
+        report["seconds"] = round(time.perf_counter() - started, 4)
+        return report
+
+    return await asyncio.gather(*(parse_one(source) for source in sources))
+
+
+def _normalize_description(desc):
+    return re.sub(r"\s+", " ", desc or "").strip().upper()
+
+
+def merge_statements(reports):
+    """
+    Merge successful per-file results into one date-ordered TransactionBatch.
+
+    A transaction key (date, signed amount, description) occurring k times in
+    one statement and j times in another is kept max(k, j) times.
+
+    Returns:
+        (transactions, meta, duplicates_removed)
+    """
+    kept = Counter()
+    batches = []
+    duplicates_removed = 0
+    latest = None  # (last transaction date, meta) of the most recent statement
+
+    for report in reports:
+        if report["status"] != "ok":
+            continue
+
+        result = report["result"]
+        transactions = as_batch(result.get("transactions", []))
+        report["transactions"] = len(transactions)
+
+        # Descriptions are dictionary-encoded: normalize each distinct one once
+        normalized = [_normalize_description(text) for text in transactions.descriptions]
+        keep = []
+        seen_in_file = Counter()
+        for index, (ordinal, cents, code) in enumerate(zip(transactions.dates, transactions.cents, transactions.codes)):
+            key = (ordinal, cents, normalized[code])
+            seen_in_file[key] += 1
+            if seen_in_file[key] <= kept[key]:
+                duplicates_removed += 1
+                continue
+            kept[key] += 1
+            keep.append(index)
+        batches.append(transactions.take(keep))
+
+        if transactions:
+            last_date = max(transactions.dates)
+            if latest is None or last_date > latest[0]:
+                latest = (last_date, result.get("meta", {}))
+
+    # Stable sort: same-day transactions keep their statement order
+    merged = TransactionBatch.concat(batches).sorted_by_date()
+    dates = merged.iso_dates()
+
+    meta = {
+        "statements": sum(1 for r in reports if r["status"] == "ok"),
+        "failed": sum(1 for r in reports if r["status"] != "ok"),
+        "ending_balance": latest[1].get("ending_balance", 0.0) if latest else 0.0,
+        "start_date": dates[0] if dates else None,
+        "end_date": dates[-1] if dates else None,
+    }
+    return merged, meta, duplicates_removed
@@ -0,0 +1,201 @@
+"""
+Vectorized cadence analysis for recurring-payment detection.
+
+SubscriptionDetective used to walk each merchant group in Python, comparing
+consecutive datetime objects and only recognizing a ~30 day gap.
+analyze_cadence() takes every transaction of every group as flat arrays
+(group code, day ordinal, amount) and works on all groups at once:
+
+1. One lexsort orders the transactions by group, then date; np.diff gives
+   every interval, and intervals spanning two groups are masked out
+2. Each interval is classified into a cadence window (weekly ... annual)
+   with searchsorted, and bincount tallies intervals per (group, cadence)
+3. A group's cadence is the one most of its intervals fall in, among those
+   it has enough matching intervals for (two weekly purchases a week
+   apart are just shopping, not a subscription); its
+   regularity is that cadence's share of the group's intervals, from which
+   the confidence follows. The median matching interval, mean amount and
+   next due date are computed with sorts, bincounts and datetime64 month
+   arithmetic over all groups as well
+
+No step loops over groups in Python; callers only do so to render the
+groups they report.
+"""
+
+from functools import lru_cache
+
+from backend.lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+# name, nominal period in days, shortest and longest interval counted as
+# this cadence, the calendar months to the next charge (0: use days), and
+# the matching intervals needed before a group gets this cadence. Short
+# cadences need more than one: ordinary purchases land a week or two apart
+# all the time, while a lone ~30 day gap is still reported as monthly
+CADENCES = (
+    ("Weekly", 7, 6, 8, 0, 2),
+    ("Biweekly", 14, 12, 16, 0, 2),
+    ("Monthly", 30, 28, 32, 1, 1),
+    ("Quarterly", 91, 85, 97, 3, 1),
+    ("Annual", 365, 355, 375, 12, 1),
+)
+CADENCE_NAMES = [cadence[0] for cadence in CADENCES]
+
+# Share of a group's intervals that must match its cadence for High /
+# Medium confidence (anything lower with at least one match is Low)
+HIGH_REGULARITY = 0.75
+MEDIUM_REGULARITY = 0.5
+# Matching intervals (charges - 1) needed for High confidence
+HIGH_MIN_INTERVALS = 2
+CONFIDENCES = ("Low", "Medium", "High")
+
+# date.toordinal() of the datetime64 epoch, 1970-01-01
+_EPOCH_ORDINAL = 719163
+
+
+@lru_cache(maxsize=None)
+def _columns():
+    """
+    CADENCES' numeric columns (periods, lows, highs, months, min matched)
+    and CONFIDENCES as arrays, built on first use so importing this module
+    doesn't import numpy.
+    """
+    columns = tuple(np.array(column) for column in list(zip(*CADENCES))[1:])
+    return columns + (np.array(CONFIDENCES),)
+
+
+def _add_months(ordinals, months):
+    """
+    Day ordinals `months` calendar months later, clamping the day of the
+    month (Jan 31 + 1 month = Feb 28/29).
+    """
+    days = (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+    month_start = days.astype("datetime64[M]")
+    day_of_month = (days - month_start.astype("datetime64[D]")).astype(np.int64)
+    target = month_start + months.astype("timedelta64[M]")
+    month_length = ((target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")).astype(np.int64)
+    result = target.astype("datetime64[D]") + np.minimum(day_of_month, month_length - 1)
+    return result.astype(np.int64) + _EPOCH_ORDINAL
+
+
+def _grouped_median(values, groups, group_count):
+    """
+    Median of `values` per group (NaN for groups without values).
+    """
+    medians = np.full(group_count, np.nan)
+    if not len(values):
+        return medians
+    order = np.lexsort((values, groups))
+    values, groups = values[order], groups[order]
+    counts = np.bincount(groups, minlength=group_count)
+    present = np.flatnonzero(counts)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[present]
+    lengths = counts[present]
+    low = values[starts + (lengths - 1) // 2]
+    high = values[starts + lengths // 2]
+    medians[present] = (low + high) / 2
+    return medians
+
+
+class CadenceReport:
+    """
+    Per-group results of analyze_cadence(), as arrays indexed by group code.
+
+    Attributes:
+        count: Transactions per group
+        intervals: Intervals (days between consecutive transactions on
+                   different days) per group
+        cadence: Index into CADENCES, or -1 if no cadence has enough
+                 matching intervals
+        matched: Intervals matching the group's cadence
+        regularity: matched / intervals
+        confidence: "High", "Medium" or "Low" (meaningless where cadence is -1)
+        interval_days: Median matching interval
+        mean_amount: Mean transaction amount
+        last: Ordinal of the latest transaction
+        next_due: Ordinal of the predicted next charge (-1 without a cadence)
+    """
+
+    def __init__(self, group_count):
+        self.group_count = group_count
+        self._gaps = np.zeros(0, dtype=np.int64)
+        self._gap_offsets = np.zeros(group_count + 1, dtype=np.int64)
+
+    def gaps(self, group):
+        """
+        Days between each of a group's consecutive transactions, in date order.
+        """
+        return self._gaps[self._gap_offsets[group]:self._gap_offsets[group + 1]].tolist()
+
+    def recurring(self):
+        """
+        Codes of the groups with a cadence.
+        """
+        return np.flatnonzero(self.cadence >= 0)
+
+
+def analyze_cadence(groups, ordinals, amounts, group_count=None):
+    """
+    Classify the cadence of every group's transactions in one pass.
+
+    Args:
+        groups: Group code (0..group_count-1) of each transaction
+        ordinals: Day ordinal (date.toordinal()) of each transaction
+        amounts: Amount of each transaction
+        group_count: Number of groups (default: max code + 1)
+
+    Returns:
+        CadenceReport
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    if group_count is None:
+        group_count = int(groups.max()) + 1 if len(groups) else 0
+    report = CadenceReport(group_count)
+
+    order = np.lexsort((ordinals, groups))
+    groups, ordinals, amounts = groups[order], ordinals[order], amounts[order]
+    report.count = np.bincount(groups, minlength=group_count)
+    report.mean_amount = np.bincount(groups, weights=amounts, minlength=group_count) / np.maximum(report.count, 1)
+    report.last = np.full(group_count, -1, dtype=np.int64)
+    report.last[groups] = ordinals  # the last write per group is its latest date
+
+    # Every interval between consecutive transactions of the same group
+    same_group = groups[1:] == groups[:-1]
+    gaps = np.diff(ordinals)[same_group]
+    gap_groups = groups[1:][same_group]
+    report._gaps = gaps
+    report._gap_offsets[1:] = np.cumsum(np.bincount(gap_groups, minlength=group_count))
+
+    # Same-day charges aren't an interval
+    real = gaps > 0
+    gaps, gap_groups = gaps[real], gap_groups[real]
+    report.intervals = np.bincount(gap_groups, minlength=group_count)
+
+    periods, lows, highs, month_steps, min_matched, confidences = _columns()
+    window = np.searchsorted(lows, gaps, side="right") - 1
+    in_window = (window >= 0) & (gaps <= highs[np.maximum(window, 0)])
+    tally = np.bincount(
+        gap_groups[in_window] * len(CADENCES) + window[in_window], minlength=group_count * len(CADENCES)
+    ).reshape(group_count, len(CADENCES))
+    tally[tally < min_matched] = 0
+
+    best = tally.argmax(axis=1)
+    report.matched = tally[np.arange(group_count), best]
+    report.cadence = np.where(report.matched > 0, best, -1)
+    report.regularity = report.matched / np.maximum(report.intervals, 1)
+    report.confidence = confidences[
+        (report.regularity >= MEDIUM_REGULARITY).astype(np.int64)
+        + ((report.regularity >= HIGH_REGULARITY) & (report.matched >= HIGH_MIN_INTERVALS))
+    ]
+
+    matching = in_window & (window == best[gap_groups])
+    report.interval_days = _grouped_median(gaps[matching], gap_groups[matching], group_count)
+
+    cadence = np.maximum(report.cadence, 0)
+    months = month_steps[cadence]
+    next_due = np.where(months > 0, _add_months(report.last, months), report.last + periods[cadence])
+    report.next_due = np.where(report.cadence >= 0, next_due, -1)
+    return report
@@ -0,0 +1,114 @@
+"""
+Runtime configuration for the FastAPI backend.
+
+Every setting can be overridden with an environment variable of the same name.
+"""
+
+import os
+
+
+def _env_int(name, default):
+    """
+    Read an integer setting from the environment, falling back to default.
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"[config] Ignoring invalid integer for {name}: {value!r}")
+        return default
+
+
+# --- Upload ingestion ---
+# Uploads are read in chunks of UPLOAD_CHUNK_SIZE bytes. Anything up to
+# UPLOAD_SPOOL_MAX_MEMORY stays in memory, larger files roll over to an
+# anonymous temp file. Uploads above UPLOAD_MAX_BYTES are rejected.
+UPLOAD_CHUNK_SIZE = _env_int("UPLOAD_CHUNK_SIZE", 1024 * 1024)
+UPLOAD_SPOOL_MAX_MEMORY = _env_int("UPLOAD_SPOOL_MAX_MEMORY", 8 * 1024 * 1024)
+UPLOAD_MAX_BYTES = _env_int("UPLOAD_MAX_BYTES", 100 * 1024 * 1024)
+
+# --- Parse executor ---
+# PDF parsing runs in a pool of PARSE_WORKERS processes (0 runs parses in a
+# thread instead). A parse taking longer than PARSE_TASK_TIMEOUT seconds from
+# when a worker picks it up is abandoned and that worker replaced; each is
+# replaced after
+# PARSE_MAX_TASKS_PER_CHILD tasks to cap memory creep from pdfminer.
+PARSE_WORKERS = _env_int("PARSE_WORKERS", os.cpu_count() or 1)
+PARSE_TASK_TIMEOUT = _env_int("PARSE_TASK_TIMEOUT", 120)
+PARSE_MAX_TASKS_PER_CHILD = _env_int("PARSE_MAX_TASKS_PER_CHILD", 50)
+
+# --- Startup ---
+# Heavy dependencies (pdfplumber, thefuzz, the OCR model) are imported on
+# first use and loaded ahead of time by the startup warm-up; LAZY_IMPORTS=0
+# imports them eagerly instead (see backend/lazy_imports.py).
+LAZY_IMPORTS = _env_int("LAZY_IMPORTS", 1)
+
+# --- Page-parallel parsing ---
+# Statements of at least PARSE_PARALLEL_MIN_PAGES pages are split across
+# PARSE_PAGE_WORKERS extra processes (per parse worker) by the parsers that
+# support it. 0 disables page-parallel parsing.
+PARSE_PAGE_WORKERS = _env_int("PARSE_PAGE_WORKERS", 0)
+PARSE_PARALLEL_MIN_PAGES = _env_int("PARSE_PARALLEL_MIN_PAGES", 40)
+
+# --- Bounded-memory parsing ---
+# Statements of at least PARSE_LOW_MEMORY_MIN_PAGES pages release each page's
+# layout once it is parsed and are opened PARSE_PAGE_WINDOW pages at a time
+# (0 keeps the whole PDF open), so memory stays flat however long the
+# statement is. PARSE_LOW_MEMORY_MIN_PAGES=0 disables the mode.
+PARSE_LOW_MEMORY_MIN_PAGES = _env_int("PARSE_LOW_MEMORY_MIN_PAGES", 100)
+PARSE_PAGE_WINDOW = _env_int("PARSE_PAGE_WINDOW", 50)
+
+# --- Page skipping ---
+# Parsers probe each page's content stream and skip the layout analysis of
+# pages that can't hold transactions (disclosures, marketing inserts; see
+# backend/parsers/page_planner.py). PARSE_PAGE_SKIPPING=0 parses every page.
+PARSE_PAGE_SKIPPING = _env_int("PARSE_PAGE_SKIPPING", 1)
+
+# --- Session store ---
+# Sessions expire SESSION_TTL_SECONDS after their last access. Once the
+# in-memory sessions exceed SESSION_MAX_BYTES (or SESSION_MAX_COUNT), the
+# least recently used ones are spilled to SESSION_SPILL_DIR, or dropped when
+# no spill directory is configured.
+SESSION_TTL_SECONDS = _env_int("SESSION_TTL_SECONDS", 60 * 60)
+SESSION_MAX_BYTES = _env_int("SESSION_MAX_BYTES", 256 * 1024 * 1024)
+SESSION_MAX_COUNT = _env_int("SESSION_MAX_COUNT", 10000)
+SESSION_SPILL_DIR = os.getenv("SESSION_SPILL_DIR", "")
+
+# --- Parse jobs ---
+# POST /jobs queues at most JOB_QUEUE_SIZE pending parses (further submissions
+# get 429 + Retry-After). Finished jobs are kept for JOB_RESULT_TTL_SECONDS.
+JOB_QUEUE_SIZE = _env_int("JOB_QUEUE_SIZE", 32)
+JOB_RESULT_TTL_SECONDS = _env_int("JOB_RESULT_TTL_SECONDS", 15 * 60)
+
+# --- Parse result cache ---
+# Parse results are cached in a SQLite file keyed by the PDF's SHA-256 plus
+# the parser name and version. Least recently used entries are evicted once
+# the cache exceeds PARSE_CACHE_MAX_BYTES. An empty PARSE_CACHE_PATH disables it.
+PARSE_CACHE_PATH = os.getenv(
+    "PARSE_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "parse_cache.sqlite3"),
+)
+PARSE_CACHE_MAX_BYTES = _env_int("PARSE_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+
+# --- Merchant normalization ---
+# Both subscription detectors normalize descriptions through one service
+# (backend/merchant_normalizer.py) that memoizes the results of the last
+# MERCHANT_MEMO_SIZE distinct raw descriptions, per operation.
+MERCHANT_MEMO_SIZE = _env_int("MERCHANT_MEMO_SIZE", 65536)
+
+# --- Batch upload ---
+# Maximum number of statements (PDFs, including those inside zip archives)
+# accepted by one /upload-batch request, and the most bytes the PDFs inside
+# its zip archives may inflate to in total.
+BATCH_MAX_FILES = _env_int("BATCH_MAX_FILES", 48)
+BATCH_MAX_UNZIPPED_BYTES = _env_int("BATCH_MAX_UNZIPPED_BYTES", 512 * 1024 * 1024)
+
+# --- Request profiling ---
+# With PROFILING_ENABLED=1, /upload-pdf and /analyze-subscriptions accept
+# ?profile=true (or an "X-Profile: 1" header) and attach a stage timing
+# breakdown plus the PROFILING_TOP_N functions by cumulative time to the
+# response. Off by default: a profiled request runs several times slower.
+PROFILING_ENABLED = _env_int("PROFILING_ENABLED", 0)
+PROFILING_TOP_N = _env_int("PROFILING_TOP_N", 25)
@@ -1,120 +1,93 @@
-from datetime import datetime
 from collections import defaultdict
-from thefuzz import fuzz, process
-import re
+import time
+from backend import metrics
+from backend.analysis_frame import as_frame
+from backend.fuzzy_groups import group_descriptions
+from backend.merchant_normalizer import RECURRING_KEYWORDS, merchant_normalizer
 
 class SubscriptionScanner:
-    RECURRING_KEYWORDS = ["PPD", "REC", "Club Fees", "Mbrshp", "Subscription", "Auto-Pay"]
+    RECURRING_KEYWORDS = list(RECURRING_KEYWORDS)
     
     def scan(self, transactions):
         """
         Scans a list of transactions for potential subscriptions.
         
         Args:
-            transactions: List of dicts {date, description, amount}
+            transactions: AnalysisFrame, TransactionBatch, or list of dicts {date, description, amount}
             
         Returns:
             List of "Suspected Subscriptions" with confidence scores.
         """
-        # Helper to normalize transaction keys
-        normalized_txs = []
-        for t in transactions:
-            desc = t.get('description', t.get('desc', ''))
-            normalized_txs.append({
-                'date': t['date'],
-                'amount': t['amount'],
-                'description': desc,
-                'clean_desc': self._clean_description(desc),
-                'original_obj': t
-            })
+        started = time.perf_counter()
+        normalized_txs = self.normalize(transactions)
+        metrics.observe_stage("detect_recurring", "normalize", time.perf_counter() - started)
 
         candidates = {} # Key: (clean_desc, amount), Value: candidate_obj
 
         # Step 2: Group transactions using token set ratio > 80
-        # We'll group by comparing clean descriptions
-        groups = []
-        
-        # Optimization: Sort by clean_desc to minimize comparisons? 
-        # Or just simple O(N^2) for small datasets (typical bank statement is < 200 lines)
-        
-        processed_indices = set()
-        
-        for i, tx in enumerate(normalized_txs):
-            if i in processed_indices:
-                continue
-                
-            current_group = [tx]
-            processed_indices.add(i)
-            
-            for j, other_tx in enumerate(normalized_txs):
-                if j in processed_indices:
-                    continue
-                
-                # Fuzzy match
-                ratio = fuzz.token_set_ratio(tx['clean_desc'], other_tx['clean_desc'])
-                if ratio > 80:
-                    current_group.append(other_tx)
-                    processed_indices.add(j)
-            
-            groups.append(current_group)
+        started = time.perf_counter()
+        groups = [
+            [normalized_txs[index] for index in group]
+            for group in group_descriptions([tx['clean_desc'] for tx in normalized_txs])
+        ]
+
+        metrics.observe_stage("detect_recurring", "fuzzy_group", time.perf_counter() - started)
+        metrics.detect_recurring_groups.observe(len(groups))
+
+        started = time.perf_counter()
 
         # Step 3: Check Intervals
         for group in groups:
             # Sort by date
-            parsed_group = []
-            for item in group:
-                dt = self._parse_date(item['date'])
-                if dt:
-                    parsed_group.append({**item, 'dt': dt})
-            
-            parsed_group.sort(key=lambda x: x['dt'])
+            parsed_group = [item for item in group if item['ordinal'] >= 0]
+            parsed_group.sort(key=lambda x: x['ordinal'])
             
             # Check for periodicity
-            if len(parsed_group) > 1:
-                for k in range(len(parsed_group) - 1):
-                    current = parsed_group[k]
-                    next_item = parsed_group[k+1]
-                    
-                    delta = next_item['dt'] - current['dt']
-                    days = abs(delta.days)
-                    
-                    # 28-31 days apart -> High Confidence
-                    if 28 <= days <= 31:
-                        self._add_candidate(candidates, current, "High", "Periodicity Detected (Monthly)")
+            for current, next_item in zip(parsed_group, parsed_group[1:]):
+                # 28-31 days apart -> High Confidence
+                if 28 <= next_item['ordinal'] - current['ordinal'] <= 31:
+                    self._add_candidate(candidates, current, "High", "Periodicity Detected (Monthly)")
             
             # Step 4: Keyword Backup
             # Check each item in group (or just the representative)
             for item in group:
-                for keyword in self.RECURRING_KEYWORDS:
-                    if keyword.lower() in item['description'].lower():
-                        # Mark as Medium if not already High
-                        self._add_candidate(candidates, item, "Medium", f"Keyword Match: {keyword}")
+                for keyword in item['keywords']:
+                    # Mark as Medium if not already High
+                    self._add_candidate(candidates, item, "Medium", f"Keyword Match: {keyword}")
 
+        metrics.observe_stage("detect_recurring", "intervals", time.perf_counter() - started)
         return list(candidates.values())
 
+    def normalize(self, transactions):
+        """
+        Transactions as dicts {date, amount, description, clean_desc,
+        keywords, ordinal}, read from their AnalysisFrame.
+
+        Args:
+            transactions: AnalysisFrame, TransactionBatch, or list of dicts {date, description, amount}
+        """
+        frame = as_frame(transactions)
+        descriptions, clean, keywords = frame.descriptions, frame.clean, frame.keywords
+        return [
+            {
+                'date': date_val,
+                'amount': amount,
+                'description': descriptions[code],
+                'clean_desc': clean[code],
+                'keywords': keywords[code],
+                'ordinal': ordinal,
+            }
+            for date_val, amount, code, ordinal in zip(
+                frame.dates(), frame.amounts.tolist(), frame.codes.tolist(), frame.ordinals.tolist()
+            )
+        ]
+
     def _clean_description(self, desc):
         """
         Removes dates, long IDs, but keeps merchant names.
+        See MerchantNormalizer.clean_description.
         """
-        # Remove dates like MM/DD or MM/DD/YY
-        desc = re.sub(r'\d{1,2}/\d{1,2}(/\d{2,4})?', '', desc)
-        
-        # Remove long numeric sequences (IDs)
-        desc = re.sub(r'\d{5,}', '', desc)
-        
-        # Remove common prefixes
-        desc = desc.replace("Debit Card Purchase", "").replace("Direct Deposit -", "")
-        
-        return desc.strip()
-
-    def _parse_date(self, date_str):
-        try:
-            if '-' in date_str:
-                return datetime.strptime(date_str, "%Y-%m-%d")
-            else:
-                return datetime.strptime(date_str, "%m/%d/%Y")
-        except ValueError:
-            return None
+        return merchant_normalizer.clean_description(desc)
 
     def _add_candidate(self, candidates, tx, confidence, reason):
         key = (tx['clean_desc'], tx['amount'])
@@ -137,4 +110,5 @@ class SubscriptionScanner:
 # Wrapper for backward compatibility
 def detect_recurring(transactions):
     scanner = SubscriptionScanner()
-    return scanner.scan(transactions)
+    with metrics.detect_recurring_seconds.time():
+        return scanner.scan(transactions)
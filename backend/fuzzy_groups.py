@@ -0,0 +1,353 @@
+"""
+Fuzzy grouping of transaction descriptions for the recurring-charge scan.
+
+SubscriptionScanner.scan groups transactions whose cleaned descriptions
+have a thefuzz token_set_ratio above 80. It used to compare every
+transaction with every later one - O(N^2) calls, written for a single
+statement of < 200 lines, and hopeless on a multi-year history of tens of
+thousands. group_descriptions() produces the same groups in three stages:
+
+1. Distinct descriptions: equal strings (after thefuzz's own processing)
+   always score 100, so each distinct description is grouped once
+2. Blocking: a seed is only compared with ungrouped descriptions sharing a
+   blocking key with it - the first or last BLOCK_AFFIX characters of one
+   of their tokens
+3. Batched scoring: for all of a seed's candidates at once, numpy computes
+   the parts of token_set_ratio that only need token lengths (shared
+   tokens, the two "intersection vs. whole" ratios) exactly, and bounds the
+   third from above with character counts. Candidates the bound rules out
+   are dropped and the rest are scored by one rapidfuzz cdist call
+
+The bound never rejects a match, so blocking is the only approximation:
+two descriptions with no token prefix or suffix in common are never
+compared. They can only match if every token of both is altered at both
+ends ("xnetflixy" vs "netflix"), which cleaned merchant descriptions don't
+do.
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+
+from backend.lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+fuzz = lazy_import("thefuzz.fuzz")
+rapidfuzz = lazy_import("rapidfuzz")
+
+# Descriptions group when fuzz.token_set_ratio (rounded, as thefuzz
+# returns it) is above this
+MATCH_THRESHOLD = 80
+# Length of the token prefixes and suffixes used as blocking keys
+BLOCK_AFFIX = 2
+# Scores within this of the rounding boundary are left to rapidfuzz
+_MARGIN = 1e-6
+# thefuzz's processing leaves lowercase ASCII letters, digits and spaces
+_ALPHABET = b"abcdefghijklmnopqrstuvwxyz0123456789"
+
+
+@lru_cache(maxsize=None)
+def _symbols():
+    """
+    Index of each byte in _ALPHABET (len(_ALPHABET) for any other byte),
+    built on first use so importing this module doesn't import numpy.
+    """
+    symbols = np.full(256, len(_ALPHABET), dtype=np.intp)
+    symbols[np.frombuffer(_ALPHABET, dtype=np.uint8)] = np.arange(len(_ALPHABET))
+    return symbols
+
+
+def _histogram(token):
+    """
+    Character counts of a token over _ALPHABET.
+    """
+    codes = _symbols()[np.frombuffer(token.encode("ascii"), dtype=np.uint8)]
+    return np.bincount(codes, minlength=len(_ALPHABET) + 1)[:len(_ALPHABET)].astype(np.int16)
+
+
+def _blocking_keys(tokens):
+    keys = set()
+    for token in tokens:
+        keys.add(token[:BLOCK_AFFIX])
+        keys.add("~" + token[-BLOCK_AFFIX:])
+    return keys
+
+
+class _Descriptions:
+    """
+    Distinct processed descriptions with their token and character
+    statistics as arrays, and inverted indexes over tokens and blocking keys.
+    """
+
+    def __init__(self, processed):
+        self.strings = processed
+        self.tokens = [set(string.split()) for string in processed]
+        count = len(processed)
+        self.token_count = np.array([len(tokens) for tokens in self.tokens], dtype=np.int32)
+        self.token_chars = np.array([sum(map(len, tokens)) for tokens in self.tokens], dtype=np.int32)
+        self.histograms = np.zeros((count, len(_ALPHABET)), dtype=np.int16)
+
+        self.token_histograms = {}
+        token_postings = defaultdict(list)
+        key_postings = defaultdict(list)
+        self.keys = []
+        for position, tokens in enumerate(self.tokens):
+            for token in tokens:
+                histogram = self.token_histograms.get(token)
+                if histogram is None:
+                    histogram = self.token_histograms[token] = _histogram(token)
+                self.histograms[position] += histogram
+                token_postings[token].append(position)
+            keys = _blocking_keys(tokens)
+            self.keys.append(keys)
+            for key in keys:
+                key_postings[key].append(position)
+        self.token_postings = {token: np.array(p, dtype=np.intp) for token, p in token_postings.items()}
+        self.key_postings = {key: np.array(p, dtype=np.intp) for key, p in key_postings.items()}
+        self.grouped = np.zeros(count, dtype=bool)
+        # Scratch space: candidate marks and each candidate's row
+        self._marks = np.zeros(count, dtype=bool)
+        self._rows = np.full(count, -1, dtype=np.intp)
+
+    def _posting(self, postings, key):
+        # Drop descriptions grouped since the posting was last read
+        posting = postings[key]
+        posting = postings[key] = posting[~self.grouped[posting]]
+        return posting
+
+    def candidates(self, position):
+        """
+        Ungrouped descriptions sharing a blocking key with `position`.
+        """
+        for key in self.keys[position]:
+            self._marks[self._posting(self.key_postings, key)] = True
+        candidates = np.flatnonzero(self._marks)
+        self._marks[candidates] = False
+        return candidates
+
+    def _shared(self, position, candidates, histograms=False):
+        """
+        Number and total length of the tokens each candidate shares with
+        `position`, and with `histograms`, their character counts.
+        """
+        size = len(candidates)
+        self._rows[candidates] = np.arange(size)
+        count = np.zeros(size, dtype=np.int32)
+        chars = np.zeros(size, dtype=np.int32)
+        counts = np.zeros((size, len(_ALPHABET)), dtype=np.int16) if histograms else None
+        for token in self.tokens[position]:
+            rows = self._rows[self._posting(self.token_postings, token)]
+            rows = rows[rows >= 0]
+            count[rows] += 1
+            chars[rows] += len(token)
+            if histograms:
+                counts[rows] += self.token_histograms[token]
+        self._rows[candidates] = -1
+        return count, chars, counts
+
+    def matches(self, position, candidates):
+        """
+        The candidates whose token_set_ratio with `position` rounds above
+        MATCH_THRESHOLD.
+        """
+        threshold = MATCH_THRESHOLD + 0.5
+        shared_count, shared_chars, _ = self._shared(position, candidates)
+
+        # Lengths of the joined intersection and differences, as rapidfuzz has them
+        shared = shared_count > 0
+        sect_len = np.where(shared, shared_chars + shared_count - 1, 0)
+        diff_count_a = self.token_count[position] - shared_count
+        diff_count_b = self.token_count[candidates] - shared_count
+        ab_len = self.token_chars[position] - shared_chars + np.maximum(diff_count_a - 1, 0)
+        ba_len = self.token_chars[candidates] - shared_chars + np.maximum(diff_count_b - 1, 0)
+        sect_ab_len = sect_len + shared + ab_len
+        sect_ba_len = sect_len + shared + ba_len
+        total = sect_ab_len + sect_ba_len
+
+        # The two intersection-vs-whole ratios are exact; one token set
+        # containing the other scores 100
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sect_ab = np.where(shared, 100 * (1 - (shared + ab_len) / (sect_len + sect_ab_len)), 0)
+            sect_ba = np.where(shared, 100 * (1 - (shared + ba_len) / (sect_len + sect_ba_len)), 0)
+        certain = shared & ((diff_count_a == 0) | (diff_count_b == 0))
+        certain |= np.maximum(sect_ab, sect_ba) > threshold + _MARGIN
+
+        # The Indel distance of the joined differences is at least their
+        # length difference ...
+        possible = ~certain & (100 * (1 - np.abs(ab_len - ba_len) / total) > threshold - _MARGIN)
+        if possible.any():
+            # ... and at least their lengths less twice the characters (and
+            # spaces) they have in common
+            rows = candidates[possible]
+            _, _, shared_histograms = self._shared(position, rows, histograms=True)
+            common = np.minimum(
+                self.histograms[position] - shared_histograms, self.histograms[rows] - shared_histograms
+            ).sum(axis=1, dtype=np.int32)
+            common += np.minimum(np.maximum(diff_count_a[possible] - 1, 0), np.maximum(diff_count_b[possible] - 1, 0))
+            distance = np.maximum(ab_len[possible] + ba_len[possible] - 2 * common, 0)
+            possible[possible] = 100 * (1 - distance / total[possible]) > threshold - _MARGIN
+
+        matched = certain
+        if possible.any():
+            scores = rapidfuzz.process.cdist(
+                [self.strings[position]], [self.strings[candidate] for candidate in candidates[possible]],
+                scorer=rapidfuzz.fuzz.token_set_ratio, dtype=np.float64, score_cutoff=MATCH_THRESHOLD,
+            )[0]
+            matched = certain.copy()
+            matched[possible] = np.round(scores) > MATCH_THRESHOLD
+        return candidates[matched]
+
+
+def group_descriptions(descriptions):
+    """
+    Group descriptions whose fuzz.token_set_ratio is above MATCH_THRESHOLD.
+
+    Grouping is greedy, as the pairwise scan it replaces: in input order,
+    each description not yet grouped starts a group and takes every later
+    ungrouped description that matches it.
+
+    Args:
+        descriptions: List of cleaned descriptions
+
+    Returns:
+        List of groups, each a list of indices into `descriptions`, ordered
+        by their first index
+    """
+    full_process = fuzz.utils.full_process
+    groups = []
+    unique_index = {}
+    processed = []
+    members = []
+    for index, description in enumerate(descriptions):
+        string = full_process(description, force_ascii=True)
+        if not string:
+            # token_set_ratio scores an empty description 0, even against itself
+            groups.append([index])
+            continue
+        position = unique_index.get(string)
+        if position is None:
+            position = unique_index[string] = len(processed)
+            processed.append(string)
+            members.append([])
+        members[position].append(index)
+
+    uniques = _Descriptions(processed)
+    for position in range(len(processed)):
+        if uniques.grouped[position]:
+            continue
+        uniques.grouped[position] = True
+        group = list(members[position])
+        candidates = uniques.candidates(position)
+        if candidates.size:
+            for candidate in uniques.matches(position, candidates).tolist():
+                uniques.grouped[candidate] = True
+                group.extend(members[candidate])
+        groups.append(sorted(group))
+
+    groups.sort(key=lambda group: group[0])
+    return groups
+
+
+class GroupIndex:
+    """
+    group_descriptions() over a list that keeps growing, without regrouping.
+
+    Greedy grouping puts each description in the group of the first earlier
+    seed (a description that started a group) it matches among those it
+    shares a blocking key with, and makes it a seed if there is none.
+    Appending descriptions therefore never changes earlier groups: add()
+    matches only the new distinct descriptions against the existing seeds,
+    blocked the same way, and groups the rest among themselves.
+
+    Groups are identified by the index of the description that started them.
+    """
+
+    def __init__(self):
+        self.count = 0         # descriptions added so far
+        self.seeds = []        # processed seed descriptions, in order
+        self.seed_groups = []  # group id of each seed
+        self.group_of = {}     # processed description -> group id
+        self._seed_keys = defaultdict(list)  # blocking key -> positions of the seeds with it
+
+    def add(self, descriptions):
+        """
+        Append descriptions.
+
+        Returns:
+            The group id of each description
+        """
+        full_process = fuzz.utils.full_process
+        first = self.count
+        self.count += len(descriptions)
+        assigned = [None] * len(descriptions)
+        new = {}  # processed description -> offsets, for descriptions not seen before
+        for offset, description in enumerate(descriptions):
+            string = full_process(description, force_ascii=True)
+            if not string:
+                # Never matches anything: a group of its own
+                assigned[offset] = first + offset
+            elif string in self.group_of:
+                assigned[offset] = self.group_of[string]
+            else:
+                new.setdefault(string, []).append(offset)
+
+        strings = list(new)
+        unmatched = []
+        for string, group in zip(strings, self._first_seed_matches(strings)):
+            if group is None:
+                unmatched.append(string)
+            else:
+                self.group_of[string] = group
+        # The rest group among themselves, in order of first appearance
+        for members in group_descriptions(unmatched):
+            group = first + new[unmatched[members[0]]][0]
+            self._add_seed(unmatched[members[0]], group)
+            for member in members:
+                self.group_of[unmatched[member]] = group
+
+        for string, offsets in new.items():
+            for offset in offsets:
+                assigned[offset] = self.group_of[string]
+        return assigned
+
+    def _add_seed(self, string, group):
+        for key in _blocking_keys(set(string.split())):
+            self._seed_keys[key].append(len(self.seeds))
+        self.seeds.append(string)
+        self.seed_groups.append(group)
+
+    def _first_seed_matches(self, strings):
+        """
+        The group of the first seed each (processed) string matches, or None.
+        Only seeds sharing a blocking key with the string are scored, as
+        group_descriptions() would compare them.
+        """
+        scorer = rapidfuzz.fuzz.token_set_ratio
+        matches = []
+        for string in strings:
+            seeds = {position for key in _blocking_keys(set(string.split())) for position in self._seed_keys.get(key, ())}
+            group = None
+            for position in sorted(seeds):
+                if round(scorer(string, self.seeds[position], score_cutoff=MATCH_THRESHOLD)) > MATCH_THRESHOLD:
+                    group = self.seed_groups[position]
+                    break
+            matches.append(group)
+        return matches
+
+    def snapshot(self):
+        """
+        The index as JSON-serializable data; see restore().
+        """
+        return {
+            "count": self.count,
+            "seeds": list(zip(self.seeds, self.seed_groups)),
+            "groups": list(self.group_of.items()),
+        }
+
+    @classmethod
+    def restore(cls, data):
+        index = cls()
+        index.count = data["count"]
+        for seed, group in data["seeds"]:
+            index._add_seed(seed, group)
+        index.group_of = dict((string, group) for string, group in data["groups"])
+        return index
@@ -0,0 +1,98 @@
+"""
+Upload ingestion - stream an UploadFile into a bounded spooled buffer.
+
+The upload is read chunk by chunk into a SpooledTemporaryFile (memory below
+the spool threshold, an anonymous temp file above it) and hashed on the fly,
+so parsers can be handed a seekable file-like object directly instead of a
+shared temp path on disk.
+"""
+
+import hashlib
+import tempfile
+
+from backend import config
+
+
+class UploadTooLargeError(ValueError):
+    """
+    Raised when an upload exceeds the configured maximum size.
+    """
+
+
+class SpooledUpload:
+    """
+    A fully received upload: seekable buffer plus its size and SHA-256 digest.
+    """
+
+    def __init__(self, filename, file, size, sha256):
+        self.filename = filename
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+
+    @property
+    def in_memory(self):
+        """
+        True while the buffer has not rolled over to disk.
+        """
+        return not getattr(self.file, "_rolled", False)
+
+    def rewind(self):
+        """
+        Seek back to the start and return the buffer for reading.
+        """
+        self.file.seek(0)
+        return self.file
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+async def spool_upload(upload, chunk_size=None, max_memory=None, max_bytes=None):
+    """
+    Stream an UploadFile into a SpooledTemporaryFile, hashing as it goes.
+
+    Args:
+        upload: FastAPI/Starlette UploadFile.
+        chunk_size (int): Bytes read per chunk.
+        max_memory (int): Spool threshold before rolling over to disk.
+        max_bytes (int): Hard limit on the upload size (None disables it).
+
+    Returns:
+        SpooledUpload positioned at offset 0.
+
+    Raises:
+        UploadTooLargeError: If the upload exceeds max_bytes.
+    """
+    chunk_size = chunk_size or config.UPLOAD_CHUNK_SIZE
+    max_memory = max_memory if max_memory is not None else config.UPLOAD_SPOOL_MAX_MEMORY
+    max_bytes = max_bytes if max_bytes is not None else config.UPLOAD_MAX_BYTES
+
+    buffer = tempfile.SpooledTemporaryFile(max_size=max_memory, mode="w+b")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                raise UploadTooLargeError(f"Upload exceeds the {max_bytes} byte limit")
+
+            digest.update(chunk)
+            buffer.write(chunk)
+    except BaseException:
+        buffer.close()
+        raise
+
+    buffer.seek(0)
+    return SpooledUpload(upload.filename, buffer, size, digest.hexdigest())
@@ -12,8 +12,13 @@ def tag_transaction(description, amount):
     if not description:
         return "Uncategorized"
         
-    description_upper = description.upper()
-    
+    return _tag_upper(description.upper(), amount)
+
+
+def _tag_upper(description_upper, amount):
+    """
+    tag_transaction() for an already upper-cased, non-empty description.
+    """
     # Rule 1: Gig Income
     # If desc contains "Wal-Mart Assocs" or "Venmo" AND amount > 0 -> Tag "Income/Gig"
     if amount > 0 and any(keyword in description_upper for keyword in ["WAL-MART ASSOCS", "VENMO"]):
@@ -35,3 +40,21 @@ def tag_transaction(description, amount):
         return "Education"
         
     return "Uncategorized"
+
+
+def tag_frame(frame):
+    """
+    Tag every transaction of an AnalysisFrame. Each distinct description is
+    tagged once as money in and once as money out.
+
+    Args:
+        frame (AnalysisFrame): The preprocessed transactions.
+
+    Returns:
+        list: The category tag of each transaction, in order.
+    """
+    tags = [
+        ("Uncategorized", "Uncategorized") if not text else (_tag_upper(text, 1), _tag_upper(text, 0))
+        for text in frame.upper
+    ]
+    return [tags[code][0 if cents > 0 else 1] for code, cents in zip(frame.codes.tolist(), frame.cents.tolist())]
@@ -0,0 +1,314 @@
+"""
+JobManager - asynchronous parse jobs behind a bounded queue.
+
+POST /jobs hands a spooled upload to the manager and returns immediately with
+a job id. A fixed set of worker coroutines drain the queue into the
+ParseExecutor, so at most `workers` parses run at once and at most
+`queue_size` wait. When the queue is full, submission fails fast with a
+Retry-After estimate instead of letting requests pile up.
+
+Progress (pages processed) and cancellation flags travel through a shared
+dict: a multiprocessing Manager dict when parses run in worker processes, a
+plain dict in thread mode. Parsers report through their `progress` callback,
+which is also where a cancelled job is stopped at the next page boundary.
+"""
+
+import asyncio
+import math
+import multiprocessing
+import secrets
+import time
+
+from backend import config
+from backend.parse_executor import parse_executor
+from backend.transactions import as_records
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class ParseCancelledError(BaseException):
+    """
+    Raised inside a parser (via its progress callback) when the job was cancelled.
+
+    Derives from BaseException, like asyncio.CancelledError, so the parsers'
+    broad `except Exception` recovery blocks don't swallow it.
+    """
+
+
+class QueueFullError(Exception):
+    """
+    Raised when the job queue is at capacity. `retry_after` is in seconds.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(f"Parse queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobsUnavailableError(Exception):
+    """
+    Raised when the job manager is not running (startup or shutdown).
+    """
+
+
+class ProgressReporter:
+    """
+    Picklable progress callback that publishes (pages_done, pages_total) for a
+    job and aborts the parse once the job has been flagged as cancelled.
+    """
+
+    def __init__(self, shared, job_id):
+        self.shared = shared
+        self.job_id = job_id
+
+    def __call__(self, pages_done, pages_total):
+        if self.shared.get(("cancelled", self.job_id)):
+            raise ParseCancelledError(self.job_id)
+        self.shared[self.job_id] = (pages_done, pages_total)
+
+
+class Job:
+    def __init__(self, job_id, parser_name, upload, on_complete=None):
+        self.id = job_id
+        self.parser = parser_name
+        self.upload = upload
+        self.on_complete = on_complete
+        self.status = JobStatus.QUEUED
+        self.pages_done = 0
+        self.pages_total = None
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._task = None
+
+    def to_dict(self):
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "parser": self.parser,
+            "progress": {
+                "pages_processed": self.pages_done,
+                "pages_total": self.pages_total,
+            },
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.status == JobStatus.SUCCEEDED:
+            data["result"] = {**self.result, "transactions": as_records(self.result.get("transactions", []))}
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class JobManager:
+    """
+    Bounded queue of parse jobs drained by a fixed pool of worker coroutines.
+    """
+
+    def __init__(self, executor=None, queue_size=None, workers=None, result_ttl=None):
+        self.executor = executor or parse_executor
+        self.queue_size = config.JOB_QUEUE_SIZE if queue_size is None else queue_size
+        self.workers = workers or max(1, self.executor.max_workers)
+        self.result_ttl = config.JOB_RESULT_TTL_SECONDS if result_ttl is None else result_ttl
+
+        self._jobs = {}
+        self._queue = None
+        self._tasks = []
+        self._manager = None
+        self._shared = None
+        # Smoothed job duration, used for Retry-After estimates
+        self._avg_duration = 5.0
+
+    @property
+    def running(self):
+        return self._queue is not None
+
+    async def start(self):
+        if self.running:
+            return
+
+        if self.executor.uses_processes:
+            # Progress and cancel flags must be visible to the worker processes
+            self._manager = await asyncio.to_thread(multiprocessing.get_context("spawn").Manager)
+            self._shared = self._manager.dict()
+        else:
+            self._shared = {}
+
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def shutdown(self):
+        if not self.running:
+            return
+
+        queue, self._queue = self._queue, None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        while not queue.empty():
+            self._close_upload(queue.get_nowait())
+
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def submit(self, parser_name, upload, on_complete=None):
+        """
+        Queue a parse of `upload` (a SpooledUpload, owned by the job from now on).
+
+        Raises:
+            JobsUnavailableError: If the manager is not running.
+            QueueFullError: If the queue is at capacity.
+        """
+        if not self.running:
+            raise JobsUnavailableError("Job queue is not running")
+
+        self._expire_finished()
+
+        job = Job(secrets.token_urlsafe(16), parser_name, upload, on_complete)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(self.retry_after())
+
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is not None and job.status == JobStatus.RUNNING:
+            self._refresh_progress(job)
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job. Finished jobs are returned unchanged.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.status in JobStatus.FINISHED:
+            return job
+
+        if job.status == JobStatus.RUNNING:
+            # Stops a process-side parse at its next page boundary
+            self._shared[("cancelled", job.id)] = True
+            if job._task is not None:
+                job._task.cancel()
+
+        self._finish(job, JobStatus.CANCELLED)
+        return job
+
+    def retry_after(self):
+        """
+        Seconds until a queue slot is likely to free up.
+        """
+        pending = self._queue.qsize() if self._queue else 0
+        return max(1, math.ceil(self._avg_duration * (pending + 1) / self.workers))
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.queue_size,
+            "workers": self.workers,
+            "jobs": len(self._jobs),
+            "avg_duration": round(self._avg_duration, 3),
+        }
+
+    async def _worker(self):
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            try:
+                if job.status == JobStatus.QUEUED:
+                    await self._run(job)
+            finally:
+                self._close_upload(job)
+                queue.task_done()
+
+    async def _run(self, job):
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        reporter = ProgressReporter(self._shared, job.id)
+        job._task = asyncio.ensure_future(
+            self.executor.run(
+                job.parser,
+                job.upload.rewind(),
+                progress=reporter,
+                content_hash=job.upload.sha256,
+            )
+        )
+
+        try:
+            result = await job._task
+        except ParseCancelledError:
+            self._finish(job, JobStatus.CANCELLED)
+            return
+        except asyncio.CancelledError:
+            if job.status != JobStatus.CANCELLED:
+                # Not a job cancel: the worker itself is being shut down
+                raise
+            return
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, JobStatus.FAILED)
+            return
+        finally:
+            job._task = None
+
+        self._refresh_progress(job)
+        job.result = result
+        if job.on_complete is not None:
+            try:
+                job.on_complete(result)
+            except Exception as e:
+                print(f"[JobManager] on_complete failed for job {job.id}: {e}")
+        self._finish(job, JobStatus.SUCCEEDED)
+
+    def _finish(self, job, status):
+        if job.status in JobStatus.FINISHED:
+            return
+        job.status = status
+        job.finished_at = time.time()
+        if job.started_at is not None and status == JobStatus.SUCCEEDED:
+            duration = job.finished_at - job.started_at
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+        # The cancel flag outlives the job status: a cancelled parse may still
+        # be running in a worker process until its next page boundary.
+        self._shared.pop(job.id, None)
+
+    def _refresh_progress(self, job):
+        progress = self._shared.get(job.id)
+        if progress:
+            job.pages_done, job.pages_total = progress
+
+    def _expire_finished(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in JobStatus.FINISHED and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._shared.pop(("cancelled", job_id), None)
+
+    @staticmethod
+    def _close_upload(job):
+        if job.upload is not None:
+            job.upload.close()
+            job.upload = None
+
+
+# Export singleton
+job_manager = JobManager()
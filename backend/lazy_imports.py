@@ -0,0 +1,168 @@
+"""
+Lazy imports for heavy dependencies, plus the warm-up that loads them.
+
+pdfplumber (with pdfminer and Pillow), thefuzz/rapidfuzz and the OCR model
+used to be imported at module load, so importing any parser - or the app -
+paid for all of them before serving a request. Modules now bind these
+dependencies with lazy_import():
+
+    pdfplumber = lazy_import("pdfplumber")
+
+which registers a module object in sys.modules without executing it. The
+real import runs on first attribute access, so `pdfplumber.open(...)` and
+patch("...pdfplumber.open") keep working unchanged. Unlike the standard
+library's importlib.util.LazyLoader before Python 3.12, the first access is
+serialized with a lock: two threads touching a module for the first time
+can't see it half-initialized.
+
+warm_up() then loads everything registered here, ahead of the first request:
+the FastAPI lifespan runs it in the background at startup, and parse workers
+run it in their pool initializer. LAZY_IMPORTS=0 restores eager imports.
+"""
+
+import importlib
+import importlib.machinery
+import importlib.util
+import sys
+import threading
+import time
+import types
+
+from backend import config
+
+
+# Modules handed out by lazy_import(), in registration order
+_registered = {}
+# Callables run by warm_up() after the imports (model construction etc.)
+_warmers = []
+_lock = threading.Lock()
+
+
+class _LazyModule(types.ModuleType):
+    """
+    A module whose code runs on first attribute access, then becomes a
+    plain module again.
+    """
+
+    def __getattribute__(self, attr):
+        _finish_import(self)
+        return types.ModuleType.__getattribute__(self, attr)
+
+    def __setattr__(self, attr, value):
+        _finish_import(self)
+        types.ModuleType.__setattr__(self, attr, value)
+
+    def __delattr__(self, attr):
+        _finish_import(self)
+        types.ModuleType.__delattr__(self, attr)
+
+
+def _finish_import(module):
+    spec = types.ModuleType.__getattribute__(module, "__spec__")
+    state = spec.loader_state
+    # Other threads wait here until the import is done; the importing
+    # thread re-enters (the module's own code and the import machinery
+    # touch it) and falls through while "loading" is set
+    with state["lock"]:
+        if type(module) is not _LazyModule or state["loading"]:
+            return
+        state["loading"] = True
+        started = time.perf_counter()
+        try:
+            spec.loader = state["loader"]
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                sys.modules.pop(spec.name, None)
+                raise
+            module.__class__ = types.ModuleType
+        finally:
+            state["loading"] = False
+        print(f"[lazy_imports] Imported {spec.name} in {time.perf_counter() - started:.3f}s")
+
+
+def lazy_import(name, optional=False):
+    """
+    Return module `name`, deferring its execution until first attribute access.
+
+    Modules that are already imported, and extension modules (which can't be
+    split into create/exec steps), are imported right away.
+
+    Args:
+        name: Absolute module name ("pdfplumber", "thefuzz.fuzz")
+        optional: Return None instead of raising if the module isn't installed
+
+    Raises:
+        ImportError: If the module isn't installed and `optional` is False
+    """
+    with _lock:
+        module = sys.modules.get(name)
+        if module is None:
+            try:
+                spec = importlib.util.find_spec(name)
+                if spec is None:
+                    raise ImportError(f"No module named {name!r}", name=name)
+                if config.LAZY_IMPORTS and isinstance(spec.loader, importlib.machinery.SourceFileLoader):
+                    module = importlib.util.module_from_spec(spec)
+                    spec.loader_state = {"lock": threading.RLock(), "loader": spec.loader, "loading": False}
+                    sys.modules[name] = module
+                    module.__class__ = _LazyModule
+                else:
+                    module = importlib.import_module(name)
+            except ImportError:
+                if optional:
+                    return None
+                raise
+        _registered.setdefault(name, module)
+    return module
+
+
+def is_loaded(module):
+    """
+    Whether a module returned by lazy_import() has actually been imported.
+    """
+    return type(module) is not _LazyModule
+
+
+def register_warmer(function):
+    """
+    Run `function` (no arguments) during warm_up(), e.g. to build a model.
+    Usable as a decorator.
+    """
+    _warmers.append(function)
+    return function
+
+
+def warm_up():
+    """
+    Load every lazily imported module and run the registered warmers.
+    Failures are logged and skipped: warm-up only moves work earlier.
+
+    Returns:
+        {name: seconds} for each module and warmer
+    """
+    timings = {}
+    for name, module in list(_registered.items()):
+        started = time.perf_counter()
+        try:
+            # Any attribute access finishes a lazy module's import
+            module.__dict__
+        except Exception as e:
+            print(f"[lazy_imports] Warm-up import of {name} failed: {e}")
+            continue
+        timings[name] = time.perf_counter() - started
+
+    for function in list(_warmers):
+        name = f"{function.__module__}.{function.__qualname__}"
+        started = time.perf_counter()
+        try:
+            function()
+        except Exception as e:
+            print(f"[lazy_imports] Warmer {name} failed: {e}")
+            continue
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def registered_modules():
+    return list(_registered)
@@ -1,12 +1,55 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
-import shutil
-import os
+from fastapi.responses import StreamingResponse, PlainTextResponse
+import asyncio
 import json
-from typing import Optional
-from backend.parser import extract_transactions
+import pickle
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from backend import config
+from backend import lazy_imports
+from backend import metrics
+from backend import profiling
+from backend.ingest import spool_upload, UploadTooLargeError
+from backend.parse_executor import parse_executor, ParseTimeoutError, PARSERS, warm_up_parsers
+from backend.session_store import session_store
+from backend.jobs import job_manager, QueueFullError, JobsUnavailableError
+from backend.search_index import catalog_index
+from backend.batch_upload import BatchLimitError, BatchSource, iter_zip_pdfs, parse_batch, merge_statements
+from backend.transactions import TransactionBatch, as_records
 
-app = FastAPI()
+
+def warm_up():
+    """
+    Startup hook: load the lazily imported dependencies (thefuzz for the
+    detective, ...) before the first request needs them. Parse workers warm
+    up in their own initializer; with PARSE_WORKERS=0 parses run in this
+    process, so the parsers are warmed here too.
+    """
+    started = time.perf_counter()
+    if parse_executor.uses_processes:
+        timings = lazy_imports.warm_up()
+    else:
+        timings = warm_up_parsers()
+    print(f"[startup] Warmed up {len(timings)} dependencies in {time.perf_counter() - started:.3f}s")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Spawn and pre-warm the parse workers before serving requests
+    await asyncio.to_thread(parse_executor.start)
+    await job_manager.start()
+    # Warm up in the background: requests are served meanwhile, and one
+    # touching a dependency that is still loading waits for it
+    warming = asyncio.create_task(asyncio.to_thread(warm_up))
+    yield
+    await warming
+    await job_manager.shutdown()
+    parse_executor.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS Configuration
 origins = [
@@ -20,94 +63,439 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Session-Token"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
-from backend.detective import detect_recurring
+from backend.analysis_frame import AnalysisFrame
+from backend.recurring_state import RecurringState
 
-# In-memory storage for the latest session's transactions (Prototype only)
-SESSION_DATA = []
+def resolve_session_token(token):
+    """
+    Reuse the caller's session token if it names a live session, otherwise mint a new one.
+    """
+    if token and session_store.get(token) is not None:
+        return token
+    return session_store.new_token()
 
-@app.post("/upload-pdf")
-async def upload_pdf(file: UploadFile = File(...)):
+
+def store_session_transactions(token, result, append=False):
     """
-    Endpoint to upload a PDF file and extract transactions.
-    Stores transactions in SESSION_DATA for analysis.
-    Returns structured data: { "meta": ..., "transactions": ... }
+    Save a parse result's transactions into the session for later analysis.
+    With `append`, add them after the session's existing transactions and
+    keep its analysis frame and recurring-charge state, so the next analysis
+    only preprocesses and scans them.
+
+    The session keeps its own copy of the transactions (the result may live
+    on as a job result), and appends grow that copy in place: an append
+    costs time in proportion to the appended transactions only.
+    """
+    transactions = result.get("transactions", [])
+
+    # Legacy record lists: the detective used to need a 'merchant' key, but our parser produces 'desc'
+    # Let's map 'desc' to 'merchant' for backward compatibility with detective.py
+    # (a TransactionBatch is stored as is and read column-wise)
+    if not isinstance(transactions, TransactionBatch):
+        for t in transactions:
+            if 'merchant' not in t:
+                t['merchant'] = t.get('desc', t.get('description', ''))
+
+    def append_to(session):
+        previous = session.get("transactions")
+        if not previous:
+            return {"transactions": session_copy(transactions)}, True
+        # Appending keeps the existing transactions (and their order) as they are
+        previous.extend(transactions if isinstance(previous, TransactionBatch) else as_records(transactions))
+        data = {"transactions": previous}
+        for derived in ("frame", "recurring"):
+            if derived in session:
+                data[derived] = session[derived]
+        return data, True, len(pickle.dumps(transactions, protocol=pickle.HIGHEST_PROTOCOL))
+
+    if not (append and session_store.update(token, append_to, default=False)):
+        session_store.put(token, {"transactions": session_copy(transactions)})
+
+
+def session_copy(transactions):
+    """
+    A copy of `transactions` the session can append to.
+    """
+    if isinstance(transactions, TransactionBatch):
+        return TransactionBatch.concat([transactions])
+    return list(transactions)
+
+
+def session_frame(session):
+    """
+    The session's AnalysisFrame: built on the first analysis, extended with
+    transactions appended since, and shared by every analysis pass. The
+    caller stores it back (see analyze_session_subscriptions).
+    """
+    transactions = session["transactions"]
+    frame = session.get("frame")
+    if frame is None or len(frame) > len(transactions):
+        return AnalysisFrame.build(transactions)
+    if len(frame) < len(transactions):
+        if isinstance(transactions, TransactionBatch):
+            appended = transactions.slice(len(frame))
+        else:
+            appended = transactions[len(frame):]
+        return frame.extend(appended)
+    return frame
+
+
+def analyze_session_subscriptions(token):
+    """
+    Suspected subscriptions among the session's transactions, or None if
+    there is no session.
+
+    The session keeps its AnalysisFrame and a RecurringState across calls
+    (written back through session_store.update, so concurrent calls on one
+    session run in turn and the store accounts for their size): only
+    transactions appended since the last analysis are scanned, and only
+    what they add to the frame and state is measured. Replacing the
+    session's transactions starts a new state.
+    """
+    def analyze(session):
+        previous = session.get("frame")
+        frame = session_frame(session)
+        state = session.get("recurring")
+        # Sizes are tracked as the frame and state grow; a rebuild is measured in full
+        incremental = previous is not None and len(previous) <= len(session["transactions"])
+        if state is None or state.count > len(frame):
+            state, incremental = RecurringState(), False
+
+        grown = frame.appended_size(previous) if incremental and frame is not previous else 0
+        with metrics.detect_recurring_seconds.time():
+            if state.count < len(frame):
+                grown += state.update(frame.slice(state.count))
+            candidates = state.candidates()
+        return {**session, "frame": frame, "recurring": state}, candidates, grown if incremental else None
+
+    return session_store.update(token, analyze)
+
+
+def check_profiling(query_flag, header_value):
+    """
+    Whether to profile this request (?profile=true or X-Profile: 1).
+
+    Raises:
+        HTTPException: 403 if profiling was requested but PROFILING_ENABLED is off.
+    """
+    if not profiling.profiling_requested(query_flag, header_value):
+        return False
+    if not config.PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiling is disabled (set PROFILING_ENABLED=1)")
+    return True
+
+
+async def receive_pdf(file):
+    """
+    Validate and spool an uploaded PDF, mapping ingestion errors to HTTP errors.
     """
-    global SESSION_DATA
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="File must be a PDF")
 
-    temp_file = f"temp_{file.filename}"
+    # Stream the upload into a spooled buffer (memory, or an anonymous temp
+    # file for large statements) and hand pdfplumber the file object directly.
+    # No shared temp path, so concurrent uploads of the same filename can't collide.
     try:
-        # with open(temp_file, "wb") as buffer:
-        #     shutil.copyfileobj(file.file, buffer)
-        
-        # FIX: Use async read to avoid WinError 233 on Windows
-        content = await file.read()
-        with open(temp_file, "wb") as buffer:
-            buffer.write(content)
-        
-        result = extract_transactions(temp_file)
-        # SESSION_DATA expects a list of transactions for the detective
-        # We extract the list from the result
-        SESSION_DATA = result.get("transactions", []) 
-        
-        # For the detective to work, it needs 'merchant' key, but our parser now produces 'desc'
-        # Let's map 'desc' to 'merchant' for backward compatibility with detective.py
-        for t in SESSION_DATA:
-            if 'merchant' not in t:
-                t['merchant'] = t['desc']
+        upload = await spool_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    metrics.upload_size_bytes.observe(upload.size, kind="pdf")
+    return upload
 
-        return result
+
+def stream_transactions(upload, token, append=False):
+    """
+    Parse `upload` page by page and yield NDJSON lines as each page completes:
+
+        {"event": "start", "session_token": ...}
+        {"event": "transaction", "page": n, "transaction": {...}}   (per transaction)
+        {"event": "page", "page": n, "pages": total}                (after each page)
+        {"event": "end", "meta": ..., "count": ..., "cached": ...}
+        {"event": "error", "detail": ...}                           (instead of "end")
+
+    The session is updated only once the whole statement parsed. Owns and
+    closes `upload`.
+    """
+    batches = []
+    try:
+        yield json.dumps({"event": "start", "session_token": token}) + "\n"
+        for event in parse_executor.stream("pnc", upload.rewind(), content_hash=upload.sha256):
+            if event["event"] == "page":
+                lines = [
+                    json.dumps({"event": "transaction", "page": event["page"], "transaction": t}, default=str)
+                    for t in event["transactions"]
+                ]
+                lines.append(json.dumps({"event": "page", "page": event["page"], "pages": event["pages"]}))
+                batches.append(event["transactions"])
+                yield "\n".join(lines) + "\n"
+            else:
+                transactions = TransactionBatch.concat(batches, style="pnc")
+                store_session_transactions(token, {"transactions": transactions}, append=append)
+                yield json.dumps({
+                    "event": "end",
+                    "meta": event["meta"],
+                    "count": len(transactions),
+                    "cached": event["cached"],
+                }, default=str) + "\n"
+    except Exception as e:
+        # The 200 status is already on the wire; report the failure in-band
+        print(f"[upload-pdf] Streaming parse failed: {e}")
+        yield json.dumps({"event": "error", "detail": str(e) or type(e).__name__}) + "\n"
+    finally:
+        upload.close()
+
+
+@app.post("/upload-pdf")
+async def upload_pdf(
+    response: Response,
+    file: UploadFile = File(...),
+    stream: bool = False,
+    profile: bool = False,
+    append: bool = False,
+    x_session_token: Optional[str] = Header(None),
+    x_profile: Optional[str] = Header(None),
+):
+    """
+    Endpoint to upload a PDF file and extract transactions.
+    Stores transactions in the caller's session (X-Session-Token header) for analysis;
+    with ?append=true they are added to the session's transactions instead of replacing them.
+    Returns structured data: { "meta": ..., "transactions": ..., "session_token": ... }
+
+    With ?stream=true the response is NDJSON (application/x-ndjson), emitted
+    page by page while the statement is still being parsed; see stream_transactions.
+    With ?profile=true (PROFILING_ENABLED only) the parse bypasses the cache
+    and the response includes a "profile" report.
+    """
+    profile = check_profiling(profile, x_profile)
+    if profile and stream:
+        raise HTTPException(status_code=400, detail="Profiling is not supported for streamed uploads")
+
+    upload = await receive_pdf(file)
+
+    if stream:
+        token = resolve_session_token(x_session_token)
+        # A sync generator: Starlette iterates it in its threadpool
+        return StreamingResponse(
+            stream_transactions(upload, token, append=append),
+            media_type="application/x-ndjson",
+            headers={"X-Session-Token": token},
+        )
+
+    try:
+        with upload:
+            # Parse in the worker pool so a large statement doesn't block the event loop
+            # Repeat uploads of the same statement are served from the parse cache
+            result = await parse_executor.run(
+                "pnc", upload.rewind(), content_hash=upload.sha256, profile=profile
+            )
+
+        token = resolve_session_token(x_session_token)
+        store_session_transactions(token, result, append=append)
+        response.headers["X-Session-Token"] = token
+
+        return {**result, "transactions": as_records(result["transactions"]), "session_token": token}
+    except ParseTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/upload-batch")
+async def upload_batch(
+    response: Response,
+    files: List[UploadFile] = File(...),
+    x_session_token: Optional[str] = Header(None),
+):
+    """
+    Upload many statements at once (PDFs and/or zip archives of PDFs).
+    Parses them in parallel, merges the transactions into one date-ordered,
+    de-duplicated set stored in the caller's session, and reports per-file
+    timing and errors.
+    """
+    too_many = HTTPException(
+        status_code=400,
+        detail=f"A batch may contain at most {config.BATCH_MAX_FILES} statements",
+    )
+    uploads = []
+    sources = []
+    unzipped_bytes = 0
+    try:
+        for file in files:
+            if file.filename.lower().endswith('.zip'):
+                try:
+                    upload = await spool_upload(file)
+                except UploadTooLargeError as e:
+                    raise HTTPException(status_code=413, detail=str(e))
+                uploads.append(upload)
+                metrics.upload_size_bytes.observe(upload.size, kind="zip")
+                # Limits apply as members are read, before the next one is inflated
+                members = iter_zip_pdfs(
+                    upload.rewind(),
+                    config.UPLOAD_MAX_BYTES,
+                    max_members=config.BATCH_MAX_FILES - len(sources),
+                    max_total_bytes=config.BATCH_MAX_UNZIPPED_BYTES - unzipped_bytes,
+                )
+                try:
+                    for source in members:
+                        sources.append(source)
+                        unzipped_bytes += len(source.data)
+                except BatchLimitError:
+                    raise too_many
+                except UploadTooLargeError:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Zip archives in a batch may unpack to at most {config.BATCH_MAX_UNZIPPED_BYTES} bytes of PDFs",
+                    )
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=f"{file.filename}: {e}")
+            else:
+                upload = await receive_pdf(file)
+                uploads.append(upload)
+                sources.append(BatchSource(upload.filename, upload.rewind(), upload.sha256))
+
+            if len(sources) > config.BATCH_MAX_FILES:
+                raise too_many
+
+        if not sources:
+            raise HTTPException(status_code=400, detail="No PDF statements found in upload")
+
+        started = time.perf_counter()
+        reports = await parse_batch(parse_executor, sources)
+        elapsed = time.perf_counter() - started
     finally:
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+        for upload in uploads:
+            upload.close()
+
+    transactions, meta, duplicates_removed = merge_statements(reports)
+    meta["duplicates_removed"] = duplicates_removed
+    meta["seconds"] = round(elapsed, 4)
+
+    token = resolve_session_token(x_session_token)
+    store_session_transactions(token, {"transactions": transactions})
+    response.headers["X-Session-Token"] = token
+
+    return {
+        "meta": meta,
+        "transactions": transactions.to_records(),
+        "files": [
+            {key: value for key, value in report.items() if key != "result"}
+            for report in reports
+        ],
+        "session_token": token,
+    }
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    response: Response,
+    file: UploadFile = File(...),
+    parser: str = Form("pnc"),
+    x_session_token: Optional[str] = Header(None),
+):
+    """
+    Queue a statement for background parsing and return its job id immediately.
+    Poll GET /jobs/{job_id} for progress; the result also lands in the caller's session.
+    Returns 429 with Retry-After when the parse queue is full.
+    """
+    if parser not in PARSERS:
+        raise HTTPException(status_code=400, detail=f"Unknown parser: {parser}")
+
+    upload = await receive_pdf(file)
+    token = resolve_session_token(x_session_token)
+
+    try:
+        job = job_manager.submit(
+            parser,
+            upload,
+            on_complete=lambda result: store_session_transactions(token, result),
+        )
+    except QueueFullError as e:
+        upload.close()
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except JobsUnavailableError as e:
+        upload.close()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    response.headers["X-Session-Token"] = token
+    return {"job_id": job.id, "status": job.status, "session_token": token}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Job status, progress in pages processed, and the parse result once finished.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job.
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
 @app.get("/analyze-subscriptions")
-def analyze_subscriptions():
+def analyze_subscriptions(
+    profile: bool = False,
+    x_session_token: Optional[str] = Header(None),
+    x_profile: Optional[str] = Header(None),
+):
     """
-    Analyze the current session's transactions for recurring subscriptions.
+    Analyze the caller's session transactions for recurring subscriptions.
+    With ?profile=true (PROFILING_ENABLED only) the response includes a "profile" report.
     """
-    global SESSION_DATA
-    if not SESSION_DATA:
+    profile = check_profiling(profile, x_profile)
+    session = session_store.get(x_session_token)
+    if not session or not session.get("transactions"):
         return {"message": "No data found. Please upload a PDF first.", "subscriptions": []}
     
-    subscriptions = detect_recurring(SESSION_DATA)
-    return {"subscriptions": subscriptions}
+    if not profile:
+        subscriptions = analyze_session_subscriptions(x_session_token)
+        return {"subscriptions": subscriptions or []}
+
+    with profiling.profile_block() as report:
+        subscriptions = analyze_session_subscriptions(x_session_token)
+    return {"subscriptions": subscriptions or [], "profile": report}
 
 @app.get("/search-item")
-def search_item(query: str):
+def search_item(query: str, limit: int = 5):
     """
-    Search for a swap item by query string.
-    Returns the best match object with price_diff.
+    Search the swaps catalog by query string.
+    Returns the best match object (with its score) plus the top `limit`
+    ranked results under "results".
     """
     try:
-        # Assuming running from root directory
-        data_path = os.path.join("backend", "data", "swaps.json")
-        if not os.path.exists(data_path):
-             # Fallback if running from backend dir
-             data_path = os.path.join("data", "swaps.json")
-             
-        with open(data_path, "r") as f:
-            swaps = json.load(f)
-        
-        query_lower = query.lower()
-        
-        # Simple linear search for best match (substring match)
-        for swap in swaps:
-            if query_lower in swap["name_brand"].lower():
-                return swap
-        
-        return {"message": "No match found", "query": query}
-        
+        matches = catalog_index.search(query, limit=max(1, min(limit, 50)))
     except FileNotFoundError:
         raise HTTPException(status_code=500, detail="Swaps database not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if not matches:
+        return {"message": "No match found", "query": query, "results": []}
+
+    results = [{**item, "score": score} for score, item in matches]
+    return {**results[0], "results": results}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Prometheus text exposition of the server's metrics.
+    """
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.MetricsRegistry.CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
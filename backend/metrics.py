@@ -0,0 +1,322 @@
+"""
+Metrics - a small Prometheus-compatible metrics registry.
+
+Counters, gauges and histograms are kept in process memory and rendered in
+the Prometheus text exposition format by GET /metrics. Recording a value is
+a dict lookup plus a bisect under a per-metric lock, so instrumentation is
+cheap enough to leave on in production.
+
+Parse stages run inside ParseExecutor worker processes, whose registries are
+never scraped. Parsers therefore report stage timings through
+observe_stage(): normally that records straight into the histogram, but
+inside capture_stages() (which the executor wraps every worker task in) the
+observations are collected instead, sent back with the parse result and
+replayed into this process with replay_stages().
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Seconds, for request and stage latencies (1ms .. 2min)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Bytes, for upload sizes (16KB .. 128MB)
+SIZE_BUCKETS = tuple(16 * 1024 * 4 ** i for i in range(8))
+# Bytes, for process memory (32MB .. 4GB)
+MEMORY_BUCKETS = tuple(32 * 1024 * 1024 * 2 ** i for i in range(8))
+# Counts, for transactions per statement and recurring groups
+COUNT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class _Metric:
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames) or not all(name in labels for name in self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+        for key, value in series:
+            lines.extend(self._render_series(key, value))
+        return lines
+
+    def _render_series(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._series.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """
+    A settable value, or one computed at scrape time by `function`, which
+    returns a number (unlabelled) or a {label values tuple: number} dict.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function=None, type_name=None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+        if type_name:
+            self.type_name = type_name
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+    def render(self):
+        if self.function is not None:
+            try:
+                values = self.function()
+            except Exception as e:
+                print(f"[Metrics] Failed to collect {self.name}: {e}")
+                values = {}
+            with self._lock:
+                self._series = values if isinstance(values, dict) else {(): values}
+        return super().render()
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        # Index of the first bucket with value <= bound; len(buckets) is +Inf
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then sum, then count
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0
+
+    def _render_series(self, key, series):
+        series = list(series)
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+        lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds metrics by name and renders them all for a scrape.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), function=None, type_name=None):
+        return self._register(Gauge(name, documentation, labelnames, function, type_name))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+
+# Export singleton
+registry = MetricsRegistry()
+
+upload_size_bytes = registry.histogram(
+    "upload_size_bytes", "Size of uploaded files.", ("kind",), buckets=SIZE_BUCKETS
+)
+parse_stage_seconds = registry.histogram(
+    "parse_stage_seconds",
+    "Time spent in each stage of a parse (open, per-page extract_text / extract_tables, regex scan) "
+    "or of recurring-transaction detection.",
+    ("parser", "stage"),
+)
+parse_seconds = registry.histogram(
+    "parse_seconds", "End-to-end parse time, excluding cache hits.", ("parser", "outcome")
+)
+parse_peak_rss_bytes = registry.histogram(
+    "parse_peak_rss_bytes",
+    "Peak resident memory of the parsing process, sampled after each page.",
+    ("parser",),
+    buckets=MEMORY_BUCKETS,
+)
+statement_transactions = registry.histogram(
+    "statement_transactions", "Transactions extracted per parsed statement.", ("parser",), buckets=COUNT_BUCKETS
+)
+parse_strategy_attempts = registry.counter(
+    "parse_strategy_attempts_total",
+    "Strategies tried by the auto parser, by outcome (ok = found transactions).",
+    ("strategy", "outcome"),
+)
+detect_recurring_seconds = registry.histogram(
+    "detect_recurring_seconds", "Runtime of recurring-transaction detection."
+)
+detect_recurring_groups = registry.histogram(
+    "detect_recurring_groups", "Merchant groups formed per detection run.", buckets=COUNT_BUCKETS
+)
+http_request_seconds = registry.histogram(
+    "http_request_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+
+
+# --- Parse stage capture (see module docstring) ---
+
+_stage_capture = contextvars.ContextVar("stage_capture", default=None)
+
+
+def observe_stage(parser, stage, seconds):
+    """
+    Record the duration of one parse stage.
+    """
+    captured = _stage_capture.get()
+    if captured is not None:
+        captured.append((parser, stage, seconds))
+    else:
+        parse_stage_seconds.observe(seconds, parser=parser, stage=stage)
+
+
+@contextmanager
+def capture_stages():
+    """
+    Collect observe_stage() calls made in this context into the yielded list
+    instead of recording them.
+    """
+    captured = []
+    token = _stage_capture.set(captured)
+    try:
+        yield captured
+    finally:
+        _stage_capture.reset(token)
+
+
+def replay_stages(captured):
+    """
+    Record captured stage observations (into an enclosing capture, if any).
+    """
+    for parser, stage, seconds in captured:
+        observe_stage(parser, stage, seconds)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording http_request_seconds per route template, so
+    /jobs/{job_id} is one series rather than one per job.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status[0],
+            )
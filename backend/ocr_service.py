@@ -1,20 +1,41 @@
 import re
 import os
+import threading
 from datetime import datetime
-try:
-    from paddleocr import PaddleOCR
-except ImportError:
-    PaddleOCR = None
+from backend.lazy_imports import lazy_import, register_warmer
+
+# None when PaddleOCR isn't installed
+paddleocr = lazy_import("paddleocr", optional=True)
 
 class ReceiptScanner:
     def __init__(self):
-        # Initialize PaddleOCR
-        # We use a try-except block to handle cases where dependencies might be missing in some environments
-        if PaddleOCR:
-            self.ocr = PaddleOCR(use_angle_cls=True, lang='en', show_log=False)
-        else:
-            self.ocr = None
-            print("Warning: PaddleOCR not installed. OCR functionality will be limited.")
+        # The PaddleOCR model takes seconds to build, so it's constructed on
+        # first use (or by the startup warm-up), not at import
+        self._ocr = None
+        self._ocr_loaded = False
+        self._ocr_lock = threading.Lock()
+
+    @property
+    def ocr(self):
+        """
+        The PaddleOCR engine, built on first access; None if PaddleOCR isn't installed.
+        """
+        if not self._ocr_loaded:
+            with self._ocr_lock:
+                if not self._ocr_loaded:
+                    # Dependencies might be missing in some environments
+                    if paddleocr is not None:
+                        self._ocr = paddleocr.PaddleOCR(use_angle_cls=True, lang='en', show_log=False)
+                    else:
+                        print("Warning: PaddleOCR not installed. OCR functionality will be limited.")
+                    self._ocr_loaded = True
+        return self._ocr
+
+    def warm_up(self):
+        """
+        Build the OCR model ahead of the first scan.
+        """
+        return self.ocr is not None
 
     def scan_receipt_image(self, image_path):
         """
@@ -109,3 +130,4 @@ class ReceiptScanner:
 
 # Export a singleton instance
 receipt_scanner = ReceiptScanner()
+register_warmer(receipt_scanner.warm_up)
@@ -0,0 +1,184 @@
+"""
+ParseCache - content-addressed store of parse results.
+
+Users re-upload the same statement constantly. Results are stored in a local
+SQLite file keyed by the SHA-256 of the PDF bytes plus the parser name and
+PARSER_VERSION, so a repeat upload costs a hash and one indexed lookup
+instead of a full pdfminer layout pass. Payloads are zlib-compressed JSON
+(a TransactionBatch is stored in its columnar to_dict() form); the least
+recently used entries are evicted once the total payload size exceeds
+`max_bytes`.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from backend import config
+from backend.metrics import registry
+from backend.transactions import TransactionBatch
+
+# Marks a "transactions" value stored as TransactionBatch.to_dict()
+_BATCH_KEY = "transaction_batch"
+
+
+class ParseCache:
+    """
+    Size-bounded LRU cache of {"meta", "transactions"} payloads in SQLite.
+    """
+
+    def __init__(self, path=None, max_bytes=None):
+        self.path = config.PARSE_CACHE_PATH if path is None else path
+        self.max_bytes = config.PARSE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    @staticmethod
+    def make_key(content_hash, parser_name, parser_version):
+        return f"{content_hash}:{parser_name}:{parser_version}"
+
+    def get(self, key):
+        """
+        Return the cached payload for `key`, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT payload FROM parse_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE parse_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self.hits += 1
+
+        payload = json.loads(zlib.decompress(row[0]))
+        if isinstance(payload, dict) and _BATCH_KEY in payload:
+            payload["transactions"] = TransactionBatch.from_dict(payload.pop(_BATCH_KEY))
+        return payload
+
+    def put(self, key, payload):
+        """
+        Store a JSON-serializable payload under `key`, evicting LRU entries as needed.
+        """
+        if not self.enabled:
+            return
+
+        if isinstance(payload, dict) and isinstance(payload.get("transactions"), TransactionBatch):
+            batch = payload["transactions"]
+            payload = {key: value for key, value in payload.items() if key != "transactions"}
+            payload[_BATCH_KEY] = batch.to_dict()
+        blob = zlib.compress(json.dumps(payload, default=str).encode("utf-8"))
+        if len(blob) > self.max_bytes:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            old = conn.execute("SELECT size FROM parse_cache WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO parse_cache (key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self._total_bytes += len(blob) - (old[0] if old else 0)
+            self._evict(conn)
+            conn.commit()
+
+    def clear(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM parse_cache")
+            conn.commit()
+            self._total_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = 0
+            if self.enabled:
+                entries = self._connect().execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0]
+            return {
+                "entries": entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Internals (caller holds the lock) ---
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache ("
+                "key TEXT PRIMARY KEY, payload BLOB NOT NULL, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS parse_cache_last_access ON parse_cache (last_access)"
+            )
+            self._conn.commit()
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM parse_cache"
+            ).fetchone()[0]
+        return self._conn
+
+    def _evict(self, conn):
+        while self._total_bytes > self.max_bytes:
+            row = conn.execute(
+                "SELECT key, size FROM parse_cache ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self._total_bytes = 0
+                break
+            conn.execute("DELETE FROM parse_cache WHERE key = ?", (row[0],))
+            self._total_bytes -= row[1]
+            self.evictions += 1
+
+
+# Export singleton
+parse_cache = ParseCache()
+
+registry.gauge(
+    "parse_cache_hits_total", "Parse cache hits.",
+    function=lambda: parse_cache.hits, type_name="counter",
+)
+registry.gauge(
+    "parse_cache_misses_total", "Parse cache misses.",
+    function=lambda: parse_cache.misses, type_name="counter",
+)
+registry.gauge(
+    "parse_cache_hit_ratio", "Parse cache hits / lookups since startup.",
+    function=lambda: parse_cache.hits / max(1, parse_cache.hits + parse_cache.misses),
+)
+registry.gauge(
+    "parse_cache_bytes", "Total compressed payload size in the parse cache.",
+    function=lambda: parse_cache._total_bytes,
+)
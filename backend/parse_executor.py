@@ -0,0 +1,711 @@
+"""
+ParseExecutor - managed worker processes for the CPU-bound PDF parsers.
+
+pdfplumber/pdfminer layout analysis is pure Python and holds the GIL, so
+running it inside an async endpoint stalls every other request on the worker.
+The executor runs parses in pre-warmed worker processes instead:
+
+1. Workers import the parser modules and pdfplumber once, at spawn time
+2. A parse is handed to a worker only once one is idle (one dispatcher
+   thread per worker), so time spent queued doesn't count against the task
+   timeout. A parse exceeding it kills and replaces its own worker only;
+   parses running on the other workers are unaffected
+3. Workers are replaced after N tasks to cap pdfminer memory creep
+4. Results are normalized to {"meta", "transactions"} and pickled back,
+   with the worker's peak memory during the parse ("peak_rss_bytes")
+5. When the caller supplies the PDF's content hash, results are served from
+   and written to the ParseCache
+
+stream() runs a parser's per-page generator on a worker as well; each
+page's transactions come back over the worker's pipe as soon as they are
+parsed, so they can be sent to the client page by page.
+"""
+
+import asyncio
+import importlib
+import io
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.reduction import recv_handle, send_handle
+
+from backend import config
+from backend import lazy_imports
+from backend import metrics
+from backend import profiling
+from backend.parse_cache import parse_cache
+from backend.parsers.page_cache import current_rss_bytes, track_memory
+from backend.transactions import TransactionBatch
+
+
+# Part of every parse cache key: bump whenever any parser's output changes
+# 2: TransactionBatch output (invalid calendar dates skipped, zero-amount
+#    INCOME reported as EXPENSE, amounts rounded to cents)
+# 3: Dec/Jan year rollover, parenthesized amounts parsed as negative
+PARSER_VERSION = "3"
+
+# Parser name -> "module:callable". Class-based parsers are referenced as
+# "module:Class.method" and instantiated fresh for every task, since they keep
+# per-parse state on the instance. Each returns its transactions as a
+# TransactionBatch (backend.transactions).
+PARSERS = {
+    "pnc": "backend.parser:extract_transaction_batch",
+    "pnc_statement": "backend.parsers.pnc_parser:parse_pnc_statement_batch",
+    "brute_force": "backend.parsers.brute_force_parser:BruteForceParser.parse_batch",
+    "generic_tables": "backend.parsers.pdf_parser:GenericParser.parse_batch",
+    "generic_loose": "backend.parsers.generic_parser:GenericPDFParser.parse_batch",
+    # Fingerprints the statement and picks one of the above (backend.parsers.strategies)
+    "auto": "backend.parsers.strategies.registry:parse_auto",
+}
+
+# Parser name -> per-page generator, yielding (page_number, page_count,
+# TransactionBatch). Used by ParseExecutor.stream().
+STREAM_PARSERS = {
+    "pnc": "backend.parser:iter_transaction_pages",
+    "brute_force": "backend.parsers.brute_force_parser:BruteForceParser.iter_pages",
+    "generic_loose": "backend.parsers.generic_parser:GenericPDFParser.iter_pages",
+}
+
+# Stream parsers whose concatenated pages equal their batch parser's result
+# (the class-based parsers sort by date afterwards), so a streamed parse can
+# safely fill the cache entry that run() would read.
+_STREAM_CACHEABLE = {"pnc"}
+
+
+class ParseTimeoutError(TimeoutError):
+    """
+    Raised when a parse exceeds the executor's per-task timeout.
+    """
+
+
+class WorkerCrashedError(RuntimeError):
+    """
+    Raised when a parse worker process dies in the middle of a task.
+    """
+
+
+def _parser_target(parser_name, registry=None):
+    try:
+        return (PARSERS if registry is None else registry)[parser_name]
+    except KeyError:
+        raise ValueError(f"Unknown parser: {parser_name}")
+
+
+def resolve_parser(parser_name, registry=None):
+    """
+    Look up a registered parser and return a callable taking one PDF source.
+
+    Raises:
+        ValueError: Unknown parser name
+    """
+    return _load_target(_parser_target(parser_name, registry))
+
+
+def _load_target(target):
+    """
+    The callable a "module:callable" or "module:Class.method" target names.
+    """
+    module_name, attr_path = target.split(":")
+    module = importlib.import_module(module_name)
+
+    if "." in attr_path:
+        class_name, method_name = attr_path.split(".")
+        return getattr(getattr(module, class_name)(), method_name)
+    return getattr(module, attr_path)
+
+
+def warm_up_parsers():
+    """
+    Import every parser module and load their lazily imported dependencies
+    (pdfplumber, ...) so the first real parse doesn't pay for them.
+    """
+    for target in PARSERS.values():
+        importlib.import_module(target.split(":")[0])
+    return lazy_imports.warm_up()
+
+
+def normalize_result(result):
+    """
+    Coerce any parser's output into the API shape {"meta": ..., "transactions": ...}.
+
+    The registered parsers return a TransactionBatch, either bare or in a
+    dict ({"meta", "transactions"} from backend.parser, top-level
+    ending_balance from parse_pnc_statement). Legacy outputs - record lists
+    and DataFrames (GenericParser with datetime dates) - become record lists.
+    """
+    if isinstance(result, TransactionBatch):
+        return {"meta": {}, "transactions": result}
+
+    if isinstance(result, dict):
+        if "meta" in result:
+            return result
+        meta = {key: value for key, value in result.items() if key != "transactions"}
+        return {"meta": meta, "transactions": result.get("transactions", [])}
+
+    transactions = result.to_dict(orient="records") if len(result) else []
+    for t in transactions:
+        if hasattr(t.get("date"), "strftime"):
+            t["date"] = t["date"].strftime("%Y-%m-%d")
+    return {"meta": {}, "transactions": transactions}
+
+
+def _run_parser(parser_name, source, progress=None, profile=False, target=None, strategy_stats=None):
+    """
+    Worker entry point. `source` is the PDF as bytes, a path, or an open
+    file object. `target` overrides the PARSERS entry (the parent resolves it,
+    so parsers registered at runtime reach the worker). `strategy_stats` is
+    the parent's strategy_registry.snapshot(): the "auto" parser plans with
+    it and leaves recording the attempts to the parent.
+
+    Returns:
+        (result, stages, profile, peak_rss_bytes): the normalized result, the
+        parse stage timings captured in the worker (for
+        metrics.replay_stages()), the profiling report when `profile` is set
+        (else None), and the worker's peak RSS sampled during the parse.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    parser = _load_target(target) if target else resolve_parser(parser_name)
+    kwargs = {"progress": progress} if progress is not None else {}
+    # Imported here: the strategies import this module
+    from backend.parsers.strategies.registry import planned_with
+
+    report = None
+    with metrics.capture_stages() as stages, track_memory() as memory, planned_with(strategy_stats):
+        if profile:
+            with profiling.profile_block() as report:
+                result = parser(source, **kwargs)
+        else:
+            result = parser(source, **kwargs)
+    return normalize_result(result), stages, report, memory.peak_rss_bytes
+
+
+def _iter_pages(parser_name, source, target=None):
+    """
+    Run a stream parser, yielding (page, pages, transactions, rss_bytes) per
+    page, where rss_bytes is the parsing process's resident memory after it.
+
+    Returns:
+        The parse meta (the generator's return value).
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    pages = _load_target(target or _parser_target(parser_name, STREAM_PARSERS))(source)
+    try:
+        while True:
+            try:
+                page, page_count, transactions = next(pages)
+            except StopIteration as stop:
+                return stop.value or {}
+            yield page, page_count, transactions, current_rss_bytes()
+    finally:
+        pages.close()
+
+
+def _transferable(source):
+    """
+    Split `source` into (source, file descriptor or None). An open file on
+    disk (a spooled upload that rolled over, ...) is handed to the worker as
+    a duplicate of its descriptor, which the caller closes once the task is
+    over: the owner may close `source` meanwhile (a cancelled job) without
+    the worker being sent a closed, or reused, descriptor. Other sources are
+    returned as they are; see _readable().
+    """
+    if not hasattr(source, "read"):
+        return source, None
+    # SpooledTemporaryFile.fileno() would first roll an in-memory buffer over to disk
+    if getattr(source, "_rolled", True):
+        try:
+            fd = source.fileno()
+        except (AttributeError, OSError):
+            fd = None
+        if fd is not None:
+            source.flush()
+            return None, os.dup(fd)
+    return source, None
+
+
+def _readable(source):
+    """
+    A picklable `source`: file objects (in-memory spools, ...) are read.
+    Runs in a dispatcher thread, never on the event loop.
+    """
+    return source.read() if hasattr(source, "read") else source
+
+
+def _picklable(error):
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def _worker_main(conn):
+    """
+    Parse worker process: warm up, then run tasks from `conn` until it sends
+    None or closes. Replies ("ready", None) once warm, then per task
+    ("result", ...) for a parse, ("page", ...) per page then ("end", meta)
+    for a stream, or ("error", exception).
+    """
+    warm_up_parsers()
+    conn.send(("ready", None))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+
+        kind, parser_name, target, source, by_handle, progress, profile, strategy_stats = task
+        handle = None
+        try:
+            if by_handle:
+                # Shares the parent's file offset; parsers read the whole PDF
+                source = handle = os.fdopen(recv_handle(conn), "rb")
+                source.seek(0)
+            if kind == "stream":
+                pages = _iter_pages(parser_name, source, target)
+                while True:
+                    try:
+                        conn.send(("page", next(pages)))
+                    except StopIteration as stop:
+                        conn.send(("end", stop.value))
+                        break
+            else:
+                conn.send(("result", _run_parser(parser_name, source, progress, profile, target, strategy_stats)))
+        except BaseException as e:
+            conn.send(("error", _picklable(e)))
+        finally:
+            if handle is not None:
+                handle.close()
+
+
+class _Worker:
+    """
+    One parse worker process and the parent's end of its pipe.
+    """
+
+    def __init__(self, context, home):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), name="parse-worker")
+        self.process.start()
+        child.close()
+        # The idle queue this worker returns to (see ParseExecutor._checkin)
+        self.home = home
+        self.ready = False
+        self.tasks = 0
+
+    def wait_ready(self):
+        while not self.ready:
+            kind, _ = self._recv()
+            self.ready = kind == "ready"
+
+    def submit(self, task, source, fd, timeout):
+        """
+        Send a task once the worker is warm.
+
+        Returns:
+            The task's deadline (time.monotonic()), or None without a timeout.
+        """
+        self.wait_ready()
+        try:
+            self.conn.send(task[:3] + (source, fd is not None) + task[3:])
+            if fd is not None:
+                send_handle(self.conn, fd, self.process.pid)
+        except OSError:
+            raise self._crashed()
+        return time.monotonic() + timeout if timeout else None
+
+    def receive(self, deadline):
+        """
+        The worker's next (kind, payload) message, or None once `deadline` passes.
+        """
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.conn.poll(remaining):
+                return None
+        return self._recv()
+
+    def _recv(self):
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            raise self._crashed()
+
+    def _crashed(self):
+        self.process.join(1)
+        return WorkerCrashedError(f"Parse worker {self.process.pid} died (exit code {self.process.exitcode})")
+
+    def stop(self):
+        """
+        Ask the worker to exit after its current task; kill it if it doesn't.
+        """
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(5)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ParseExecutor:
+    """
+    Runs registered parsers off the event loop in recyclable worker processes.
+    """
+
+    def __init__(self, max_workers=None, task_timeout=None, max_tasks_per_child=None, cache=None):
+        self.cache = parse_cache if cache is None else cache
+        self.max_workers = config.PARSE_WORKERS if max_workers is None else max_workers
+        self.task_timeout = config.PARSE_TASK_TIMEOUT if task_timeout is None else task_timeout
+        self.max_tasks_per_child = (
+            config.PARSE_MAX_TASKS_PER_CHILD if max_tasks_per_child is None else max_tasks_per_child
+        )
+        self._context = multiprocessing.get_context("spawn")
+        # Idle workers, and one dispatcher thread per worker to wait on them
+        self._idle = None
+        self._dispatcher = None
+        self._workers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def uses_processes(self):
+        return self.max_workers > 0
+
+    def start(self, prewarm=True):
+        """
+        Spawn the workers. With prewarm, wait until every worker has imported
+        and warmed up the parsers.
+        """
+        if not self.uses_processes:
+            return
+
+        with self._lock:
+            if self._idle is not None:
+                return
+            idle = self._idle = queue.Queue()
+            self._dispatcher = ThreadPoolExecutor(self.max_workers, thread_name_prefix="parse-dispatch")
+
+        workers = [self._spawn(idle) for _ in range(self.max_workers)]
+        for worker in workers:
+            if prewarm:
+                worker.wait_ready()
+            idle.put(worker)
+        print(f"[ParseExecutor] Started {self.max_workers} parse worker(s)")
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            dispatcher, self._idle, self._dispatcher = self._dispatcher, None, None
+            workers, self._workers = list(self._workers), set()
+        if dispatcher is not None:
+            dispatcher.shutdown(wait=False, cancel_futures=True)
+        for worker in workers:
+            worker.stop() if wait else worker.kill()
+
+    async def run(self, parser_name, source, progress=None, content_hash=None, profile=False):
+        """
+        Parse `source` (PDF bytes, path, or seekable file object) with the
+        named parser off the event loop. `progress(pages_done, pages_total)`
+        is forwarded to the parser. With `content_hash` (the SHA-256 of the
+        PDF bytes) the result is looked up in / stored to the parse cache.
+        With `profile`, the cache lookup is skipped and the result carries a
+        "profile" report (see backend.profiling). A parsed (not cached)
+        result also carries "peak_rss_bytes", the parsing process's peak
+        resident memory sampled after each page.
+
+        Raises:
+            ParseTimeoutError: If the parse exceeds the task timeout.
+            ValueError: Unknown parser name, or whatever the parser raises.
+        """
+        cache_key = None
+        if content_hash and self.cache is not None and self.cache.enabled:
+            cache_key = self.cache.make_key(content_hash, parser_name, PARSER_VERSION)
+            # SQLite, zlib and JSON work stays off the event loop
+            cached = None if profile else await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result, stages, report, peak_rss_bytes = await self._run(parser_name, source, progress, profile)
+            outcome = "ok"
+        except ParseTimeoutError:
+            outcome = "timeout"
+            raise
+        except Exception:
+            raise
+        except BaseException:
+            # Job cancellation (ParseCancelledError / asyncio.CancelledError)
+            outcome = "cancelled"
+            raise
+        finally:
+            metrics.parse_seconds.observe(time.perf_counter() - started, parser=parser_name, outcome=outcome)
+
+        metrics.replay_stages(stages)
+        metrics.statement_transactions.observe(len(result["transactions"]), parser=parser_name)
+        metrics.parse_peak_rss_bytes.observe(peak_rss_bytes, parser=parser_name)
+        if "strategy" in result["meta"]:
+            from backend.parsers.strategies.registry import strategy_registry
+
+            strategy_registry.record_attempts(result["meta"]["strategy"])
+            for attempt in result["meta"]["strategy"]["attempts"]:
+                outcome = "ok" if attempt["ok"] else "failed"
+                metrics.parse_strategy_attempts.inc(strategy=attempt["strategy"], outcome=outcome)
+
+        if cache_key is not None:
+            await asyncio.to_thread(self.cache.put, cache_key, result)
+        # Describes this parse, not the statement, so it isn't cached
+        result = {**result, "peak_rss_bytes": peak_rss_bytes}
+        if report is not None:
+            result = {**result, "profile": report}
+        return result
+
+    def stream(self, parser_name, source, content_hash=None):
+        """
+        Parse `source` page by page on a worker, yielding events as each page
+        completes:
+
+            {"event": "page", "page": n, "pages": total, "transactions": TransactionBatch}
+            {"event": "end", "meta": {...}, "cached": bool}
+
+        Pages are handed on as they are parsed, not accumulated (except to fill
+        the parse cache for the "pnc" parser). A cache hit is replayed as a
+        single page. Blocks between pages, so it is meant to be iterated from
+        a worker thread (Starlette runs sync streaming bodies in its
+        threadpool). Closing the generator early kills the worker's parse.
+        With max_workers=0 the parse runs in the calling thread and the
+        timeout can only be enforced between pages.
+
+        Raises:
+            ParseTimeoutError: If the parse exceeds the task timeout.
+            ValueError: Unknown parser name, or whatever the parser raises.
+        """
+        if parser_name not in STREAM_PARSERS:
+            raise ValueError(f"Parser does not support streaming: {parser_name}")
+
+        cache_key = None
+        if content_hash and self.cache is not None and self.cache.enabled:
+            cache_key = self.cache.make_key(content_hash, parser_name, PARSER_VERSION)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield {"event": "page", "page": 1, "pages": 1, "transactions": cached["transactions"]}
+                yield {"event": "end", "meta": cached["meta"], "cached": True}
+                return
+
+        started = time.perf_counter()
+        outcome = "error"
+        count = 0
+        peak_rss_bytes = 0
+        # Kept only to fill the cache, and only when it's a faithful result
+        collected = [] if cache_key is not None and parser_name in _STREAM_CACHEABLE else None
+
+        if self.uses_processes:
+            pages = self._stream_on_worker(parser_name, source)
+        else:
+            pages = self._stream_in_thread(parser_name, source)
+        try:
+            while True:
+                try:
+                    page, page_count, transactions, rss_bytes = next(pages)
+                except StopIteration as stop:
+                    meta = stop.value or {}
+                    break
+
+                count += len(transactions)
+                peak_rss_bytes = max(peak_rss_bytes, rss_bytes)
+                if collected is not None:
+                    collected.append(transactions)
+                yield {"event": "page", "page": page, "pages": page_count, "transactions": transactions}
+            outcome = "ok"
+        except ParseTimeoutError:
+            outcome = "timeout"
+            raise
+        except Exception:
+            raise
+        except BaseException:
+            # The client went away (GeneratorExit)
+            outcome = "cancelled"
+            raise
+        finally:
+            pages.close()
+            metrics.parse_seconds.observe(time.perf_counter() - started, parser=parser_name, outcome=outcome)
+
+        metrics.statement_transactions.observe(count, parser=parser_name)
+        metrics.parse_peak_rss_bytes.observe(peak_rss_bytes, parser=parser_name)
+        if collected is not None:
+            self.cache.put(cache_key, {"meta": meta, "transactions": TransactionBatch.concat(collected)})
+        yield {"event": "end", "meta": meta, "cached": False}
+
+    def _stream_on_worker(self, parser_name, source):
+        """
+        _iter_pages run on a worker: yields its pages as they arrive and
+        returns its meta. The deadline is checked while waiting for each
+        page, so a page that never finishes kills the worker.
+        """
+        task = ("stream", parser_name, _parser_target(parser_name, STREAM_PARSERS), None, False, None)
+        source, fd = _transferable(source)
+        try:
+            source = _readable(source)
+            self._ensure_started()
+            worker = self._checkout()
+        except BaseException:
+            if fd is not None:
+                os.close(fd)
+            raise
+        healthy = False
+        try:
+            deadline = worker.submit(task, source, fd, self.task_timeout)
+            while True:
+                message = worker.receive(deadline)
+                if message is None:
+                    raise ParseTimeoutError(f"Parse exceeded {self.task_timeout}s timeout")
+                kind, payload = message
+                if kind == "page":
+                    yield payload
+                    continue
+                healthy = True
+                if kind == "error":
+                    raise payload
+                return payload
+        finally:
+            # Unhealthy also when the caller stopped early: the worker is mid-parse
+            self._checkin(worker, healthy)
+            if fd is not None:
+                os.close(fd)
+
+    def _stream_in_thread(self, parser_name, source):
+        deadline = time.monotonic() + self.task_timeout if self.task_timeout else None
+        pages = _iter_pages(parser_name, source)
+        try:
+            while True:
+                try:
+                    item = next(pages)
+                except StopIteration as stop:
+                    return stop.value
+                if deadline is not None and time.monotonic() > deadline:
+                    raise ParseTimeoutError(f"Parse exceeded {self.task_timeout}s timeout")
+                yield item
+        finally:
+            pages.close()
+
+    async def _run(self, parser_name, source, progress, profile=False):
+        from backend.parsers.strategies.registry import strategy_registry
+
+        # Workers plan with this process's strategy statistics, which outlive them
+        stats = strategy_registry.snapshot()
+        if not self.uses_processes:
+            return await self._await(asyncio.to_thread(_run_parser, parser_name, source, progress, profile, None, stats))
+
+        task = ("run", parser_name, _parser_target(parser_name), progress, profile, stats)
+        dispatcher = self._ensure_started()
+        # Taken here, on the loop, where a cancelled job closes its upload
+        source, fd = _transferable(source)
+        try:
+            future = dispatcher.submit(self._call, task, source, fd)
+        except BaseException:
+            if fd is not None:
+                os.close(fd)
+            raise
+        if fd is not None:
+            # The call may outlive a cancelled run(): it owns the descriptor until it returns
+            future.add_done_callback(lambda _: os.close(fd))
+        return await asyncio.wrap_future(future)
+
+    async def _await(self, awaitable):
+        if not self.task_timeout:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, timeout=self.task_timeout)
+        except asyncio.TimeoutError:
+            raise ParseTimeoutError(f"Parse exceeded {self.task_timeout}s timeout")
+
+    def _call(self, task, source, fd):
+        """
+        Run a task on the next idle worker. Runs in a dispatcher thread.
+        """
+        source = _readable(source)
+        try:
+            return self._call_worker(task, source, fd)
+        except WorkerCrashedError as e:
+            # Retry once on a fresh worker
+            print(f"[ParseExecutor] {e}, retrying on a fresh worker")
+            return self._call_worker(task, source, fd)
+
+    def _call_worker(self, task, source, fd):
+        worker = self._checkout()
+        healthy = False
+        try:
+            # The timeout starts now that a worker has the task
+            deadline = worker.submit(task, source, fd, self.task_timeout)
+            message = worker.receive(deadline)
+            if message is None:
+                raise ParseTimeoutError(f"Parse exceeded {self.task_timeout}s timeout")
+            healthy = True
+            kind, payload = message
+            if kind == "error":
+                raise payload
+            return payload
+        finally:
+            self._checkin(worker, healthy)
+
+    def _ensure_started(self):
+        dispatcher = self._dispatcher
+        if dispatcher is None:
+            self.start(prewarm=False)
+            dispatcher = self._dispatcher
+        return dispatcher
+
+    def _spawn(self, home):
+        worker = _Worker(self._context, home)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _checkout(self):
+        idle = self._idle
+        if idle is None:
+            raise RuntimeError("ParseExecutor is shut down")
+        worker = idle.get()
+        if not worker.process.is_alive():
+            self._checkin(worker, healthy=False)
+            worker = idle.get()
+        return worker
+
+    def _checkin(self, worker, healthy):
+        """
+        Return a worker to its idle queue. A worker that timed out or died is
+        killed, one that reached max_tasks_per_child is stopped, and either is
+        replaced by a fresh one; after shutdown() workers are just stopped.
+        """
+        worker.tasks += 1
+        retire = not healthy or (self.max_tasks_per_child and worker.tasks >= self.max_tasks_per_child)
+        with self._lock:
+            current = worker.home is self._idle
+            if retire or not current:
+                self._workers.discard(worker)
+        if not current:
+            worker.stop() if healthy else worker.kill()
+            return
+        if retire:
+            worker.stop() if healthy else worker.kill()
+            worker = self._spawn(worker.home)
+        worker.home.put(worker)
+
+
+# Export singleton
+parse_executor = ParseExecutor()
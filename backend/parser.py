@@ -1,6 +1,36 @@
-import pdfplumber
 import re
+import time
 from datetime import datetime
+from backend.lazy_imports import lazy_import
+from backend.metrics import observe_stage
+from backend.parsers.lexer import LineLexer, CONTINUATION
+from backend.parsers.page_cache import open_document
+from backend.parsers.page_planner import PagePlanner
+from backend.parsers.normalize import StatementCalendar, amounts_to_cents
+from backend.transactions import TransactionBatch
+
+pdfplumber = lazy_import("pdfplumber")
+
+# Regex for transaction line: Date (MM/DD)  Amount  Description
+# Example: 10/01 197.90 FD SPTSBK CASINO
+# Note: PNC sometimes puts amount before description or vice versa depending on section, 
+# but the spec says: `^(\d{2}/\d{2})\s+([\d,]+\.\d{2})\s+(.*)`
+# We will stick to the spec but be robust.
+TX_PATTERN = re.compile(r'^(\d{2}/\d{2})\s+([\d,]+\.\d{2})\s+(.*)')
+
+# Regex for Ending Balance in summary table
+# Looking for "Ending balance" followed by amount
+SUMMARY_PATTERN = re.compile(r'Ending balance.*\$([\d,]+\.\d{2})', re.IGNORECASE)
+
+# PNC section headers, matched exactly as printed on the statement
+LEXER = LineLexer(
+    credit=["Deposits and Other Additions"],
+    debit=["Banking/Debit Card Withdrawals", "Online and Electronic Banking Deductions"],
+    balance=["Daily Balance Detail"],
+    summary=["ending balance"],
+    transaction=TX_PATTERN,
+    case_sensitive=("credit", "debit", "balance"),
+)
 
 def parse_amount(amount_str):
     """
@@ -11,112 +41,167 @@ def parse_amount(amount_str):
     except ValueError:
         return 0.0
 
-def extract_transactions(pdf_path):
+def extract_transactions(pdf_path, progress=None):
     """
     Extracts transactions from a PNC Bank PDF statement.
+
+    Args:
+        pdf_path: Path to the PDF, or a seekable binary file-like object
+                  (e.g. the spooled upload buffer from backend.ingest).
+        progress: Optional callback progress(pages_done, pages_total), called after each page.
+
+    Returns:
+        {"meta": ..., "transactions": [{"date", "amount", "desc", "type"}, ...]}
+    """
+    result = extract_transaction_batch(pdf_path, progress)
+    return {"meta": result["meta"], "transactions": result["transactions"].to_records()}
+
+def extract_transaction_batch(pdf_path, progress=None):
+    """
+    extract_transactions, with the transactions as a TransactionBatch.
+    """
+    batch = TransactionBatch("pnc")
+    meta = {
+        "period": "Unknown",
+        "ending_balance": 0.0
+    }
+
+    try:
+        pages = iter_transaction_pages(pdf_path, progress)
+        while True:
+            try:
+                _, _, page_batch = next(pages)
+            except StopIteration as stop:
+                meta = stop.value
+                break
+            batch.extend(page_batch)
+    except Exception as e:
+        print(f"Error parsing PDF: {e}")
+        return {"meta": meta, "transactions": TransactionBatch("pnc")}
+
+    return {"meta": meta, "transactions": batch}
+
+def iter_transaction_pages(pdf_path, progress=None):
+    """
+    Generator form of extract_transactions: yields each page's transactions as
+    soon as the page is parsed, so callers can stream them out.
+
+    Yields:
+        (page_number, page_count, transactions) with a 1-based page_number
+        and the page's transactions as a TransactionBatch.
+
+    Returns:
+        The statement meta dict (as the generator's StopIteration value).
     """
-    transactions = []
     meta = {
         "period": "Unknown",
         "ending_balance": 0.0
     }
     
     current_mode = None # "INCOME" or "EXPENSE"
-    
-    # Regex for transaction line: Date (MM/DD)  Amount  Description
-    # Example: 10/01 197.90 FD SPTSBK CASINO
-    # Note: PNC sometimes puts amount before description or vice versa depending on section, 
-    # but the spec says: `^(\d{2}/\d{2})\s+([\d,]+\.\d{2})\s+(.*)`
-    # We will stick to the spec but be robust.
-    tx_pattern = re.compile(r'^(\d{2}/\d{2})\s+([\d,]+\.\d{2})\s+(.*)')
-    
-    # Regex for Ending Balance in summary table
-    # Looking for "Ending balance" followed by amount
-    summary_pattern = re.compile(r'Ending balance.*\$([\d,]+\.\d{2})', re.IGNORECASE)
 
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if not text:
+    # Date formatting (Assume current year 2025 as per spec)
+    # Spec says: Convert dates from "MM/DD" to "2025-MM-DD"
+    # Ideally we'd infer year from statement period
+    calendar = StatementCalendar(2025)
+
+    started = time.perf_counter()
+    with open_document(pdf_path, pdfplumber.open) as pdf:
+        observe_stage("pnc", "open", time.perf_counter() - started)
+
+        # Pages without dates or section keywords are skipped unparsed
+        planner = PagePlanner.for_lexer(LEXER)
+        for page_num, page in enumerate(pdf.pages):
+            if progress:
+                progress(page_num, len(pdf.pages))
+
+            page_transactions = TransactionBatch("pnc")
+            if page_num:
+                started = time.perf_counter()
+                skip = not planner.should_parse(page)
+                observe_stage("pnc", "probe", time.perf_counter() - started)
+                if skip:
+                    yield page_num + 1, len(pdf.pages), page_transactions
                     continue
+
+            started = time.perf_counter()
+            text = page.extract_text()
+            observe_stage("pnc", "extract_text", time.perf_counter() - started)
+            if page_num == 0:
+                planner.calibrate(page, text)
+            if not text:
+                yield page_num + 1, len(pdf.pages), page_transactions
+                continue
+            
+            started = time.perf_counter()
+            tokens = LEXER.tokenize([line.strip() for line in text.split('\n')])
+            # Raw (date, amount, desc, mode) captures, parsed per page in bulk
+            captures = []
+            
+            # Simple iterator to handle multi-line descriptions
+            i = 0
+            while i < len(tokens):
+                token = tokens[i]
                 
-                lines = text.split('\n')
-                
-                # Simple iterator to handle multi-line descriptions
-                i = 0
-                while i < len(lines):
-                    line = lines[i].strip()
-                    
-                    # 1. Detect Mode (Section Headers)
-                    if "Deposits and Other Additions" in line:
-                        current_mode = "INCOME"
-                        i += 1
-                        continue
-                    elif "Banking/Debit Card Withdrawals" in line or "Online and Electronic Banking Deductions" in line:
-                        current_mode = "EXPENSE"
-                        i += 1
-                        continue
-                    elif "Daily Balance Detail" in line:
-                        # End of transaction sections usually
-                        current_mode = None
-                        i += 1
-                        continue
-
-                    # 2. Extract Summary (Ending Balance)
-                    # This might be in a specific table header/row structure
-                    # We'll try a simple regex search on the line first
-                    summary_match = summary_pattern.search(line)
+                # 1. Detect Mode (Section Headers)
+                if token.section > 0:
+                    current_mode = "INCOME"
+                    i += 1
+                    continue
+                elif token.section < 0:
+                    current_mode = "EXPENSE"
+                    i += 1
+                    continue
+                elif token.balance:
+                    # End of transaction sections usually
+                    current_mode = None
+                    i += 1
+                    continue
+
+                # 2. Extract Summary (Ending Balance)
+                # This might be in a specific table header/row structure
+                # We'll try a simple regex search on the line first
+                if token.summary:
+                    summary_match = SUMMARY_PATTERN.search(token.text)
                     if summary_match:
                         meta["ending_balance"] = parse_amount(summary_match.group(1))
 
-                    # 3. Extract Transactions
-                    if current_mode:
-                        match = tx_pattern.match(line)
-                        if match:
-                            date_str = match.group(1)
-                            amount_str = match.group(2)
-                            desc = match.group(3)
-                            
-                            # Handle multi-line description
-                            # Look ahead to next line
-                            if i + 1 < len(lines):
-                                next_line = lines[i+1].strip()
-                                # If next line doesn't start with a date and isn't a header/empty
-                                if not tx_pattern.match(next_line) and \
-                                   "Deposits and Other Additions" not in next_line and \
-                                   "Banking/Debit Card Withdrawals" not in next_line and \
-                                   "Online and Electronic Banking Deductions" not in next_line and \
-                                   "Daily Balance Detail" not in next_line and \
-                                   next_line:
-                                    desc += " " + next_line
-                                    i += 1 # Skip next line since we consumed it
-                            
-                            # Cleaning Rules
-                            desc = desc.replace("Direct Deposit -", "").strip()
-                            desc = desc.replace("Debit Card Purchase", "").strip()
-                            desc = desc.replace("Web Pmt- Payment", "").strip()
-                            
-                            # Date formatting (Assume current year 2025 as per spec)
-                            # Spec says: Convert dates from "MM/DD" to "2025-MM-DD"
-                            try:
-                                # We'll just prepend 2025- for now
-                                # Ideally we'd infer year from statement period
-                                formatted_date = f"2025-{date_str.replace('/', '-')}"
-                            except:
-                                formatted_date = date_str
-
-                            transactions.append({
-                                "date": formatted_date,
-                                "amount": parse_amount(amount_str),
-                                "desc": desc,
-                                "type": current_mode
-                            })
-                    
-                    i += 1
-                    
-    except Exception as e:
-        print(f"Error parsing PDF: {e}")
-        return {"meta": meta, "transactions": []}
+                # 3. Extract Transactions
+                if current_mode:
+                    match = token.match
+                    if match:
+                        date_str = match.group(1)
+                        amount_str = match.group(2)
+                        desc = match.group(3)
+                        
+                        # Handle multi-line description: the next line, if
+                        # it's not a date, header or empty line
+                        if i + 1 < len(tokens) and tokens[i + 1].kind == CONTINUATION:
+                            desc += " " + tokens[i + 1].text
+                            i += 1 # Skip next line since we consumed it
+                        
+                        # Cleaning Rules
+                        desc = desc.replace("Direct Deposit -", "").strip()
+                        desc = desc.replace("Debit Card Purchase", "").strip()
+                        desc = desc.replace("Web Pmt- Payment", "").strip()
+                        
+                        captures.append((date_str, amount_str, desc, current_mode))
+                
+                i += 1
+
+            if captures:
+                date_strs, amount_strs, descs, modes = zip(*captures)
+                ordinals, dates_ok = calendar.month_day_ordinals(date_strs)
+                cents, _ = amounts_to_cents(amount_strs)  # Always numeric: TX_PATTERN matched it
+                for ok, ordinal, amount, desc, mode in zip(dates_ok.tolist(), ordinals.tolist(), cents.tolist(), descs, modes):
+                    if not ok:
+                        continue # Not a calendar date
+                    page_transactions.append(ordinal, amount if mode == "INCOME" else -amount, desc)
+
+            observe_stage("pnc", "scan", time.perf_counter() - started)
+            yield page_num + 1, len(pdf.pages), page_transactions
+
+        if progress:
+            progress(len(pdf.pages), len(pdf.pages))
 
-    return {"meta": meta, "transactions": transactions}
+    return meta
@@ -8,10 +8,20 @@ This parser does NOT rely on table extraction. Instead, it:
 4. Returns DataFrame or raises specific error if no transactions found
 """
 
-import pdfplumber
-import pandas as pd
 import re
-from datetime import datetime
+import time
+from datetime import date, datetime
+from backend import config
+from backend.lazy_imports import lazy_import
+from backend.metrics import observe_stage, capture_stages, replay_stages
+from backend.parsers.lexer import LineLexer
+from backend.parsers.normalize import StatementCalendar, amounts_to_cents
+from backend.parsers.page_cache import open_document
+from backend.parsers.page_planner import PagePlanner
+from backend.parsers import parallel_pages
+from backend.transactions import TransactionBatch
+
+pdfplumber = lazy_import("pdfplumber")
 
 
 class BruteForceParser:
@@ -26,10 +36,32 @@ class BruteForceParser:
     #   "01/03 $50.00 ATM WITHDRAWAL"
     TRANSACTION_PATTERN = re.compile(r'^(\d{2}/\d{2})\s+([$]?[\d,]+\.\d{2})\s+(.+)$')
     
-    def __init__(self):
+    # Section keywords, matched case-insensitively anywhere in a line
+    LEXER = LineLexer(
+        credit=['deposits', 'additions', 'credits'],
+        debit=['withdrawals', 'deductions', 'checks paid', 'purchase'],
+        balance=['daily balance', 'balance detail'],
+        transaction=TRANSACTION_PATTERN,
+    )
+    
+    def __init__(self, page_workers=None, parallel_min_pages=None):
+        """
+        Args:
+            page_workers: Worker processes for page-parallel parsing
+                          (default config.PARSE_PAGE_WORKERS; 0 = sequential)
+            parallel_min_pages: Only statements with at least this many pages
+                                are parsed in parallel
+        """
         self.year = datetime.now().year
-        self.transactions = []
+        self.calendar = StatementCalendar(self.year)
+        self.transactions = TransactionBatch("signed")
+        self._first_page_text = ""
+        self.planner = None
         self.current_multiplier = 0  # State: +1 (deposit) or -1 (withdrawal)
+        self.page_workers = config.PARSE_PAGE_WORKERS if page_workers is None else page_workers
+        self.parallel_min_pages = (
+            config.PARSE_PARALLEL_MIN_PAGES if parallel_min_pages is None else parallel_min_pages
+        )
     
     def extract_statement_year(self, text):
         """
@@ -45,157 +77,355 @@ class BruteForceParser:
         
         return self.year
     
-    def parse(self, file_path):
+    def parse(self, file_path, progress=None):
         """
         Main parsing function using regex line-by-line extraction.
         
+        Args:
+            file_path: Path to the PDF or a seekable binary file object
+            progress: Optional callback progress(pages_done, pages_total)
+        
         Returns:
             pandas.DataFrame with columns: [date, amount, description, source]
         
         Raises:
             ValueError: If no transactions found (specific error message)
         """
-        self.transactions = []
-        self.current_multiplier = 0
+        batch = self._collect(file_path, progress)
         
+        # Convert to DataFrame with error handling
+        print(f"[BruteForceParser] Converting {len(batch)} transactions to DataFrame", flush=True)
         try:
-            with pdfplumber.open(file_path) as pdf:
-                if not pdf.pages:
-                    raise ValueError("PDF is empty - no pages found")
-                
-                # Extract year from first page
-                first_page_text = pdf.pages[0].extract_text() or ""
-                self.year = self.extract_statement_year(first_page_text)
-                print(f"[BruteForceParser] Detected Year: {self.year}")
-                
-                # Process all pages
-                for page_num, page in enumerate(pdf.pages):
-                    page_text = page.extract_text()
-                    
-                    if not page_text:
-                        print(f"[BruteForceParser] Page {page_num + 1}: No text found")
-                        continue
-                    
-                    print(f"[BruteForceParser] Processing Page {page_num + 1}/{len(pdf.pages)}")
-                    self._process_page_text(page_text, page_num)
-                
-                # Check if we found any transactions
-                if not self.transactions:
-                    # Provide context on what was parsed to help debugging
-                    first_100_chars = first_page_text[:100].replace('\n', ' ') if first_page_text else "No text extracted"
-                    raise ValueError(f"Parsed 0 transactions. Text content: {first_100_chars}...")
-                
-                # Convert to DataFrame with error handling
-                print(f"[BruteForceParser] Converting {len(self.transactions)} transactions to DataFrame", flush=True)
-                try:
-                    df = pd.DataFrame(self.transactions)
-                    print(f"[BruteForceParser] DataFrame created successfully, shape: {df.shape}", flush=True)
-                    
-                    if not df.empty:
-                        print(f"[BruteForceParser] Sorting DataFrame by date", flush=True)
-                        # Sort by date (dates are already strings in YYYY-MM-DD format)
-                        df = df.sort_values(by='date').reset_index(drop=True)
-                        print(f"[BruteForceParser] Sorting completed", flush=True)
-                    
-                    print(f"[BruteForceParser] Successfully extracted {len(df)} transactions", flush=True)
-                    return df
-                    
-                except Exception as e:
-                    print(f"[BruteForceParser] ERROR in DataFrame operations: {type(e).__name__}: {str(e)}", flush=True)
-                    import traceback
-                    traceback.print_exc()
-                    raise ValueError(f"DataFrame operation failed: {str(e)}")
-                
+            df = batch.to_dataframe()
+            print(f"[BruteForceParser] DataFrame created successfully, shape: {df.shape}", flush=True)
+            
+            if not df.empty:
+                print(f"[BruteForceParser] Sorting DataFrame by date", flush=True)
+                # Sort by date (dates are already strings in YYYY-MM-DD format)
+                df = df.sort_values(by='date').reset_index(drop=True)
+                print(f"[BruteForceParser] Sorting completed", flush=True)
+            
+            print(f"[BruteForceParser] Successfully extracted {len(df)} transactions", flush=True)
+            return df
+            
+        except Exception as e:
+            print(f"[BruteForceParser] ERROR in DataFrame operations: {type(e).__name__}: {str(e)}", flush=True)
+            import traceback
+            traceback.print_exc()
+            raise ValueError(f"DataFrame operation failed: {str(e)}")
+    
+    def parse_batch(self, file_path, progress=None):
+        """
+        Like parse(), returning a date-ordered TransactionBatch instead of a DataFrame.
+        
+        Raises:
+            ValueError: If no transactions found
+        """
+        batch = self._collect(file_path, progress).sorted_by_date()
+        print(f"[BruteForceParser] Successfully extracted {len(batch)} transactions", flush=True)
+        return batch
+    
+    def _collect(self, file_path, progress=None):
+        """
+        Run iter_pages() to the end and concatenate the pages, in statement order.
+        
+        Raises:
+            ValueError: If no transactions found (specific error message)
+        """
+        self.transactions = TransactionBatch("signed")
+        self._first_page_text = ""
+        
+        try:
+            for _, _, page_transactions in self.iter_pages(file_path, progress):
+                self.transactions.extend(page_transactions)
         except ValueError:
             # Re-raise ValueError with specific message
             raise
         except Exception as e:
             raise ValueError(f"BruteForce parsing failed: {str(e)}")
+        
+        # Check if we found any transactions
+        if not self.transactions:
+            # Provide context on what was parsed to help debugging
+            first_page_text = self._first_page_text
+            first_100_chars = first_page_text[:100].replace('\n', ' ') if first_page_text else "No text extracted"
+            raise ValueError(f"Parsed 0 transactions. Text content: {first_100_chars}...")
+        
+        return self.transactions
+    
+    def iter_pages(self, file_path, progress=None):
+        """
+        Parse the PDF page by page, yielding each page's transactions as soon
+        as the page is done instead of accumulating them.
+        
+        Section state (deposit/withdrawal) carries across pages. Transactions
+        are in statement order; parse() is what sorts them by date.
+        
+        Yields:
+            (page_number, page_count, transactions) with a 1-based page_number
+            and the page's transactions as a TransactionBatch
+        
+        Raises:
+            ValueError: If the PDF has no pages
+        """
+        self.current_multiplier = 0
+        
+        started = time.perf_counter()
+        with open_document(file_path, pdfplumber.open) as pdf:
+            observe_stage("brute_force", "open", time.perf_counter() - started)
+            if not pdf.pages:
+                raise ValueError("PDF is empty - no pages found")
+            
+            # Extract year from first page
+            self._first_page_text = pdf.pages[0].extract_text() or ""
+            self.year = self.extract_statement_year(self._first_page_text)
+            self.calendar = StatementCalendar.from_text(self.year, self._first_page_text)
+            print(f"[BruteForceParser] Detected Year: {self.year}")
+            
+            # Pages without dates or section keywords are skipped unparsed
+            self.planner = PagePlanner.for_lexer(self.LEXER)
+            self.planner.calibrate(pdf.pages[0], self._first_page_text)
+            
+            shared_source = None
+            if self.page_workers > 1 and len(pdf.pages) >= max(2, self.parallel_min_pages):
+                shared_source = parallel_pages.shareable_source(file_path)
+            
+            if shared_source is not None:
+                # Page 0 is parsed here, its text is already extracted
+                yield from self._iter_pages_sequential(pdf, progress, stop=1)
+                yield from self._iter_pages_parallel(shared_source, len(pdf.pages), progress)
+            else:
+                yield from self._iter_pages_sequential(pdf, progress)
+            
+            if self.planner.skipped:
+                print(f"[BruteForceParser] Skipped {self.planner.skipped} page(s) without transaction content")
+            if progress:
+                progress(len(pdf.pages), len(pdf.pages))
+    
+    def _iter_pages_sequential(self, pdf, progress=None, stop=None):
+        """
+        Extract and scan pages [0, stop) of an open document in order.
+        """
+        page_count = len(pdf.pages)
+        for page_num, page in enumerate(pdf.pages[:stop]):
+            if progress:
+                progress(page_num, page_count)
+            
+            if page_num and self.planner is not None:
+                started = time.perf_counter()
+                skip = not self.planner.should_parse(page)
+                observe_stage("brute_force", "probe", time.perf_counter() - started)
+                if skip:
+                    # Nothing a skipped page holds affects the section state either
+                    yield page_num + 1, page_count, TransactionBatch("signed")
+                    continue
+            
+            started = time.perf_counter()
+            page_text = page.extract_text()
+            observe_stage("brute_force", "extract_text", time.perf_counter() - started)
+            
+            if not page_text:
+                print(f"[BruteForceParser] Page {page_num + 1}: No text found")
+                yield page_num + 1, page_count, TransactionBatch("signed")
+                continue
+            
+            print(f"[BruteForceParser] Processing Page {page_num + 1}/{page_count}")
+            started = time.perf_counter()
+            page_transactions = self._process_page_text(page_text, page_num)
+            observe_stage("brute_force", "scan", time.perf_counter() - started)
+            yield page_num + 1, page_count, page_transactions
+    
+    def _iter_pages_parallel(self, source, page_count, progress=None):
+        """
+        Extract and scan pages [1, page_count) in worker processes, then merge
+        them in page order while carrying the section state across pages.
+        
+        Workers can't know the section a page starts in. For each page they
+        return the lines before its first section header (or balance line),
+        which are scanned here once the starting section is known, plus the
+        transactions after it and the section the page ends in, which don't
+        depend on where it started. The output is identical to the
+        sequential path.
+        """
+        ranges = parallel_pages.chunk_ranges(1, page_count, self.page_workers)
+        print(f"[BruteForceParser] Parsing pages 2-{page_count} in {len(ranges)} chunks on {self.page_workers} workers")
+        chunks = parallel_pages.map_page_chunks(
+            _scan_page_chunk, source, ranges, self.calendar, self.planner, workers=self.page_workers
+        )
+        
+        for (start, _), (page_results, stages) in zip(ranges, chunks):
+            replay_stages(stages)
+            for page_num, page_result in enumerate(page_results, start=start):
+                if progress:
+                    progress(page_num, page_count)
+                
+                if page_result is None:
+                    print(f"[BruteForceParser] Page {page_num + 1}: No text found")
+                    yield page_num + 1, page_count, TransactionBatch("signed")
+                    continue
+                
+                head_lines, tail_transactions, exit_multiplier = page_result
+                # No header or balance line among head_lines: scanned in the incoming section
+                page_transactions = self._scan_tokens(self._tokenize(head_lines), page_num)
+                page_transactions.extend(tail_transactions)
+                if exit_multiplier:
+                    self.current_multiplier = exit_multiplier
+                yield page_num + 1, page_count, page_transactions
+    
+    def _split_at_first_state_line(self, tokens):
+        """
+        Index of the first line that sets the section or stops the page scan.
+        """
+        for index, token in enumerate(tokens):
+            if token.section or token.balance:
+                return index
+        return len(tokens)
+    
+    def _tokenize(self, lines):
+        """
+        Classify stripped lines with the lexer.
+        """
+        return self.LEXER.tokenize([line.strip() for line in lines])
     
     def _process_page_text(self, page_text, page_num):
         """
         Process text from a single page line-by-line.
+        
+        Returns:
+            TransactionBatch of the transactions found on the page
+        """
+        return self._scan_tokens(self._tokenize(page_text.split('\n')), page_num)
+    
+    def _scan_tokens(self, tokens, page_num, line_offset=0):
         """
-        lines = page_text.split('\n')
+        Scan a page's classified lines in the current section, updating the
+        section state.
         
-        for line_num, line in enumerate(lines):
-            line_stripped = line.strip()
-            
-            if not line_stripped:
+        Returns:
+            TransactionBatch of the transactions found in the lines
+        """
+        # Raw captures, normalized together once the lines are scanned
+        captures = []
+        
+        for line_num, token in enumerate(tokens, start=line_offset):
+            if not token.text:
                 continue
             
-            # Step 1: Check for section headers (state changes)
-            self._check_section_header(line_stripped)
+            # Step 1: Section headers (state changes)
+            self._check_section_header(token.section)
             
             # Step 2: Skip if we hit balance detail section
-            if self._is_balance_section(line_stripped):
+            if token.balance:
                 print(f"[BruteForceParser] Page {page_num + 1}: Stopping at 'Daily Balance Detail'")
                 break
             
-            # Step 3: Try to match transaction pattern
-            if self.current_multiplier != 0:
-                self._try_extract_transaction(line_stripped, line_num, page_num)
+            # Step 3: Capture the transaction, if the line matched the pattern
+            if self.current_multiplier != 0 and token.match is not None:
+                self._capture_transaction(captures, token.match, line_num)
+        
+        return self._normalize_captures(captures, page_num)
     
-    def _check_section_header(self, line):
+    def _check_section_header(self, multiplier):
         """
-        Identify section type and set multiplier.
+        Switch to the section a header line names (+1.0 deposits, -1.0 withdrawals, 0 none).
         """
-        line_lower = line.lower()
+        if multiplier == 1.0 and self.current_multiplier != 1.0:
+            print(f"[BruteForceParser] Section detected: DEPOSITS (multiplier = +1.0)")
+            self.current_multiplier = 1.0
         
-        # Deposits/Credits section
-        if any(keyword in line_lower for keyword in ['deposits', 'additions', 'credits']):
-            if self.current_multiplier != 1.0:
-                print(f"[BruteForceParser] Section detected: DEPOSITS (multiplier = +1.0)")
-                self.current_multiplier = 1.0
-        
-        # Withdrawals/Debits section
-        elif any(keyword in line_lower for keyword in ['withdrawals', 'deductions', 'checks paid', 'purchase']):
-            if self.current_multiplier != -1.0:
-                print(f"[BruteForceParser] Section detected: WITHDRAWALS (multiplier = -1.0)")
-                self.current_multiplier = -1.0
+        elif multiplier == -1.0 and self.current_multiplier != -1.0:
+            print(f"[BruteForceParser] Section detected: WITHDRAWALS (multiplier = -1.0)")
+            self.current_multiplier = -1.0
     
-    def _is_balance_section(self, line):
+    def _capture_transaction(self, captures, match, line_num):
         """
-        Check if we've reached the balance summary section (should stop parsing).
+        Record the raw strings of a TRANSACTION_PATTERN match, with the
+        current section's sign, for _normalize_captures.
+        
+        Returns:
+            True if the line was captured
         """
-        line_lower = line.lower()
-        return 'daily balance' in line_lower or 'balance detail' in line_lower
+        description = match.group(3).strip()  # Description
+        
+        # Skip if description looks like a total row
+        if description.lower() in ['total', 'totals', 'subtotal']:
+            return False
+        
+        # MM/DD, amount with commas and optional $
+        captures.append((line_num, match.group(1), match.group(2), description, self.current_multiplier))
+        return True
     
-    def _try_extract_transaction(self, line, line_num, page_num):
+    def _normalize_captures(self, captures, page_num):
         """
-        Try to extract a transaction from a line using regex.
+        Parse the captured dates and amounts in one bulk step.
+        
+        Returns:
+            TransactionBatch of the captures that parsed, in order
         """
-        match = self.TRANSACTION_PATTERN.match(line)
+        batch = TransactionBatch("signed")
+        if not captures:
+            return batch
         
-        if match:
-            date_str = match.group(1)  # MM/DD
-            amount_str = match.group(2)  # Amount with commas and optional $
-            description = match.group(3).strip()  # Description
-            
-            # Skip if description looks like a total row
-            if description.lower() in ['total', 'totals', 'subtotal']:
-                return
-            
-            try:
-                # Parse date
-                date_obj = datetime.strptime(f"{date_str}/{self.year}", "%m/%d/%Y")
-                formatted_date = date_obj.strftime("%Y-%m-%d")
-                
-                # Parse amount (remove $ and ,)
-                clean_amount_str = amount_str.replace('$', '').replace(',', '')
-                amount = float(clean_amount_str)
-                final_amount = abs(amount) * self.current_multiplier
-                
-                # Add transaction (use formatted_date string, not date_obj)
-                self.transactions.append({
-                    'date': formatted_date,  # FIX: Use string instead of datetime object
-                    'description': description,
-                    'amount': final_amount,
-                    'source': 'PDF'
-                })
+        line_nums, date_strs, amount_strs, descriptions, multipliers = zip(*captures)
+        ordinals, dates_ok = self.calendar.month_day_ordinals(date_strs)
+        cents, amounts_ok = amounts_to_cents(amount_strs)
+        
+        keep = []
+        for index, ok in enumerate((dates_ok & amounts_ok).tolist()):
+            if not ok:
+                # Failed to parse date or amount
+                problem = "date" if not dates_ok[index] else "amount"
+                print(f"[BruteForceParser] Page {page_num + 1}, Line {line_nums[index]}: Regex matched but failed to parse {problem}: {date_strs[index]!r} {amount_strs[index]!r}")
+                continue
+            amount = abs(int(cents[index]))
+            if multipliers[index] < 0:
+                amount = -amount
+            print(f"[BruteForceParser] Page {page_num + 1}, Line {line_nums[index]}: Found transaction: {date.fromordinal(int(ordinals[index])).isoformat()} | ${amount / 100:.2f} | {descriptions[index][:30]}")
+            keep.append((int(ordinals[index]), amount, descriptions[index]))
+        
+        if keep:
+            batch.append_columns(*zip(*keep))
+        return batch
+
+
+def _scan_page_chunk(source, start, stop, calendar, planner=None):
+    """
+    Page worker for BruteForceParser._iter_pages_parallel: extract pages
+    [start, stop) and scan everything that doesn't depend on the incoming section.
+    Pages the (calibrated) planner rules out are reported as having no text.
+    
+    Returns:
+        ([None | (head_lines, tail_transactions, exit_multiplier) per page], stages)
+    """
+    parser = BruteForceParser(page_workers=0)
+    parser.year = calendar.year
+    parser.calendar = calendar
+    results = []
+    
+    with capture_stages() as stages:
+        with open_document(parallel_pages.open_shared_source(source), pdfplumber.open) as pdf:
+            for page_num in range(start, stop):
+                if planner is not None:
+                    started = time.perf_counter()
+                    skip = not planner.should_parse(pdf.pages[page_num])
+                    observe_stage("brute_force", "probe", time.perf_counter() - started)
+                    if skip:
+                        results.append(None)
+                        continue
                 
-                print(f"[BruteForceParser] Page {page_num + 1}, Line {line_num}: Found transaction: {formatted_date} | ${final_amount:.2f} | {description[:30]}")
+                started = time.perf_counter()
+                page_text = pdf.pages[page_num].extract_text()
+                observe_stage("brute_force", "extract_text", time.perf_counter() - started)
+                if not page_text:
+                    results.append(None)
+                    continue
                 
-            except (ValueError, TypeError) as e:
-                # Failed to parse date or amount
-                print(f"[BruteForceParser] Page {page_num + 1}, Line {line_num}: Regex matched but failed to parse: {e}")
+                started = time.perf_counter()
+                tokens = parser._tokenize(page_text.split('\n'))
+                split = parser._split_at_first_state_line(tokens)
+                parser.current_multiplier = 0
+                tail_transactions = parser._scan_tokens(tokens[split:], page_num, line_offset=split)
+                results.append(([token.text for token in tokens[:split]], tail_transactions, parser.current_multiplier))
+                observe_stage("brute_force", "scan", time.perf_counter() - started)
+    
+    return results, stages
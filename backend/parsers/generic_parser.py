@@ -1,7 +1,14 @@
-import pdfplumber
-import pandas as pd
 import re
-from datetime import datetime
+import time
+from datetime import date, datetime
+from backend.lazy_imports import lazy_import
+from backend.metrics import observe_stage
+from backend.parsers.page_cache import open_document
+from backend.parsers.page_planner import PagePlanner
+from backend.parsers.normalize import StatementCalendar, amounts_to_cents
+from backend.transactions import TransactionBatch, month_day_ordinal
+
+pdfplumber = lazy_import("pdfplumber")
 
 
 class GenericPDFParser:
@@ -12,7 +19,8 @@ class GenericPDFParser:
     
     def __init__(self):
         self.year = datetime.now().year
-        self.transactions = []
+        self.calendar = StatementCalendar(self.year)
+        self.transactions = TransactionBatch("generic_loose")
     
     def extract_statement_year(self, text):
         """
@@ -105,6 +113,13 @@ class GenericPDFParser:
         """
         Step 6: Data Cleaning - Combine "Date" (MM/DD) with extracted Year to form YYYY-MM-DD.
         """
+        ordinal = self.parse_date_ordinal(date_str)
+        return date.fromordinal(ordinal).isoformat() if ordinal is not None else None
+    
+    def parse_date_ordinal(self, date_str):
+        """
+        parse_date(), returning the date's day ordinal (or None).
+        """
         if not date_str:
             return None
         
@@ -113,23 +128,20 @@ class GenericPDFParser:
         try:
             # MM/DD format (most common)
             if re.match(r"^\d{1,2}/\d{1,2}$", date_str):
-                date_obj = datetime.strptime(f"{date_str}/{self.year}", "%m/%d/%Y")
-                return date_obj.strftime("%Y-%m-%d")
+                month = int(date_str.split("/")[0])
+                return month_day_ordinal(date_str, self.calendar.year_of(month))
             
             # MM/DD/YYYY format
             elif re.match(r"^\d{1,2}/\d{1,2}/\d{4}$", date_str):
-                date_obj = datetime.strptime(date_str, "%m/%d/%Y")
-                return date_obj.strftime("%Y-%m-%d")
+                return datetime.strptime(date_str, "%m/%d/%Y").toordinal()
             
             # MM/DD/YY format
             elif re.match(r"^\d{1,2}/\d{1,2}/\d{2}$", date_str):
-                date_obj = datetime.strptime(date_str, "%m/%d/%y")
-                return date_obj.strftime("%Y-%m-%d")
+                return datetime.strptime(date_str, "%m/%d/%y").toordinal()
             
             # YYYY-MM-DD format (already formatted)
             elif re.match(r"^\d{4}-\d{1,2}-\d{1,2}$", date_str):
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                return date_obj.strftime("%Y-%m-%d")
+                return datetime.strptime(date_str, "%Y-%m-%d").toordinal()
             
         except ValueError:
             return None
@@ -151,80 +163,154 @@ class GenericPDFParser:
         
         return True
     
-    def parse_statement_loose(self, file_path):
+    def parse_statement_loose(self, file_path, progress=None):
         """
         Main parsing function that implements the complete state-machine logic.
         
+        Args:
+            file_path: Path to the PDF or a seekable binary file object
+            progress: Optional callback progress(pages_done, pages_total)
+        
         Returns:
             pandas.DataFrame with columns: [date, amount, description, category]
             Empty DataFrame if no transactions found
         """
-        self.transactions = []
+        import pandas as pd
+        
+        batch = self._collect(file_path, progress)
+        
+        # Step 7: Return DataFrame
+        if not batch:
+            return pd.DataFrame(columns=["date", "amount", "description", "category"])
+        
+        df = batch.to_dataframe()
+        df = df.sort_values(by="date").reset_index(drop=True)
+        print(f"[GenericPDFParser] Successfully extracted {len(df)} transactions")
+        
+        return df
+    
+    def parse_batch(self, file_path, progress=None):
+        """
+        Like parse_statement_loose(), returning a date-ordered TransactionBatch
+        (empty if no transactions found) instead of a DataFrame.
+        """
+        batch = self._collect(file_path, progress).sorted_by_date()
+        if batch:
+            print(f"[GenericPDFParser] Successfully extracted {len(batch)} transactions")
+        return batch
+    
+    def _collect(self, file_path, progress=None):
+        """
+        Run iter_pages() to the end and concatenate the pages, in statement
+        order. Any failure yields an empty batch.
+        """
+        self.transactions = TransactionBatch("generic_loose")
         
         try:
-            with pdfplumber.open(file_path) as pdf:
-                if not pdf.pages:
-                    print("WARNING: PDF is empty")
-                    return pd.DataFrame(columns=["date", "amount", "description", "category"])
-                
-                # Step 1: Extract Statement Year from first page
-                first_page_text = pdf.pages[0].extract_text() or ""
-                self.year = self.extract_statement_year(first_page_text)
-                print(f"[GenericPDFParser] Detected Year: {self.year}")
+            for _, _, page_transactions in self.iter_pages(file_path, progress):
+                self.transactions.extend(page_transactions)
+        except Exception as e:
+            print(f"ERROR: Critical failure in parse_statement_loose: {e}")
+            self.transactions = TransactionBatch("generic_loose")
+            return self.transactions
+        
+        if not self.transactions:
+            print("[GenericPDFParser] No transactions found")
+        return self.transactions
+    
+    def iter_pages(self, file_path, progress=None):
+        """
+        Run the table state machine page by page, yielding each page's
+        transactions as soon as the page is done instead of accumulating them.
+        
+        Transactions are in statement order; parse_statement_loose() is what
+        sorts them by date. Unlike parse_statement_loose(), failures to open
+        the PDF propagate to the caller.
+        
+        Yields:
+            (page_number, page_count, transactions) with a 1-based page_number
+            and the page's transactions as a TransactionBatch
+        """
+        started = time.perf_counter()
+        with open_document(file_path, pdfplumber.open) as pdf:
+            observe_stage("generic_loose", "open", time.perf_counter() - started)
+            if not pdf.pages:
+                print("WARNING: PDF is empty")
+                return
+            
+            # Step 1: Extract Statement Year from first page
+            first_page_text = pdf.pages[0].extract_text() or ""
+            self.year = self.extract_statement_year(first_page_text)
+            self.calendar = StatementCalendar.from_text(self.year, first_page_text)
+            print(f"[GenericPDFParser] Detected Year: {self.year}")
+            
+            # Only pages with both a "Date" header and a date can hold a
+            # transaction table; the others are skipped before extract_tables()
+            planner = PagePlanner(["date"], dates=True, require_all=True)
+            planner.calibrate(pdf.pages[0], first_page_text)
+            
+            # Step 2: Iterate through all pages
+            for page_num, page in enumerate(pdf.pages):
+                if progress:
+                    progress(page_num, len(pdf.pages))
                 
-                # Step 2: Iterate through all pages
-                for page_num, page in enumerate(pdf.pages):
-                    print(f"[GenericPDFParser] Processing Page {page_num + 1}/{len(pdf.pages)}")
-                    
-                    # Step 3: Extract ALL tables (no strict bounding boxes)
-                    try:
-                        tables = page.extract_tables()
-                    except Exception as e:
-                        print(f"WARNING: Failed to extract tables from page {page_num + 1}: {e}")
-                        continue
-                    
-                    if not tables:
-                        print(f"[GenericPDFParser] No tables found on page {page_num + 1}")
+                page_transactions = TransactionBatch("generic_loose")
+                if page_num:
+                    started = time.perf_counter()
+                    skip = not planner.should_parse(page)
+                    observe_stage("generic_loose", "probe", time.perf_counter() - started)
+                    if skip:
+                        print(f"[GenericPDFParser] Skipping Page {page_num + 1}/{len(pdf.pages)} (no transaction table)")
+                        yield page_num + 1, len(pdf.pages), page_transactions
                         continue
-                    
-                    print(f"[GenericPDFParser] Found {len(tables)} table(s) on page {page_num + 1}")
-                    
-                    # Process each table
-                    for table_idx, table in enumerate(tables):
-                        try:
-                            self._process_table(page, table, table_idx, page_num)
-                        except Exception as e:
-                            print(f"WARNING: Failed to process table {table_idx + 1} on page {page_num + 1}: {e}")
-                            continue
+                print(f"[GenericPDFParser] Processing Page {page_num + 1}/{len(pdf.pages)}")
                 
-                # Step 7: Return DataFrame
-                if not self.transactions:
-                    print("[GenericPDFParser] No transactions found")
-                    return pd.DataFrame(columns=["date", "amount", "description", "category"])
+                # Step 3: Extract ALL tables (no strict bounding boxes)
+                started = time.perf_counter()
+                try:
+                    tables = page.extract_tables()
+                except Exception as e:
+                    print(f"WARNING: Failed to extract tables from page {page_num + 1}: {e}")
+                    tables = []
+                observe_stage("generic_loose", "extract_tables", time.perf_counter() - started)
                 
-                df = pd.DataFrame(self.transactions)
-                df = df.sort_values(by="date").reset_index(drop=True)
-                print(f"[GenericPDFParser] Successfully extracted {len(df)} transactions")
+                if not tables:
+                    print(f"[GenericPDFParser] No tables found on page {page_num + 1}")
+                else:
+                    print(f"[GenericPDFParser] Found {len(tables)} table(s) on page {page_num + 1}")
                 
-                return df
+                # Process each table
+                started = time.perf_counter()
+                for table_idx, table in enumerate(tables):
+                    try:
+                        page_transactions.extend(self._process_table(page, table, table_idx, page_num))
+                    except Exception as e:
+                        print(f"WARNING: Failed to process table {table_idx + 1} on page {page_num + 1}: {e}")
+                        continue
+                observe_stage("generic_loose", "scan", time.perf_counter() - started)
                 
-        except Exception as e:
-            print(f"ERROR: Critical failure in parse_statement_loose: {e}")
-            return pd.DataFrame(columns=["date", "amount", "description", "category"])
+                yield page_num + 1, len(pdf.pages), page_transactions
+            
+            if progress:
+                progress(len(pdf.pages), len(pdf.pages))
     
     def _process_table(self, page, table, table_idx, page_num):
         """
         Process a single table from a page.
+        
+        Returns:
+            TransactionBatch of the transactions in the table's data rows
         """
+        table_transactions = TransactionBatch("generic_loose")
         if not table or len(table) == 0:
-            return
+            return table_transactions
         
         # Step 4: Inspect Header Row (row 0)
         header_row = table[0]
         
         if not self.is_transaction_table(header_row):
             print(f"[GenericPDFParser] Skipping table {table_idx + 1} (not a transaction table)")
-            return
+            return table_transactions
         
         print(f"[GenericPDFParser] Processing transaction table {table_idx + 1}")
         
@@ -247,23 +333,50 @@ class GenericPDFParser:
             print(f"WARNING: Failed to determine sign for table {table_idx + 1}: {e}, defaulting to +1.0")
             multiplier = 1.0
         
-        # Process data rows (skip header)
+        # Process data rows (skip header), collecting their raw cells
+        captures = []
         for row_idx, row in enumerate(table[1:], start=1):
             try:
-                self._process_row(row, multiplier, row_idx, table_idx)
+                capture = self._process_row(row, multiplier, row_idx, table_idx)
             except Exception as e:
                 print(f"WARNING: Failed to process row {row_idx} in table {table_idx + 1}: {e}")
                 continue
+            if capture:
+                captures.append(capture)
+        
+        # Step 6: Data Cleaning, for the whole table at once
+        if captures:
+            date_strs, amount_strs, descriptions = zip(*captures)
+            ordinals, dates_ok = self.calendar.month_day_ordinals([str(d).strip() for d in date_strs])
+            cents, amounts_ok = amounts_to_cents(amount_strs)
+            for index, (ordinal, date_ok, amount_ok) in enumerate(zip(ordinals.tolist(), dates_ok.tolist(), amounts_ok.tolist())):
+                if not date_ok:
+                    # Not MM/DD: full dates (MM/DD/YYYY, ...) are parsed one by one
+                    ordinal = self.parse_date_ordinal(date_strs[index])
+                    if ordinal is None:
+                        continue  # Invalid date
+                if not amount_ok:
+                    continue  # Invalid amount
+                # Apply multiplier
+                amount = abs(int(cents[index]))
+                table_transactions.append(ordinal, -amount if multiplier < 0 else amount, descriptions[index])
+        
+        return table_transactions
     
     def _process_row(self, row, multiplier, row_idx, table_idx):
         """
         Process a single row from a table.
+        
+        Returns:
+            The row's raw (date, amount, description) cells, or None if the
+            row is not a transaction; _process_table parses the dates and
+            amounts of all rows together
         """
         # Remove None/empty cells
         clean_row = [cell for cell in row if cell and str(cell).strip()]
         
         if len(clean_row) < 2:
-            return  # Not enough data
+            return None  # Not enough data
         
         # Assume structure: [Date, ...Description..., Amount]
         date_str = clean_row[0]
@@ -275,29 +388,11 @@ class GenericPDFParser:
         else:
             description = "Transaction"  # Fallback if only date and amount
         
-        # Step 6: Data Cleaning
-        parsed_date = self.parse_date(date_str)
-        if not parsed_date:
-            return  # Invalid date
-        
-        amount = self.clean_amount(amount_str)
-        if amount is None:
-            return  # Invalid amount
-        
-        # Apply multiplier
-        final_amount = abs(amount) * multiplier
-        
         # Filter out invalid rows
         if not self.is_valid_transaction_row(row, description):
-            return
-        
-        # Add transaction
-        self.transactions.append({
-            "date": parsed_date,
-            "amount": final_amount,
-            "description": description.strip(),
-            "category": "Uncategorized"
-        })
+            return None
+        
+        return date_str, amount_str, description.strip()
 
 
 # Usage Example:
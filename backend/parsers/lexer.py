@@ -0,0 +1,188 @@
+"""
+LineLexer - classify a page's text lines in one pass.
+
+The text-based parsers all walk a statement line by line asking the same
+questions: does this line open a deposits or withdrawals section, does it
+start the balance detail (where transactions stop), is it a transaction?
+Asking them one line at a time meant lowercasing every line and running
+several any(keyword in line) scans in Python before the transaction regex,
+and backend.parser re-asked them all for the line after each transaction.
+
+A LineLexer holds one parser's vocabulary: keyword groups (credit, debit,
+balance, summary) and the transaction regex. tokenize() answers every
+question for every line of a page at once:
+
+1. The page is lowercased once and each keyword is located with str.find
+   over the whole page, so keyword scanning runs at C speed and costs
+   nothing per line that doesn't contain a keyword (most lines)
+2. The transaction regex is matched once per line
+3. Each line becomes one LineToken holding all the answers - a header line
+   can also match the transaction pattern, and some parsers act on both -
+   plus a `kind` summarizing it: HEADER, TX, CONTINUATION, BALANCE or NOISE
+
+    LEXER = LineLexer(
+        credit=["deposits", "additions"],
+        debit=["withdrawals"],
+        balance=["daily balance"],
+        transaction=r"(?P<date>\\d{2}/\\d{2})\\s+(?P<amount>[\\d,]+\\.\\d{2})\\s+(?P<desc>.+)$",
+    )
+    for token in LEXER.tokenize(page_text.split("\\n")):
+        ...
+
+See benchmark_line_classifier.py for the cost on multi-thousand-line pages.
+"""
+
+import re
+
+
+HEADER = "HEADER"
+TX = "TX"
+CONTINUATION = "CONTINUATION"
+BALANCE = "BALANCE"
+NOISE = "NOISE"
+
+_GROUPS = ("credit", "debit", "balance", "summary")
+
+
+class LineToken:
+    """
+    One classified line.
+
+    Attributes:
+        text: The line as given to the lexer
+        kind: HEADER, TX, CONTINUATION, BALANCE or NOISE
+        section: +1.0 if the line names a deposits section, else -1.0 if it
+                 names a withdrawals section, else 0
+        balance: True if the line contains a balance-section marker
+        summary: True if the line contains a summary marker
+        match: The transaction regex match (groups date, amount, desc), or None
+    """
+
+    __slots__ = ("text", "kind", "section", "balance", "summary", "match")
+
+    def __init__(self, text, kind, section=0, balance=False, summary=False, match=None):
+        self.text = text
+        self.kind = kind
+        self.section = section
+        self.balance = balance
+        self.summary = summary
+        self.match = match
+
+    def __repr__(self):
+        return f"LineToken({self.kind}, {self.text!r})"
+
+
+class LineLexer:
+    """
+    One parser's line vocabulary.
+    """
+
+    def __init__(self, credit, debit, balance, transaction, summary=(), case_sensitive=()):
+        """
+        Args:
+            credit: Keywords that open a deposits section
+            debit: Keywords that open a withdrawals section (credit wins if both appear)
+            balance: Markers of the balance section
+            transaction: Transaction regex (string or compiled), matched at the
+                         start of each line, with groups date, amount and desc
+            summary: Markers of summary lines the parser extracts values from
+            case_sensitive: Names of the keyword groups above matched
+                            case-sensitively (the rest ignore case)
+        """
+        self.keywords = {"credit": credit, "debit": debit, "balance": balance, "summary": summary}
+        self.case_sensitive = frozenset(case_sensitive)
+        unknown = self.case_sensitive.difference(_GROUPS)
+        if unknown:
+            raise ValueError(f"Unknown keyword groups: {sorted(unknown)}")
+        # Lowercase keywords once for the case-insensitive groups
+        self._needles = {
+            group: tuple(word if group in self.case_sensitive else word.lower() for word in words)
+            for group, words in self.keywords.items()
+        }
+        self.transaction = re.compile(transaction) if isinstance(transaction, str) else transaction
+
+    def _keyword_lines(self, lines):
+        """
+        Find the lines containing each keyword group's words.
+
+        Returns:
+            {group: set of line indices}
+        """
+        text = "\n".join(lines)
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Lowercasing changed some character's length, so page offsets
+            # no longer line up; search line by line instead
+            return self._keyword_lines_slow(lines)
+
+        found = {}
+        for group, needles in self._needles.items():
+            haystack = text if group in self.case_sensitive else lowered
+            indices = found[group] = set()
+            for needle in needles:
+                # Hits come in page order, so each one's line index is the
+                # previous hit's plus the newlines between them
+                index, previous = 0, 0
+                position = haystack.find(needle)
+                while position != -1:
+                    index += haystack.count("\n", previous, position)
+                    indices.add(index)
+                    previous = position
+                    position = haystack.find(needle, position + len(needle))
+        return found
+
+    def _keyword_lines_slow(self, lines):
+        found = {group: set() for group in self._needles}
+        for index, line in enumerate(lines):
+            line_lower = line.lower()
+            for group, needles in self._needles.items():
+                haystack = line if group in self.case_sensitive else line_lower
+                if any(needle in haystack for needle in needles):
+                    found[group].add(index)
+        return found
+
+    def tokenize(self, lines):
+        """
+        Classify every line exactly once. A non-blank NOISE line directly
+        after a TX line is reported as CONTINUATION (a wrapped description).
+
+        Args:
+            lines: The lines of a page, as the parser wants them matched
+                   (stripped or not)
+
+        Returns:
+            List of LineTokens, one per line
+        """
+        lines = lines if isinstance(lines, list) else list(lines)
+        found = self._keyword_lines(lines)
+        credit, debit, balance, summary = (found[group] for group in _GROUPS)
+        match_transaction = self.transaction.match
+
+        tokens = []
+        append, make_token = tokens.append, LineToken
+        previous = NOISE
+        for index, line in enumerate(lines):
+            section = 1.0 if index in credit else (-1.0 if index in debit else 0)
+            is_balance = index in balance
+            match = match_transaction(line)
+
+            if is_balance:
+                kind = BALANCE
+            elif section:
+                kind = HEADER
+            elif match is not None:
+                kind = TX
+            elif previous == TX and line and not line.isspace():
+                kind = CONTINUATION
+            else:
+                kind = NOISE
+
+            append(make_token(line, kind, section, is_balance, index in summary, match))
+            previous = kind
+        return tokens
+
+    def classify(self, line):
+        """
+        Classify a single line (never CONTINUATION, which needs context).
+        """
+        return self.tokenize([line])[0]
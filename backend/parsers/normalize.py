@@ -0,0 +1,244 @@
+"""
+Bulk normalization of captured dates and amounts.
+
+The parsers' regexes capture raw strings ("10/01", "$1,234.56", "(12.00)").
+Converting them one row at a time costs a split/int/date() and a chain of
+str.replace() plus float() per transaction. Instead, each parser collects a
+page's (or table's) raw captures and normalizes them in one step:
+
+1. Amounts: the page's strings are joined into one text, so stripping "$",
+   "," and spaces and rewriting "(x)" as "-x" are single C-level passes;
+   numpy then parses every number at once and rounds to integer cents
+2. MM/DD dates: fixed-width "MM/DD" captures are read straight out of one
+   byte buffer as digit columns; months and days are validated and turned
+   into day ordinals with datetime64 arithmetic
+
+Each function returns the values plus a boolean mask of which rows parsed,
+so callers skip bad rows exactly where the per-row code raised ValueError.
+
+December/January rollover: MM/DD dates carry no year. A StatementCalendar
+holds the statement year, and - when page one prints a statement period
+that crosses New Year ("12/15/2024 to 01/14/2025") - puts months from the
+period's start month onwards in the start year and earlier months in the
+end year.
+"""
+
+import re
+from datetime import datetime
+
+from backend.lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+
+# date.toordinal() of 1970-01-01, the datetime64 epoch
+EPOCH_ORDINAL = 719163
+
+# Whitespace str.strip() removes, besides " " and "\n"
+_ASCII_WHITESPACE = "\t\r\x0b\x0c\x1c\x1d\x1e\x1f"
+_PARENTHESIZED = re.compile(r"^\((.*)\)$", re.MULTILINE)
+_OPENING_PARENTHESIS = re.compile(r"^\((?=.*\)$)", re.MULTILINE)
+_MONTH_DAY = re.compile(r"^\s*(\d{1,2})/(\d{1,2})\s*$")
+
+# "12/15/2024 to 01/14/2025", "Dec 15, 2024 - January 14, 2025", ...
+_PERIOD_SEPARATOR = r"\s*(?:-|–|to|through|thru)\s*"
+_NUMERIC_PERIOD = re.compile(
+    r"(\d{1,2}/\d{1,2}/\d{2,4})" + _PERIOD_SEPARATOR + r"(\d{1,2}/\d{1,2}/\d{2,4})", re.IGNORECASE
+)
+_WORDED_PERIOD = re.compile(
+    r"([A-Za-z]{3,9}\.? \d{1,2},? \d{4})" + _PERIOD_SEPARATOR + r"([A-Za-z]{3,9}\.? \d{1,2},? \d{4})", re.IGNORECASE
+)
+_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%B %d %Y", "%b %d %Y")
+
+
+def _parse_period_date(text):
+    text = text.replace(",", "").replace(".", "")
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def find_statement_period(text):
+    """
+    Find the statement period printed on a page, e.g. "For the period
+    12/15/2024 to 01/14/2025".
+
+    Returns:
+        (start date, end date), or None if no plausible period is printed
+    """
+    if not text:
+        return None
+    for pattern in (_NUMERIC_PERIOD, _WORDED_PERIOD):
+        for match in pattern.finditer(text):
+            start, end = _parse_period_date(match.group(1)), _parse_period_date(match.group(2))
+            if start and end and 0 <= (end - start).days <= 366:
+                return start, end
+    return None
+
+
+class StatementCalendar:
+    """
+    Resolves year-less MM/DD dates for one statement.
+    """
+
+    def __init__(self, year, period=None):
+        """
+        Args:
+            year: The statement year, used for every month unless `period`
+                  crosses New Year
+            period: Optional (start date, end date) statement period
+        """
+        self.year = year
+        self.period = period
+        self.rollover_month = None
+        if period and period[0].year != period[1].year:
+            # Months from the start month onwards belong to the start year
+            self.rollover_month = period[0].month
+
+    @classmethod
+    def from_text(cls, year, text):
+        """
+        Calendar for a statement whose first page reads `text`.
+        """
+        return cls(year, find_statement_period(text))
+
+    def years(self, months):
+        """
+        The year of each month in `months` (a numpy array).
+        """
+        if self.rollover_month is None:
+            return np.full(len(months), self.year, dtype=np.int64)
+        start, end = self.period
+        return np.where(months >= self.rollover_month, start.year, end.year).astype(np.int64)
+
+    def year_of(self, month):
+        if self.rollover_month is None:
+            return self.year
+        return self.period[0].year if month >= self.rollover_month else self.period[1].year
+
+    def month_day_ordinals(self, month_days):
+        """
+        Day ordinals of "MM/DD" strings.
+
+        Returns:
+            (ordinals, valid): int64 and bool numpy arrays; invalid rows
+            (not MM/DD, or no such calendar date) have valid False
+        """
+        months, days, valid = _split_month_days(month_days)
+        return _ordinals(self.years(months), months, days, valid)
+
+
+def _split_month_days(month_days):
+    """
+    Month and day columns of "MM/DD" strings, plus which rows had that shape.
+    """
+    count = len(month_days)
+    if count == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=bool)
+
+    # Fast path: every capture is exactly "MM/DD" (what the text parsers'
+    # regexes match), so the joined text is a (count, 6) byte matrix
+    joined = "\n".join(month_days) + "\n"
+    if len(joined) == 6 * count and joined.isascii():
+        matrix = np.frombuffer(joined.encode("ascii"), dtype=np.uint8).reshape(count, 6)
+        digits = matrix[:, [0, 1, 3, 4]].astype(np.int64) - 48
+        valid = (matrix[:, 2] == ord("/")) & (matrix[:, 5] == ord("\n")) & ((digits >= 0) & (digits <= 9)).all(axis=1)
+        months = digits[:, 0] * 10 + digits[:, 1]
+        days = digits[:, 2] * 10 + digits[:, 3]
+        return months, days, valid
+
+    months = np.zeros(count, dtype=np.int64)
+    days = np.zeros(count, dtype=np.int64)
+    valid = np.zeros(count, dtype=bool)
+    for index, text in enumerate(month_days):
+        match = _MONTH_DAY.match(text) if isinstance(text, str) else None
+        if match:
+            months[index], days[index], valid[index] = int(match.group(1)), int(match.group(2)), True
+    return months, days, valid
+
+
+def _ordinals(years, months, days, valid):
+    """
+    Day ordinals of (year, month, day) columns, invalidating impossible dates.
+    """
+    valid = valid & (months >= 1) & (months <= 12) & (days >= 1) & (years >= 1) & (years <= 9999)
+    # Out-of-range rows are computed with placeholder values and masked
+    safe_months = np.where(valid, months, 1)
+    month_index = (np.where(valid, years, 1970) - 1970) * 12 + (safe_months - 1)
+    first_day = month_index.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    next_first_day = (month_index + 1).astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    valid &= days <= next_first_day - first_day
+    ordinals = np.where(valid, first_day + days - 1 + EPOCH_ORDINAL, 0)
+    return ordinals, valid
+
+
+def _has_other_whitespace(text):
+    if not text.isascii():
+        return any(character.isspace() and character != "\n" for character in text)
+    return any(character in text for character in _ASCII_WHITESPACE)
+
+
+def _negate_parenthesized(joined):
+    """
+    Rewrite every line of the form "(x)" as "-x".
+    """
+    # Constant replacements are much cheaper than a "-\1" template per match:
+    # turn the "(" of each fully parenthesized line into "-", then drop the
+    # ")"s - as long as those were the only ")"s in the text
+    opened, converted = _OPENING_PARENTHESIS.subn("-", joined)
+    if opened.count(")") == converted:
+        return opened.replace(")", "")
+    return _PARENTHESIZED.sub(r"-\1", joined)
+
+
+def amounts_to_cents(amounts):
+    """
+    Signed integer cents of amount strings like "$1,234.56", "-5.00" or
+    "(12.00)" (parenthesized = negative). "$", "," and spaces are ignored.
+
+    Returns:
+        (cents, valid): int64 and bool numpy arrays; rows that aren't a
+        number have valid False
+    """
+    count = len(amounts)
+    if count == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+
+    try:
+        joined = "\n".join(amounts)
+    except TypeError:
+        amounts = [str(amount) for amount in amounts]
+        joined = "\n".join(amounts)
+    joined = joined.replace("$", "").replace(",", "").replace(" ", "")
+
+    if joined.count("\n") != count - 1 or _has_other_whitespace(joined):
+        # Rare: an amount containing a newline or tab; clean each row on its own
+        cleaned = [str(amount).replace("$", "").replace(",", "").replace(" ", "").strip() for amount in amounts]
+        cleaned = [_PARENTHESIZED.sub(r"-\1", amount) for amount in cleaned]
+    else:
+        if "(" in joined:
+            joined = _negate_parenthesized(joined)
+        cleaned = joined.split("\n")
+
+    try:
+        values = np.array(cleaned, dtype=np.float64)
+        valid = np.isfinite(values)
+    except ValueError:
+        # Some row isn't a number: parse row by row to find which
+        values = np.zeros(count, dtype=np.float64)
+        valid = np.zeros(count, dtype=bool)
+        for index, text in enumerate(cleaned):
+            try:
+                values[index] = float(text)
+                valid[index] = True
+            except ValueError:
+                continue
+        valid &= np.isfinite(values)
+
+    cents = np.rint(np.where(valid, values, 0.0) * 100).astype(np.int64)
+    return cents, valid
+
@@ -0,0 +1,367 @@
+"""
+StatementDocument - one open PDF whose per-page extraction results are shared.
+
+pdfminer layout analysis dominates parse time, and the parsers used to redo
+it: parse_pnc_statement extracted tables and then text from every page,
+GenericPDFParser re-extracted a page's text once per table, BruteForceParser
+extracted page 0 twice. A StatementDocument wraps each pdfplumber page in a
+PageContent whose extract_text() / extract_words() / extract_tables() /
+find_tables() results are computed lazily, once, and then reused.
+
+Every parser opens its input through open_document(), which passes an
+existing StatementDocument straight through. A caller that tries several
+parsers on the same statement opens the document once and hands it to each
+of them, so falling back never repeats extraction work:
+
+    with StatementDocument(path) as doc:
+        result = BruteForceParser().parse(doc)
+        if result.empty:
+            result = GenericPDFParser().parse_statement_loose(doc)
+
+Bounded-memory mode: pdfplumber keeps every page's layout (every char
+object) cached for as long as the PDF is open, and pdfminer caches every
+object it resolves, so memory grows with the page count. Statements of at
+least PARSE_LOW_MEMORY_MIN_PAGES pages are read in bounded-memory mode
+instead:
+
+1. Iterating doc.pages releases each page's layout as soon as the loop moves
+   past it; the small memoized results (text, tables, words) are kept, so
+   the parsers' page loops don't change
+2. The PDF is opened PARSE_PAGE_WINDOW pages at a time, dropping pdfminer's
+   object caches between windows. Pages outside the open window are
+   reopened on demand
+
+Process RSS is sampled after each page; the peak is kept on the document
+and reported to an enclosing track_memory() block.
+"""
+
+import contextvars
+import os
+from contextlib import contextmanager
+
+from backend import config
+from backend.lazy_imports import lazy_import
+
+pdfplumber = lazy_import("pdfplumber")
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+_MISSING = object()
+
+
+def current_rss_bytes():
+    """
+    Resident set size of this process, in bytes (0 if it can't be read).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        # Not /proc: fall back to the lifetime peak (KiB on Linux)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return 0
+
+
+class MemoryTracker:
+    """
+    Peak process RSS seen by the documents read inside a track_memory() block.
+    """
+
+    def __init__(self):
+        self.peak_rss_bytes = 0
+
+    def sample(self, rss_bytes=None):
+        rss_bytes = current_rss_bytes() if rss_bytes is None else rss_bytes
+        self.peak_rss_bytes = max(self.peak_rss_bytes, rss_bytes)
+        return rss_bytes
+
+
+_memory_tracker = contextvars.ContextVar("memory_tracker", default=None)
+
+
+@contextmanager
+def track_memory():
+    """
+    Yield a MemoryTracker that every StatementDocument read in this context
+    reports its RSS samples to.
+    """
+    tracker = MemoryTracker()
+    tracker.sample()
+    token = _memory_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _memory_tracker.reset(token)
+        tracker.sample()
+
+
+class PageContent:
+    """
+    Memoizing wrapper around a pdfplumber page. Calls with arguments, and
+    any other attribute, go straight to the underlying page.
+    """
+
+    def __init__(self, page=None, loader=None):
+        """
+        Args:
+            page: The pdfplumber page, or None to load it on first use
+            loader: Callable returning the page when it isn't loaded
+        """
+        self._page = page
+        self._loader = loader
+        self._cache = {}
+
+    @property
+    def page(self):
+        if self._page is None:
+            self._page = self._loader()
+        return self._page
+
+    def _memoized(self, name, compute):
+        value = self._cache.get(name, _MISSING)
+        if value is _MISSING:
+            value = self._cache[name] = compute()
+        return value
+
+    def extract_text(self, **kwargs):
+        if kwargs:
+            return self.page.extract_text(**kwargs)
+        return self._memoized("text", lambda: self.page.extract_text())
+
+    def extract_words(self, **kwargs):
+        if kwargs:
+            return self.page.extract_words(**kwargs)
+        return self._memoized("words", lambda: self.page.extract_words())
+
+    def extract_tables(self, table_settings=None):
+        if table_settings:
+            return self.page.extract_tables(table_settings)
+        return self._memoized("tables", lambda: self.page.extract_tables())
+
+    def find_tables(self, table_settings=None):
+        if table_settings:
+            return self.page.find_tables(table_settings)
+        return self._memoized("found_tables", lambda: self.page.find_tables())
+
+    def crop_text(self, bbox):
+        """
+        Text inside `bbox` (x0, top, x1, bottom), memoized per bbox.
+        """
+        return self._memoized(("crop_text", tuple(bbox)), lambda: self.page.crop(bbox).extract_text())
+
+    def release(self, unload=False):
+        """
+        Drop the page's cached layout, keeping the memoized results that
+        don't refer back to it. With `unload`, forget the page object too
+        (its PDF is being closed); it is reloaded on next use.
+        """
+        # Table objects hold on to the page and its layout
+        self._cache.pop("found_tables", None)
+        page = self._page
+        if page is None:
+            return
+        close = getattr(page, "close", None)
+        if close is not None:
+            close()
+        if unload:
+            self._page = None
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the wrapper (width, crop, ...)
+        if name in ("_page", "_loader", "_cache"):
+            raise AttributeError(name)
+        return getattr(self.page, name)
+
+
+class DocumentPages:
+    """
+    The pages of a StatementDocument (or a slice of them) as a sequence of
+    PageContent. In bounded-memory mode, iterating releases each page once
+    the loop moves past it.
+    """
+
+    def __init__(self, document, indices):
+        self.document = document
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return DocumentPages(self.document, self.indices[index])
+        return self.document._page(self.indices[index])
+
+    def __iter__(self):
+        document = self.document
+        for index in self.indices:
+            page = document._page(index)
+            try:
+                yield page
+            finally:
+                # Also runs when the loop breaks out early
+                document._page_done(index)
+
+
+class StatementDocument:
+    """
+    An open PDF with one PageContent per page.
+
+    A re-entrant context manager: the PDF is opened on the first `with` and
+    closed when the outermost `with` exits, so a document can be passed to
+    several parsers that each use it in a `with` block.
+    """
+
+    def __init__(self, source, opener=None, low_memory=None, window=None):
+        """
+        Args:
+            source: Path to the PDF or a seekable binary file object
+            opener: Callable returning a pdfplumber-style context manager
+                    (defaults to pdfplumber.open). Opening in windows calls
+                    it with a `pages` list of 1-based page numbers
+            low_memory: Force bounded-memory mode on or off; None decides
+                        by page count (config.PARSE_LOW_MEMORY_MIN_PAGES)
+            window: Pages per window in bounded-memory mode; 0 keeps the
+                    whole PDF open (defaults to config.PARSE_PAGE_WINDOW)
+        """
+        self.source = source
+        self.opener = opener or pdfplumber.open
+        self.low_memory = low_memory
+        self.window = config.PARSE_PAGE_WINDOW if window is None else window
+        self.pdf = None
+        self.pages = []
+        self.bounded = False
+        self.peak_rss_bytes = 0
+        self._context = None
+        self._window_range = None
+        self._contents = []
+        self._depth = 0
+
+    def __enter__(self):
+        if self._depth == 0:
+            self._open()
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth == 0:
+            self._sample_memory()
+            self._close_window(exc_type, exc, tb)
+            self._contents = []
+            self.pages = []
+            self.bounded = False
+        return False
+
+    def __len__(self):
+        return len(self.pages)
+
+    # --- Opening ---
+
+    def _open(self):
+        self._context = self.opener(self.source)
+        self.pdf = self._context.__enter__()
+        page_count = _page_count(self.pdf)
+
+        if self.low_memory is None:
+            min_pages = config.PARSE_LOW_MEMORY_MIN_PAGES
+            self.bounded = min_pages > 0 and page_count >= min_pages
+        else:
+            self.bounded = bool(self.low_memory)
+
+        if self.bounded and 0 < self.window < page_count:
+            # Reopen the first window only; pages are loaded window by window
+            self._close_window(None, None, None)
+            self._contents = [PageContent(loader=self._loader(index)) for index in range(page_count)]
+            self._open_window(0)
+            print(f"[StatementDocument] Bounded-memory mode: {page_count} pages in windows of {self.window}")
+        else:
+            self._window_range = range(page_count)
+            self._contents = [PageContent(page) for page in self.pdf.pages]
+            if self.bounded:
+                print(f"[StatementDocument] Bounded-memory mode: {page_count} pages")
+        self.pages = DocumentPages(self, range(len(self._contents)))
+        self._sample_memory()
+
+    def _open_window(self, index):
+        """
+        Open the window of pages containing page `index`, closing the current one.
+        """
+        self._close_window(None, None, None)
+        start = index - index % self.window
+        window = range(start, min(start + self.window, len(self._contents)))
+        if hasattr(self.source, "seek"):
+            self.source.seek(0)
+        self._context = self.opener(self.source, pages=[number + 1 for number in window])
+        self.pdf = self._context.__enter__()
+        for content, page in zip((self._contents[number] for number in window), self.pdf.pages):
+            content._page = page
+        self._window_range = window
+
+    def _close_window(self, exc_type, exc, tb):
+        context, self._context = self._context, None
+        if context is None:
+            return
+        if self._window_range is not None:
+            for index in self._window_range:
+                self._contents[index].release(unload=True)
+        self._window_range = None
+        self.pdf = None
+        context.__exit__(exc_type, exc, tb)
+
+    def _loader(self, index):
+        def load():
+            if self._window_range is None or index not in self._window_range:
+                self._open_window(index)
+            return self._contents[index]._page
+        return load
+
+    # --- Page access (see DocumentPages) ---
+
+    def _page(self, index):
+        return self._contents[index]
+
+    def _page_done(self, index):
+        if self.bounded:
+            self._contents[index].release()
+        self._sample_memory()
+
+    def _sample_memory(self):
+        rss_bytes = current_rss_bytes()
+        self.peak_rss_bytes = max(self.peak_rss_bytes, rss_bytes)
+        tracker = _memory_tracker.get()
+        if tracker is not None:
+            tracker.sample(rss_bytes)
+
+
+def _page_count(pdf):
+    """
+    Number of pages, read from the page tree so pdfplumber doesn't build a
+    Page object for each one.
+    """
+    doc = getattr(pdf, "doc", None)
+    if doc is not None:
+        try:
+            from pdfminer.pdftypes import resolve1
+            count = resolve1(resolve1(doc.catalog["Pages"])["Count"])
+            if isinstance(count, int) and count >= 0:
+                return count
+        except Exception:
+            pass
+    return len(pdf.pages)
+
+
+def open_document(source, opener=None):
+    """
+    Return `source` if it is already a StatementDocument, else a new one over it.
+    Use the result in a `with` block.
+    """
+    if isinstance(source, StatementDocument):
+        return source
+    return StatementDocument(source, opener)
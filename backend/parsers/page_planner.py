@@ -0,0 +1,240 @@
+"""
+PagePlanner - skip pages that can't hold transactions without laying them out.
+
+Every parser used to run pdfminer layout analysis (extract_text /
+extract_tables) on every page, including the disclosure, privacy-notice and
+marketing pages that make up much of a real statement and follow the last
+transaction section. Layout analysis is the dominant cost of a parse.
+
+Before a page is laid out, the planner probes it: the strings shown by the
+page's content stream (and its form XObjects) are decoded straight from the
+stream, which costs a small fraction of layout analysis. A parser only gets
+anything from a page whose text contains a date ("10/01", "2025-10-01") or
+one of its section keywords ("Deposits and Other Additions", "Daily
+Balance Detail", ...). A page whose probe shows neither is skipped exactly
+as if it were blank, so results are unchanged. Once the last transaction
+section is closed, the remaining pages all probe as boilerplate and cost
+one probe each.
+
+The probe is only trusted where it reads like extract_text():
+
+1. calibrate() compares it with the first page's extract_text(), which every
+   parser runs anyway; if the probe misses text there (composite/CID fonts,
+   custom encodings), the planner parses every page
+2. A page drawing text in a font the first page doesn't use, or in a
+   composite (Type0) or Type3 font, is always parsed
+
+    planner = PagePlanner.for_lexer(LEXER)
+    planner.calibrate(pdf.pages[0], first_page_text)
+    for page_num, page in enumerate(pdf.pages):
+        if page_num and not planner.should_parse(page):
+            continue  # boilerplate
+"""
+
+import re
+from collections import Counter
+
+from backend import config
+
+
+# Dates as the parsers read them: MM/DD, MM/DD/YY(YY), YYYY-MM-DD
+DATE_PATTERN = re.compile(r"\d{1,2}/\d{1,2}|\d{4}-\d{1,2}-\d{1,2}")
+
+# Literal strings (allowing one level of unescaped nested parentheses) and
+# hex strings in a content stream
+_STRING_PATTERN = re.compile(
+    rb"\(((?:[^\\()]|\\.|\((?:[^\\()]|\\.)*\))*)\)|<([0-9A-Fa-f\s]*)>", re.DOTALL
+)
+_ESCAPE_PATTERN = re.compile(rb"\\([0-7]{1,3}|.)", re.DOTALL)
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f", b"\n": b"", b"\r": b""}
+_WHITESPACE = re.compile(r"\s+")
+
+# Share of the first page's extract_text() characters the probe must contain
+CALIBRATION_THRESHOLD = 0.95
+# Form XObjects nested deeper than this make a page unprobeable
+MAX_FORM_DEPTH = 3
+
+
+class _Unprobeable(Exception):
+    """
+    The page's text can't be read from its content stream.
+    """
+
+
+def _unescape(match):
+    escape = match.group(1)
+    if escape[:1].isdigit():
+        return bytes([int(escape, 8) & 0xFF])
+    return _ESCAPES.get(escape, escape)
+
+
+def _decode_strings(data):
+    """
+    The text of every string in a content stream, in stream order.
+    """
+    parts = []
+    for match in _STRING_PATTERN.finditer(data):
+        literal, hexadecimal = match.groups()
+        if literal is not None:
+            parts.append(_ESCAPE_PATTERN.sub(_unescape, literal).decode("latin-1"))
+        else:
+            digits = re.sub(rb"\s", b"", hexadecimal)
+            if len(digits) % 2:
+                digits += b"0"
+            parts.append(bytes.fromhex(digits.decode("ascii")).decode("latin-1"))
+    return parts
+
+
+def _stream_data(stream):
+    from pdfminer.pdftypes import resolve1
+    return resolve1(stream).get_data()
+
+
+def _collect(resources, contents, fonts, parts, depth=0):
+    """
+    Decode the strings of `contents` and the form XObjects in `resources`,
+    recording the fonts they can use.
+
+    Raises:
+        _Unprobeable: Composite or Type3 fonts, or forms nested too deeply
+    """
+    from pdfminer.pdftypes import resolve1
+
+    if depth > MAX_FORM_DEPTH:
+        raise _Unprobeable("form XObjects nested too deeply")
+    resources = resolve1(resources) or {}
+
+    for name, font in (resolve1(resources.get("Font")) or {}).items():
+        font = resolve1(font)
+        subtype = getattr(font.get("Subtype"), "name", font.get("Subtype"))
+        if subtype in ("Type0", "Type3"):
+            raise _Unprobeable(f"{subtype} font {name}")
+        base_font = font.get("BaseFont")
+        encoding = font.get("Encoding")
+        fonts.add((getattr(base_font, "name", str(base_font)), repr(resolve1(encoding))))
+
+    for stream in contents:
+        parts.extend(_decode_strings(_stream_data(stream)))
+
+    for xobject in (resolve1(resources.get("XObject")) or {}).values():
+        xobject = resolve1(xobject)
+        subtype = xobject.get("Subtype")
+        if getattr(subtype, "name", subtype) == "Form":
+            _collect(xobject.get("Resources"), [xobject], fonts, parts, depth + 1)
+
+
+def probe_page(page):
+    """
+    Read a page's text straight from its content stream, without layout
+    analysis. The strings come out in stream order, which need not be
+    reading order, so only use the result to look for tokens.
+
+    Args:
+        page: A pdfplumber page (or PageContent)
+
+    Returns:
+        (text, fonts): the page's strings joined by newlines and the set of
+        fonts it can draw with, or None if the page can't be probed
+    """
+    from pdfminer.pdfpage import PDFPage
+
+    try:
+        page_obj = page.page_obj
+        if not isinstance(page_obj, PDFPage):
+            return None
+        fonts, parts = set(), []
+        _collect(page_obj.resources, list(page_obj.contents or []), fonts, parts)
+    except Exception:
+        # _Unprobeable, broken streams, objects that aren't PDF pages, ...
+        return None
+    return "\n".join(parts), fonts
+
+
+def _squash(text):
+    """
+    Lowercase with all whitespace removed, so keywords match however the
+    content stream split or spaced them.
+    """
+    return _WHITESPACE.sub("", text).lower()
+
+
+class PagePlanner:
+    """
+    Decides, from a page's probe, whether a parser needs to lay the page out.
+    """
+
+    def __init__(self, keywords=(), dates=True, require_all=False, enabled=None):
+        """
+        Args:
+            keywords: Words the parser reacts to (section headers, table
+                      headers, summary labels), matched case-insensitively
+            dates: Whether a date on the page is a reason to parse it
+            require_all: Parse only pages showing every signal (each keyword
+                         and, with `dates`, a date), instead of any of them
+            enabled: Force page skipping on or off (default
+                     config.PARSE_PAGE_SKIPPING)
+        """
+        self.keywords = tuple(_squash(keyword) for keyword in keywords)
+        self.dates = dates
+        self.require_all = require_all
+        self.enabled = bool(config.PARSE_PAGE_SKIPPING if enabled is None else enabled)
+        self.trusted_fonts = None
+        self.skipped = 0
+
+    @classmethod
+    def for_lexer(cls, lexer, enabled=None):
+        """
+        Planner for a LineLexer-based parser: a page matters if it has a
+        date (a possible transaction line) or any of the lexer's keywords.
+        """
+        keywords = [word for words in lexer.keywords.values() for word in words]
+        return cls(keywords, dates=True, enabled=enabled)
+
+    def calibrate(self, page, text):
+        """
+        Check the probe against the first page's extract_text(). Until this
+        succeeds, should_parse() parses every page.
+
+        Returns:
+            True if page skipping is in effect for this document
+        """
+        if not self.enabled or not text:
+            return False
+        probe = probe_page(page)
+        if probe is None:
+            print("[PagePlanner] First page can't be probed; parsing every page")
+            return False
+
+        expected = Counter(character for character in text if character.isalnum())
+        found = Counter(character for character in probe[0] if character.isalnum())
+        covered = sum((expected & found).values()) / max(1, sum(expected.values()))
+        if covered < CALIBRATION_THRESHOLD:
+            print(f"[PagePlanner] Probe covers {covered:.0%} of the first page's text; parsing every page")
+            return False
+
+        self.trusted_fonts = probe[1]
+        return True
+
+    def should_parse(self, page):
+        """
+        Whether `page` may hold anything the parser extracts.
+        """
+        if self.trusted_fonts is None:
+            return True
+        probe = probe_page(page)
+        if probe is None:
+            return True
+        text, fonts = probe
+        if not fonts <= self.trusted_fonts:
+            return True
+
+        squashed = _squash(text)
+        signals = [keyword in squashed for keyword in self.keywords]
+        if self.dates:
+            signals.append(DATE_PATTERN.search(squashed) is not None)
+        if not signals:
+            return True
+        needed = all(signals) if self.require_all else any(signals)
+        if not needed:
+            self.skipped += 1
+        return needed
@@ -0,0 +1,145 @@
+"""
+Page-parallel parsing helpers.
+
+Text extraction is per page and independent, so a long statement can be
+split into contiguous page ranges that worker processes extract (and scan)
+concurrently, each opening its own copy of the PDF. What is *not*
+independent is parser state carried between pages (the current section), so
+parsers using this module return, per page, enough to resolve that state
+afterwards in one cheap sequential pass over the pages, in page order.
+
+Workers come from a per-process pool created on first use and kept for
+later parses. Inside a ParseExecutor worker that is one page pool per parse
+worker, so PARSE_PAGE_WORKERS multiplies with PARSE_WORKERS.
+"""
+
+import atexit
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.parsers.page_cache import StatementDocument
+
+
+# Smallest page range handed to one task: every task opens the PDF, and
+# pdfplumber builds all page objects on open (~0.4ms per page)
+MIN_CHUNK_PAGES = 8
+# Ranges per worker: more balances uneven pages, fewer means fewer opens
+CHUNKS_PER_WORKER = 2
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def shareable_source(source):
+    """
+    Return `source` in a form a worker process can open (a path or the PDF
+    bytes), or None if that isn't possible.
+    """
+    if isinstance(source, StatementDocument):
+        source = source.source
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "read") and hasattr(source, "seek"):
+        position = source.tell()
+        try:
+            source.seek(0)
+            return source.read()
+        finally:
+            source.seek(position)
+    return None
+
+
+def open_shared_source(source):
+    """
+    Inverse of shareable_source, for use inside a worker.
+    """
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def chunk_ranges(start, stop, workers, min_chunk=MIN_CHUNK_PAGES):
+    """
+    Split pages [start, stop) into contiguous (start, stop) ranges, a couple
+    per worker so one slow range doesn't leave the other workers idle.
+    """
+    pages = stop - start
+    if pages <= 0:
+        return []
+    size = max(min_chunk, -(-pages // (max(1, workers) * CHUNKS_PER_WORKER)))
+    return [(first, min(first + size, stop)) for first in range(start, stop, size)]
+
+
+def _watch_parent(parent_pid):
+    """
+    Exit once the process that created the pool is gone. A ParseExecutor
+    worker is killed, not shut down, when its parse times out.
+    """
+    while True:
+        time.sleep(1.0)
+        if os.getppid() != parent_pid:
+            os._exit(0)
+
+
+def _init_page_worker(parent_pid):
+    threading.Thread(target=_watch_parent, args=(parent_pid,), daemon=True).start()
+
+
+def get_page_pool(workers):
+    """
+    Return this process's page worker pool, (re)created for `workers` workers.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_page_worker,
+                initargs=(os.getpid(),),
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_page_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown_page_pool)
+
+
+def map_page_chunks(function, source, ranges, *args, workers):
+    """
+    Run function(source, start, stop, *args) for every range on the page pool.
+
+    Returns:
+        Iterator of results in range order; each is yielded as soon as it and
+        every earlier range have finished.
+    """
+    pool = get_page_pool(workers)
+    futures = [pool.submit(function, source, start, stop, *args) for start, stop in ranges]
+    try:
+        for future in futures:
+            yield future.result()
+    except BrokenProcessPool:
+        # Don't hand the dead pool to the next parse
+        shutdown_page_pool()
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
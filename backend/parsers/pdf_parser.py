@@ -1,11 +1,17 @@
-import pdfplumber
-import pandas as pd
 import re
 from datetime import datetime
+from backend.lazy_imports import lazy_import
+from backend.parsers.normalize import StatementCalendar, amounts_to_cents
+from backend.parsers.page_cache import open_document
+from backend.parsers.page_planner import PagePlanner
+from backend.transactions import TransactionBatch
+
+pdfplumber = lazy_import("pdfplumber")
 
 class GenericParser:
     def __init__(self):
         self.year = datetime.now().year
+        self.calendar = StatementCalendar(self.year)
 
     def extract_statement_year(self, text):
         """
@@ -22,23 +28,58 @@ class GenericParser:
             
         return self.year
 
-    def parse(self, file_path):
+    def parse(self, file_path, progress=None):
         """
         Parses the PDF using spatial analysis to find transaction tables.
+        Optional progress(pages_done, pages_total) is called as pages are processed.
+        
+        Returns:
+            pandas.DataFrame with columns [date (datetime), description, amount, source]
         """
-        all_transactions = []
+        import pandas as pd
+        
+        batch = self._collect(file_path, progress)
+        if not batch:
+            return pd.DataFrame()
         
-        with pdfplumber.open(file_path) as pdf:
+        df = batch.to_dataframe()
+        df["date"] = pd.to_datetime(df["date"])
+        return df.sort_values(by="date")
+    
+    def parse_batch(self, file_path, progress=None):
+        """
+        Like parse(), returning a date-ordered TransactionBatch instead of a DataFrame.
+        """
+        return self._collect(file_path, progress).sorted_by_date()
+    
+    def _collect(self, file_path, progress=None):
+        """
+        Extract every table transaction, in statement order, into a TransactionBatch.
+        """
+        all_transactions = TransactionBatch("signed")
+        
+        with open_document(file_path, pdfplumber.open) as pdf:
             if len(pdf.pages) == 0:
                 raise ValueError("PDF is empty")
 
             # Try to get year from first page
             first_page_text = pdf.pages[0].extract_text()
             self.year = self.extract_statement_year(first_page_text)
+            self.calendar = StatementCalendar.from_text(self.year, first_page_text)
             
             print(f"DEBUG: GenericParser started. Year detected: {self.year}")
 
+            # Table rows need a date; pages without one are skipped unparsed
+            planner = PagePlanner(dates=True)
+            planner.calibrate(pdf.pages[0], first_page_text)
+
             for page_num, page in enumerate(pdf.pages):
+                if progress:
+                    progress(page_num, len(pdf.pages))
+                if page_num and not planner.should_parse(page):
+                    print(f"DEBUG: Page {page_num} skipped (no dates)")
+                    continue
+
                 # Find tables
                 tables = page.find_tables()
                 print(f"DEBUG: Page {page_num} tables found: {len(tables) if tables else 0}")
@@ -53,7 +94,7 @@ class GenericParser:
                     search_bbox = (0, top_search_area, page.width, bbox[1])
                     
                     try:
-                        text_above = page.crop(search_bbox).extract_text() or ""
+                        text_above = page.crop_text(search_bbox) or ""
                     except Exception:
                         text_above = ""
                         
@@ -97,7 +138,8 @@ class GenericParser:
                     print(f"DEBUG: Text above: '{text_above}'")
                     print(f"DEBUG: Multiplier: {current_multiplier}")
 
-                    # Process Rows
+                    # Process Rows, collecting their raw cells
+                    captures = []
                     for row in data:
                         clean_row = [x for x in row if x]
                         
@@ -121,45 +163,51 @@ class GenericParser:
                         description = " ".join([str(x) for x in clean_row[1:-1]])
                         description = description.replace("\n", " ").strip()
                         
-                        try:
-                            # Parse Date
-                            # Try MM/DD first (most common in statements)
-                            if re.match(r"^\d{1,2}/\d{1,2}$", date_str):
-                                date_obj = datetime.strptime(f"{date_str}/{self.year}", "%m/%d/%Y")
-                            elif re.match(r"^\d{1,2}/\d{1,2}/\d{2,4}$", date_str):
-                                # Handle 2 digit year
-                                if len(date_str.split('/')[-1]) == 2:
-                                    date_obj = datetime.strptime(date_str, "%m/%d/%y")
-                                else:
-                                    date_obj = datetime.strptime(date_str, "%m/%d/%Y")
-                            else:
-                                # Try generic parse or skip
-                                continue
+                        captures.append((date_str, amount_str, description))
+                    
+                    if captures:
+                        self._append_captures(all_transactions, captures, current_multiplier)
 
-                            # Parse Amount
-                            amount_clean = amount_str.replace("$", "").replace(",", "").replace(" ", "")
-                            # Handle negative signs in amount string if present (some banks do "-100.00")
-                            amount = float(amount_clean)
-                            
-                            # Apply multiplier (if amount is already negative, this might flip it, 
-                            # but usually bank statements show positive numbers in "Withdrawals" section.
-                            # If the number is explicitly negative in a withdrawal section, it might be a refund (positive).
-                            # Let's assume the section defines the sign, unless the number itself is negative.
-                            # Actually, usually "Withdrawals" section lists positive numbers that are subtractions.
-                            # So multiplier -1 is correct.
-                            final_amount = abs(amount) * current_multiplier
-                            
-                            all_transactions.append({
-                                "date": date_obj,
-                                "description": description,
-                                "amount": final_amount,
-                                "source": "PDF"
-                            })
-                        except ValueError:
-                            continue
+            if progress:
+                progress(len(pdf.pages), len(pdf.pages))
 
-        df = pd.DataFrame(all_transactions)
-        if not df.empty:
-            df = df.sort_values(by="date")
+        return all_transactions
+
+    def _append_captures(self, transactions, captures, multiplier):
+        """
+        Parse a table's captured (date, amount, description) cells in one
+        bulk step and append the rows that parse to `transactions`.
+        """
+        date_strs, amount_strs, descriptions = zip(*captures)
+        # Try MM/DD first (most common in statements)
+        ordinals, dates_ok = self.calendar.month_day_ordinals(date_strs)
+        # Handle negative signs in amount string if present (some banks do "-100.00")
+        cents, amounts_ok = amounts_to_cents(amount_strs)
+        
+        for index, (ordinal, date_ok, amount_ok) in enumerate(zip(ordinals.tolist(), dates_ok.tolist(), amounts_ok.tolist())):
+            if not amount_ok:
+                continue
+            if not date_ok:
+                ordinal = self._full_date_ordinal(date_strs[index])
+                if ordinal is None:
+                    continue
             
-        return df
+            # The section defines the sign: "Withdrawals" sections list positive
+            # numbers that are subtractions, so multiplier -1 is correct
+            amount = abs(int(cents[index]))
+            transactions.append(ordinal, -amount if multiplier < 0 else amount, descriptions[index])
+
+    def _full_date_ordinal(self, date_str):
+        """
+        Day ordinal of an MM/DD/YY or MM/DD/YYYY date, or None.
+        """
+        if not re.match(r"^\d{1,2}/\d{1,2}/\d{2,4}$", date_str):
+            # Try generic parse or skip
+            return None
+        try:
+            # Handle 2 digit year
+            if len(date_str.split('/')[-1]) == 2:
+                return datetime.strptime(date_str, "%m/%d/%y").toordinal()
+            return datetime.strptime(date_str, "%m/%d/%Y").toordinal()
+        except ValueError:
+            return None
@@ -1,14 +1,34 @@
-import pdfplumber
 import re
 from datetime import datetime
-import pandas as pd
+from backend.lazy_imports import lazy_import
+from backend.parsers.lexer import LineLexer
+from backend.parsers.page_cache import open_document
+from backend.parsers.page_planner import PagePlanner
+from backend.parsers.normalize import StatementCalendar, amounts_to_cents
+from backend.transactions import TransactionBatch
 
-def parse_pnc_statement(file_path):
+pdfplumber = lazy_import("pdfplumber")
+
+# Regex for transaction lines: Date (MM/DD) + Amount + Description
+# Matches: "08/26 175.00 Direct Deposit..."
+# Note: ^\s* allows for indentation
+TRANSACTION_PATTERN = re.compile(r'^\s*(\d{2}/\d{2})\s+([$]?[\d,]+\.\d{2})\s+(.*)$')
+
+# State machine vocabulary, matched case-insensitively anywhere in a line
+LEXER = LineLexer(
+    credit=["deposits and other additions"],
+    debit=["banking/debit card withdrawals", "deductions", "checks paid", "purchase", "online and electronic banking deductions"],
+    balance=["daily balance detail"],
+    transaction=TRANSACTION_PATTERN,
+)
+
+def parse_pnc_statement(file_path, progress=None):
     """
     Parses a PNC PDF statement using a state machine approach.
     
     Args:
-        file_path (str): Path to the PDF file.
+        file_path (str): Path to the PDF file (or a seekable binary file object).
+        progress (callable): Optional progress(pages_done, pages_total) callback.
         
     Returns:
         dict: {
@@ -17,33 +37,44 @@ def parse_pnc_statement(file_path):
             "transactions": list[dict]
         }
     """
-    transactions = []
+    result = parse_pnc_statement_batch(file_path, progress)
+    return {**result, "transactions": result["transactions"].to_records()}
+
+
+def parse_pnc_statement_batch(file_path, progress=None):
+    """
+    parse_pnc_statement, with the transactions as a TransactionBatch.
+    """
+    transactions = TransactionBatch("pnc_statement")
     current_multiplier = 1.0 # Default to Deposits
     in_balance_section = False
     year = datetime.now().year # Default year
     ending_balance = 0.0
     
-    # Regex for transaction lines: Date (MM/DD) + Amount + Description
-    # Matches: "08/26 175.00 Direct Deposit..."
-    # Note: ^\s* allows for indentation
-    transaction_pattern = re.compile(r'^\s*(\d{2}/\d{2})\s+([$]?[\d,]+\.\d{2})\s+(.*)$')
-    
     try:
-        with pdfplumber.open(file_path) as pdf:
+        with open_document(file_path, pdfplumber.open) as pdf:
             if not pdf.pages:
                 raise ValueError("PDF is empty")
                 
+            # Pages showing none of what a step looks for are skipped unparsed
+            first_page_text = pdf.pages[0].extract_text() or ""
+            balance_planner = PagePlanner(["ending balance"], dates=False)
+            balance_planner.calibrate(pdf.pages[0], first_page_text)
+            transaction_planner = PagePlanner.for_lexer(LEXER)
+            transaction_planner.calibrate(pdf.pages[0], first_page_text)
+            
             # --- Step 1: Extract Ending Balance (Multi-Page Scan) ---
             balance_found = False
-            for page in pdf.pages:
+            for page_num, page in enumerate(pdf.pages):
                 if balance_found:
                     break
+                if page_num and not balance_planner.should_parse(page):
+                    continue
                 try:
                     tables = page.extract_tables()
                     for table in tables:
-                        df = pd.DataFrame(table)
                         # Search for "Ending balance" in any cell
-                        for r_idx, row in df.iterrows():
+                        for row in table:
                             for c_idx, cell in enumerate(row):
                                 if cell and "ending balance" in str(cell).lower():
                                     # Try to find the value in the next column
@@ -64,31 +95,34 @@ def parse_pnc_statement(file_path):
                     print(f"[WARNING] Could not extract ending balance from table on page {page.page_number}: {e}")
 
             # --- Step 2: Extract Year ---
-            first_page_text = pdf.pages[0].extract_text() or ""
             year_match = re.search(r'\b(20\d{2})\b', first_page_text[:500])
             if year_match:
                 year = int(year_match.group(1))
+            calendar = StatementCalendar.from_text(year, first_page_text)
             
             # --- Step 3: Parse Transactions ---
-            for page in pdf.pages:
+            for page_num, page in enumerate(pdf.pages):
+                if progress:
+                    progress(page_num, len(pdf.pages))
+                if page_num and not transaction_planner.should_parse(page):
+                    continue
                 text = page.extract_text()
                 if not text:
                     continue
                     
-                lines = text.split('\n')
-                for line in lines:
-                    line_lower = line.lower()
-                    
+                # Raw (date, amount, description, sign) captures, parsed per page in bulk
+                captures = []
+                for token in LEXER.tokenize(text.split('\n')):
                     # State Machine: Check for section headers
-                    if "deposits and other additions" in line_lower:
+                    if token.section > 0:
                         current_multiplier = 1.0
                         in_balance_section = False # Reset balance section flag
                         continue
-                    elif any(x in line_lower for x in ["banking/debit card withdrawals", "deductions", "checks paid", "purchase", "online and electronic banking deductions"]):
+                    elif token.section < 0:
                         current_multiplier = -1.0
                         in_balance_section = False # Reset balance section flag
                         continue
-                    elif "daily balance detail" in line_lower:
+                    elif token.balance:
                         in_balance_section = True
                         continue
                         
@@ -96,8 +130,8 @@ def parse_pnc_statement(file_path):
                     if in_balance_section:
                         continue
                         
-                    # Try to match transaction
-                    match = transaction_pattern.match(line)
+                    # Transaction pattern match (None if the line isn't one)
+                    match = token.match
                     if match:
                         date_str = match.group(1)
                         amount_str = match.group(2)
@@ -107,34 +141,28 @@ def parse_pnc_statement(file_path):
                         if "total" in raw_description.lower():
                             continue
                             
-                        try:
-                            # Parse Amount
-                            clean_amount = amount_str.replace('$', '').replace(',', '')
-                            amount = float(clean_amount)
-                            final_amount = abs(amount) * current_multiplier
-                            
-                            # Parse Date
-                            date_obj = datetime.strptime(f"{date_str}/{year}", "%m/%d/%Y")
-                            formatted_date = date_obj.strftime("%Y-%m-%d")
-                            
-                            # Clean Description
-                            description = raw_description
-                            for prefix in ["Direct Deposit -", "Debit Card Purchase", "Web Pmt-", "POS Purchase", "Recurring Debit Card"]:
-                                description = description.replace(prefix, "").strip()
-                            
-                            # Determine type
-                            tx_type = "INCOME" if final_amount > 0 else "EXPENSE"
-                            
-                            transactions.append({
-                                "date": formatted_date,
-                                "amount": abs(final_amount), # Frontend expects positive amount + type
-                                "description": description,
-                                "type": tx_type,
-                                "category": "Uncategorized", # Placeholder
-                                "source": "pdf"
-                            })
-                        except ValueError:
+                        # Clean Description
+                        description = raw_description
+                        for prefix in ["Direct Deposit -", "Debit Card Purchase", "Web Pmt-", "POS Purchase", "Recurring Debit Card"]:
+                            description = description.replace(prefix, "").strip()
+                        
+                        captures.append((date_str, amount_str, description, current_multiplier))
+
+                if captures:
+                    date_strs, amount_strs, descriptions, multipliers = zip(*captures)
+                    ordinals, dates_ok = calendar.month_day_ordinals(date_strs)
+                    cents, amounts_ok = amounts_to_cents(amount_strs)
+                    for ok, ordinal, amount, description, multiplier in zip(
+                        (dates_ok & amounts_ok).tolist(), ordinals.tolist(), cents.tolist(), descriptions, multipliers
+                    ):
+                        if not ok:
                             continue # Skip lines that look like tx but fail parsing
+                        # Type (INCOME/EXPENSE) follows the sign; the frontend gets a positive amount + type
+                        amount = abs(amount)
+                        transactions.append(ordinal, -amount if multiplier < 0 else amount, description)
+
+            if progress:
+                progress(len(pdf.pages), len(pdf.pages))
 
         if not transactions:
             raise ValueError("Parsing failed - No data found")
@@ -0,0 +1,126 @@
+"""
+Statement fingerprinting - identify the institution and layout of a
+statement from its first page's text alone.
+
+Text extraction of one page is the cheapest thing we can do with a PDF, and
+every parser needs that text anyway (StatementDocument memoizes it), so the
+fingerprint costs nothing extra on the strategy that ends up running.
+"""
+
+import re
+import time
+
+from backend.metrics import observe_stage
+
+
+# Institution name -> phrases that identify its statements (case-insensitive)
+INSTITUTIONS = {
+    "pnc": (
+        "pnc bank",
+        "pnc.com",
+        "virtual wallet",
+        "deposits and other additions",
+        "banking/debit card withdrawals",
+        "online and electronic banking deductions",
+    ),
+}
+
+# A statement needs this many of an institution's phrases on page one to match
+MIN_INSTITUTION_HITS = 2
+
+# "10/01 197.90 PAYROLL": date, amount, then description (PNC-style text lines)
+AMOUNT_FIRST_LINE = re.compile(r"^\s*\d{2}/\d{2}\s+[$]?[\d,]+\.\d{2}\s+\S")
+# "10/01 PAYROLL 197.90": date, description, then amount (columnar tables)
+AMOUNT_LAST_LINE = re.compile(r"^\s*\d{1,2}/\d{1,2}(?:/\d{2,4})?\s+\D.*?\s-?[$(]?-?[\d,]+\.\d{2}\)?\s*$")
+
+# Layouts
+LAYOUT_AMOUNT_FIRST = "amount_first"
+LAYOUT_AMOUNT_LAST = "amount_last"
+LAYOUT_UNKNOWN = "unknown"
+LAYOUT_NO_TEXT = "no_text"
+
+
+class Fingerprint:
+    """
+    What the first page says about a statement.
+    """
+
+    def __init__(self, institution, layout, page_count, signals=None):
+        self.institution = institution
+        self.layout = layout
+        self.page_count = page_count
+        self.signals = signals or {}
+
+    @property
+    def key(self):
+        """
+        Stable "institution/layout" label, used to group strategy statistics.
+        """
+        return f"{self.institution}/{self.layout}"
+
+    def to_dict(self):
+        return {
+            "institution": self.institution,
+            "layout": self.layout,
+            "page_count": self.page_count,
+            "signals": dict(self.signals),
+        }
+
+
+def identify_institution(text):
+    """
+    Return the name of the institution whose phrases best match `text`, or "unknown".
+    """
+    text_lower = text.lower()
+    best, best_hits = "unknown", 0
+    for name, phrases in INSTITUTIONS.items():
+        hits = sum(1 for phrase in phrases if phrase in text_lower)
+        if hits >= MIN_INSTITUTION_HITS and hits > best_hits:
+            best, best_hits = name, hits
+    return best
+
+
+def classify_layout(text):
+    """
+    Classify transaction lines in `text` by where the amount sits.
+
+    Returns:
+        (layout, signals) where signals holds the per-layout line counts
+    """
+    if not text.strip():
+        return LAYOUT_NO_TEXT, {"amount_first_lines": 0, "amount_last_lines": 0}
+
+    amount_first = amount_last = 0
+    for line in text.split("\n"):
+        if AMOUNT_FIRST_LINE.match(line):
+            amount_first += 1
+        elif AMOUNT_LAST_LINE.match(line):
+            amount_last += 1
+
+    signals = {"amount_first_lines": amount_first, "amount_last_lines": amount_last}
+    if amount_first > amount_last:
+        return LAYOUT_AMOUNT_FIRST, signals
+    if amount_last > amount_first:
+        return LAYOUT_AMOUNT_LAST, signals
+    return LAYOUT_UNKNOWN, signals
+
+
+def fingerprint_document(doc):
+    """
+    Fingerprint an open StatementDocument from its first page's text.
+
+    Args:
+        doc: An open StatementDocument
+
+    Returns:
+        Fingerprint
+    """
+    started = time.perf_counter()
+    if not doc.pages:
+        return Fingerprint("unknown", LAYOUT_NO_TEXT, 0)
+
+    text = doc.pages[0].extract_text() or ""
+    layout, signals = classify_layout(text)
+    fingerprint = Fingerprint(identify_institution(text), layout, len(doc.pages), signals)
+    observe_stage("auto", "fingerprint", time.perf_counter() - started)
+    return fingerprint
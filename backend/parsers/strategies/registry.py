@@ -0,0 +1,259 @@
+"""
+StrategyRegistry - route a statement straight to the parser most likely to
+succeed on it, cheapest first.
+
+Picking a parser used to be trial and error (see test_parsers.py): run the
+table parsers, and when their table extraction comes back empty, fall back
+to the regex parsers. Instead, the registry:
+
+1. Fingerprints the statement from its first page's text (institution and
+   transaction-line layout, see fingerprint.py)
+2. Orders the registered strategies: those whose predicate accepts the
+   fingerprint first, then the rest as a fallback; within each group by
+   expected cost, i.e. relative cost / observed success rate for this
+   fingerprint, so text-only parsers run before table extraction
+3. Runs them in that order against one shared StatementDocument until one
+   returns transactions, recording each attempt's outcome
+
+Every attempt is also returned in the result's meta["strategy"]. Parses run
+by ParseExecutor happen in worker processes, which are recycled, so their
+outcomes are recorded in the parent instead: the executor sends the parent's
+snapshot() with each task, the worker plans with it inside planned_with(),
+and the executor feeds the returned attempts to record_attempts() (and the
+parse_strategy_attempts_total metric), as it replays stage timings.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from backend.lazy_imports import lazy_import
+from backend.metrics import observe_stage
+from backend.parse_executor import normalize_result, resolve_parser
+from backend.parsers.page_cache import open_document
+from backend.parsers.strategies.fingerprint import (
+    LAYOUT_AMOUNT_FIRST,
+    LAYOUT_AMOUNT_LAST,
+    Fingerprint,
+    fingerprint_document,
+)
+
+pdfplumber = lazy_import("pdfplumber")
+
+# Statistics sent by the process that records the outcomes (see planned_with)
+_sent_stats = contextvars.ContextVar("strategy_sent_stats", default=None)
+
+
+@contextmanager
+def planned_with(stats):
+    """
+    Plan the parses made in this context with `stats`, a snapshot() taken by
+    the process that records their outcomes, and leave the recording to it:
+    the attempts are only returned in meta["strategy"]. With stats=None,
+    parses plan with and record into the registry as usual.
+    """
+    token = _sent_stats.set(stats)
+    try:
+        yield
+    finally:
+        _sent_stats.reset(token)
+
+
+class Strategy:
+    """
+    A registered parser plus when to use it and what it costs.
+    """
+
+    def __init__(self, name, parser, cost, accepts):
+        """
+        Args:
+            name: Strategy name, reported in results and metrics
+            parser: Name of the parser in backend.parse_executor.PARSERS
+            cost: Relative cost of a run; text-only parsers are cheap, table
+                  extraction is several times dearer
+            accepts: Callable(fingerprint) -> True if the strategy is expected
+                     to handle statements with that fingerprint
+        """
+        self.name = name
+        self.parser = parser
+        self.cost = cost
+        self.accepts = accepts
+
+    def run(self, doc, progress=None):
+        """
+        Parse an open StatementDocument.
+
+        Returns:
+            Normalized result {"meta": ..., "transactions": [...]}
+        """
+        parser = resolve_parser(self.parser)
+        kwargs = {"progress": progress} if progress is not None else {}
+        return normalize_result(parser(doc, **kwargs))
+
+
+class StrategyRegistry:
+    """
+    Ordered parsing strategies with per-fingerprint success statistics.
+    """
+
+    def __init__(self, strategies=()):
+        self._strategies = {}
+        # (fingerprint key, strategy name) -> [attempts, successes]
+        self._stats = {}
+        self._lock = threading.Lock()
+        for strategy in strategies:
+            self.register(strategy)
+
+    def register(self, strategy):
+        if strategy.name in self._strategies:
+            raise ValueError(f"Strategy already registered: {strategy.name}")
+        self._strategies[strategy.name] = strategy
+        return strategy
+
+    def success_rate(self, fingerprint, strategy_name):
+        """
+        Observed success rate of a strategy on this kind of statement, smoothed
+        towards 1/2 so untried strategies aren't ruled out.
+        """
+        stats = _sent_stats.get()
+        if stats is None:
+            with self._lock:
+                attempts, successes = self._stats.get((fingerprint.key, strategy_name), (0, 0))
+        else:
+            attempts, successes = stats.get((fingerprint.key, strategy_name), (0, 0))
+        return (successes + 1) / (attempts + 2)
+
+    def plan(self, fingerprint):
+        """
+        Return every registered strategy in the order to try them for `fingerprint`.
+        """
+        def expected_cost(strategy):
+            return strategy.cost / self.success_rate(fingerprint, strategy.name)
+
+        strategies = sorted(self._strategies.values(), key=expected_cost)
+        accepted = [s for s in strategies if s.accepts(fingerprint)]
+        return accepted + [s for s in strategies if not s.accepts(fingerprint)]
+
+    def record(self, fingerprint, strategy_name, ok):
+        with self._lock:
+            counts = self._stats.setdefault((fingerprint.key, strategy_name), [0, 0])
+            counts[0] += 1
+            if ok:
+                counts[1] += 1
+
+    def record_attempts(self, strategy_meta):
+        """
+        Record the attempts a parse returned in its meta["strategy"].
+        """
+        fingerprint = Fingerprint(**strategy_meta["fingerprint"])
+        for attempt in strategy_meta["attempts"]:
+            self.record(fingerprint, attempt["strategy"], attempt["ok"])
+
+    def snapshot(self):
+        """
+        Returns:
+            {(fingerprint key, strategy name): (attempts, successes)}, for planned_with()
+        """
+        with self._lock:
+            return {key: tuple(counts) for key, counts in self._stats.items()}
+
+    def stats(self):
+        """
+        Returns:
+            {fingerprint key: {strategy name: {"attempts", "successes", "success_rate"}}}
+        """
+        with self._lock:
+            items = sorted(self._stats.items())
+        stats = {}
+        for (key, name), (attempts, successes) in items:
+            stats.setdefault(key, {})[name] = {
+                "attempts": attempts,
+                "successes": successes,
+                "success_rate": round(successes / attempts, 4),
+            }
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    def parse(self, source, progress=None):
+        """
+        Fingerprint `source` and run strategies in plan order until one finds
+        transactions.
+
+        Args:
+            source: Path to the PDF, a seekable binary file object, or an open
+                    StatementDocument
+            progress: Optional callback progress(pages_done, pages_total),
+                      restarted by each strategy tried
+
+        Returns:
+            The winning strategy's normalized result, with meta["strategy"]
+            holding the strategy name (None if every strategy failed), the
+            fingerprint, and every attempt made
+        """
+        with open_document(source, pdfplumber.open) as doc:
+            fingerprint = fingerprint_document(doc)
+            result, winner, attempts = None, None, []
+
+            for strategy in self.plan(fingerprint):
+                started = time.perf_counter()
+                try:
+                    candidate = strategy.run(doc, progress)
+                    ok = bool(candidate["transactions"])
+                except Exception as e:
+                    print(f"[StrategyRegistry] {strategy.name} failed on {fingerprint.key}: {e}")
+                    candidate, ok = None, False
+                seconds = time.perf_counter() - started
+
+                observe_stage("auto", strategy.name, seconds)
+                if _sent_stats.get() is None:
+                    self.record(fingerprint, strategy.name, ok)
+                attempts.append({"strategy": strategy.name, "ok": ok, "seconds": round(seconds, 6)})
+
+                if candidate is not None and result is None:
+                    result = candidate
+                if ok:
+                    result, winner = candidate, strategy.name
+                    break
+
+        result = result or {"meta": {}, "transactions": []}
+        print(f"[StrategyRegistry] {fingerprint.key}: {winner or 'no strategy'} after {len(attempts)} attempt(s)")
+        meta = {
+            **result["meta"],
+            "strategy": {"name": winner, "fingerprint": fingerprint.to_dict(), "attempts": attempts},
+        }
+        return {"meta": meta, "transactions": result["transactions"]}
+
+
+def _is_pnc(fingerprint):
+    return fingerprint.institution == "pnc"
+
+
+def _amount_first(fingerprint):
+    return fingerprint.layout == LAYOUT_AMOUNT_FIRST
+
+
+def _amount_last(fingerprint):
+    return fingerprint.layout == LAYOUT_AMOUNT_LAST
+
+
+def parse_auto(file_path, progress=None):
+    """
+    Parse a statement with the default strategy registry (the "auto" parser).
+    """
+    return strategy_registry.parse(file_path, progress)
+
+
+# Export singleton
+strategy_registry = StrategyRegistry([
+    # Text-only: one extract_text per page, which the fingerprint already paid for on page one
+    Strategy("pnc", "pnc", cost=1, accepts=_is_pnc),
+    Strategy("brute_force", "brute_force", cost=2, accepts=_amount_first),
+    # Table extraction: several times the cost of text extraction
+    Strategy("generic_tables", "generic_tables", cost=5, accepts=_amount_last),
+    Strategy("generic_loose", "generic_loose", cost=6, accepts=_amount_last),
+    Strategy("pnc_statement", "pnc_statement", cost=6, accepts=_is_pnc),
+])
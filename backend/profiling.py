@@ -0,0 +1,142 @@
+"""
+Profiling - opt-in per-request profiles for the parse and analysis endpoints.
+
+A profiled request runs under cProfile (deterministic, so every call is
+counted) with parse/analysis stage timings captured through
+metrics.capture_stages(). The report attached to the response has:
+
+1. "stages": seconds and call counts per stage (open, extract_text, scan, ...)
+2. "packages": own time grouped by top-level package, which answers the
+   usual question directly (pdfminer vs. re vs. rapidfuzz vs. our code)
+3. "top_functions": the top N functions by cumulative time
+
+Profiles of parses are taken inside the worker process that runs the parse.
+"""
+
+import cProfile
+import os
+import pstats
+import re
+import sys
+import sysconfig
+import time
+from contextlib import contextmanager
+
+from backend import config
+from backend import metrics
+
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_STDLIB = os.path.realpath(sysconfig.get_paths()["stdlib"])
+_BUILTIN_OWNER = re.compile(r"of '([A-Za-z_][\w]*)")
+_BUILTIN_MODULE = re.compile(r"<built-in method ([A-Za-z_][\w]*)\.")
+
+
+def profiling_requested(query_flag, header_value):
+    """
+    True if the request asked for a profile via ?profile= or X-Profile.
+    """
+    if query_flag:
+        return True
+    return str(header_value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _package_of(filename, function_name):
+    """
+    Attribute a profiled function to a top-level package name.
+    """
+    if filename == "~":
+        # C builtins: "<method 'match' of 're.Pattern' objects>", "<built-in method zlib.compress>"
+        match = _BUILTIN_OWNER.search(function_name) or _BUILTIN_MODULE.search(function_name)
+        return match.group(1).split(".")[0] if match else "builtins"
+    if filename.startswith("<frozen "):
+        # Frozen stdlib modules: "<frozen importlib._bootstrap>"
+        return filename[len("<frozen "):-1].split(".")[0]
+
+    path = os.path.realpath(filename)
+    parts = path.split(os.sep)
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            package = parts[parts.index(marker) + 1]
+            return os.path.splitext(package)[0]
+    if path.startswith(_REPO_ROOT + os.sep):
+        return os.path.relpath(path, _REPO_ROOT).split(os.sep)[0]
+    if path.startswith(_STDLIB + os.sep):
+        return os.path.splitext(os.path.relpath(path, _STDLIB).split(os.sep)[0])[0]
+    return "other"
+
+
+def _short_path(filename):
+    for root in sorted((p for p in sys.path if p), key=len, reverse=True):
+        if filename.startswith(root + os.sep):
+            return os.path.relpath(filename, root)
+    return filename
+
+
+def stage_breakdown(stages):
+    """
+    Aggregate (label, stage, seconds) observations into {"label.stage": {"seconds", "calls"}}.
+    """
+    breakdown = {}
+    for label, stage, seconds in stages:
+        entry = breakdown.setdefault(f"{label}.{stage}", {"seconds": 0.0, "calls": 0})
+        entry["seconds"] += seconds
+        entry["calls"] += 1
+    for entry in breakdown.values():
+        entry["seconds"] = round(entry["seconds"], 6)
+    return breakdown
+
+
+def summarize(profiler, stages, wall_seconds, top_n=None):
+    """
+    Build the JSON-serializable profile report.
+    """
+    top_n = config.PROFILING_TOP_N if top_n is None else top_n
+    stats = pstats.Stats(profiler).stats
+
+    packages = {}
+    rows = []
+    for (filename, line, function_name), (_, calls, tottime, cumtime, _) in stats.items():
+        package = _package_of(filename, function_name)
+        packages[package] = packages.get(package, 0.0) + tottime
+        rows.append((cumtime, tottime, calls, filename, line, function_name))
+
+    rows.sort(reverse=True)
+    top_functions = [
+        {
+            "function": function_name if filename == "~" else f"{_short_path(filename)}:{line}({function_name})",
+            "calls": calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        }
+        for cumtime, tottime, calls, filename, line, function_name in rows[:top_n]
+    ]
+
+    return {
+        "wall_seconds": round(wall_seconds, 6),
+        "stages": stage_breakdown(stages),
+        "packages": {
+            name: round(seconds, 6)
+            for name, seconds in sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        },
+        "top_functions": top_functions,
+    }
+
+
+@contextmanager
+def profile_block(top_n=None):
+    """
+    Profile the enclosed code. The yielded dict is filled with the report on exit.
+    Stage timings seen while profiling are still recorded in the metrics.
+    """
+    report = {}
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    with metrics.capture_stages() as stages:
+        profiler.enable()
+        try:
+            yield report
+        finally:
+            profiler.disable()
+    report.update(summarize(profiler, stages, time.perf_counter() - started, top_n))
+    metrics.replay_stages(stages)
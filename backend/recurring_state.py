@@ -0,0 +1,288 @@
+"""
+RecurringState - recurring-charge detection that updates as transactions arrive.
+
+detect_recurring() regroups and rescans every transaction on each call, so
+analyzing a session again after adding one month redoes years of work.
+RecurringState keeps what the scan derives and folds new transactions in:
+
+1. Merchant groups: a GroupIndex (see backend/fuzzy_groups.py) puts each
+   new description in the group the full scan would
+2. Interval statistics: each group's dated transactions in date order. A
+   transaction is "monthly" when the next one in its group is 28-31 days
+   later; inserting a transaction only changes that for itself and its
+   predecessor
+3. Candidate confidences: per (description, amount) key, its monthly
+   transactions, the first keyword hit and the last-seen date
+
+candidates() then reports exactly what SubscriptionScanner.scan would for
+all transactions added so far, in the same order; the keys are kept in
+that order as they change, so only the keys an update touched are
+re-sorted. snapshot() / restore()
+convert the state to and from JSON-serializable data, so it can be stored
+and survive restarts; pickling uses the same format.
+"""
+
+import bisect
+import pickle
+import time
+from itertools import islice
+
+from backend import metrics
+from backend.analysis_frame import as_frame
+from backend.detective import SubscriptionScanner
+from backend.fuzzy_groups import GroupIndex
+
+SNAPSHOT_VERSION = 1
+MONTHLY_REASON = "Periodicity Detected (Monthly)"
+
+
+def _is_monthly(current, following):
+    return following is not None and 28 <= following[0] - current[0] <= 31
+
+
+class _Key:
+    """
+    What the scan knows about one (clean description, amount) key.
+    """
+
+    __slots__ = ("merchant", "amount", "monthly", "first_monthly", "keyword", "last_seen")
+
+    def __init__(self, merchant, amount):
+        self.merchant = merchant
+        self.amount = amount
+        # index -> (group, ordinal, index, date) of its transactions followed
+        # 28-31 days later by the next one in their group
+        self.monthly = {}
+        self.first_monthly = None
+        # (group, index, keyword, date) of its first transaction naming a keyword
+        self.keyword = None
+        self.last_seen = None
+
+    def set_monthly(self, event):
+        self.monthly[event[2]] = event
+        if self.first_monthly is None or event < self.first_monthly:
+            self.first_monthly = event
+
+    def clear_monthly(self, index):
+        event = self.monthly.pop(index, None)
+        if event is not None and event == self.first_monthly:
+            self.first_monthly = min(self.monthly.values()) if self.monthly else None
+
+    def first_event(self):
+        """
+        Sort key of the scan's first _add_candidate call for this key: groups
+        in order, each one's monthly hits (by date) before its keyword hits.
+        """
+        events = []
+        if self.first_monthly is not None:
+            group, ordinal, index, _ = self.first_monthly
+            events.append((group, 0, ordinal, index))
+        if self.keyword is not None:
+            group, index, _, _ = self.keyword
+            events.append((group, 1, index, 0))
+        return min(events) if events else None
+
+    def candidate(self):
+        first = self.first_event()
+        if first[1] == 0:
+            confidence, reason, detected = "High", MONTHLY_REASON, self.first_monthly[3]
+        else:
+            # A later monthly hit upgrades a keyword candidate, keeping its date
+            detected = self.keyword[3]
+            if self.first_monthly is not None:
+                confidence, reason = "High", MONTHLY_REASON
+            else:
+                confidence, reason = "Medium", f"Keyword Match: {self.keyword[2]}"
+        return {
+            "merchant": self.merchant,
+            "amount": self.amount,
+            "confidence": confidence,
+            "reason": reason,
+            "detected_date": detected,
+        }
+
+
+class RecurringState:
+    """
+    Incremental SubscriptionScanner.scan over a growing list of transactions.
+    """
+
+    def __init__(self, scanner=None):
+        self.scanner = scanner or SubscriptionScanner()
+        self.groups = GroupIndex()
+        # group id -> [(ordinal, index, key id, date), ...] in date order
+        self.members = {}
+        self.keys = []
+        self._key_ids = {}
+        self._reset_order()
+
+    @property
+    def count(self):
+        """
+        Number of transactions added so far.
+        """
+        return self.groups.count
+
+    def update(self, transactions):
+        """
+        Add transactions, as if appended to everything added before. Costs
+        time in proportion to the new transactions only.
+
+        Args:
+            transactions: AnalysisFrame, TransactionBatch, or list of dicts {date, description, amount}
+
+        Returns:
+            Approximate growth of the pickled state: the pickled size of the
+            groups, keys and dated transactions added
+        """
+        started = time.perf_counter()
+        normalized = self.scanner.normalize(as_frame(transactions))
+        metrics.observe_stage("detect_recurring", "normalize", time.perf_counter() - started)
+
+        started = time.perf_counter()
+        first, seeds, grouped = self.count, len(self.groups.seeds), len(self.groups.group_of)
+        group_ids = self.groups.add([tx['clean_desc'] for tx in normalized])
+        metrics.observe_stage("detect_recurring", "fuzzy_group", time.perf_counter() - started)
+
+        started = time.perf_counter()
+        keys, members = len(self.keys), []
+        for offset, (tx, group) in enumerate(zip(normalized, group_ids)):
+            index = first + offset
+            key_id = self._key_id(tx['clean_desc'], tx['amount'])
+            key = self.keys[key_id]
+
+            if key.keyword is None and tx['keywords']:
+                key.keyword = (group, index, tx['keywords'][0], tx['date'])
+                self._touched.add(key_id)
+
+            if tx['ordinal'] >= 0:
+                member = (tx['ordinal'], index, key_id, tx['date'])
+                self._insert(group, member)
+                members.append(member)
+                key.last_seen = member[0] if key.last_seen is None else max(key.last_seen, member[0])
+        self._reorder()
+        metrics.observe_stage("detect_recurring", "intervals", time.perf_counter() - started)
+
+        # Descriptions are only ever added to group_of, so the new ones are its last entries
+        added = (
+            self.groups.seeds[seeds:],
+            list(islice(reversed(self.groups.group_of.items()), len(self.groups.group_of) - grouped)),
+            [[key.merchant, key.amount, key.keyword, key.last_seen] for key in self.keys[keys:]],
+            members,
+        )
+        return len(pickle.dumps(added, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def candidates(self):
+        """
+        Suspected subscriptions, as SubscriptionScanner.scan returns them for
+        all transactions added so far.
+        """
+        return [self.keys[key_id].candidate() for _, key_id in self._order]
+
+    def _reset_order(self):
+        # [(first event, key id), ...] of the candidate keys, in candidates() order
+        self._order = []
+        self._first_events = {}  # key id -> its entry's first event
+        self._touched = set()  # ids of keys whose first event may have changed
+
+    def _reorder(self):
+        """
+        Move the touched keys to their place in the candidate order.
+        """
+        changed = []
+        for key_id in self._touched:
+            previous = self._first_events.get(key_id)
+            current = self.keys[key_id].first_event()
+            if current != previous:
+                changed.append((key_id, previous, current))
+                if current is None:
+                    del self._first_events[key_id]
+                else:
+                    self._first_events[key_id] = current
+        self._touched.clear()
+
+        if len(changed) * 16 > len(self._order):
+            # Most of the order changed (a first or large update, a restore): sort it anew
+            self._order = sorted((event, key_id) for key_id, event in self._first_events.items())
+            return
+        for key_id, previous, current in changed:
+            if previous is not None:
+                del self._order[bisect.bisect_left(self._order, (previous, key_id))]
+            if current is not None:
+                bisect.insort(self._order, (current, key_id))
+
+    def _key_id(self, merchant, amount):
+        key_id = self._key_ids.get((merchant, amount))
+        if key_id is None:
+            key_id = self._key_ids[(merchant, amount)] = len(self.keys)
+            self.keys.append(_Key(merchant, amount))
+        return key_id
+
+    def _insert(self, group, member):
+        # Indices are unique, so members order by (ordinal, index)
+        members = self.members.setdefault(group, [])
+        position = bisect.bisect(members, member)
+        members.insert(position, member)
+        following = members[position + 1] if position + 1 < len(members) else None
+        self._mark(group, member, following)
+        if position:
+            self._mark(group, members[position - 1], member)
+
+    def _mark(self, group, member, following):
+        self._touched.add(member[2])
+        key = self.keys[member[2]]
+        if _is_monthly(member, following):
+            key.set_monthly((group, member[0], member[1], member[3]))
+        else:
+            key.clear_monthly(member[1])
+
+    # --- Snapshots ---
+
+    def snapshot(self):
+        """
+        The state as JSON-serializable data.
+        """
+        return {
+            "version": SNAPSHOT_VERSION,
+            "groups": self.groups.snapshot(),
+            "keys": [[key.merchant, key.amount, key.keyword, key.last_seen] for key in self.keys],
+            "members": [[group, [list(member) for member in members]] for group, members in self.members.items()],
+        }
+
+    @classmethod
+    def restore(cls, data, scanner=None):
+        """
+        Rebuild a state from snapshot() data.
+
+        Raises:
+            ValueError: The snapshot is from an incompatible version
+        """
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported recurring-state snapshot version: {data.get('version')}")
+        state = cls(scanner)
+        state._load(data)
+        return state
+
+    def _load(self, data):
+        self.groups = GroupIndex.restore(data["groups"])
+        self.members = {}
+        self.keys = []
+        self._key_ids = {}
+        self._reset_order()
+        for merchant, amount, keyword, last_seen in data["keys"]:
+            key = self.keys[self._key_id(merchant, amount)]
+            key.keyword = tuple(keyword) if keyword else None
+            key.last_seen = last_seen
+        for group, members in data["members"]:
+            members = self.members[group] = [tuple(member) for member in members]
+            for member, following in zip(members, members[1:] + [None]):
+                self._mark(group, member, following)
+        self._touched.update(range(len(self.keys)))
+        self._reorder()
+
+    def __getstate__(self):
+        return self.snapshot()
+
+    def __setstate__(self, data):
+        self.scanner = SubscriptionScanner()
+        self._load(data)
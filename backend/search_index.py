@@ -0,0 +1,200 @@
+"""
+CatalogIndex - in-memory ranked fuzzy search over the swaps catalog.
+
+The catalog (backend/data/swaps.json) is loaded once, and again only when
+the file's mtime changes, into:
+
+1. An inverted index: token -> items whose name_brand contains it
+2. A sorted vocabulary, for prefix matches ("ketch" -> "ketchup")
+3. A character trigram index over the vocabulary, for typos ("cheerois")
+
+A query touches only the postings of its own tokens and trigrams, so lookup
+cost depends on the query and the matching items, not on catalog size. For
+typo matching it walks only the postings of the query's rarest trigrams:
+a token reaching FUZZY_THRESHOLD must share enough trigrams with the query
+that it appears in at least one of them, and trigrams common to more than
+MAX_TRIGRAM_POSTINGS tokens (low IDF, e.g. " co") are skipped outright.
+"""
+
+import bisect
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import defaultdict
+
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "swaps.json")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Minimum trigram Dice similarity for a fuzzy token match
+FUZZY_THRESHOLD = 0.45
+# Cap on vocabulary tokens considered per query token (prefix scans)
+MAX_PREFIX_EXPANSIONS = 50
+# Trigrams shared by more vocabulary tokens than this are too common to
+# look up for typo matching
+MAX_TRIGRAM_POSTINGS = 1000
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def trigrams(token):
+    # One space each side: the first trigram keeps two of the token's letters
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _Snapshot:
+    """
+    One immutable build of the index. Searches hold a reference to a single
+    snapshot, so a concurrent reload never exposes a half-built index.
+    """
+
+    def __init__(self, items, field):
+        postings = defaultdict(list)
+        self.items = items
+        self.names = []
+        self.token_counts = []
+
+        for item_idx, item in enumerate(items):
+            tokens = tokenize(item.get(field, ""))
+            self.names.append(" ".join(tokens))
+            self.token_counts.append(max(1, len(set(tokens))))
+            for token in set(tokens):
+                postings[token].append(item_idx)
+
+        trigram_postings = defaultdict(list)
+        self.token_trigrams = {}
+        for token in postings:
+            grams = trigrams(token)
+            self.token_trigrams[token] = grams
+            for gram in grams:
+                trigram_postings[gram].append(token)
+
+        self.postings = dict(postings)
+        self.vocabulary = sorted(postings)
+        self.trigram_postings = dict(trigram_postings)
+
+
+class CatalogIndex:
+    """
+    Token + trigram index over catalog items, keyed on `name_brand`.
+    """
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH, field="name_brand"):
+        self.path = path
+        self.field = field
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._snapshot = _Snapshot([], field)
+
+    def search(self, query, limit=5):
+        """
+        Rank catalog items against `query`.
+
+        Returns:
+            List of (score, item) pairs, best first, score in (0, 1].
+        """
+        index = self._ensure_loaded()
+
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        # item index -> per-query-token best similarity
+        best = defaultdict(lambda: [0.0] * len(query_tokens))
+        # item index -> set of matched item tokens (for coverage)
+        matched = defaultdict(set)
+
+        for q_idx, q_token in enumerate(query_tokens):
+            for token, similarity in self._expand_token(index, q_token).items():
+                for item_idx in index.postings[token]:
+                    scores = best[item_idx]
+                    if similarity > scores[q_idx]:
+                        scores[q_idx] = similarity
+                    matched[item_idx].add(token)
+
+        query_lower = " ".join(query_tokens)
+        ranked = []
+        for item_idx, scores in best.items():
+            base = sum(scores) / len(scores)
+            # Prefer names without many unmatched extra words
+            coverage = len(matched[item_idx]) / index.token_counts[item_idx]
+            score = base * (0.85 + 0.15 * min(1.0, coverage))
+            # Whole-query substring matches (the old behaviour) rank first
+            if query_lower in index.names[item_idx]:
+                score = 0.9 * score + 0.1
+            ranked.append((round(score, 4), -item_idx))
+
+        top = heapq.nlargest(limit, ranked)
+        return [(score, index.items[-neg_idx]) for score, neg_idx in top]
+
+    def __len__(self):
+        return len(self._ensure_loaded().items)
+
+    @staticmethod
+    def _expand_token(index, q_token):
+        """
+        Map a query token to matching vocabulary tokens with a similarity in (0, 1].
+        """
+        candidates = {}
+
+        if q_token in index.postings:
+            candidates[q_token] = 1.0
+
+        # Prefix matches, for search-as-you-type
+        start = bisect.bisect_left(index.vocabulary, q_token)
+        for token in index.vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(q_token):
+                break
+            if token != q_token:
+                candidates[token] = max(candidates.get(token, 0.0), 0.6 + 0.3 * len(q_token) / len(token))
+
+        # Trigram fuzzy matches, for typos. Dice >= FUZZY_THRESHOLD needs at
+        # least `needed` shared trigrams (a token has one or more), so every
+        # match shares one of the query's len - needed + 1 rarest trigrams
+        q_grams = trigrams(q_token)
+        needed = math.ceil(FUZZY_THRESHOLD * (len(q_grams) + 1) / 2)
+        postings = sorted((index.trigram_postings.get(gram, ()) for gram in q_grams), key=len)
+        probed = set()
+        for tokens in postings[:len(q_grams) - needed + 1]:
+            if len(tokens) > MAX_TRIGRAM_POSTINGS:
+                break
+            probed.update(tokens)
+        for token in probed:
+            grams = index.token_trigrams[token]
+            dice = 2.0 * len(q_grams & grams) / (len(q_grams) + len(grams))
+            if dice >= FUZZY_THRESHOLD:
+                candidates[token] = max(candidates.get(token, 0.0), 0.8 * dice)
+
+        return candidates
+
+    def _ensure_loaded(self):
+        """
+        Return the current snapshot, rebuilding it if the catalog file changed.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Catalog not found: {self.path}")
+
+        if mtime == self._mtime:
+            return self._snapshot
+
+        with self._lock:
+            if mtime != self._mtime:
+                with open(self.path, "r") as f:
+                    items = json.load(f)
+                self._snapshot = _Snapshot(items, self.field)
+                self._mtime = mtime
+                print(f"[CatalogIndex] Indexed {len(items)} catalog items")
+            return self._snapshot
+
+
+# Export singleton
+catalog_index = CatalogIndex()
@@ -0,0 +1,268 @@
+"""
+SessionStore - per-user session data keyed by an opaque session token.
+
+Replaces the old module-global SESSION_DATA list. Sessions are kept in an
+LRU ordered by last access and bounded three ways:
+
+1. TTL: a session not touched for `ttl_seconds` is discarded
+2. Memory budget: once the size of all in-memory sessions (estimated by
+   their pickled size, measured once on write) exceeds `max_bytes`, or there
+   are more than `max_sessions`, the least recently used ones are evicted
+3. Spill: evicted sessions are written to `spill_dir` as compressed pickles
+   and transparently reloaded on the next access (dropped if no spill_dir)
+
+State derived from a session (analysis frames, ...) is written back with
+update(), which serializes updates per session. Its callback can report how
+much the session grew, so an incremental update doesn't pay for pickling
+the whole session again; otherwise the session is re-measured.
+"""
+
+import os
+import pickle
+import re
+import secrets
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from backend import config
+
+
+TOKEN_PATTERN = re.compile(r'^[A-Za-z0-9_-]{16,128}$')
+
+
+class _Entry:
+    __slots__ = ("data", "size", "last_access")
+
+    def __init__(self, data, size, last_access):
+        self.data = data
+        self.size = size
+        self.last_access = last_access
+
+
+class SessionStore:
+    """
+    Thread-safe LRU + TTL session store with a global memory budget.
+    """
+
+    def __init__(self, ttl_seconds=None, max_bytes=None, max_sessions=None, spill_dir=None, clock=time.monotonic):
+        self.ttl_seconds = config.SESSION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_bytes = config.SESSION_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_sessions = config.SESSION_MAX_COUNT if max_sessions is None else max_sessions
+        self.spill_dir = config.SESSION_SPILL_DIR if spill_dir is None else spill_dir
+        self._clock = clock
+
+        self._sessions = OrderedDict()  # token -> _Entry, least recently used first
+        self._spilled = {}  # token -> last_access of sessions living on disk
+        self._updating = {}  # token -> (update lock, threads using it); never evicted
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.spills = 0
+
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+
+    @staticmethod
+    def new_token():
+        return secrets.token_urlsafe(24)
+
+    @staticmethod
+    def is_valid_token(token):
+        return bool(token) and bool(TOKEN_PATTERN.match(token))
+
+    def get(self, token, default=None):
+        """
+        Return the session data for `token`, reloading it from disk if it was
+        spilled. Expired or unknown sessions return `default`.
+        """
+        if not self.is_valid_token(token):
+            return default
+
+        with self._lock:
+            now = self._clock()
+            entry = self._sessions.get(token)
+
+            if entry is None and token in self._spilled:
+                entry = self._load_spilled(token)
+
+            if entry is None:
+                return default
+
+            if self._is_expired(entry.last_access, now):
+                self._remove(token)
+                return default
+
+            entry.last_access = now
+            self._sessions.move_to_end(token)
+            self._enforce_budget(keep=token)
+            return entry.data
+
+    def put(self, token, data):
+        """
+        Store `data` (any picklable object) under `token`, replacing any
+        existing session. Returns the token.
+        """
+        if not self.is_valid_token(token):
+            raise ValueError("Invalid session token")
+
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._remove(token)
+            entry = _Entry(data, len(payload), self._clock())
+            self._sessions[token] = entry
+            self._bytes += entry.size
+            self._expire_stale()
+            self._enforce_budget(keep=token)
+        return token
+
+    def update(self, token, fn, default=None):
+        """
+        Replace the session's data with what `fn` derives from it. Updates of
+        one session run one at a time (other sessions aren't blocked) and the
+        session isn't evicted while `fn` runs.
+
+        Args:
+            fn: Called with the session data; returns (new data, result) or
+                (new data, result, size change). The size change (in pickled
+                bytes) is added to the session's size; without one, or if it
+                is None, the new data is pickled to measure it
+
+        Returns:
+            fn's result, or `default` if `token` has no live session. If the
+            session is replaced or deleted while fn runs, the new data is dropped.
+        """
+        if not self.is_valid_token(token):
+            return default
+
+        with self._lock:
+            lock, users = self._updating.get(token, (threading.Lock(), 0))
+            self._updating[token] = (lock, users + 1)
+        try:
+            with lock:
+                data = self.get(token)
+                if data is None:
+                    return default
+
+                new_data, result, *change = fn(data)
+                change = change[0] if change else None
+                size = None if change is not None else len(pickle.dumps(new_data, protocol=pickle.HIGHEST_PROTOCOL))
+                with self._lock:
+                    entry = self._sessions.get(token)
+                    if entry is not None and entry.data is data:
+                        entry.data = new_data
+                        if size is None:
+                            size = entry.size + change
+                        self._bytes += size - entry.size
+                        entry.size = size
+                        self._enforce_budget(keep=token)
+                return result
+        finally:
+            with self._lock:
+                lock, users = self._updating.pop(token)
+                if users > 1:
+                    self._updating[token] = (lock, users - 1)
+
+    def delete(self, token):
+        with self._lock:
+            self._remove(token)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "spilled_sessions": len(self._spilled),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "spills": self.spills,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions) + len(self._spilled)
+
+    # --- Internals (caller holds the lock) ---
+
+    def _is_expired(self, last_access, now):
+        return bool(self.ttl_seconds) and now - last_access > self.ttl_seconds
+
+    def _expire_stale(self):
+        now = self._clock()
+
+        # The LRU front holds the oldest accesses, so stop at the first live one
+        while self._sessions:
+            token, entry = next(iter(self._sessions.items()))
+            if not self._is_expired(entry.last_access, now):
+                break
+            self._remove(token)
+
+        for token, last_access in list(self._spilled.items()):
+            if self._is_expired(last_access, now):
+                self._remove(token)
+
+    def _enforce_budget(self, keep=None):
+        while self._bytes > self.max_bytes or len(self._sessions) > self.max_sessions:
+            # Never evict the session being served or one being updated, even if over budget
+            token = next((t for t in self._sessions if t != keep and t not in self._updating), None)
+            if token is None:
+                break
+            self._evict(token)
+
+    def _evict(self, token):
+        entry = self._sessions.pop(token)
+        self._bytes -= entry.size
+        self.evictions += 1
+
+        if not self.spill_dir:
+            return
+
+        try:
+            payload = zlib.compress(pickle.dumps(entry.data, protocol=pickle.HIGHEST_PROTOCOL))
+            with open(self._spill_path(token), "wb") as f:
+                f.write(payload)
+            self._spilled[token] = entry.last_access
+            self.spills += 1
+        except OSError as e:
+            print(f"[SessionStore] Failed to spill session, dropping it: {e}")
+
+    def _load_spilled(self, token):
+        last_access = self._spilled.pop(token)
+        path = self._spill_path(token)
+        try:
+            with open(path, "rb") as f:
+                payload = zlib.decompress(f.read())
+            data = pickle.loads(payload)
+        except (OSError, zlib.error, pickle.UnpicklingError) as e:
+            print(f"[SessionStore] Failed to reload spilled session: {e}")
+            return None
+        finally:
+            self._unlink(path)
+
+        entry = _Entry(data, len(payload), last_access)
+        self._sessions[token] = entry
+        self._bytes += entry.size
+        return entry
+
+    def _remove(self, token):
+        entry = self._sessions.pop(token, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        if self._spilled.pop(token, None) is not None:
+            self._unlink(self._spill_path(token))
+
+    def _spill_path(self, token):
+        return os.path.join(self.spill_dir, f"session_{token}.bin")
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# Export singleton
+session_store = SessionStore()
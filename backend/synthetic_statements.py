@@ -0,0 +1,318 @@
+"""
+Synthetic bank statements - deterministic PDFs with known transactions.
+
+Parser benchmarks and tests need realistic statements of any length, and the
+transactions each one really contains, to measure throughput and accuracy.
+generate_statement() builds both from a seed:
+
+1. "pnc": PNC-style text statement. A header with the statement period,
+   then "Deposits and Other Additions", "Banking/Debit Card Withdrawals and
+   Purchases" and "Online and Electronic Banking Deductions" sections of
+   "MM/DD amount description" lines (some descriptions wrap onto a second
+   line), sections re-headed "- continued" on each new page, and a "Daily
+   Balance Detail" section at the end
+2. "table": the same transactions as ruled Date | Description | Amount
+   tables under section headings, followed by a Date | Balance table
+
+Either layout can end with boilerplate pages (billing-rights disclosures,
+privacy notice, marketing), which real statements carry and which hold no
+transactions.
+
+The same (layout, pages, seed, ...) always produces the same PDF bytes and
+the same ground truth, so results can be compared across runs.
+"""
+
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from backend.lazy_imports import lazy_import
+from backend.transactions import TransactionBatch
+
+fpdf = lazy_import("fpdf")
+
+
+LAYOUTS = ("pnc", "table")
+
+# Section title, sign, share of the statement's transactions
+SECTIONS = (
+    ("Deposits and Other Additions", 1, 0.15),
+    ("Banking/Debit Card Withdrawals and Purchases", -1, 0.6),
+    ("Online and Electronic Banking Deductions", -1, 0.25),
+)
+BALANCE_SECTION = "Daily Balance Detail"
+
+# Description, amount range in dollars. Deposits avoid the words the
+# parsers use as section keywords ("deposits", "credits", "purchase", ...)
+MERCHANTS = {
+    1: (
+        ("Direct Deposit - PAYROLL ACME CORP", (1200, 3200)),
+        ("Mobile Deposit REF 4471", (20, 600)),
+        ("Transfer From Savings X1234", (50, 1500)),
+        ("Zelle From J SMITH", (10, 300)),
+        ("Interest Payment", (0.01, 5)),
+    ),
+    -1: (
+        ("Debit Card Purchase NETFLIX.COM", (15.49, 15.49)),
+        ("Debit Card Purchase SPOTIFY USA", (11.99, 11.99)),
+        ("Debit Card Purchase WHOLEFDS MKT 10234", (8, 240)),
+        ("POS Purchase SHELL OIL 5744", (20, 90)),
+        ("POS Purchase TARGET T-1123", (5, 180)),
+        ("Recurring Debit Card PLANET FITNESS", (24.99, 24.99)),
+        ("Debit Card Purchase AMAZON MKTPL", (4, 320)),
+        ("Debit Card Purchase STARBUCKS 0931", (3, 18)),
+        ("Debit Card Purchase UBER TRIP", (7, 65)),
+        ("Web Pmt- Payment CON EDISON", (60, 240)),
+        ("Web Pmt- Payment VERIZON WIRELESS", (45, 160)),
+        ("ACH Web GEICO AUTO", (98.5, 98.5)),
+        ("ATM Withdrawal 1200 MAIN ST", (20, 400)),
+    ),
+}
+
+# Boilerplate page paragraphs. Like the real thing they print no dates; they
+# also avoid the words the parsers treat as section headers
+BOILERPLATE = (
+    "Important Information About Your Account",
+    "In case of errors or questions about your electronic transfers, call us at the number shown on "
+    "this statement or write to us as soon as you can if you think your statement or receipt is wrong "
+    "or if you need more information about a transfer listed on the statement.",
+    "We must hear from you no later than sixty days after we sent you the first statement on which the "
+    "problem or error appeared. Tell us your name and account number, describe the error or the transfer "
+    "you are unsure about, and explain as clearly as you can why you believe it is an error.",
+    "Privacy Notice: Federal law gives consumers the right to limit some but not all sharing of personal "
+    "information. Federal law also requires us to tell you how we collect, share, and protect your "
+    "personal information. Please read this notice carefully to understand what we do.",
+    "Make the most of your money with Virtual Wallet. Set savings goals, track your spending and get "
+    "alerts on the go with our mobile app. Visit any branch or sign on to online banking to learn more.",
+    "Member FDIC. Equal Housing Lender.",
+)
+
+# Second lines some descriptions wrap onto (PNC prints reference numbers there)
+CONTINUATIONS = ("REF 2219038841", "CARD 4471 SEQ 88", "ID 99120331 WEB")
+
+LINE_HEIGHT = 4
+MAX_TRANSACTIONS_PER_PAGE = 30
+_FIXED_CREATION_DATE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class SyntheticStatement:
+    """
+    A generated statement PDF and the transactions printed on it.
+
+    Attributes:
+        layout: "pnc" or "table"
+        pages: Number of pages in the PDF
+        period: (start date, end date) printed on page one
+        transactions: Ground truth as a "signed" TransactionBatch, in
+                      statement order, descriptions as printed (without
+                      wrapped second lines)
+        pdf_bytes: The PDF
+    """
+
+    def __init__(self, layout, pages, period, transactions, pdf_bytes):
+        self.layout = layout
+        self.pages = pages
+        self.period = period
+        self.transactions = transactions
+        self.pdf_bytes = pdf_bytes
+
+    def write(self, path):
+        with open(path, "wb") as f:
+            f.write(self.pdf_bytes)
+        return path
+
+    def __repr__(self):
+        return f"SyntheticStatement({self.layout!r}, {self.pages} pages, {len(self.transactions)} transactions)"
+
+
+def generate_statement(
+    pages=1, layout="pnc", seed=0, transactions_per_page=30, start=date(2025, 10, 1), days=31, boilerplate_pages=0,
+):
+    """
+    Generate a statement PDF of exactly `pages` transaction pages plus
+    `boilerplate_pages` pages without transactions.
+
+    Args:
+        pages: Transaction page count (at least 1)
+        layout: One of LAYOUTS
+        seed: Random seed; equal arguments give identical output
+        transactions_per_page: Transactions printed on each page
+        start: First day of the statement period
+        days: Length of the statement period in days
+        boilerplate_pages: Disclosure / marketing pages appended at the end
+
+    Returns:
+        SyntheticStatement
+
+    Raises:
+        ValueError: Unknown layout, or a page count / density out of range
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {layout}")
+    if pages < 1:
+        raise ValueError("A statement has at least one page")
+    if not 1 <= transactions_per_page <= MAX_TRANSACTIONS_PER_PAGE:
+        raise ValueError(f"transactions_per_page must be between 1 and {MAX_TRANSACTIONS_PER_PAGE}")
+
+    rng = random.Random(seed)
+    period = (start, start + timedelta(days=days - 1))
+    rows = _generate_rows(rng, pages * transactions_per_page, period)
+
+    truth = TransactionBatch("signed")
+    for section, ordinal, cents, description, _ in rows:
+        truth.append(ordinal, cents * SECTIONS[section][1], description)
+
+    pdf = fpdf.FPDF(format="letter")
+    pdf.set_creation_date(_FIXED_CREATION_DATE)
+    pdf.set_auto_page_break(False)
+    pdf.set_margins(12, 10)
+
+    balances = _daily_balances(rng, rows, period)
+    render = _render_pnc_page if layout == "pnc" else _render_table_page
+    total_pages = pages + boilerplate_pages
+    for page in range(pages):
+        page_rows = rows[page * transactions_per_page:(page + 1) * transactions_per_page]
+        previous = rows[page * transactions_per_page - 1][0] if page else None
+        pdf.add_page()
+        pdf.set_font("Helvetica", size=8)
+        if page == 0:
+            _render_header(pdf, period, balances)
+        _line(pdf, f"Page {page + 1} of {total_pages}")
+        render(pdf, page_rows, previous)
+        if page == pages - 1:
+            render_balance = _render_pnc_balances if layout == "pnc" else _render_table_balances
+            render_balance(pdf, balances)
+        if pdf.get_y() > pdf.h - LINE_HEIGHT:
+            raise ValueError(f"Page {page + 1} overflowed; use fewer transactions_per_page")
+    for page in range(pages, total_pages):
+        pdf.add_page()
+        _line(pdf, f"Page {page + 1} of {total_pages}")
+        _render_boilerplate(pdf, rng)
+
+    return SyntheticStatement(layout, total_pages, period, truth, bytes(pdf.output()))
+
+
+def _generate_rows(rng, count, period):
+    """
+    (section index, day ordinal, cents, description, continuation) tuples in
+    statement order: section by section, by date within a section.
+    """
+    sections = []
+    remaining = count
+    for index, (_, sign, share) in enumerate(SECTIONS):
+        size = remaining if index == len(SECTIONS) - 1 else min(remaining, max(1, round(count * share)))
+        remaining -= size
+        sections.append((index, sign, size))
+
+    first, span = period[0].toordinal(), (period[1] - period[0]).days + 1
+    rows = []
+    for index, sign, size in sections:
+        section_rows = []
+        for _ in range(size):
+            description, (low, high) = rng.choice(MERCHANTS[sign])
+            cents = round(rng.uniform(low, high) * 100)
+            continuation = rng.choice(CONTINUATIONS) if rng.random() < 0.1 else None
+            section_rows.append((index, first + rng.randrange(span), max(cents, 1), description, continuation))
+        section_rows.sort(key=lambda row: row[1])
+        rows.extend(section_rows)
+    return rows
+
+
+def _daily_balances(rng, rows, period):
+    """
+    A handful of (day ordinal, balance cents) pairs for the balance section.
+    """
+    balance = rng.randrange(100000, 900000)
+    days = sorted({period[0].toordinal() + offset for offset in (0, 7, 14, 21, (period[1] - period[0]).days)})
+    balances = []
+    for day in days:
+        balance += sum(cents * SECTIONS[section][1] for section, ordinal, cents, _, _ in rows if ordinal == day)
+        balances.append((day, balance))
+    return balances
+
+
+def _money(cents):
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100:,}.{abs(cents) % 100:02d}"
+
+
+def _month_day(ordinal):
+    return date.fromordinal(ordinal).strftime("%m/%d")
+
+
+def _line(pdf, text, bold=False):
+    pdf.set_font("Helvetica", style="B" if bold else "", size=8)
+    pdf.cell(0, LINE_HEIGHT, text=text, new_x="LMARGIN", new_y="NEXT")
+
+
+def _render_header(pdf, period, balances):
+    _line(pdf, "PNC Bank", bold=True)
+    _line(pdf, "Virtual Wallet Spend Statement")
+    _line(pdf, f"For the period {period[0]:%m/%d/%Y} to {period[1]:%m/%d/%Y}")
+    _line(pdf, "Primary account number: XX-XXXX-4471")
+    _line(pdf, f"Beginning balance ${_money(balances[0][1])}")
+    _line(pdf, f"Ending balance ${_money(balances[-1][1])}")
+
+
+def _render_boilerplate(pdf, rng):
+    _line(pdf, BOILERPLATE[0], bold=True)
+    paragraphs = list(BOILERPLATE[1:])
+    rng.shuffle(paragraphs)
+    for paragraph in paragraphs * 3:
+        pdf.multi_cell(0, LINE_HEIGHT, text=paragraph, new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(LINE_HEIGHT)
+
+
+def _section_title(section, previous):
+    title = SECTIONS[section][0]
+    return f"{title} - continued" if section == previous else title
+
+
+def _render_pnc_page(pdf, rows, previous):
+    current = None
+    for section, ordinal, cents, description, continuation in rows:
+        if section != current:
+            # Every page (re)opens the section it starts in
+            _line(pdf, _section_title(section, previous), bold=True)
+            previous = current = section
+        _line(pdf, f"{_month_day(ordinal)} {_money(cents)} {description}")
+        if continuation:
+            _line(pdf, continuation)
+
+
+def _render_pnc_balances(pdf, balances):
+    _line(pdf, BALANCE_SECTION, bold=True)
+    for ordinal, cents in balances:
+        _line(pdf, f"{_month_day(ordinal)} {_money(cents)}")
+
+
+def _table(pdf, header, rows, widths):
+    pdf.set_font("Helvetica", style="B", size=8)
+    for text, width in zip(header, widths):
+        pdf.cell(width, LINE_HEIGHT + 1, text=text, border=1)
+    pdf.ln()
+    pdf.set_font("Helvetica", size=8)
+    for row in rows:
+        for text, width in zip(row, widths):
+            pdf.cell(width, LINE_HEIGHT + 1, text=text, border=1)
+        pdf.ln()
+    pdf.ln(LINE_HEIGHT)
+
+
+def _render_table_page(pdf, rows, previous):
+    start = 0
+    while start < len(rows):
+        section = rows[start][0]
+        stop = start
+        while stop < len(rows) and rows[stop][0] == section:
+            stop += 1
+        _line(pdf, _section_title(section, previous), bold=True)
+        table_rows = [
+            (_month_day(ordinal), description, _money(cents)) for _, ordinal, cents, description, _ in rows[start:stop]
+        ]
+        _table(pdf, ("Date", "Description", "Amount"), table_rows, (22, 130, 30))
+        previous, start = section, stop
+
+
+def _render_table_balances(pdf, balances):
+    _line(pdf, BALANCE_SECTION, bold=True)
+    _table(pdf, ("Date", "Balance"), [(_month_day(ordinal), _money(cents)) for ordinal, cents in balances], (22, 30))
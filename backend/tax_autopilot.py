@@ -32,16 +32,41 @@ class TaxAutopilot:
             return 0.0
 
         # Step 1b: Identify if Source is Gig
-        description = transaction.get('description', '').upper()
-        is_gig = any(platform in description for platform in self.GIG_PLATFORMS)
-        
-        if not is_gig:
+        if not self._is_gig(transaction.get('description', '').upper()):
             return 0.0
 
-        # Step 2: Apply safe estimate (20% flat rate for MVP)
+        amount = float(transaction.get('amount', 0))
+        withholding_amount = amount * self._tax_rate(state)
+        
+        return round(withholding_amount, 2)
+
+    def estimate_gig_taxes(self, frame, state="NJ"):
+        """
+        Estimated tax withholding for every transaction of an AnalysisFrame.
+        Money in (positive cents) from a gig platform is gig income; each
+        distinct description is checked once.
+
+        Args:
+            frame (AnalysisFrame): The preprocessed transactions.
+            state (str): The state code (e.g., "NJ").
+
+        Returns:
+            list: The withholding amount of each transaction, 0.0 where it isn't gig income.
+        """
+        is_gig = [self._is_gig(text) for text in frame.upper]
+        tax_rate = self._tax_rate(state)
+        return [
+            round(amount * tax_rate, 2) if cents > 0 and is_gig[code] else 0.0
+            for code, cents, amount in zip(frame.codes.tolist(), frame.cents.tolist(), frame.amounts.tolist())
+        ]
+
+    def _is_gig(self, description_upper):
+        return any(platform in description_upper for platform in self.GIG_PLATFORMS)
+
+    def _tax_rate(self, state):
+        # Apply safe estimate (20% flat rate for MVP)
         # In a real app, we'd lookup state tax brackets + self-employment tax (15.3%) + federal.
         # 20-30% is usually the safe rule of thumb. User requested 20%.
-        
         tax_rate = self.DEFAULT_RATE
         
         # Placeholder for state-specific logic
@@ -49,11 +74,7 @@ class TaxAutopilot:
             tax_rate += 0.05 # Example: Higher tax for CA
         elif state == "NY":
             tax_rate += 0.04
-            
-        amount = float(transaction.get('amount', 0))
-        withholding_amount = amount * tax_rate
-        
-        return round(withholding_amount, 2)
+        return tax_rate
 
 # Export singleton
 tax_autopilot = TaxAutopilot()
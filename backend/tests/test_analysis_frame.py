@@ -0,0 +1,142 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import pickle
+import random
+import unittest
+from datetime import date, datetime
+from backend.analysis_frame import AnalysisFrame, parse_date_ordinal
+from backend.intelligence.categorizer import tag_frame, tag_transaction
+from backend.subscription_detective import SubscriptionDetective
+from backend.tax_autopilot import tax_autopilot
+from backend.transactions import as_batch
+
+
+NAMES = ["NETFLIX.COM", "UBER TRIP PAYOUT", "VENMO CASHOUT", "FANDUEL CASINO", "PSU TUITION", "SHELL OIL 5744", ""]
+
+
+def random_records(rng, count):
+    records = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.05:
+            date_val = "not a date"
+        elif roll < 0.7:
+            date_val = f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}"
+        else:
+            date_val = f"{rng.randrange(1, 13):02d}/{rng.randrange(1, 29):02d}/2024"
+        records.append({"date": date_val, "description": rng.choice(NAMES), "amount": rng.choice([-42.5, 15.49, 120.0])})
+    return records
+
+
+class TestAnalysisFrame(unittest.TestCase):
+    def test_columns_from_records_and_batches(self):
+        records = [
+            {"date": "2025-01-05", "desc": "Netflix.com", "amount": 15.49, "type": "EXPENSE"},
+            {"date": "01/20/2025", "desc": "UBER PAYOUT", "amount": 80.0, "type": "INCOME"},
+            {"date": "2025-01-05", "desc": "Netflix.com", "amount": 15.49, "type": "EXPENSE"},
+        ]
+        for transactions in (records, as_batch(records)):
+            frame = AnalysisFrame.build(transactions)
+            self.assertEqual([date.fromordinal(o) for o in frame.ordinals.tolist()], [date(2025, 1, 5), date(2025, 1, 20), date(2025, 1, 5)])
+            self.assertEqual(frame.cents.tolist(), [-1549, 8000, -1549])
+            self.assertEqual(frame.amounts.tolist(), [15.49, 80.0, 15.49])
+            self.assertEqual(frame.codes.tolist(), [0, 1, 0])
+            self.assertEqual(frame.upper, ("NETFLIX.COM", "UBER PAYOUT"))
+            self.assertEqual([frame.merchants[m] for m in frame.merchant_ids.tolist()], ["NETFLIX.COM", "UBER PAYOUT"])
+        self.assertEqual(AnalysisFrame.build(records).dates(), ["2025-01-05", "01/20/2025", "2025-01-05"])
+
+    def test_parses_every_detective_date_format(self):
+        expected = date(2023, 12, 1).toordinal()
+        for value in ["2023-12-01", "12/01/2023", "01-12-2023", "2023/12/01", datetime(2023, 12, 1, 9, 30), date(2023, 12, 1)]:
+            self.assertEqual(parse_date_ordinal(value), expected, value)
+        # Day-first wins where both dash orders fit
+        self.assertEqual(parse_date_ordinal("12-13-2023"), date(2023, 12, 13).toordinal())
+        self.assertEqual(parse_date_ordinal("12-01-2023"), date(2023, 1, 12).toordinal())
+        self.assertEqual(parse_date_ordinal("not a date"), -1)
+
+    def test_is_immutable(self):
+        frame = AnalysisFrame.build(random_records(random.Random(1), 10))
+        with self.assertRaises(AttributeError):
+            frame.cents = None
+        with self.assertRaises(ValueError):
+            frame.cents[0] = 1
+        restored = pickle.loads(pickle.dumps(frame))
+        self.assertEqual(restored.cents.tolist(), frame.cents.tolist())
+        with self.assertRaises(ValueError):
+            restored.ordinals[0] = 1
+
+    def test_extend_and_slice_match_building_everything(self):
+        rng = random.Random(2)
+        records = random_records(rng, 200)
+        whole = AnalysisFrame.build(records)
+        frame = AnalysisFrame.build(records[:70]).extend(as_batch([r for r in records[70:] if r["date"] != "not a date"]))
+        expected = AnalysisFrame.build(records[:70] + [r for r in records[70:] if r["date"] != "not a date"])
+        for name in ("ordinals", "cents", "amounts", "codes"):
+            self.assertEqual(getattr(frame, name).tolist(), getattr(expected, name).tolist(), name)
+        self.assertEqual(frame.descriptions, expected.descriptions)
+        tail = whole.slice(150)
+        self.assertEqual(len(tail), 50)
+        self.assertEqual(tail.dates(), [r["date"] for r in records[150:]])
+
+    def test_extending_touches_only_new_rows_and_values(self):
+        rng = random.Random(4)
+        chunks = [random_records(rng, rng.randrange(0, 40)) for _ in range(8)]
+        frame = AnalysisFrame.build(chunks[0])
+        seen = list(chunks[0])
+        for chunk in chunks[1:]:
+            extended = frame.extend(chunk)
+            # The tables are shared and the existing rows are reused, not copied
+            self.assertIs(extended._tables, frame._tables)
+            previous = extended._chunks[:-1]
+            self.assertTrue(previous[0] is frame._joined or all(a is b for a, b in zip(previous, frame._chunks)))
+            self.assertEqual(len(extended._chunks[-1]["codes"]), len(chunk))
+            seen += chunk
+            expected = AnalysisFrame.build(seen)
+            for name in ("ordinals", "cents", "amounts", "codes", "date_codes", "merchant_ids", "date_ordinals"):
+                self.assertEqual(getattr(extended, name).tolist(), getattr(expected, name).tolist(), name)
+            for name in ("descriptions", "upper", "clean", "keywords", "merchants", "date_values"):
+                self.assertEqual(getattr(extended, name), getattr(expected, name), name)
+            start = rng.randrange(len(seen) + 1)
+            self.assertEqual(extended.slice(start).dates(), expected.slice(start).dates())
+            self.assertEqual(extended.slice(start, start + 5).cents.tolist(), expected.cents[start:start + 5].tolist())
+            frame = extended
+        restored = pickle.loads(pickle.dumps(frame))
+        self.assertEqual(restored.dates(), frame.dates())
+        self.assertEqual(restored.extend(chunks[0]).codes.tolist(), frame.extend(chunks[0]).codes.tolist())
+
+    def test_appended_size_tracks_the_pickled_growth(self):
+        rng = random.Random(5)
+        frame = AnalysisFrame.build(random_records(rng, 2000))
+        extended = frame.extend(random_records(rng, 500) + [{"date": "2025-06-30", "description": "NEW SHOP", "amount": 1.0}])
+        growth = len(pickle.dumps(extended)) - len(pickle.dumps(frame))
+        self.assertLess(abs(extended.appended_size(frame) - growth), growth * 0.2)
+        self.assertLess(extended.appended_size(extended), 1000)
+
+    def test_sibling_extends_do_not_see_each_other(self):
+        frame = AnalysisFrame.build([{"date": "2025-01-05", "description": "NETFLIX.COM", "amount": -15.49}])
+        left = frame.extend([{"date": "2025-02-05", "description": "SPOTIFY", "amount": -9.99}])
+        right = frame.extend([{"date": "2025-03-05", "description": "HULU", "amount": -7.99}])
+        self.assertEqual(frame.descriptions, ("NETFLIX.COM",))
+        self.assertEqual(left.descriptions, ("NETFLIX.COM", "SPOTIFY"))
+        self.assertEqual(right.descriptions, ("NETFLIX.COM", "HULU"))
+        self.assertEqual(right.dates(), ["2025-01-05", "2025-03-05"])
+        self.assertEqual(right.merchants, ("NETFLIX.COM", "HULU"))
+
+    def test_analyzers_run_against_the_frame(self):
+        records = random_records(random.Random(3), 300)
+        frame = AnalysisFrame.build(records)
+        self.assertEqual(tag_frame(frame), [tag_transaction(r["description"], r["amount"]) for r in records])
+        self.assertEqual(
+            tax_autopilot.estimate_gig_taxes(frame, "CA"),
+            [
+                tax_autopilot.calculate_gig_tax({**r, "direction": "INCOME"}, "CA") if r["amount"] > 0 else 0.0
+                for r in records
+            ],
+        )
+        detective = SubscriptionDetective()
+        self.assertEqual(detective.identify_recurring_payments(frame), detective.identify_recurring_payments(records))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import asyncio
+import io
+import unittest
+import zipfile
+from unittest.mock import patch
+from backend.batch_upload import BatchLimitError, BatchSource, iter_zip_pdfs, parse_batch, merge_statements
+from backend.ingest import UploadTooLargeError
+
+
+def tx(date, amount, desc, tx_type="EXPENSE"):
+    return {"date": date, "amount": amount, "desc": desc, "type": tx_type}
+
+
+class FakeExecutor:
+    def __init__(self, results):
+        self.results = results
+
+    async def run(self, parser_name, source, progress=None, content_hash=None):
+        result = self.results[source]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class TestBatchUpload(unittest.TestCase):
+    def test_merge_dedups_across_statements_only(self):
+        september = {"meta": {"ending_balance": 100.0}, "transactions": [
+            tx("2025-09-30", 5.0, "COFFEE"),
+            tx("2025-09-30", 5.0, "COFFEE"),
+            tx("2025-09-02", 12.0, "NETFLIX"),
+        ]}
+        # Overlapping export: repeats the 09/30 coffees
+        october = {"meta": {"ending_balance": 250.0}, "transactions": [
+            tx("2025-09-30", 5.0, "coffee"),
+            tx("2025-09-30", 5.0, "COFFEE "),
+            tx("2025-10-02", 12.0, "NETFLIX"),
+        ]}
+        reports = [
+            {"filename": "oct.pdf", "status": "ok", "result": october},
+            {"filename": "bad.pdf", "status": "error", "error": "boom"},
+            {"filename": "sep.pdf", "status": "ok", "result": september},
+        ]
+
+        transactions, meta, removed = merge_statements(reports)
+
+        self.assertEqual(removed, 2)
+        self.assertEqual([t["date"] for t in transactions],
+                         ["2025-09-02", "2025-09-30", "2025-09-30", "2025-10-02"])
+        self.assertEqual(meta["ending_balance"], 250.0)
+        self.assertEqual(meta["statements"], 2)
+        self.assertEqual(meta["failed"], 1)
+
+    def test_parse_batch_reports_per_file(self):
+        executor = FakeExecutor({"a": {"meta": {}, "transactions": []}, "b": ValueError("bad pdf")})
+        reports = asyncio.run(parse_batch(executor, [BatchSource("a.pdf", "a", "1"), BatchSource("b.pdf", "b", "2")]))
+
+        self.assertEqual([r["status"] for r in reports], ["ok", "error"])
+        self.assertEqual(reports[1]["error"], "bad pdf")
+        self.assertTrue(all("seconds" in r for r in reports))
+
+    def test_zip_members(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("2025/jan.pdf", b"%PDF jan")
+            archive.writestr("notes.txt", b"ignored")
+        buffer.seek(0)
+
+        sources = list(iter_zip_pdfs(buffer))
+        self.assertEqual([s.filename for s in sources], ["2025/jan.pdf"])
+        self.assertEqual(sources[0].data, b"%PDF jan")
+
+        buffer.seek(0)
+        with self.assertRaises(ValueError):
+            list(iter_zip_pdfs(buffer, max_member_bytes=4))
+
+    def test_zip_limits_stop_before_inflating(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for month in range(12):
+                archive.writestr(f"{month}.pdf", b"%PDF" + b"0" * 1000)
+
+        inflated = []
+        with patch.object(zipfile.ZipFile, "read", lambda archive, member: inflated.append(member) or b"%PDF"):
+            buffer.seek(0)
+            with self.assertRaises(BatchLimitError):
+                list(iter_zip_pdfs(buffer, max_members=3))
+            self.assertEqual(len(inflated), 3)
+
+            inflated.clear()
+            buffer.seek(0)
+            with self.assertRaises(UploadTooLargeError):
+                list(iter_zip_pdfs(buffer, max_total_bytes=2500))
+            self.assertEqual(len(inflated), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
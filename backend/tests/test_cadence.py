@@ -0,0 +1,115 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import random
+import statistics
+import unittest
+from datetime import date, timedelta
+import numpy as np
+from backend.cadence import CADENCES, _add_months, analyze_cadence
+from backend.subscription_detective import SubscriptionDetective
+from backend.transactions import as_batch
+
+
+def charges(description, amount, first, count, step):
+    """
+    `count` charges `step` days apart, or `step` calendar months apart for
+    step="month".
+    """
+    days = []
+    for n in range(count):
+        if step == "month":
+            month = first.month - 1 + n
+            days.append(date(first.year + month // 12, month % 12 + 1, first.day))
+        else:
+            days.append(first + timedelta(days=step * n))
+    return [{"date": day.isoformat(), "description": description, "amount": amount} for day in days]
+
+
+class TestAnalyzeCadence(unittest.TestCase):
+    def test_classifies_each_cadence(self):
+        start = date(2023, 1, 15)
+        transactions = (
+            charges("GYM CLASS", 12.0, start, 10, 7)
+            + charges("PAYROLL", 1500.0, start, 6, 14)
+            + charges("NETFLIX.COM", 15.49, start, 6, "month")
+            + charges("WATER UTILITY", 80.0, start, 4, 91)
+            + charges("DOMAIN RENEWAL", 20.0, start, 3, 365)
+            + charges("COFFEE", 4.0, start, 1, 1)
+        )
+        subscriptions = SubscriptionDetective().identify_recurring_payments(transactions)
+        self.assertEqual(
+            [(s["name"], s["frequency"], s["confidence"]) for s in subscriptions],
+            [
+                ("GYM CLASS", "Weekly", "High"),
+                ("PAYROLL", "Biweekly", "High"),
+                ("NETFLIX.COM", "Monthly", "High"),
+                ("WATER UTILITY", "Quarterly", "High"),
+                ("DOMAIN RENEWAL", "Annual", "High"),
+            ],
+        )
+        netflix = subscriptions[2]
+        self.assertEqual(netflix["next_due"], "2023-07-15")
+        self.assertEqual(netflix["details"], "Detected 6 transactions. Intervals: [31, 28, 31, 30, 31]")
+
+    def test_confidence_follows_regularity(self):
+        start = date(2024, 1, 1)
+        irregular = charges("SHOP", 9.0, start, 4, "month") + [
+            {"date": "2024-01-05", "description": "SHOP", "amount": 9.0},
+            {"date": "2024-03-20", "description": "SHOP", "amount": 9.0},
+        ]
+        pair = charges("SPOTIFY USA", 11.99, start, 2, "month")
+        subscriptions = SubscriptionDetective().identify_recurring_payments(irregular + pair)
+        self.assertEqual([(s["name"], s["confidence"]) for s in subscriptions], [("SHOP", "Low"), ("SPOTIFY", "Medium")])
+
+    def test_short_cadences_need_repeated_intervals(self):
+        start = date(2024, 5, 4)
+        groceries = charges("TRADER JOES #552", 64.1, start, 2, 7) + charges("CORNER BAKERY", 9.5, start, 2, 14)
+        self.assertEqual(SubscriptionDetective().identify_recurring_payments(groceries), [])
+
+        # One weekly interval doesn't outvote a monthly one either
+        mixed = charges("SHELL OIL", 40.0, start, 2, 7) + charges("SHELL OIL", 40.0, date(2024, 6, 11), 1, 1)
+        subscriptions = SubscriptionDetective().identify_recurring_payments(mixed)
+        self.assertEqual([(s["frequency"], s["interval_days"]) for s in subscriptions], [("Monthly", 31.0)])
+
+    def test_next_due_clamps_month_end(self):
+        ordinals = np.array([date(2024, 1, 31).toordinal(), date(2024, 11, 30).toordinal()])
+        due = _add_months(ordinals, np.array([1, 3]))
+        self.assertEqual([date.fromordinal(int(d)) for d in due], [date(2024, 2, 29), date(2025, 2, 28)])
+
+    def test_matches_per_group_reference(self):
+        rng = random.Random(3)
+        groups = [rng.randrange(40) for _ in range(2000)]
+        ordinals = [738000 + rng.randrange(1500) for _ in groups]
+        amounts = [rng.choice([5.0, 9.99, 20.0]) for _ in groups]
+        report = analyze_cadence(groups, ordinals, amounts, 41)
+
+        for group in range(41):
+            days = sorted(o for g, o in zip(groups, ordinals) if g == group)
+            gaps = [b - a for a, b in zip(days, days[1:])]
+            self.assertEqual(report.gaps(group), gaps)
+            intervals = [gap for gap in gaps if gap > 0]
+            tally = [sum(low <= gap <= high for gap in intervals) for _, _, low, high, _, _ in CADENCES]
+            tally = [count if count >= CADENCES[c][5] else 0 for c, count in enumerate(tally)]
+            best = max(range(len(CADENCES)), key=lambda c: (tally[c], -c))
+            if not tally[best]:
+                self.assertEqual(report.cadence[group], -1)
+                continue
+            self.assertEqual(report.cadence[group], best)
+            matching = [gap for gap in intervals if CADENCES[best][2] <= gap <= CADENCES[best][3]]
+            self.assertEqual(report.interval_days[group], statistics.median(matching))
+            self.assertAlmostEqual(report.regularity[group], tally[best] / len(intervals))
+            self.assertEqual(report.last[group], days[-1])
+
+    def test_batch_matches_records(self):
+        records = (
+            charges("Debit Card Purchase NETFLIX.COM 1024", 15.49, date(2025, 1, 3), 4, "month")
+            + charges("POS PURCHASE GYM", 30.0, date(2025, 1, 1), 5, 7)
+        )
+        random.Random(1).shuffle(records)
+        detective = SubscriptionDetective()
+        self.assertEqual(detective.identify_recurring_payments(as_batch(records)), detective.identify_recurring_payments(records))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import random
+import unittest
+from thefuzz import fuzz
+from backend.detective import SubscriptionScanner
+from backend.fuzzy_groups import MATCH_THRESHOLD, group_descriptions
+
+
+WORDS = (
+    "netflix spotify usa wholefds mkt shell oil target amazon mktpl starbucks uber trip payment "
+    "con edison verizon wireless geico auto atm withdrawal main st pos ppd rec club fees mbrshp"
+).split()
+
+
+def pairwise_groups(descriptions):
+    """
+    The pairwise scan SubscriptionScanner.scan used to run.
+    """
+    grouped = set()
+    groups = []
+    for i, description in enumerate(descriptions):
+        if i in grouped:
+            continue
+        group = [i]
+        grouped.add(i)
+        for j, other in enumerate(descriptions):
+            if j not in grouped and fuzz.token_set_ratio(description, other) > MATCH_THRESHOLD:
+                group.append(j)
+                grouped.add(j)
+        groups.append(group)
+    return groups
+
+
+def misspell(word, rng):
+    if len(word) < 4 or rng.random() < 0.7:
+        return word
+    position = rng.randrange(1, len(word) - 1)
+    if rng.random() < 0.5:
+        return word[:position] + word[position + 1:]
+    return word[:position] + rng.choice("abxyz") + word[position:]
+
+
+def random_descriptions(rng):
+    descriptions = []
+    for _ in range(rng.randrange(1, 120)):
+        description = " ".join(misspell(rng.choice(WORDS), rng) for _ in range(rng.randrange(0, 4)))
+        if rng.random() < 0.3:
+            description += f" {rng.randrange(10000)}"
+        if rng.random() < 0.05:
+            description = "-- & --"
+        descriptions.append(description.upper() if rng.random() < 0.5 else description)
+    return descriptions
+
+
+class TestGroupDescriptions(unittest.TestCase):
+    def test_matches_pairwise_scan(self):
+        for seed in range(100):
+            descriptions = random_descriptions(random.Random(seed))
+            self.assertEqual(group_descriptions(descriptions), pairwise_groups(descriptions), descriptions)
+
+    def test_edge_cases(self):
+        descriptions = ["NETFLIX.COM", "", "netflix com", "Netflix", "  ", "UER", "UBER", "netflix.com"]
+        # Empty descriptions never match, not even each other; subsets score 100
+        self.assertEqual(group_descriptions(descriptions), [[0, 2, 3, 7], [1], [4], [5, 6]])
+        self.assertEqual(group_descriptions([]), [])
+
+    def test_scan_groups_by_description(self):
+        # A month apart only once the misspelled charge joins the group
+        transactions = [
+            {"date": "2025-01-03", "description": "Debit Card Purchase NETFLIX.COM 0042", "amount": -15.49},
+            {"date": "2025-02-03", "description": "Debit Card Purchase NETFLX.COM 0042", "amount": -15.49},
+        ]
+        subscriptions = SubscriptionScanner().scan(transactions)
+        self.assertEqual([(s["merchant"], s["confidence"]) for s in subscriptions], [("NETFLIX.COM 0042", "High")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import asyncio
+import hashlib
+import io
+import unittest
+from backend.ingest import spool_upload, UploadTooLargeError
+
+
+class FakeUpload:
+    """Minimal stand-in for starlette's UploadFile."""
+
+    def __init__(self, filename, data):
+        self.filename = filename
+        self._stream = io.BytesIO(data)
+        self.read_sizes = []
+
+    async def read(self, size=-1):
+        self.read_sizes.append(size)
+        return self._stream.read(size)
+
+
+class TestSpoolUpload(unittest.TestCase):
+    def test_small_upload_stays_in_memory(self):
+        data = b"%PDF-1.4 small statement"
+        upload = FakeUpload("statement.pdf", data)
+
+        with asyncio.run(spool_upload(upload, chunk_size=4, max_memory=1024)) as spooled:
+            self.assertTrue(spooled.in_memory)
+            self.assertEqual(spooled.size, len(data))
+            self.assertEqual(spooled.sha256, hashlib.sha256(data).hexdigest())
+            self.assertEqual(spooled.rewind().read(), data)
+
+        # Read in chunks rather than one whole-file read
+        self.assertTrue(all(size == 4 for size in upload.read_sizes))
+
+    def test_large_upload_rolls_to_disk(self):
+        data = b"x" * 5000
+        upload = FakeUpload("statement.pdf", data)
+
+        with asyncio.run(spool_upload(upload, chunk_size=1000, max_memory=2048)) as spooled:
+            self.assertFalse(spooled.in_memory)
+            self.assertEqual(spooled.rewind().read(), data)
+
+    def test_upload_over_limit_is_rejected(self):
+        upload = FakeUpload("statement.pdf", b"x" * 5000)
+
+        with self.assertRaises(UploadTooLargeError):
+            asyncio.run(spool_upload(upload, chunk_size=1000, max_bytes=4096))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import asyncio
+import io
+import unittest
+from backend.ingest import SpooledUpload
+from backend.jobs import JobManager, JobStatus, QueueFullError, JobsUnavailableError
+
+
+class FakeExecutor:
+    """Stands in for ParseExecutor: a 3 page parse gated on an event."""
+
+    uses_processes = False
+    max_workers = 1
+
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def run(self, parser_name, source, progress=None, content_hash=None):
+        progress(1, 3)
+        await self.release.wait()
+        progress(3, 3)
+        return {"meta": {}, "transactions": [{"desc": source.read().decode()}]}
+
+
+def make_upload(data=b"statement"):
+    return SpooledUpload("statement.pdf", io.BytesIO(data), len(data), "sha")
+
+
+class TestJobManager(unittest.TestCase):
+    def test_job_lifecycle(self):
+        async def scenario():
+            executor = FakeExecutor()
+            manager = JobManager(executor=executor, queue_size=2)
+            await manager.start()
+            completed = []
+
+            job = manager.submit("pnc", make_upload(), on_complete=completed.append)
+            self.assertEqual(job.status, JobStatus.QUEUED)
+
+            await asyncio.sleep(0.01)
+            self.assertEqual(manager.get(job.id).status, JobStatus.RUNNING)
+            self.assertEqual(job.pages_done, 1)
+            self.assertEqual(job.pages_total, 3)
+
+            executor.release.set()
+            await asyncio.sleep(0.01)
+            self.assertEqual(job.status, JobStatus.SUCCEEDED)
+            self.assertEqual(job.to_dict()["progress"]["pages_processed"], 3)
+            self.assertEqual(job.result["transactions"][0]["desc"], "statement")
+            self.assertEqual(len(completed), 1)
+
+            await manager.shutdown()
+
+        asyncio.run(scenario())
+
+    def test_queue_full_and_cancel(self):
+        async def scenario():
+            executor = FakeExecutor()
+            manager = JobManager(executor=executor, queue_size=1)
+            await manager.start()
+
+            running = manager.submit("pnc", make_upload())
+            await asyncio.sleep(0.01)  # picked up by the single worker
+            queued = manager.submit("pnc", make_upload())
+
+            with self.assertRaises(QueueFullError) as ctx:
+                manager.submit("pnc", make_upload())
+            self.assertGreaterEqual(ctx.exception.retry_after, 1)
+
+            manager.cancel(queued.id)
+            manager.cancel(running.id)
+            await asyncio.sleep(0.01)
+            self.assertEqual(queued.status, JobStatus.CANCELLED)
+            self.assertEqual(running.status, JobStatus.CANCELLED)
+            self.assertIsNone(queued.upload)
+
+            # Both slots are free again
+            manager.submit("pnc", make_upload())
+            await manager.shutdown()
+
+            with self.assertRaises(JobsUnavailableError):
+                manager.submit("pnc", make_upload())
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
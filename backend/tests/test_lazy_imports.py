@@ -0,0 +1,99 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import shutil
+import subprocess
+import tempfile
+import textwrap
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from backend import lazy_imports
+from backend import ocr_service
+from backend.lazy_imports import is_loaded, lazy_import
+
+
+SLOW_MODULE = textwrap.dedent("""
+    import time
+    LOADS = [1]
+    time.sleep(0.2)
+    VALUE = 42
+""")
+
+
+class TestLazyImport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        sys.path.insert(0, self.directory)
+
+    def tearDown(self):
+        sys.path.remove(self.directory)
+        sys.modules.pop("lazy_probe", None)
+        lazy_imports._registered.pop("lazy_probe", None)
+        shutil.rmtree(self.directory)
+
+    def test_import_runs_once_on_first_access_across_threads(self):
+        with open(os.path.join(self.directory, "lazy_probe.py"), "w") as f:
+            f.write(SLOW_MODULE)
+
+        module = lazy_import("lazy_probe")
+        self.assertFalse(is_loaded(module))
+        self.assertIs(sys.modules["lazy_probe"], module)
+
+        seen = []
+        threads = [threading.Thread(target=lambda: seen.append(module.VALUE)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(seen, [42] * 4)
+        self.assertEqual(module.LOADS, [1])
+        self.assertTrue(is_loaded(module))
+
+    def test_missing_modules(self):
+        self.assertIsNone(lazy_import("no_such_module_here", optional=True))
+        with self.assertRaises(ImportError):
+            lazy_import("no_such_module_here")
+
+    def test_parsers_defer_pdfplumber_until_warm_up(self):
+        script = (
+            "import sys; import backend.parser; import backend.parsers.brute_force_parser; "
+            "before = 'pdfminer' in sys.modules; "
+            "from backend.parse_executor import warm_up_parsers; warm_up_parsers(); "
+            "print('loaded', before, 'pdfminer' in sys.modules)"
+        )
+        env = dict(os.environ, LAZY_IMPORTS="1")
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=os.getcwd(), env=env, capture_output=True, text=True, check=True,
+        ).stdout.splitlines()
+        self.assertEqual(output[-1], "loaded False True")
+
+    def test_app_defers_numpy_until_analysis(self):
+        script = (
+            "import sys; import backend.main; "
+            "before = 'numpy.linalg' in sys.modules; "
+            "from backend.cadence import analyze_cadence; analyze_cadence([0, 0], [1, 31], [9.99, 9.99]); "
+            "print('loaded', before, 'numpy.linalg' in sys.modules)"
+        )
+        env = dict(os.environ, LAZY_IMPORTS="1")
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=os.getcwd(), env=env, capture_output=True, text=True, check=True,
+        ).stdout.splitlines()
+        self.assertEqual(output[-1], "loaded False True")
+
+
+class TestReceiptScannerWarmUp(unittest.TestCase):
+    def test_model_is_built_on_first_use(self):
+        fake = MagicMock()
+        with patch.object(ocr_service, "paddleocr", fake):
+            scanner = ocr_service.ReceiptScanner()
+            fake.PaddleOCR.assert_not_called()
+
+            self.assertTrue(scanner.warm_up())
+            scanner.ocr
+            fake.PaddleOCR.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import random
+import unittest
+from backend import parser as pnc_text_parser
+from backend.parsers.brute_force_parser import BruteForceParser
+from backend.parsers.lexer import BALANCE, CONTINUATION, HEADER, NOISE, TX, LineLexer
+
+
+LINE_PARTS = [
+    "10/01 197.90", "10/02 $1,250.00", "Deposits", "ADDITIONS", "Checks Paid", "purchase",
+    "Withdrawals", "Daily Balance", "balance detail", "NETFLIX", "COFFEE", "Total", "", "  ",
+    "Ending balance $1,000.00", "İstanbul", "ẞ",
+]
+
+
+def keyword_scan(line, keywords):
+    """The per-line scan the lexer replaces."""
+    line_lower = line.lower()
+    return any(keyword in line_lower for keyword in keywords)
+
+
+class TestLineLexer(unittest.TestCase):
+    def test_kinds(self):
+        lexer = BruteForceParser.LEXER
+        tokens = lexer.tokenize([
+            "Deposits and Other Additions",
+            "10/01 197.90 PAYROLL",
+            "ACME CORP",
+            "",
+            "10/03 12.00 PURCHASE NETFLIX",
+            "Daily Balance Detail",
+        ])
+        self.assertEqual([t.kind for t in tokens], [HEADER, TX, CONTINUATION, NOISE, HEADER, BALANCE])
+        self.assertEqual(tokens[0].section, 1.0)
+        # A header line that is also a transaction keeps both answers
+        self.assertEqual(tokens[4].section, -1.0)
+        self.assertEqual(tokens[4].match.group(3), "PURCHASE NETFLIX")
+
+    def test_matches_per_line_keyword_scans(self):
+        lexer = BruteForceParser.LEXER
+        rng = random.Random(7)
+        lines = [" ".join(rng.sample(LINE_PARTS, rng.randint(0, 4))) for _ in range(2000)]
+        # Includes lines whose lowercase changes length, forcing the per-line path
+        for text in (lines[:1000], [line for line in lines if "İ" not in line]):
+            for line, token in zip(text, lexer.tokenize(text)):
+                expected = 1.0 if keyword_scan(line, lexer.keywords["credit"]) else (
+                    -1.0 if keyword_scan(line, lexer.keywords["debit"]) else 0
+                )
+                self.assertEqual(token.section, expected, line)
+                self.assertEqual(token.balance, keyword_scan(line, lexer.keywords["balance"]), line)
+                self.assertEqual(token.match is not None, bool(BruteForceParser.TRANSACTION_PATTERN.match(line)), line)
+
+    def test_case_sensitive_groups(self):
+        tokens = pnc_text_parser.LEXER.tokenize([
+            "deposits and other additions",
+            "Deposits and Other Additions",
+            "ENDING BALANCE $10.00",
+        ])
+        self.assertEqual([t.section for t in tokens], [0, 1.0, 0])
+        self.assertTrue(tokens[2].summary)
+
+    def test_rejects_unknown_group(self):
+        with self.assertRaises(ValueError):
+            LineLexer(credit=[], debit=[], balance=[], transaction=r"x", case_sensitive=("credits",))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import random
+import re
+import unittest
+from backend.detective import SubscriptionScanner
+from backend.merchant_normalizer import (
+    MERCHANT_ALIASES, NOISE_WORDS, RECURRING_KEYWORDS, SCANNER_PREFIXES, MerchantNormalizer,
+)
+from backend.subscription_detective import SubscriptionDetective
+
+
+def reference_merchant_name(desc):
+    """
+    SubscriptionDetective._normalize_description before the shared service.
+    """
+    if not desc:
+        return ""
+    norm = desc.upper()
+    norm = re.sub(r'\d{1,2}[/-]\d{1,2}([/-]\d{2,4})?', '', norm)
+    norm = re.sub(r'\d{4,}', '', norm)
+    norm = re.sub(r'\s+[#]\d+', '', norm)
+    norm = re.sub(r'\s+ID:?\s*\d+', '', norm)
+    for word in ["POS PURCHASE", "DEBIT CARD", "RECURRING", "PAYMENT", "AUTH", "VISA", "MC"]:
+        norm = norm.replace(word, "")
+    norm = re.sub(r'\s+', ' ', norm).strip()
+    mappings = {
+        "NFLX": "NETFLIX",
+        "SPOTIFY": "SPOTIFY",
+        "AMZN": "AMAZON PRIME",
+        "PRIME VIDEO": "AMAZON PRIME",
+        "DISNEY+": "DISNEY PLUS",
+        "D+:": "DISNEY PLUS"
+    }
+    if norm in mappings:
+        return mappings[norm]
+    for key, val in mappings.items():
+        if key in norm:
+            return val
+    return norm
+
+
+def reference_clean_description(desc):
+    """
+    SubscriptionScanner._clean_description before the shared service.
+    """
+    desc = re.sub(r'\d{1,2}/\d{1,2}(/\d{2,4})?', '', desc)
+    desc = re.sub(r'\d{5,}', '', desc)
+    desc = desc.replace("Debit Card Purchase", "").replace("Direct Deposit -", "")
+    return desc.strip()
+
+
+def fragments():
+    """
+    Every substring of the words the normalizer looks for, plus dates, IDs
+    and reference numbers: random concatenations hit overlapping and
+    removal-created matches.
+    """
+    words = NOISE_WORDS + tuple(MERCHANT_ALIASES) + RECURRING_KEYWORDS + SCANNER_PREFIXES
+    parts = {word[i:j] for word in words for i in range(len(word)) for j in range(i + 1, len(word) + 1)}
+    return sorted(parts) + [" ", "  ", "#12", " ID 5", " ID:7", "12/31", "2024-01-02", "12345", "ppd", "x", "İ"]
+
+
+class TestMerchantNormalizer(unittest.TestCase):
+    def test_matches_previous_implementations(self):
+        parts = fragments()
+        rng = random.Random(5)
+        normalizer = MerchantNormalizer(memo_size=0)
+        for _ in range(20000):
+            desc = "".join(rng.choice(parts) for _ in range(rng.randrange(8)))
+            self.assertEqual(normalizer.merchant_name(desc), reference_merchant_name(desc), desc)
+            self.assertEqual(normalizer.clean_description(desc), reference_clean_description(desc), desc)
+            self.assertEqual(
+                normalizer.recurring_keywords(desc),
+                tuple(keyword for keyword in RECURRING_KEYWORDS if keyword.lower() in desc.lower()),
+                desc,
+            )
+
+    def test_noise_removal_order(self):
+        normalizer = MerchantNormalizer()
+        # Removing PAYMENT creates AUTH, which the chain removes later
+        self.assertEqual(normalizer.merchant_name("AUPAYMENTTH STORE"), "STORE")
+        # AUTH goes before VISA, leaving "VIS"
+        self.assertEqual(normalizer.merchant_name("VISAUTH STORE"), "VIS STORE")
+        # PAYMENT goes before AUTH, so the AUTH removal leaves a PAYMENT
+        self.assertEqual(normalizer.merchant_name("PAYAUTHMENT"), "PAYMENT")
+
+    def test_aliases_follow_priority(self):
+        normalizer = MerchantNormalizer()
+        self.assertEqual(normalizer.merchant_name("DEBIT CARD NFLX.COM 1024"), "NETFLIX")
+        # AMZN is listed before PRIME VIDEO and DISNEY+
+        self.assertEqual(normalizer.merchant_name("DISNEY+ PRIME VIDEO AMZN"), "AMAZON PRIME")
+        self.assertEqual(normalizer.merchant_name("disney+:"), "DISNEY PLUS")
+
+    def test_memo_is_bounded_and_counted(self):
+        normalizer = MerchantNormalizer(memo_size=2)
+        for desc in ["NETFLIX.COM", "NETFLIX.COM", "SPOTIFY USA", "GYM", "NETFLIX.COM"]:
+            normalizer.merchant_name(desc)
+        stats = normalizer.stats()
+        self.assertEqual(stats["operations"]["merchant_name"], {"entries": 2, "hits": 1, "misses": 4, "hit_ratio": 0.2})
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 4, 2))
+        normalizer.clear()
+        self.assertEqual(normalizer.stats()["entries"], 0)
+
+    def test_detectors_share_the_service(self):
+        self.assertEqual(SubscriptionDetective()._normalize_description("POS PURCHASE NFLX 12/01"), "NETFLIX")
+        scanner = SubscriptionScanner()
+        self.assertEqual(scanner._clean_description("Debit Card Purchase 12/01 GYM 123456"), "GYM")
+        candidates = scanner.scan([{"date": "2025-01-05", "description": "GEICO AUTO PPD", "amount": 98.5}])
+        self.assertEqual([c["reason"] for c in candidates], ["Keyword Match: PPD"])
+
+
+if __name__ == "__main__":
+    unittest.main()
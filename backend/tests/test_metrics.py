@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import unittest
+from backend.metrics import MetricsRegistry, capture_stages, observe_stage, replay_stages, parse_stage_seconds
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_histogram_exposition(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        latency.observe(0.05, route="/a")
+        latency.observe(0.1, route="/a")
+        latency.observe(3.0, route="/a")
+
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE latency_seconds histogram", lines)
+        self.assertIn('latency_seconds_bucket{route="/a",le="0.1"} 2', lines)
+        self.assertIn('latency_seconds_bucket{route="/a",le="1"} 2', lines)
+        self.assertIn('latency_seconds_bucket{route="/a",le="+Inf"} 3', lines)
+        self.assertIn('latency_seconds_count{route="/a"} 3', lines)
+        self.assertIn('latency_seconds_sum{route="/a"} 3.15', lines)
+
+    def test_counters_gauges_and_label_checks(self):
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests.", ("status",))
+        requests.inc(status=200)
+        requests.inc(2, status=200)
+        registry.gauge("ratio", "Ratio.", function=lambda: 0.25)
+
+        text = registry.render()
+        self.assertIn('requests_total{status="200"} 3', text)
+        self.assertIn("ratio 0.25", text)
+
+        with self.assertRaises(ValueError):
+            requests.inc(route="/a")
+        with self.assertRaises(ValueError):
+            registry.counter("requests_total", "Duplicate.")
+
+    def test_stage_capture_and_replay(self):
+        before = parse_stage_seconds.count(parser="test", stage="open")
+
+        with capture_stages() as stages:
+            observe_stage("test", "open", 0.01)
+        self.assertEqual(stages, [("test", "open", 0.01)])
+        self.assertEqual(parse_stage_seconds.count(parser="test", stage="open"), before)
+
+        replay_stages(stages)
+        self.assertEqual(parse_stage_seconds.count(parser="test", stage="open"), before + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import random
+import re
+import unittest
+from datetime import date
+from backend.parsers.brute_force_parser import BruteForceParser
+from backend.parsers.normalize import StatementCalendar, amounts_to_cents, find_statement_period
+from backend.tests.test_page_cache import mock_document
+from backend.transactions import month_day_ordinal, parse_cents
+
+
+AMOUNTS = [
+    "12.00", "$1,234.56", "(12.00)", "$(5.10)", "-5.00", " 7.25 ", "1 000.01", "0.29", "", "abc",
+    "(12.00", "12.00)", "((1.00))", "\t(3.00)\t", "1.005", "2.675", "$", "-", "(-4.00)",
+]
+DATES = ["10/01", "12/31", "02/29", "02/30", "13/01", "00/10", "1/5", " 3/7 ", "10-01", "001/05", "", "10/1x"]
+
+
+def reference_cents(amount_str):
+    """The per-row conversion the parsers used."""
+    try:
+        return parse_cents(amount_str)
+    except ValueError:
+        return None
+
+
+def reference_ordinal(date_str, year):
+    date_str = date_str.strip()
+    if not re.match(r"^\d{1,2}/\d{1,2}$", date_str):
+        return None
+    try:
+        return month_day_ordinal(date_str, year)
+    except ValueError:
+        return None
+
+
+class TestBulkNormalization(unittest.TestCase):
+    def test_amounts_match_per_row_parsing(self):
+        rng = random.Random(3)
+        amounts = AMOUNTS + [rng.choice(AMOUNTS) for _ in range(500)]
+        for batch in (amounts, [a for a in amounts if "\t" not in a], [a for a in amounts if "(" not in a]):
+            cents, valid = amounts_to_cents(batch)
+            for amount, value, ok in zip(batch, cents.tolist(), valid.tolist()):
+                self.assertEqual(value if ok else None, reference_cents(amount), repr(amount))
+
+    def test_dates_match_per_row_parsing(self):
+        rng = random.Random(5)
+        fixed_width = [f"{rng.randint(0, 13):02d}/{rng.randint(0, 32):02d}" for _ in range(500)]
+        for year in (2024, 2025):
+            for batch in (DATES, fixed_width):
+                ordinals, valid = StatementCalendar(year).month_day_ordinals(batch)
+                for date_str, ordinal, ok in zip(batch, ordinals.tolist(), valid.tolist()):
+                    self.assertEqual(ordinal if ok else None, reference_ordinal(date_str, year), repr(date_str))
+
+    def test_empty(self):
+        self.assertEqual(len(amounts_to_cents([])[0]), 0)
+        self.assertEqual(len(StatementCalendar(2025).month_day_ordinals([])[1]), 0)
+
+
+class TestStatementCalendar(unittest.TestCase):
+    def test_finds_period(self):
+        self.assertEqual(
+            find_statement_period("For the period 12/15/2024 to 01/14/2025\nPage 1 of 3"),
+            (date(2024, 12, 15), date(2025, 1, 14)),
+        )
+        self.assertEqual(
+            find_statement_period("Statement Period: Dec 15, 2024 - January 14, 2025"),
+            (date(2024, 12, 15), date(2025, 1, 14)),
+        )
+        self.assertIsNone(find_statement_period("Statement 2025"))
+        # Backwards or longer than a year isn't a statement period
+        self.assertIsNone(find_statement_period("01/14/2025 to 12/15/2024"))
+
+    def test_december_january_rollover(self):
+        calendar = StatementCalendar.from_text(2024, "For the period 12/15/2024 to 01/14/2025")
+        ordinals, valid = calendar.month_day_ordinals(["12/20", "01/05", "12/31"])
+        self.assertTrue(valid.all())
+        self.assertEqual(
+            [date.fromordinal(o).isoformat() for o in ordinals.tolist()],
+            ["2024-12-20", "2025-01-05", "2024-12-31"],
+        )
+        self.assertEqual((calendar.year_of(12), calendar.year_of(1)), (2024, 2025))
+
+        same_year = StatementCalendar.from_text(2025, "For the period 03/01/2025 to 03/31/2025")
+        self.assertIsNone(same_year.rollover_month)
+
+    def test_brute_force_parser_rolls_over_across_pages(self):
+        doc, _ = mock_document([
+            "Statement 2024\nFor the period 12/15/2024 to 01/14/2025\nWithdrawals\n12/20 12.00 NETFLIX",
+            "01/05 $1,000.00 RENT\n01/07 3.50 COFFEE\n02/30 1.00 BAD DATE",
+        ])
+        with doc:
+            batch = BruteForceParser(page_workers=0).parse_batch(doc)
+        self.assertEqual(batch.iso_dates(), ["2024-12-20", "2025-01-05", "2025-01-07"])
+        self.assertEqual(list(batch.cents), [-1200, -100000, -350])
+
+
+if __name__ == "__main__":
+    unittest.main()
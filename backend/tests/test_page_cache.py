@@ -0,0 +1,111 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import io
+import unittest
+from contextlib import nullcontext
+from unittest.mock import MagicMock
+import pdfplumber
+from backend.parser import extract_transactions
+from backend.parsers.brute_force_parser import BruteForceParser
+from backend.parsers.generic_parser import GenericPDFParser
+from backend.parsers.page_cache import StatementDocument, open_document, track_memory
+from backend.tests.test_parse_executor import build_statement_pdf
+
+
+def mock_document(page_texts):
+    pages = []
+    for text in page_texts:
+        page = MagicMock()
+        page.extract_text.return_value = text
+        page.extract_tables.return_value = []
+        pages.append(page)
+    pdf = MagicMock()
+    pdf.pages = pages
+    return StatementDocument("statement.pdf", opener=lambda source: nullcontext(pdf)), pages
+
+
+class TestStatementDocument(unittest.TestCase):
+    def test_fallback_reuses_extraction(self):
+        doc, pages = mock_document([
+            "Statement 2025\nDeposits\n10/01 100.00 PAYROLL",
+            "Withdrawals\n10/03 12.00 NETFLIX",
+        ])
+
+        with doc:
+            brute = BruteForceParser().parse(doc)
+            GenericPDFParser().parse_statement_loose(doc)
+            extract_transactions(doc)
+
+        self.assertEqual(list(brute["amount"]), [100.0, -12.0])
+        for page in pages:
+            self.assertEqual(page.extract_text.call_count, 1)
+            self.assertEqual(page.extract_tables.call_count, 1)
+
+    def test_reentrant_open_and_close(self):
+        pdf_bytes = build_statement_pdf(["Deposits and Other Additions", "10/01 197.90 PAYROLL"])
+        doc = StatementDocument(io.BytesIO(pdf_bytes))
+
+        with doc:
+            self.assertIs(open_document(doc), doc)
+            first = extract_transactions(doc)
+            self.assertEqual(len(doc), 1)  # still open after the parser's own `with`
+            second = extract_transactions(doc)
+        self.assertIsNone(doc.pdf)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first, extract_transactions(io.BytesIO(pdf_bytes)))
+
+    def test_calls_with_arguments_are_not_memoized(self):
+        doc, pages = mock_document(["a"])
+        with doc:
+            doc.pages[0].extract_text(layout=True)
+            doc.pages[0].extract_text(layout=True)
+            self.assertEqual(doc.pages[0].extract_text(), "a")
+        self.assertEqual(pages[0].extract_text.call_count, 3)
+
+
+
+class TestBoundedMemory(unittest.TestCase):
+    def test_iteration_releases_each_page(self):
+        doc, pages = mock_document(["Statement 2025\nWithdrawals\n10/03 12.00 NETFLIX", "b", "c"])
+        doc.low_memory, doc.window = True, 0
+
+        with doc:
+            for page in doc.pages:
+                page.extract_text()
+                self.assertEqual(pages[0].close.call_count, 0)
+                break  # leaving the loop releases the page too
+            self.assertEqual([page.close.call_count for page in pages], [1, 0, 0])
+            result = BruteForceParser(page_workers=0).parse(doc)
+            self.assertEqual([page.close.call_count for page in pages], [2, 1, 1])
+
+        self.assertEqual(list(result["amount"]), [-12.0])
+        self.assertEqual(pages[0].extract_text.call_count, 1)  # memoized text survives the release
+
+    def test_windows_match_a_regular_parse(self):
+        lines = [["Statement 2025", "Withdrawals", f"10/{day:02d} {day}.00 SHOP {day}"] for day in range(1, 6)]
+        pdf_bytes = build_statement_pdf(*lines)
+        expected = BruteForceParser(page_workers=0).parse_batch(io.BytesIO(pdf_bytes))
+
+        windows = []
+
+        def opener(source, **kwargs):
+            windows.append(kwargs.get("pages"))
+            return pdfplumber.open(source, **kwargs)
+
+        doc = StatementDocument(io.BytesIO(pdf_bytes), opener=opener, low_memory=True, window=2)
+        with track_memory() as memory, doc:
+            self.assertEqual(len(doc), 5)
+            batch = BruteForceParser(page_workers=0).parse_batch(doc)
+
+        self.assertEqual(batch, expected)
+        self.assertEqual(len(batch), 5)
+        # The whole file once to count pages, then one window at a time
+        self.assertEqual(windows, [None, [1, 2], [3, 4], [5]])
+        self.assertGreater(doc.peak_rss_bytes, 0)
+        self.assertGreaterEqual(memory.peak_rss_bytes, doc.peak_rss_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import io
+import unittest
+from unittest.mock import MagicMock, patch
+import pdfplumber
+from backend import config
+from backend.parser import extract_transaction_batch
+from backend.parsers.brute_force_parser import BruteForceParser
+from backend.parsers.generic_parser import GenericPDFParser
+from backend.parsers.page_planner import PagePlanner, _decode_strings, probe_page
+from backend.synthetic_statements import generate_statement
+
+
+class TestProbe(unittest.TestCase):
+    def test_decodes_content_stream_strings(self):
+        data = rb"BT (Deposits and \(Other\) Additions) Tj [(10/0) -20 (1)] TJ <3132> Tj (caf\351) Tj ET"
+        self.assertEqual(_decode_strings(data), ["Deposits and (Other) Additions", "10/0", "1", "12", "caf\xe9"])
+
+    def test_probe_matches_page_text(self):
+        statement = generate_statement(1, "pnc", seed=1)
+        with pdfplumber.open(io.BytesIO(statement.pdf_bytes)) as pdf:
+            text, fonts = probe_page(pdf.pages[0])
+            self.assertEqual(text.split("\n")[:2], ["PNC Bank", "Virtual Wallet Spend Statement"])
+            self.assertTrue(fonts)
+            self.assertIsNone(probe_page(MagicMock()))
+
+
+class TestPagePlanner(unittest.TestCase):
+    def parse(self, parser, pdf_bytes, enabled):
+        with patch.object(config, "PARSE_PAGE_SKIPPING", enabled):
+            return parser(io.BytesIO(pdf_bytes))
+
+    def test_skipping_leaves_results_unchanged(self):
+        statement = generate_statement(3, "pnc", seed=2, boilerplate_pages=3)
+        for parse in (
+            lambda source: BruteForceParser(page_workers=0).parse_batch(source),
+            lambda source: extract_transaction_batch(source)["transactions"],
+        ):
+            skipped = self.parse(parse, statement.pdf_bytes, True)
+            self.assertEqual(skipped, self.parse(parse, statement.pdf_bytes, False))
+            self.assertEqual(len(skipped), len(statement.transactions))
+
+    def test_boilerplate_pages_are_skipped(self):
+        statement = generate_statement(2, "table", seed=2, boilerplate_pages=3)
+        parser = GenericPDFParser()
+        with pdfplumber.open(io.BytesIO(statement.pdf_bytes)) as pdf:
+            planner = PagePlanner(["date"], dates=True, require_all=True, enabled=True)
+            self.assertTrue(planner.calibrate(pdf.pages[0], pdf.pages[0].extract_text()))
+            self.assertEqual([planner.should_parse(page) for page in pdf.pages[1:]], [True, False, False, False])
+        self.assertEqual(len(parser.parse_batch(io.BytesIO(statement.pdf_bytes))), len(statement.transactions))
+
+    def test_uncalibrated_planner_parses_every_page(self):
+        planner = PagePlanner(["deposits"], enabled=True)
+        self.assertFalse(planner.calibrate(MagicMock(), "Deposits"))
+        self.assertTrue(planner.should_parse(MagicMock()))
+
+        statement = generate_statement(1, "pnc", seed=1)
+        with pdfplumber.open(io.BytesIO(statement.pdf_bytes)) as pdf:
+            # The probe has to reproduce the first page's text to be trusted
+            self.assertFalse(planner.calibrate(pdf.pages[0], "Text the probe can't see " * 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
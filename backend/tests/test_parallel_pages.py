@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import io
+import random
+import unittest
+from contextlib import redirect_stdout
+from backend.parsers.brute_force_parser import BruteForceParser
+from backend.parsers.parallel_pages import chunk_ranges, shareable_source
+from backend.tests.test_parse_executor import build_statement_pdf
+
+
+def build_random_statement(pages, seed=7):
+    """Pages that start mid-section, switch sections mid-page, hit balance detail or are blank."""
+    rng = random.Random(seed)
+    all_pages = [["Statement Period 01/01/2024 - 12/31/2024"]]
+    for page in range(pages):
+        lines = []
+        for _ in range(rng.randint(0, 12)):
+            roll = rng.random()
+            if roll < 0.12:
+                lines.append(rng.choice(["Deposits and Other Additions", "Banking/Debit Card Withdrawals", "Checks Paid"]))
+            elif roll < 0.16:
+                lines.append("Daily Balance Detail")
+            else:
+                lines.append(f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d} {rng.randint(1, 999)}.{rng.randint(0, 99):02d} MERCHANT {page}")
+        all_pages.append(lines)
+    return build_statement_pdf(*all_pages)
+
+
+class TestParallelPages(unittest.TestCase):
+    def test_chunk_ranges_cover_pages_in_order(self):
+        ranges = chunk_ranges(1, 100, workers=4)
+        self.assertEqual(ranges[0][0], 1)
+        self.assertEqual(ranges[-1][1], 100)
+        self.assertTrue(all(a[1] == b[0] for a, b in zip(ranges, ranges[1:])))
+        self.assertEqual(chunk_ranges(1, 1, workers=4), [])
+
+    def test_shareable_source(self):
+        stream = io.BytesIO(b"%PDF")
+        stream.seek(2)
+        self.assertEqual(shareable_source(stream), b"%PDF")
+        self.assertEqual(shareable_source("statement.pdf"), "statement.pdf")
+        self.assertIsNone(shareable_source(object()))
+
+    def test_parallel_output_matches_sequential(self):
+        pdf_bytes = build_random_statement(60)
+
+        with redirect_stdout(io.StringIO()):
+            sequential = list(BruteForceParser(page_workers=0).iter_pages(io.BytesIO(pdf_bytes)))
+            parallel = list(BruteForceParser(page_workers=2, parallel_min_pages=2).iter_pages(io.BytesIO(pdf_bytes)))
+            frame = BruteForceParser(page_workers=2, parallel_min_pages=2).parse(io.BytesIO(pdf_bytes))
+
+        self.assertGreater(sum(len(page[2]) for page in sequential), 100)
+        self.assertEqual(parallel, sequential)
+        self.assertEqual(len(frame), sum(len(page[2]) for page in sequential))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import asyncio
+import tempfile
+import unittest
+from backend.parse_cache import ParseCache
+from backend.parse_executor import PARSER_VERSION, ParseExecutor
+
+
+def payload(n):
+    return {"meta": {"ending_balance": 1.0}, "transactions": [{"desc": f"TX {i} " * 20} for i in range(n)]}
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_miss_and_persistence(self):
+        cache = ParseCache(path=self.path, max_bytes=10**6)
+        key = cache.make_key("abc", "pnc", "1")
+
+        self.assertIsNone(cache.get(key))
+        cache.put(key, payload(2))
+        self.assertEqual(cache.get(key), payload(2))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        cache.close()
+
+        reopened = ParseCache(path=self.path, max_bytes=10**6)
+        self.assertEqual(reopened.get(key), payload(2))
+        self.assertIsNone(reopened.get(cache.make_key("abc", "pnc", "2")))
+        reopened.close()
+
+    def test_lru_eviction_by_size(self):
+        cache = ParseCache(path=self.path, max_bytes=10**6)
+        cache.put("probe", payload(50))
+        entry_size = cache.stats()["bytes"]
+        cache.clear()
+        cache.close()
+
+        cache = ParseCache(path=self.path, max_bytes=int(entry_size * 2.5))
+        cache.put("a", payload(50))
+        cache.put("b", payload(50))
+        cache.get("a")  # b is now least recently used
+        cache.put("c", payload(50))
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        cache.close()
+
+    def test_executor_serves_repeat_parse_from_cache(self):
+        cache = ParseCache(path=self.path, max_bytes=10**6)
+        executor = ParseExecutor(max_workers=0, task_timeout=5, cache=cache)
+        cache.put(cache.make_key("sha", "pnc", PARSER_VERSION), payload(1))
+
+        # A miss would reach the parser (and fail on these bytes)
+        result = asyncio.run(executor.run("pnc", b"not a pdf", content_hash="sha"))
+        self.assertEqual(result, payload(1))
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,263 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from fpdf import FPDF
+from backend import metrics
+from backend.parse_cache import ParseCache
+from backend.parse_executor import ParseExecutor, ParseTimeoutError, PARSERS, STREAM_PARSERS
+from backend.transactions import TransactionBatch
+
+
+def build_statement_pdf(lines, *more_pages):
+    """Each positional argument is the list of text lines for one page."""
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=10)
+    for page_lines in (lines,) + more_pages:
+        pdf.add_page()
+        for line in page_lines:
+            pdf.cell(0, 6, text=line, new_x="LMARGIN", new_y="NEXT")
+    return bytes(pdf.output())
+
+
+def slow_parse(source, progress=None):
+    """Test parser: `source` is how many seconds to take."""
+    time.sleep(float(source))
+    return TransactionBatch()
+
+
+def slow_pages(source):
+    """Test stream parser: two pages, each taking `source` seconds."""
+    for page in (1, 2):
+        time.sleep(float(source))
+        yield page, 2, TransactionBatch()
+    return {"pages": 2}
+
+
+class TestParseExecutor(unittest.TestCase):
+    def test_parse_runs_in_worker_process(self):
+        pdf_bytes = build_statement_pdf([
+            "Deposits and Other Additions",
+            "10/01 197.90 FD SPTSBK CASINO",
+            "Banking/Debit Card Withdrawals",
+            "10/03 12.00 NETFLIX",
+        ])
+        executor = ParseExecutor(max_workers=1, task_timeout=60, max_tasks_per_child=2)
+        try:
+            executor.start()
+            result = asyncio.run(executor.run("pnc", pdf_bytes))
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(len(result["transactions"]), 2)
+        self.assertEqual(result["transactions"][0]["type"], "INCOME")
+        self.assertEqual(result["transactions"][1]["desc"], "NETFLIX")
+
+    def test_unknown_parser_is_rejected(self):
+        executor = ParseExecutor(max_workers=0, task_timeout=5)
+        with self.assertRaises(ValueError):
+            asyncio.run(executor.run("no_such_parser", b""))
+
+    def test_timeout(self):
+        executor = ParseExecutor(max_workers=0, task_timeout=0.1)
+        with patch.dict(PARSERS, {"sleep": "time:sleep"}):
+            with self.assertRaises(ParseTimeoutError):
+                asyncio.run(executor.run("sleep", 1))
+
+    def test_queued_time_does_not_count_against_timeout(self):
+        executor = ParseExecutor(max_workers=1, task_timeout=2, max_tasks_per_child=10)
+
+        async def burst():
+            return await asyncio.gather(*(executor.run("slow", "0.8") for _ in range(4)))
+
+        with patch.dict(PARSERS, {"slow": "backend.tests.test_parse_executor:slow_parse"}):
+            try:
+                executor.start()
+                results = asyncio.run(burst())
+            finally:
+                executor.shutdown()
+        self.assertEqual(len(results), 4)
+
+    def test_timeout_kills_only_the_stuck_worker(self):
+        executor = ParseExecutor(max_workers=2, task_timeout=1.5, max_tasks_per_child=10)
+
+        async def mixed():
+            stuck = asyncio.ensure_future(executor.run("slow", "30"))
+            await asyncio.sleep(0.2)
+            healthy = await asyncio.gather(*(executor.run("slow", "0.5") for _ in range(3)))
+            return await asyncio.gather(stuck, return_exceptions=True), healthy
+
+        with patch.dict(PARSERS, {"slow": "backend.tests.test_parse_executor:slow_parse"}):
+            try:
+                executor.start()
+                (stuck,), healthy = asyncio.run(mixed())
+                # The replacement worker takes new parses
+                again = asyncio.run(executor.run("slow", "0.1"))
+            finally:
+                executor.shutdown()
+        self.assertIsInstance(stuck, ParseTimeoutError)
+        self.assertEqual(len(healthy), 3)
+        self.assertEqual(len(again["transactions"]), 0)
+
+    def test_open_files_reach_the_worker(self):
+        pdf_bytes = build_statement_pdf(["Banking/Debit Card Withdrawals", "10/03 12.00 NETFLIX"])
+        executor = ParseExecutor(max_workers=1, task_timeout=60)
+        try:
+            executor.start()
+            for max_size in (1, len(pdf_bytes) * 2):
+                # Rolled over to disk (passed as a descriptor) and in memory (read off the loop)
+                with tempfile.SpooledTemporaryFile(max_size=max_size) as spool:
+                    spool.write(pdf_bytes)
+                    spool.seek(0)
+                    result = asyncio.run(executor.run("pnc", spool))
+                self.assertEqual(result["transactions"][0]["desc"], "NETFLIX")
+        finally:
+            executor.shutdown()
+
+    def test_cancelled_parse_keeps_its_file_until_dispatched(self):
+        pdf_bytes = build_statement_pdf(["Banking/Debit Card Withdrawals", "10/03 12.00 NETFLIX"])
+        other_bytes = build_statement_pdf(["Banking/Debit Card Withdrawals", "10/04 9.99 SPOTIFY"])
+        executor = ParseExecutor(max_workers=1, task_timeout=60, cache=ParseCache(path=""))
+        results = []
+        call = executor._call
+
+        def recording_call(task, source, fd):
+            results.append(call(task, source, fd))
+            return results[-1]
+
+        async def cancel_while_workers_are_busy():
+            # A stream holds the only worker, so the parse waits for it in _checkout
+            streaming = threading.Thread(target=lambda: list(executor.stream("slow", "1")))
+            streaming.start()
+            await asyncio.sleep(0.3)
+
+            # Rolled over to disk, so handed to the worker as a descriptor
+            spool = tempfile.SpooledTemporaryFile(max_size=1)
+            spool.write(pdf_bytes)
+            parse = asyncio.ensure_future(executor.run("pnc", spool))
+            await asyncio.sleep(0.3)
+            # What JobManager.cancel does to a running job
+            parse.cancel()
+            spool.close()
+            with self.assertRaises(asyncio.CancelledError):
+                await parse
+
+            # Likely reuses the closed upload's descriptor number
+            with tempfile.TemporaryFile() as other:
+                other.write(other_bytes)
+                other.flush()
+                await asyncio.to_thread(streaming.join)
+                for _ in range(100):
+                    if results:
+                        break
+                    await asyncio.sleep(0.05)
+
+        with patch.dict(STREAM_PARSERS, {"slow": "backend.tests.test_parse_executor:slow_pages"}), \
+                patch.object(executor, "_call", recording_call):
+            try:
+                executor.start()
+                workers = set(executor._workers)
+                asyncio.run(cancel_while_workers_are_busy())
+                # No worker was killed for a bad descriptor
+                self.assertEqual(set(executor._workers), workers)
+            finally:
+                executor.shutdown()
+
+        # The dispatched parse still read its own statement
+        self.assertEqual([t["desc"] for t in results[0][0]["transactions"]], ["NETFLIX"])
+
+
+class TestParseStream(unittest.TestCase):
+    PAGES = (
+        ["Deposits and Other Additions", "10/01 197.90 FD SPTSBK CASINO"],
+        ["Banking/Debit Card Withdrawals", "10/03 12.00 NETFLIX", "10/04 4.50 COFFEE"],
+        ["Ending balance $1,000.00"],
+    )
+
+    def test_stream_yields_pages_matching_batch_result(self):
+        pdf_bytes = build_statement_pdf(*self.PAGES)
+        executor = ParseExecutor(max_workers=0, task_timeout=60, cache=ParseCache(path=""))
+
+        events = list(executor.stream("pnc", pdf_bytes))
+        batch = asyncio.run(executor.run("pnc", pdf_bytes))
+
+        self.assertEqual([e["page"] for e in events[:-1]], [1, 2, 3])
+        self.assertEqual([len(e["transactions"]) for e in events[:-1]], [1, 2, 0])
+        # Section state carries across the page break
+        self.assertEqual(events[1]["transactions"][0]["type"], "EXPENSE")
+        self.assertEqual(events[-1], {"event": "end", "meta": batch["meta"], "cached": False})
+        streamed = [t for e in events[:-1] for t in e["transactions"]]
+        self.assertEqual(streamed, batch["transactions"])
+
+    def test_stream_fills_and_replays_cache(self):
+        pdf_bytes = build_statement_pdf(*self.PAGES)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParseCache(path=os.path.join(tmp, "cache.sqlite3"))
+            executor = ParseExecutor(max_workers=0, task_timeout=60, cache=cache)
+
+            first = list(executor.stream("pnc", pdf_bytes, content_hash="abc"))
+            replay = list(executor.stream("pnc", pdf_bytes, content_hash="abc"))
+            cached = asyncio.run(executor.run("pnc", pdf_bytes, content_hash="abc"))
+            cache.close()
+
+        self.assertTrue(replay[-1]["cached"])
+        self.assertEqual(len(replay), 2)
+        self.assertEqual(replay[0]["transactions"], cached["transactions"])
+        self.assertEqual(len(cached["transactions"]), sum(len(e.get("transactions", [])) for e in first))
+
+    def test_class_parsers_stream(self):
+        pdf_bytes = build_statement_pdf(*self.PAGES)
+        executor = ParseExecutor(max_workers=0, task_timeout=60, cache=ParseCache(path=""))
+
+        events = list(executor.stream("brute_force", pdf_bytes))
+        amounts = [t["amount"] for e in events[:-1] for t in e["transactions"]]
+        self.assertEqual(amounts, [197.90, -12.00, -4.50])
+
+        with self.assertRaises(ValueError):
+            list(executor.stream("pnc_statement", pdf_bytes))
+
+    def test_stream_runs_on_worker(self):
+        pdf_bytes = build_statement_pdf(*self.PAGES)
+        in_thread = ParseExecutor(max_workers=0, task_timeout=60, cache=ParseCache(path=""))
+        expected = list(in_thread.stream("pnc", pdf_bytes))
+
+        executor = ParseExecutor(max_workers=1, task_timeout=60, cache=ParseCache(path=""))
+        try:
+            executor.start()
+            events = list(executor.stream("pnc", pdf_bytes))
+        finally:
+            executor.shutdown()
+        self.assertEqual([(e["page"], list(e["transactions"])) for e in events[:-1]],
+                         [(e["page"], list(e["transactions"])) for e in expected[:-1]])
+        self.assertEqual(events[-1], expected[-1])
+
+    def test_stream_timeout_interrupts_a_page(self):
+        executor = ParseExecutor(max_workers=1, task_timeout=1, cache=ParseCache(path=""))
+        timeouts = metrics.parse_seconds.count(parser="slow", outcome="timeout")
+        with patch.dict(STREAM_PARSERS, {"slow": "backend.tests.test_parse_executor:slow_pages"}):
+            try:
+                executor.start()
+                started = time.monotonic()
+                with self.assertRaises(ParseTimeoutError):
+                    list(executor.stream("slow", "30"))
+                self.assertLess(time.monotonic() - started, 10)
+
+                # Closing a stream early abandons the worker's parse
+                events = executor.stream("slow", "0.5")
+                next(events)
+                events.close()
+                # Both runs left a fresh worker behind
+                self.assertEqual(list(executor.stream("slow", "0.1"))[-1]["meta"], {"pages": 2})
+            finally:
+                executor.shutdown()
+        self.assertEqual(metrics.parse_seconds.count(parser="slow", outcome="timeout"), timeouts + 1)
+        self.assertGreaterEqual(metrics.parse_seconds.count(parser="slow", outcome="cancelled"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import re
+import unittest
+from backend.metrics import observe_stage
+from backend.profiling import profile_block, profiling_requested
+
+
+class TestProfiling(unittest.TestCase):
+    def test_profile_report(self):
+        pattern = re.compile(r"(\d+)\s+(\w+)")
+        with profile_block(top_n=5) as report:
+            observe_stage("test", "scan", 0.25)
+            observe_stage("test", "scan", 0.5)
+            for _ in range(200):
+                pattern.findall("10 apples 20 pears " * 20)
+
+        self.assertEqual(report["stages"], {"test.scan": {"seconds": 0.75, "calls": 2}})
+        self.assertIn("re", report["packages"])
+        self.assertLessEqual(len(report["top_functions"]), 5)
+        self.assertTrue(all({"function", "calls", "tottime", "cumtime"} <= set(f) for f in report["top_functions"]))
+        self.assertGreater(report["wall_seconds"], 0)
+
+    def test_profiling_requested(self):
+        self.assertTrue(profiling_requested(True, None))
+        self.assertTrue(profiling_requested(False, "1"))
+        self.assertTrue(profiling_requested(False, "true"))
+        self.assertFalse(profiling_requested(False, None))
+        self.assertFalse(profiling_requested(False, "0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import json
+import pickle
+import random
+import unittest
+from unittest.mock import patch
+from backend.detective import SubscriptionScanner
+from thefuzz import fuzz
+from backend.fuzzy_groups import GroupIndex, group_descriptions
+from backend.recurring_state import RecurringState
+from backend.transactions import as_batch
+
+
+NAMES = [
+    "NETFLIX.COM", "NETFLX.COM", "SPOTIFY USA", "PLANET FITNESS Club Fees", "GEICO AUTO PPD",
+    "SHELL OIL 5744", "***", "Mbrshp GYM", "AMAZON MKTPL",
+]
+
+
+def random_transactions(rng, count):
+    transactions = []
+    for _ in range(count):
+        if rng.random() < 0.05:
+            date = "not a date"
+        elif rng.random() < 0.8:
+            date = f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}"
+        else:
+            date = f"{rng.randrange(1, 13):02d}/{rng.randrange(1, 29):02d}/2024"
+        transactions.append({"date": date, "description": rng.choice(NAMES), "amount": rng.choice([15.49, 9.99, 30.0])})
+    return transactions
+
+
+def monthly(description, amount, months):
+    return [{"date": f"2025-{month:02d}-05", "description": description, "amount": amount} for month in months]
+
+
+class TestGroupIndex(unittest.TestCase):
+    def test_appending_matches_grouping_everything(self):
+        rng = random.Random(1)
+        descriptions = [rng.choice(NAMES) + rng.choice(["", " 0042", " X1"]) for _ in range(200)] + ["", ""]
+        rng.shuffle(descriptions)
+        expected = {index: group[0] for group in group_descriptions(descriptions) for index in group}
+
+        index = GroupIndex()
+        assigned = []
+        for start in range(0, len(descriptions), 37):
+            assigned.extend(index.add(descriptions[start:start + 37]))
+            index = GroupIndex.restore(json.loads(json.dumps(index.snapshot())))
+        self.assertEqual(assigned, [expected[i] for i in range(len(descriptions))])
+
+    def test_appending_applies_the_same_blocking(self):
+        # Each pair scores above the threshold but shares no token prefix or
+        # suffix, so grouping everything at once never compares it
+        pairs = [("netflix", "xnetflixy"), ("amazon prime", "xamazonx xprimex"), ("hulu", "hulu plus")]
+        for old, new in pairs:
+            self.assertGreater(fuzz.token_set_ratio(old, new), 80)
+            descriptions = [old, "gym 24", new]
+            expected = {index: group[0] for group in group_descriptions(descriptions) for index in group}
+
+            index = GroupIndex()
+            assigned = index.add(descriptions[:2]) + index.add(descriptions[2:])
+            self.assertEqual(assigned, [expected[i] for i in range(len(descriptions))], new)
+
+
+class TestRecurringState(unittest.TestCase):
+    def test_updates_match_full_scan(self):
+        for seed in range(50):
+            rng = random.Random(seed)
+            transactions = random_transactions(rng, rng.randrange(1, 80))
+            state = RecurringState()
+            start = 0
+            while start < len(transactions):
+                step = rng.randrange(1, 20)
+                state.update(transactions[start:start + step])
+                start += step
+                if rng.random() < 0.5:
+                    state = RecurringState.restore(json.loads(json.dumps(state.snapshot())))
+            self.assertEqual(state.candidates(), SubscriptionScanner().scan(transactions), seed)
+
+    def test_small_updates_keep_the_candidate_order(self):
+        rng = random.Random(7)
+        transactions = random_transactions(rng, 600)
+        # Many (description, amount) keys, so a few changed keys are re-sorted in place
+        for transaction in transactions:
+            transaction["amount"] = rng.randrange(1, 40) + 0.99
+        state = RecurringState()
+        state.update(transactions[:500])
+        start = 500
+        while start < len(transactions):
+            step = rng.randrange(1, 4)
+            grown = state.update(transactions[start:start + step])
+            start += step
+            self.assertGreater(grown, 0)
+            self.assertEqual(state.candidates(), SubscriptionScanner().scan(transactions[:start]), start)
+
+    def test_batches_and_pickling(self):
+        transactions = monthly("Debit Card Purchase NETFLIX.COM", 15.49, [1, 2, 3]) + monthly("GEICO AUTO PPD", 98.5, [1])
+        batch = as_batch(transactions)
+        state = RecurringState()
+        state.update(batch.take(range(2)))
+        state = pickle.loads(pickle.dumps(state))
+        state.update(batch.take(range(2, len(batch))))
+        self.assertEqual(state.count, 4)
+        self.assertEqual(state.candidates(), SubscriptionScanner().scan(batch))
+
+    def test_out_of_order_month_moves_the_interval(self):
+        state = RecurringState()
+        state.update(monthly("SPOTIFY USA", 11.99, [1, 3]))
+        self.assertEqual(state.candidates(), [])
+        # February lands between the two: both gaps are now monthly
+        state.update(monthly("SPOTIFY USA", 11.99, [2]))
+        self.assertEqual(
+            [(c["merchant"], c["confidence"], c["detected_date"]) for c in state.candidates()],
+            [("SPOTIFY USA", "High", "2025-01-05")],
+        )
+        self.assertEqual(state.keys[0].last_seen, state.members[0][-1][0])
+
+    def test_update_only_processes_new_transactions(self):
+        state = RecurringState()
+        state.update(monthly("SPOTIFY USA", 11.99, range(1, 13)))
+        scanner = state.scanner
+        with patch.object(scanner, "normalize", wraps=scanner.normalize) as normalize, \
+                patch("backend.fuzzy_groups.group_descriptions", wraps=group_descriptions) as group:
+            state.update(monthly("NETFLIX.COM", 15.49, [1]))
+        self.assertEqual(len(normalize.call_args.args[0]), 1)
+        self.assertEqual(group.call_args.args[0], ["netflix com"])
+
+    def test_rejects_unknown_snapshot_version(self):
+        with self.assertRaises(ValueError):
+            RecurringState.restore({"version": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import json
+import random
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from backend import search_index
+from backend.search_index import FUZZY_THRESHOLD, CatalogIndex, trigrams
+
+
+CATALOG = [
+    {"id": "heinz_ketchup", "name_brand": "Heinz Ketchup", "price": 4.99},
+    {"id": "hunts_ketchup", "name_brand": "Hunt's Tomato Ketchup", "price": 3.49},
+    {"id": "tide_pods", "name_brand": "Tide Pods", "price": 12.99},
+    {"id": "cheerios", "name_brand": "Cheerios", "price": 4.29},
+    {"id": "honey_cheerios", "name_brand": "Honey Nut Cheerios", "price": 4.79},
+]
+
+
+class TestCatalogIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "swaps.json")
+        self.write(CATALOG)
+        self.index = CatalogIndex(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, items):
+        with open(self.path, "w") as f:
+            json.dump(items, f)
+
+    def ids(self, query, limit=5):
+        return [item["id"] for _, item in self.index.search(query, limit=limit)]
+
+    def test_exact_and_substring_rank_first(self):
+        self.assertEqual(self.ids("heinz ketchup")[0], "heinz_ketchup")
+        self.assertEqual(self.ids("cheerios")[0], "cheerios")
+        self.assertEqual(self.ids("Tide")[0], "tide_pods")
+
+    def test_prefix_and_typo_matches(self):
+        self.assertEqual(set(self.ids("ketch")), {"heinz_ketchup", "hunts_ketchup"})
+        self.assertEqual(self.ids("cheerois")[:2], ["cheerios", "honey_cheerios"])
+
+    def test_scores_are_ranked_and_limited(self):
+        results = self.index.search("ketchup", limit=1)
+        self.assertEqual(len(results), 1)
+        scores = [score for score, _ in self.index.search("ketchup")]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(self.index.search("zzzz"), [])
+
+    def test_reloads_when_catalog_changes(self):
+        self.assertEqual(len(self.index), 5)
+        time.sleep(0.01)
+        self.write(CATALOG + [{"id": "gv_ketchup", "name_brand": "Great Value Ketchup"}])
+        os.utime(self.path, ns=(time.time_ns(), time.time_ns() + 10**9))
+
+        self.assertEqual(len(self.index), 6)
+        self.assertIn("gv_ketchup", self.ids("great value"))
+
+    def test_rare_trigram_probe_finds_every_fuzzy_match(self):
+        rng = random.Random(6)
+        words = ["".join(rng.choice("abcdeo") for _ in range(rng.randrange(1, 9))) for _ in range(400)]
+        self.write([{"id": str(n), "name_brand": word} for n, word in enumerate(words)])
+        snapshot = self.index._ensure_loaded()
+
+        for query in words[:60] + ["cheerois", "x", "abcabcabc"]:
+            q_grams = trigrams(query)
+            expected = {
+                token
+                for token, grams in snapshot.token_trigrams.items()
+                if 2.0 * len(q_grams & grams) / (len(q_grams) + len(grams)) >= FUZZY_THRESHOLD
+            }
+            found = set(CatalogIndex._expand_token(snapshot, query))
+            self.assertTrue(expected <= found, query)
+
+    def test_common_trigrams_are_not_walked(self):
+        with patch.object(search_index, "MAX_TRIGRAM_POSTINGS", 0):
+            self.assertEqual(self.ids("cheerois"), [])
+            self.assertEqual(self.ids("ketch")[0], "heinz_ketchup")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import tempfile
+import threading
+import time
+import pickle
+import unittest
+from unittest.mock import patch
+from backend import main
+from backend.detective import SubscriptionScanner
+from backend.session_store import SessionStore
+from backend.transactions import TransactionBatch, as_batch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def transactions(n):
+    return {"transactions": [{"date": "2025-10-01", "amount": float(i), "desc": f"TX {i}"} for i in range(n)]}
+
+
+class TestSessionStore(unittest.TestCase):
+    def test_sessions_are_isolated(self):
+        store = SessionStore(ttl_seconds=60, max_bytes=10**6, max_sessions=10, spill_dir="")
+        alice, bob = store.new_token(), store.new_token()
+        store.put(alice, transactions(1))
+        store.put(bob, transactions(2))
+
+        self.assertEqual(len(store.get(alice)["transactions"]), 1)
+        self.assertEqual(len(store.get(bob)["transactions"]), 2)
+        self.assertIsNone(store.get("not-a-valid-token"))
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        store = SessionStore(ttl_seconds=60, max_bytes=10**6, max_sessions=10, spill_dir="", clock=clock)
+        token = store.put(store.new_token(), transactions(1))
+
+        clock.now += 30
+        self.assertIsNotNone(store.get(token))
+        clock.now += 61
+        self.assertIsNone(store.get(token))
+        self.assertEqual(len(store), 0)
+
+    def test_lru_eviction_under_budget(self):
+        store = SessionStore(ttl_seconds=60, max_bytes=10**6, max_sessions=2, spill_dir="")
+        first, second, third = (store.new_token() for _ in range(3))
+        store.put(first, transactions(1))
+        store.put(second, transactions(1))
+        store.get(first)  # second is now least recently used
+        store.put(third, transactions(1))
+
+        self.assertIsNotNone(store.get(first))
+        self.assertIsNone(store.get(second))
+        self.assertIsNotNone(store.get(third))
+        self.assertEqual(store.stats()["evictions"], 1)
+
+    def test_memory_budget_spills_to_disk(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            store = SessionStore(ttl_seconds=60, max_bytes=2000, max_sessions=100, spill_dir=spill_dir)
+            cold, hot = store.new_token(), store.new_token()
+            store.put(cold, transactions(40))
+            store.put(hot, transactions(40))
+
+            stats = store.stats()
+            self.assertEqual(stats["spills"], 1)
+            self.assertEqual(stats["spilled_sessions"], 1)
+            self.assertLessEqual(stats["bytes"], 2000)
+
+            # Reloading the cold session spills the other one in its place
+            self.assertEqual(len(store.get(cold)["transactions"]), 40)
+            self.assertEqual(len(os.listdir(spill_dir)), 1)
+            self.assertEqual(len(store.get(hot)["transactions"]), 40)
+
+    def test_update_remeasures_size(self):
+        store = SessionStore(ttl_seconds=60, max_bytes=10**6, max_sessions=10, spill_dir="")
+        token = store.put(store.new_token(), transactions(1))
+        before = store.stats()["bytes"]
+
+        result = store.update(token, lambda data: ({**data, "derived": list(range(1000))}, "done"))
+        self.assertEqual(result, "done")
+        self.assertEqual(len(store.get(token)["derived"]), 1000)
+        self.assertGreater(store.stats()["bytes"], before + 1000)
+        self.assertEqual(store.update(store.new_token(), lambda data: (data, "done"), default="none"), "none")
+
+    def test_update_can_report_its_size_change(self):
+        store = SessionStore(ttl_seconds=60, max_bytes=10**6, max_sessions=10, spill_dir="")
+        token = store.put(store.new_token(), transactions(1))
+        before = store.stats()["bytes"]
+
+        # Not picklable: the store must take the reported change instead of measuring
+        result = store.update(token, lambda data: ({**data, "derived": lambda: None}, "done", 250))
+        self.assertEqual(result, "done")
+        self.assertEqual(store.stats()["bytes"], before + 250)
+
+    def test_updates_of_one_session_run_in_turn(self):
+        store = SessionStore(ttl_seconds=60, max_bytes=10**6, max_sessions=10, spill_dir="")
+        token = store.put(store.new_token(), {"count": 0})
+
+        def increment(data):
+            count = data["count"]
+            time.sleep(0.01)
+            return {"count": count + 1}, None
+
+        threads = [threading.Thread(target=store.update, args=(token, increment)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(store.get(token)["count"], 8)
+
+    def test_session_being_updated_is_not_evicted(self):
+        store = SessionStore(ttl_seconds=60, max_bytes=10**6, max_sessions=1, spill_dir="")
+        busy, other = store.new_token(), store.new_token()
+        store.put(busy, transactions(1))
+
+        def replace_other(data):
+            store.put(other, transactions(1))
+            return {**data, "derived": True}, None
+
+        store.update(busy, replace_other)
+        self.assertTrue(store.get(busy)["derived"])
+
+    def test_update_drops_data_if_session_was_replaced(self):
+        store = SessionStore(ttl_seconds=60, max_bytes=10**6, max_sessions=10, spill_dir="")
+        token = store.put(store.new_token(), transactions(1))
+
+        def replaced_meanwhile(data):
+            store.put(token, transactions(2))
+            return {**data, "derived": True}, None
+
+        store.update(token, replaced_meanwhile)
+        self.assertNotIn("derived", store.get(token))
+        self.assertEqual(len(store.get(token)["transactions"]), 2)
+
+
+class TestSessionTransactions(unittest.TestCase):
+    def test_appends_grow_the_session_copy_in_place(self):
+        store = SessionStore(ttl_seconds=60, max_bytes=10**7, max_sessions=10, spill_dir="")
+        uploads = [
+            as_batch([
+                {"date": f"2025-{month:02d}-{day:02d}", "description": f"SHOP {day * month % 37}", "amount": -1.5 * day}
+                for day in range(1, 29)
+            ] + [{"date": f"2025-{month:02d}-05", "description": "NETFLIX.COM", "amount": -15.49}])
+            for month in range(1, 5)
+        ]
+        with patch.object(main, "session_store", store):
+            token = store.new_token()
+            main.store_session_transactions(token, {"transactions": uploads[0]})
+            main.analyze_session_subscriptions(token)
+            stored = store.get(token)["transactions"]
+            # The result's own batch (a job keeps it) is left alone
+            self.assertIsNot(stored, uploads[0])
+
+            for upload in uploads[1:]:
+                with patch.object(TransactionBatch, "concat", side_effect=AssertionError):
+                    main.store_session_transactions(token, {"transactions": upload}, append=True)
+                subscriptions = main.analyze_session_subscriptions(token)
+
+            session = store.get(token)
+            self.assertIs(session["transactions"], stored)
+            self.assertEqual(len(stored), 4 * 29)
+            self.assertEqual(len(uploads[0]), 29)
+            self.assertEqual(subscriptions, SubscriptionScanner().scan(stored))
+            # The tracked size stays close to the measured one
+            measured = len(pickle.dumps(session, protocol=pickle.HIGHEST_PROTOCOL))
+            self.assertLess(abs(store.stats()["bytes"] - measured), measured * 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import asyncio
+import io
+import unittest
+from unittest.mock import MagicMock, patch
+from backend import metrics
+from backend.parse_executor import ParseExecutor
+from backend.parsers.page_cache import StatementDocument
+from backend.parsers.strategies.fingerprint import Fingerprint, classify_layout, fingerprint_document, identify_institution
+from backend.parsers.strategies.registry import Strategy, StrategyRegistry, planned_with, strategy_registry
+from backend.tests.test_page_cache import mock_document
+from backend.tests.test_parse_executor import build_statement_pdf
+
+
+PNC_PAGE = [
+    "PNC Bank Virtual Wallet Statement 2025",
+    "Deposits and Other Additions",
+    "10/01 197.90 FD SPTSBK CASINO",
+    "Banking/Debit Card Withdrawals",
+    "10/03 12.00 NETFLIX",
+]
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_institution_needs_several_phrases(self):
+        self.assertEqual(identify_institution("\n".join(PNC_PAGE)), "pnc")
+        self.assertEqual(identify_institution("Deposits and Other Additions"), "unknown")
+
+    def test_layout(self):
+        self.assertEqual(classify_layout("10/01 197.90 PAYROLL\n10/02 5.00 COFFEE")[0], "amount_first")
+        self.assertEqual(classify_layout("10/01 PAYROLL 197.90\n10/02 COFFEE $5.00")[0], "amount_last")
+        self.assertEqual(classify_layout("Account summary")[0], "unknown")
+        self.assertEqual(classify_layout("")[0], "no_text")
+
+    def test_reads_only_the_first_page(self):
+        doc, pages = mock_document(["\n".join(PNC_PAGE), "10/05 1.00 LATER"])
+        with doc:
+            fingerprint = fingerprint_document(doc)
+        self.assertEqual(fingerprint.key, "pnc/amount_first")
+        self.assertEqual(fingerprint.page_count, 2)
+        pages[1].extract_text.assert_not_called()
+        pages[1].extract_tables.assert_not_called()
+
+
+class TestStrategyRegistry(unittest.TestCase):
+    def make_registry(self, outcomes):
+        """outcomes: strategy name -> (cost, accepts, transactions or exception)"""
+        registry = StrategyRegistry()
+        calls = []
+        for name, (cost, accepts, outcome) in outcomes.items():
+            strategy = Strategy(name, name, cost, lambda fingerprint, accepts=accepts: accepts)
+
+            def run(doc, progress=None, name=name, outcome=outcome):
+                calls.append(name)
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return {"meta": {}, "transactions": outcome}
+
+            strategy.run = run
+            registry.register(strategy)
+        return registry, calls
+
+    def test_accepted_strategies_run_first_then_cheapest_fallback(self):
+        registry, calls = self.make_registry({
+            "tables": (5, False, [{"amount": 1.0}]),
+            "text": (1, False, ValueError("Parsed 0 transactions")),
+            "matched": (6, True, []),
+        })
+        doc, _ = mock_document(["Account summary"])
+
+        result = registry.parse(doc)
+
+        self.assertEqual(calls, ["matched", "text", "tables"])
+        self.assertEqual(result["transactions"], [{"amount": 1.0}])
+        self.assertEqual(result["meta"]["strategy"]["name"], "tables")
+        self.assertEqual([a["ok"] for a in result["meta"]["strategy"]["attempts"]], [False, False, True])
+
+        stats = registry.stats()["unknown/unknown"]
+        self.assertEqual(stats["matched"], {"attempts": 1, "successes": 0, "success_rate": 0.0})
+        self.assertEqual(stats["tables"]["successes"], 1)
+
+    def test_failures_demote_a_strategy(self):
+        registry, calls = self.make_registry({
+            "cheap": (1, False, []),
+            "dear": (2, False, [{"amount": 1.0}]),
+        })
+        doc, _ = mock_document(["Account summary"])
+        for _ in range(3):
+            registry.parse(doc)
+
+        # After two failures cheap's expected cost, 1 / (1/4), exceeds dear's 2 / (3/4)
+        self.assertEqual(calls[-1:], ["dear"])
+        self.assertEqual(len(calls), 5)
+
+    def test_pnc_statement_routes_to_text_parser_without_table_extraction(self):
+        pdf_bytes = build_statement_pdf(PNC_PAGE)
+        doc = StatementDocument(io.BytesIO(pdf_bytes))
+        strategy_registry.reset_stats()
+
+        with doc:
+            page = doc.pages[0].page
+            with patch.object(type(page), "extract_tables", MagicMock(side_effect=AssertionError)):
+                result = strategy_registry.parse(doc)
+
+        self.assertEqual(result["meta"]["strategy"]["name"], "pnc")
+        self.assertEqual(len(result["meta"]["strategy"]["attempts"]), 1)
+        self.assertEqual([t["desc"] for t in result["transactions"]], ["FD SPTSBK CASINO", "NETFLIX"])
+
+    def test_auto_parser_records_attempt_metrics(self):
+        pdf_bytes = build_statement_pdf(["Statement 2025", "10/01 PAYROLL 100.00", "10/02 COFFEE 4.50"])
+        before = metrics.parse_strategy_attempts.value(strategy="pnc", outcome="failed")
+
+        executor = ParseExecutor(max_workers=0, task_timeout=60)
+        result = asyncio.run(executor.run("auto", pdf_bytes))
+
+        self.assertEqual(result["meta"]["strategy"]["fingerprint"]["layout"], "amount_last")
+        self.assertEqual(metrics.parse_strategy_attempts.value(strategy="pnc", outcome="failed"), before + 1)
+
+    def test_worker_outcomes_are_recorded_in_the_parent(self):
+        pdf_bytes = build_statement_pdf(["Statement 2025", "10/01 PAYROLL 100.00", "10/02 COFFEE 4.50"])
+        fingerprint = Fingerprint("unknown", "amount_last", 1)
+        strategy_registry.reset_stats()
+        for _ in range(10):
+            strategy_registry.record(fingerprint, "generic_tables", False)
+
+        # Every parse runs on a fresh worker
+        executor = ParseExecutor(max_workers=1, task_timeout=60, max_tasks_per_child=1)
+        try:
+            results = [asyncio.run(executor.run("auto", pdf_bytes)) for _ in range(2)]
+        finally:
+            executor.shutdown()
+
+        # The workers planned with the parent's statistics...
+        for result in results:
+            self.assertEqual(result["meta"]["strategy"]["attempts"][0]["strategy"], "generic_loose")
+        # ...and their outcomes were recorded there
+        stats = strategy_registry.stats()[fingerprint.key]
+        self.assertEqual(stats["generic_tables"]["attempts"], 12)
+        self.assertEqual(stats["pnc"]["attempts"], 2)
+
+    def test_planned_with_defers_recording(self):
+        registry = StrategyRegistry([
+            Strategy("cheap", "pnc", cost=1, accepts=lambda f: True),
+            Strategy("dear", "brute_force", cost=2, accepts=lambda f: True),
+        ])
+        doc, _ = mock_document(["10/01 PAYROLL 100.00"])
+        # cheap failed three times in the recording process: 1 / (1/5) > 2 / (1/2)
+        stats = {("unknown/amount_last", "cheap"): (3, 0)}
+        parsed = {"meta": {}, "transactions": [{"desc": "PAYROLL"}]}
+
+        with planned_with(stats), patch("backend.parsers.strategies.registry.resolve_parser", return_value=lambda doc: parsed):
+            result = registry.parse(doc)
+
+        self.assertEqual([a["strategy"] for a in result["meta"]["strategy"]["attempts"]], ["dear"])
+        self.assertEqual(registry.stats(), {})
+        registry.record_attempts(result["meta"]["strategy"])
+        self.assertEqual(registry.stats(), {"unknown/amount_last": {"dear": {"attempts": 1, "successes": 1, "success_rate": 1.0}}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import io
+import unittest
+import pdfplumber
+from backend.parser import extract_transaction_batch
+from backend.parsers.brute_force_parser import BruteForceParser
+from backend.parsers.pdf_parser import GenericParser
+from backend.synthetic_statements import generate_statement
+
+
+def pairs(batch):
+    return sorted(zip(batch.dates, batch.cents))
+
+
+class TestSyntheticStatements(unittest.TestCase):
+    def test_deterministic(self):
+        first = generate_statement(2, "pnc", seed=3)
+        self.assertEqual(first.pdf_bytes, generate_statement(2, "pnc", seed=3).pdf_bytes)
+        self.assertEqual(first.transactions, generate_statement(2, "pnc", seed=3).transactions)
+        self.assertNotEqual(first.pdf_bytes, generate_statement(2, "pnc", seed=4).pdf_bytes)
+
+    def test_exact_page_count_and_period(self):
+        for layout in ("pnc", "table"):
+            statement = generate_statement(3, layout, seed=1, transactions_per_page=30)
+            with pdfplumber.open(io.BytesIO(statement.pdf_bytes)) as pdf:
+                self.assertEqual(len(pdf.pages), 3)
+            self.assertEqual(len(statement.transactions), 90)
+            start, end = statement.period
+            self.assertTrue(all(start.toordinal() <= day <= end.toordinal() for day in statement.transactions.dates))
+
+    def test_text_parsers_recover_pnc_layout(self):
+        statement = generate_statement(2, "pnc", seed=5)
+        expected = pairs(statement.transactions)
+        self.assertEqual(pairs(extract_transaction_batch(io.BytesIO(statement.pdf_bytes))["transactions"]), expected)
+        self.assertEqual(pairs(BruteForceParser(page_workers=0).parse_batch(io.BytesIO(statement.pdf_bytes))), expected)
+
+    def test_table_parser_recovers_table_layout(self):
+        statement = generate_statement(2, "table", seed=5)
+        batch = GenericParser().parse_batch(io.BytesIO(statement.pdf_bytes))
+        self.assertEqual(pairs(batch), pairs(statement.transactions))
+
+    def test_rejects_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            generate_statement(1, "no_such_layout")
+        with self.assertRaises(ValueError):
+            generate_statement(0)
+        with self.assertRaises(ValueError):
+            generate_statement(1, transactions_per_page=500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import pickle
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from backend.batch_upload import merge_statements
+from backend.detective import SubscriptionScanner
+from backend.parse_cache import ParseCache
+from backend.transactions import TransactionBatch, as_batch, as_records, parse_cents
+
+
+def ordinal(text):
+    return date.fromisoformat(text).toordinal()
+
+
+def pnc_records():
+    return [
+        {"date": "2025-10-03", "amount": 12.0, "desc": "NETFLIX", "type": "EXPENSE"},
+        {"date": "2025-10-01", "amount": 197.9, "desc": "PAYROLL", "type": "INCOME"},
+        {"date": "2025-11-03", "amount": 12.0, "desc": "NETFLIX", "type": "EXPENSE"},
+    ]
+
+
+class TestTransactionBatch(unittest.TestCase):
+    def test_descriptions_are_stored_once(self):
+        batch = TransactionBatch.from_records(pnc_records())
+        self.assertEqual(batch.style, "pnc")
+        self.assertEqual(batch.descriptions, ["NETFLIX", "PAYROLL"])
+        self.assertEqual(list(batch.codes), [0, 1, 0])
+        self.assertEqual(list(batch.cents), [-1200, 19790, -1200])
+
+    def test_renders_each_parsers_record_shape(self):
+        batch = TransactionBatch("signed")
+        batch.append(ordinal("2025-10-03"), -1200, "NETFLIX")
+        self.assertEqual(batch.to_records(), [
+            {"date": "2025-10-03", "description": "NETFLIX", "amount": -12.0, "source": "PDF"},
+        ])
+        self.assertEqual(batch[0], batch.to_records()[0])
+
+        records = pnc_records()
+        batch = as_batch(records)
+        self.assertEqual(batch, records)
+        self.assertEqual(list(batch), records)
+        self.assertEqual(batch[-1], records[-1])
+        self.assertEqual(batch.to_dataframe()["amount"].tolist(), [12.0, 197.9, 12.0])
+
+    def test_concat_remaps_descriptions_and_sort_is_stable(self):
+        first = TransactionBatch("pnc")
+        first.append(ordinal("2025-10-05"), -500, "COFFEE")
+        first.append(ordinal("2025-10-01"), -100, "TEA")
+        second = TransactionBatch("pnc")
+        second.append(ordinal("2025-10-01"), -200, "COFFEE")
+
+        merged = TransactionBatch.concat([first, second]).sorted_by_date()
+
+        self.assertEqual(merged.descriptions, ["COFFEE", "TEA"])
+        self.assertEqual(merged.description_column(), ["TEA", "COFFEE", "COFFEE"])
+        self.assertEqual(list(merged.cents), [-100, -200, -500])
+
+    def test_slice_keeps_only_the_descriptions_it_uses(self):
+        batch = TransactionBatch.from_records(pnc_records())
+        tail = batch.slice(1)
+        self.assertEqual(tail, pnc_records()[1:])
+        self.assertEqual(tail.descriptions, ["PAYROLL", "NETFLIX"])
+        self.assertEqual(batch.slice(1, 2), pnc_records()[1:2])
+        self.assertEqual(len(batch.slice(5)), 0)
+
+    def test_parse_cents(self):
+        self.assertEqual(parse_cents("$1,234.56"), 123456)
+        self.assertEqual(parse_cents("(12.00)"), -1200)
+        self.assertEqual(parse_cents("0.29"), 29)
+        with self.assertRaises(ValueError):
+            parse_cents("abc")
+
+    def test_serialization_round_trips(self):
+        batch = as_batch(pnc_records())
+        batch.iso_dates()
+        self.assertEqual(pickle.loads(pickle.dumps(batch)), batch)
+        self.assertEqual(TransactionBatch.from_dict(batch.to_dict()), batch)
+
+        restored = pickle.loads(pickle.dumps(batch))
+        restored.append(ordinal("2025-12-03"), -1200, "NETFLIX")
+        self.assertEqual(restored.descriptions, ["NETFLIX", "PAYROLL"])
+
+    def test_as_records_passes_lists_through(self):
+        records = pnc_records()
+        self.assertIs(as_records(records), records)
+        self.assertEqual(as_records(as_batch(records)), records)
+
+
+class TestBatchConsumers(unittest.TestCase):
+    def test_parse_cache_restores_batches(self):
+        directory = tempfile.mkdtemp()
+        try:
+            cache = ParseCache(path=os.path.join(directory, "cache.sqlite3"), max_bytes=10**6)
+            batch = as_batch(pnc_records())
+            cache.put("key", {"meta": {"ending_balance": 1.0}, "transactions": batch})
+
+            payload = cache.get("key")
+
+            self.assertIsInstance(payload["transactions"], TransactionBatch)
+            self.assertEqual(payload, {"meta": {"ending_balance": 1.0}, "transactions": batch})
+            cache.close()
+        finally:
+            shutil.rmtree(directory)
+
+    def test_merge_reads_batches_and_lists(self):
+        reports = [
+            {"filename": "oct.pdf", "status": "ok", "result": {"meta": {}, "transactions": as_batch(pnc_records())}},
+            {"filename": "sep.pdf", "status": "ok", "result": {"meta": {}, "transactions": pnc_records()[:1]}},
+        ]
+        transactions, meta, removed = merge_statements(reports)
+
+        self.assertIsInstance(transactions, TransactionBatch)
+        self.assertEqual(removed, 1)
+        self.assertEqual(transactions.iso_dates(), ["2025-10-01", "2025-10-03", "2025-11-03"])
+        self.assertEqual((meta["start_date"], meta["end_date"]), ("2025-10-01", "2025-11-03"))
+
+    def test_detective_scans_batch_like_records(self):
+        scanner = SubscriptionScanner()
+        records = pnc_records()
+        self.assertEqual(scanner.scan(as_batch(records)), scanner.scan(records))
+
+
+if __name__ == "__main__":
+    unittest.main()
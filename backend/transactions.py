@@ -0,0 +1,399 @@
+"""
+TransactionBatch - the compact, columnar form every parser emits.
+
+Parsers used to return a list of dicts (backend.parser, parse_pnc_statement)
+or a pandas DataFrame (the class-based parsers), with different keys
+(desc / description) and sign conventions (signed amount vs. positive amount
+plus INCOME/EXPENSE type). A TransactionBatch stores the same data as
+parallel arrays instead:
+
+1. dates: day ordinals (datetime.date.toordinal()), array('i')
+2. cents: signed amounts in cents, positive = money in, array('q')
+3. codes: indexes into `descriptions`, each distinct description stored once
+
+Appending a transaction is three array appends; no dict per row, no
+DataFrame. Pickling (process pool results, session spill files) sends the
+arrays as raw bytes.
+
+Each batch has a record style (RECORD_STYLES) naming the dict shape its
+parser historically returned. The batch is a read-only sequence of those
+dicts - iterating or indexing renders rows on demand - so API responses and
+callers written for lists keep working, while hot paths (merging, dedup,
+detection) read the columns directly.
+"""
+
+from array import array
+from datetime import date, datetime
+from itertools import repeat
+
+
+# Record style -> (keys in order, signed amounts?, constant fields).
+# Unsigned styles render abs(amount) plus "type": INCOME / EXPENSE.
+RECORD_STYLES = {
+    # backend.parser
+    "pnc": (("date", "amount", "desc", "type"), False, {}),
+    # backend.parsers.pnc_parser
+    "pnc_statement": (
+        ("date", "amount", "description", "type", "category", "source"),
+        False,
+        {"category": "Uncategorized", "source": "pdf"},
+    ),
+    # BruteForceParser, GenericParser
+    "signed": (("date", "description", "amount", "source"), True, {"source": "PDF"}),
+    # GenericPDFParser
+    "generic_loose": (("date", "amount", "description", "category"), True, {"category": "Uncategorized"}),
+}
+
+
+def to_cents(amount):
+    """
+    Convert a float amount to integer cents.
+    """
+    return round(amount * 100)
+
+
+def parse_cents(amount_str):
+    """
+    Parse an amount string like "$1,234.56" or "(12.00)" into signed cents.
+
+    Raises:
+        ValueError: If the string is not a number
+    """
+    cleaned = str(amount_str).replace("$", "").replace(",", "").replace(" ", "").strip()
+    if cleaned.startswith("(") and cleaned.endswith(")"):
+        cleaned = "-" + cleaned[1:-1]
+    return to_cents(float(cleaned))
+
+
+def month_day_ordinal(month_day, year):
+    """
+    Day ordinal of an "MM/DD" date in `year`.
+
+    Raises:
+        ValueError: If the date doesn't exist
+    """
+    month, day = month_day.split("/")
+    return date(year, int(month), int(day)).toordinal()
+
+
+def date_ordinal(value):
+    """
+    Day ordinal of a date, datetime, "YYYY-MM-DD" or "MM/DD/YYYY" value.
+
+    Raises:
+        ValueError: If the value isn't a recognizable date
+    """
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    if hasattr(value, "to_pydatetime"):
+        return value.to_pydatetime().date().toordinal()
+    text = str(value).strip()
+    if "-" in text:
+        return date.fromisoformat(text[:10]).toordinal()
+    return datetime.strptime(text, "%m/%d/%Y").date().toordinal()
+
+
+def infer_style(record):
+    """
+    Guess the record style a legacy transaction dict was produced in.
+    """
+    if "desc" in record:
+        return "pnc"
+    if "type" in record:
+        return "pnc_statement"
+    if "category" in record:
+        return "generic_loose"
+    return "signed"
+
+
+class TransactionBatch:
+    """
+    Columnar transactions with dictionary-encoded descriptions.
+    """
+
+    def __init__(self, style="signed"):
+        """
+        Args:
+            style: Record style used when rendering rows (see RECORD_STYLES)
+        """
+        if style not in RECORD_STYLES:
+            raise ValueError(f"Unknown record style: {style}")
+        self.style = style
+        self.dates = array("i")
+        self.cents = array("q")
+        self.codes = array("i")
+        self.descriptions = []
+        self._code_of = None
+        self._iso_cache = None
+
+    # --- Building ---
+
+    def _code(self, description):
+        if self._code_of is None:
+            self._code_of = {text: code for code, text in enumerate(self.descriptions)}
+        code = self._code_of.get(description)
+        if code is None:
+            code = self._code_of[description] = len(self.descriptions)
+            self.descriptions.append(description)
+        return code
+
+    def append(self, ordinal, cents, description):
+        """
+        Add one transaction.
+
+        Args:
+            ordinal: Day ordinal of the transaction date
+            cents: Signed amount in cents (positive = money in)
+            description: Description text
+        """
+        self.dates.append(ordinal)
+        self.cents.append(cents)
+        self.codes.append(self._code(description))
+
+    def append_columns(self, ordinals, cents, descriptions):
+        """
+        Add transactions from parallel columns (sequences or numpy arrays).
+        """
+        self.dates.extend(ordinals.tolist() if hasattr(ordinals, "tolist") else ordinals)
+        self.cents.extend(cents.tolist() if hasattr(cents, "tolist") else cents)
+        self.codes.extend(self._code(description) for description in descriptions)
+
+    def extend(self, other):
+        """
+        Append every transaction of another batch (or legacy record list).
+        """
+        other = as_batch(other, self.style)
+        remap = [self._code(text) for text in other.descriptions]
+        self.dates.extend(other.dates)
+        self.cents.extend(other.cents)
+        self.codes.extend(remap[code] for code in other.codes)
+        return self
+
+    @classmethod
+    def concat(cls, batches, style=None):
+        """
+        Concatenate batches in order. The style defaults to the first batch's.
+        """
+        batches = list(batches)
+        merged = cls(style or (batches[0].style if batches else "signed"))
+        for batch in batches:
+            merged.extend(batch)
+        return merged
+
+    @classmethod
+    def from_records(cls, records, style=None):
+        """
+        Build a batch from legacy transaction dicts (any parser's shape).
+
+        Raises:
+            ValueError: If a record has no usable date or amount
+        """
+        records = list(records)
+        batch = cls(style or (infer_style(records[0]) if records else "signed"))
+        for record in records:
+            amount = record.get("amount")
+            if amount is None:
+                raise ValueError(f"Transaction has no amount: {record}")
+            cents = to_cents(float(amount))
+            if record.get("type") == "EXPENSE":
+                cents = -abs(cents)
+            elif record.get("type") == "INCOME":
+                cents = abs(cents)
+            description = record.get("desc", record.get("description", record.get("merchant", ""))) or ""
+            batch.append(date_ordinal(record.get("date")), cents, description)
+        return batch
+
+    # --- Columns ---
+
+    def __len__(self):
+        return len(self.dates)
+
+    def iso_dates(self):
+        """
+        Dates as "YYYY-MM-DD" strings; each distinct date is formatted once.
+        """
+        cache = self._iso_cache
+        if cache is None:
+            cache = self._iso_cache = {}
+        dates = []
+        for ordinal in self.dates:
+            text = cache.get(ordinal)
+            if text is None:
+                text = cache[ordinal] = date.fromordinal(ordinal).isoformat()
+            dates.append(text)
+        return dates
+
+    def amounts(self):
+        """
+        Amounts as floats in the batch's style (positive for unsigned styles).
+        """
+        if RECORD_STYLES[self.style][1]:
+            return [cents / 100 for cents in self.cents]
+        return [abs(cents) / 100 for cents in self.cents]
+
+    def signed_amounts(self):
+        return [cents / 100 for cents in self.cents]
+
+    def description_column(self):
+        descriptions = self.descriptions
+        return [descriptions[code] for code in self.codes]
+
+    def columns(self):
+        """
+        The rendered columns, keyed and ordered as the style's records.
+        """
+        keys, signed, constants = RECORD_STYLES[self.style]
+        size = len(self)
+        values = {"date": self.iso_dates(), "amount": self.amounts()}
+        description = self.description_column()
+        values["desc"] = values["description"] = description
+        if not signed:
+            values["type"] = ["INCOME" if cents > 0 else "EXPENSE" for cents in self.cents]
+        for key, constant in constants.items():
+            values[key] = list(repeat(constant, size))
+        return {key: values[key] for key in keys}
+
+    # --- Legacy views ---
+
+    def to_records(self):
+        """
+        Render every row as the style's dict.
+        """
+        columns = self.columns()
+        keys = tuple(columns)
+        return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+    def to_dataframe(self):
+        """
+        Render as the DataFrame the class-based parsers returned (unsorted).
+        """
+        import pandas as pd
+        return pd.DataFrame(self.columns())
+
+    def __iter__(self):
+        return iter(self.to_records())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        if index < 0:
+            index += len(self)
+        keys, signed, constants = RECORD_STYLES[self.style]
+        cents = self.cents[index]
+        values = {
+            "date": date.fromordinal(self.dates[index]).isoformat(),
+            "amount": (cents if signed else abs(cents)) / 100,
+            "type": "INCOME" if cents > 0 else "EXPENSE",
+            **constants,
+        }
+        values["desc"] = values["description"] = self.descriptions[self.codes[index]]
+        return {key: values[key] for key in keys}
+
+    def __eq__(self, other):
+        if isinstance(other, TransactionBatch):
+            return (
+                self.style == other.style
+                and self.dates == other.dates
+                and self.cents == other.cents
+                and self.description_column() == other.description_column()
+            )
+        if isinstance(other, list):
+            return self.to_records() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"TransactionBatch({len(self)} transactions, style={self.style!r})"
+
+    # --- Reordering ---
+
+    def take(self, indices):
+        """
+        New batch with the rows at `indices`, in that order.
+        """
+        taken = TransactionBatch(self.style)
+        taken.descriptions = list(self.descriptions)
+        dates, cents, codes = self.dates, self.cents, self.codes
+        for index in indices:
+            taken.dates.append(dates[index])
+            taken.cents.append(cents[index])
+            taken.codes.append(codes[index])
+        return taken
+
+    def slice(self, start, stop=None):
+        """
+        New batch with rows start:stop, holding only the descriptions they
+        use: costs time in proportion to those rows.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        sliced = TransactionBatch(self.style)
+        sliced.dates = self.dates[start:stop]
+        sliced.cents = self.cents[start:stop]
+        descriptions = self.descriptions
+        sliced.codes.extend(sliced._code(descriptions[code]) for code in self.codes[start:stop])
+        return sliced
+
+    def sorted_by_date(self):
+        """
+        New batch ordered by date; same-day transactions keep their order.
+        """
+        return self.take(sorted(range(len(self)), key=self.dates.__getitem__))
+
+    # --- Serialization ---
+
+    def to_dict(self):
+        """
+        JSON-safe columnar form (see from_dict).
+        """
+        return {
+            "style": self.style,
+            "dates": self.dates.tolist(),
+            "cents": self.cents.tolist(),
+            "codes": self.codes.tolist(),
+            "descriptions": list(self.descriptions),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        batch = cls(data["style"])
+        batch.dates.extend(data["dates"])
+        batch.cents.extend(data["cents"])
+        batch.codes.extend(data["codes"])
+        batch.descriptions = list(data["descriptions"])
+        return batch
+
+    def __getstate__(self):
+        # The description index and date cache are rebuilt on demand
+        return {
+            "style": self.style,
+            "dates": self.dates,
+            "cents": self.cents,
+            "codes": self.codes,
+            "descriptions": self.descriptions,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._code_of = None
+        self._iso_cache = None
+
+
+def as_batch(transactions, style=None):
+    """
+    Return `transactions` as a TransactionBatch, converting a legacy record list.
+    """
+    if isinstance(transactions, TransactionBatch):
+        return transactions
+    return TransactionBatch.from_records(transactions, style)
+
+
+def as_records(transactions):
+    """
+    Return `transactions` as a list of dicts, rendering a TransactionBatch.
+    """
+    if isinstance(transactions, TransactionBatch):
+        return transactions.to_records()
+    return transactions
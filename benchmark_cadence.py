@@ -0,0 +1,89 @@
+"""
+Benchmark the cadence engine (backend/cadence.py) against the per-group
+Python loop SubscriptionDetective used to run, on generated histories of
+many merchant groups with weekly to annual charges plus noise.
+
+Usage: python benchmark_cadence.py [--sizes 10000 100000 1000000] [--groups 5000]
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from backend.cadence import CADENCES, analyze_cadence
+
+SIZES = [10000, 100000, 1000000]
+SEED = 7
+
+
+def make_history(size, group_count, rng):
+    """
+    (groups, ordinals, amounts) lists: each group charges on one cadence
+    (or at random), with a few days of jitter.
+    """
+    start = 738000
+    plans = [(rng.choice(CADENCES + (None,)), rng.randrange(365)) for _ in range(group_count)]
+    counters = [0] * group_count
+    groups, ordinals, amounts = [], [], []
+    for _ in range(size):
+        group = rng.randrange(group_count)
+        cadence, offset = plans[group]
+        if cadence is None:
+            day = start + rng.randrange(3650)
+        else:
+            day = start + offset + counters[group] * cadence[1] + rng.randint(-1, 1)
+        counters[group] += 1
+        groups.append(group)
+        ordinals.append(day)
+        amounts.append(round(rng.uniform(5, 100), 2))
+    return groups, ordinals, amounts
+
+
+def per_group_loop(groups, ordinals, amounts):
+    """
+    The shape of the old engine: group, sort and walk intervals per group.
+    """
+    grouped = defaultdict(list)
+    for group, ordinal, amount in zip(groups, ordinals, amounts):
+        grouped[group].append((ordinal, amount))
+    found = 0
+    for transactions in grouped.values():
+        transactions.sort()
+        tally = [0] * len(CADENCES)
+        for (first, _), (second, _) in zip(transactions, transactions[1:]):
+            for index, (_, _, low, high, _, _) in enumerate(CADENCES):
+                if low <= second - first <= high:
+                    tally[index] += 1
+        found += any(count >= cadence[5] for count, cadence in zip(tally, CADENCES))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cadence engine benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--groups", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(SEED)
+    print(f"{'transactions':>12} {'groups':>7} {'loop (s)':>9} {'vectorized (s)':>15} {'recurring':>10}  same")
+    for size in args.sizes:
+        groups, ordinals, amounts = make_history(size, args.groups, rng)
+
+        started = time.perf_counter()
+        expected = per_group_loop(groups, ordinals, amounts)
+        loop = time.perf_counter() - started
+
+        columns = np.array(groups), np.array(ordinals), np.array(amounts)
+        started = time.perf_counter()
+        report = analyze_cadence(*columns, args.groups)
+        vectorized = time.perf_counter() - started
+
+        found = len(report.recurring())
+        print(f"{size:>12} {args.groups:>7} {loop:>9.3f} {vectorized:>15.3f} {found:>10}  {found == expected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark the fuzzy merchant grouping in SubscriptionScanner.scan (see
+backend/fuzzy_groups.py) on generated multi-year
+histories: grouping time and group count from 1k to 1M transactions. The
+pairwise scan it replaced is timed too, up to --pairwise-max transactions,
+and both must produce the same groups.
+
+Descriptions mimic card and ACH activity: a few thousand merchants, each
+with a handful of store numbers and locations, behind the usual channel
+prefixes, with the odd misspelling.
+
+Usage: python benchmark_grouping.py [--sizes 1000 3000 10000 100000 1000000]
+                                    [--merchants 3000] [--pairwise-max 3000]
+"""
+
+import argparse
+import random
+import time
+
+from thefuzz import fuzz
+
+from backend.detective import SubscriptionScanner
+from backend.fuzzy_groups import MATCH_THRESHOLD, group_descriptions
+
+SIZES = [1000, 3000, 10000, 100000, 1000000]
+SEED = 7
+SYLLABLES = ["ka", "lo", "mar", "ten", "vi", "sto", "ra", "bel", "quin", "dor", "fe", "lix", "an", "tro", "zen"]
+KINDS = ["MARKET", "CAFE", "FITNESS", "PHARMACY", "AUTO", "GRILL", "BOOKS", "WIRELESS", "INSURANCE", "ENERGY"]
+PREFIXES = ["Debit Card Purchase", "POS Purchase", "Recurring Debit Card", "ACH Web", "Web Pmt- Payment"]
+CITIES = ["NEW YORK NY", "PITTSBURGH PA", "AUSTIN TX", "DENVER CO", "CHICAGO IL", ""]
+
+
+def make_merchants(count, rng):
+    merchants = []
+    for _ in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randrange(2, 4))).upper()
+        stores = [str(rng.randrange(100, 9999)) for _ in range(rng.randrange(1, 6))]
+        merchants.append((rng.choice(PREFIXES), f"{name} {rng.choice(KINDS)}", stores))
+    return merchants
+
+
+def misspell(word, rng):
+    position = rng.randrange(1, len(word) - 1)
+    return word[:position] + word[position + 1:]
+
+
+def make_descriptions(size, merchants, rng):
+    """
+    `size` raw descriptions, cleaned the way SubscriptionScanner.scan does.
+    """
+    scanner = SubscriptionScanner()
+    descriptions = []
+    for _ in range(size):
+        prefix, name, stores = rng.choice(merchants)
+        if rng.random() < 0.02:
+            name = misspell(name, rng)
+        raw = f"{prefix} {rng.randrange(1, 13):02d}/{rng.randrange(1, 29):02d} {name} {rng.choice(stores)} {rng.choice(CITIES)}"
+        descriptions.append(scanner._clean_description(raw))
+    return descriptions
+
+
+def pairwise_groups(descriptions):
+    """
+    The O(N^2) scan group_descriptions replaced.
+    """
+    grouped = set()
+    groups = []
+    for i, description in enumerate(descriptions):
+        if i in grouped:
+            continue
+        group = [i]
+        grouped.add(i)
+        for j, other in enumerate(descriptions):
+            if j not in grouped and fuzz.token_set_ratio(description, other) > MATCH_THRESHOLD:
+                group.append(j)
+                grouped.add(j)
+        groups.append(group)
+    return groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy grouping benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--merchants", type=int, default=3000)
+    parser.add_argument("--pairwise-max", type=int, default=3000,
+                        help="Largest size to also time the pairwise scan on")
+    args = parser.parse_args()
+
+    rng = random.Random(SEED)
+    merchants = make_merchants(args.merchants, rng)
+    print(f"{'transactions':>12} {'distinct':>9} {'groups':>7} {'blocked (s)':>12} {'pairwise (s)':>13}  same groups")
+    for size in args.sizes:
+        descriptions = make_descriptions(size, merchants, rng)
+
+        started = time.perf_counter()
+        groups = group_descriptions(descriptions)
+        blocked = time.perf_counter() - started
+
+        pairwise, same = "-", "-"
+        if size <= args.pairwise_max:
+            started = time.perf_counter()
+            same = pairwise_groups(descriptions) == groups
+            pairwise = f"{time.perf_counter() - started:.3f}"
+        print(f"{size:>12} {len(set(descriptions)):>9} {len(groups):>7} {blocked:>12.3f} {pairwise:>13}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark line classification on long statements: the per-line keyword scans
+the text parsers used to run against one LineLexer pass per page.
+
+Usage: python benchmark_line_classifier.py [lines ...]
+"""
+
+import io
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+
+from backend.parsers.brute_force_parser import BruteForceParser
+
+CREDIT = ['deposits', 'additions', 'credits']
+DEBIT = ['withdrawals', 'deductions', 'checks paid', 'purchase']
+BALANCE = ['daily balance', 'balance detail']
+MERCHANTS = ["NETFLIX.COM", "SPOTIFY USA", "AMAZON MKTPLACE", "SHELL OIL 5743", "WHOLE FOODS", "PAYROLL ACME CORP"]
+
+
+def build_page(line_count, seed=0):
+    """Synthetic statement text: mostly transactions, some headers, wrapped descriptions and noise."""
+    rng = random.Random(seed)
+    lines = []
+    while len(lines) < line_count:
+        roll = rng.random()
+        if roll < 0.02:
+            lines.append(rng.choice(["Deposits and Other Additions", "Banking/Debit Card Withdrawals"]))
+        elif roll < 0.85:
+            lines.append(f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d} {rng.randint(1, 2500):,}.{rng.randint(0, 99):02d} "
+                         f"Debit Card Purchase {rng.choice(MERCHANTS)} {rng.randint(1000, 9999)}")
+        elif roll < 0.95:
+            lines.append(f"Ref {rng.randint(10**8, 10**9)} {rng.choice(MERCHANTS)}")
+        else:
+            lines.append("")
+    return "\n".join(lines)
+
+
+def classify_per_line(lines):
+    """The classification BruteForceParser did before the lexer, one line at a time."""
+    results = []
+    for line in lines:
+        line_stripped = line.strip()
+        line_lower = line_stripped.lower()
+        if any(keyword in line_lower for keyword in CREDIT):
+            section = 1.0
+        elif any(keyword in line_lower for keyword in DEBIT):
+            section = -1.0
+        else:
+            section = 0
+        balance = 'daily balance' in line_lower or 'balance detail' in line_lower
+        results.append((section, balance, BruteForceParser.TRANSACTION_PATTERN.match(line_stripped)))
+    return results
+
+
+def classify_lexer(lines):
+    return BruteForceParser.LEXER.tokenize([line.strip() for line in lines])
+
+
+def scan_page(text):
+    parser = BruteForceParser()
+    with redirect_stdout(io.StringIO()):
+        return parser._process_page_text(text, 0)
+
+
+def best_of(function, argument, repeat=7):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(sizes):
+    print(f"{'lines':>8} {'per-line ms':>12} {'lexer ms':>10} {'speedup':>8} {'full scan ms':>13}")
+    for size in sizes:
+        text = build_page(size)
+        lines = text.split("\n")
+        per_line = best_of(classify_per_line, lines)
+        lexer = best_of(classify_lexer, lines)
+        scan = best_of(scan_page, text, repeat=3)
+        print(f"{size:>8} {per_line * 1000:>12.2f} {lexer * 1000:>10.2f} {per_line / lexer:>7.2f}x {scan * 1000:>13.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [2000, 5000, 20000])
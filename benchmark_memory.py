@@ -0,0 +1,72 @@
+"""
+Benchmark peak memory of parsing a long statement with and without
+bounded-memory mode (see backend/parsers/page_cache.py). Each run parses a
+generated N-page statement with BruteForceParser in a fresh interpreter and
+reports its time and peak RSS.
+
+Usage: python benchmark_memory.py [pages ...]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+from fpdf import FPDF
+
+PAGE_COUNTS = [50, 200, 1000]
+LINES_PER_PAGE = 40
+
+MODES = {
+    "regular": {"PARSE_LOW_MEMORY_MIN_PAGES": "0"},
+    "bounded": {"PARSE_LOW_MEMORY_MIN_PAGES": "1", "PARSE_PAGE_WINDOW": "0"},
+    "bounded+windows": {"PARSE_LOW_MEMORY_MIN_PAGES": "1", "PARSE_PAGE_WINDOW": "50"},
+}
+
+PARSE_SNIPPET = """
+import contextlib, io, resource, sys, time
+from backend.parsers.brute_force_parser import BruteForceParser
+started = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    batch = BruteForceParser(page_workers=0).parse_batch(sys.argv[1])
+max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+print(len(batch), time.perf_counter() - started, max_rss)
+"""
+
+
+def build_statement(path, pages):
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=9)
+    for page in range(pages):
+        pdf.add_page()
+        pdf.cell(0, 5, text="Statement 2025", new_x="LMARGIN", new_y="NEXT")
+        pdf.cell(0, 5, text="Banking/Debit Card Withdrawals", new_x="LMARGIN", new_y="NEXT")
+        for line in range(LINES_PER_PAGE):
+            day = (page + line) % 28 + 1
+            text = f"10/{day:02d} {line + 1}.{page % 100:02d} MERCHANT {page}-{line} PURCHASE"
+            pdf.cell(0, 5, text=text, new_x="LMARGIN", new_y="NEXT")
+    pdf.output(path)
+
+
+def run_parse(path, env):
+    output = subprocess.run(
+        [sys.executable, "-c", PARSE_SNIPPET, path],
+        env=dict(os.environ, **env), capture_output=True, text=True, check=True,
+    ).stdout
+    count, seconds, max_rss = output.strip().splitlines()[-1].split()
+    return int(count), float(seconds), int(max_rss)
+
+
+def main(page_counts):
+    print(f"{'pages':>6} {'mode':<16} {'transactions':>12} {'seconds':>8} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in page_counts:
+            path = os.path.join(directory, f"statement_{pages}.pdf")
+            build_statement(path, pages)
+            for mode, env in MODES.items():
+                count, seconds, max_rss = run_parse(path, env)
+                print(f"{pages:>6} {mode:<16} {count:>12} {seconds:>8.1f} {max_rss / 2 ** 20:>9.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or PAGE_COUNTS)
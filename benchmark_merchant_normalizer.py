@@ -0,0 +1,85 @@
+"""
+Benchmark merchant normalization: the per-call re.sub / str.replace chains
+both subscription detectors used to run on every transaction against the
+shared MerchantNormalizer (precompiled alternations, LRU memo), on
+generated descriptions where a few hundred merchants repeat.
+
+Usage: python benchmark_merchant_normalizer.py [--sizes 10000 100000 1000000] [--merchants 500]
+"""
+
+import argparse
+import random
+import time
+
+from backend.merchant_normalizer import RECURRING_KEYWORDS, MerchantNormalizer
+from backend.tests.test_merchant_normalizer import reference_clean_description, reference_merchant_name
+
+SIZES = [10000, 100000, 1000000]
+SEED = 7
+SYLLABLES = ["ka", "lo", "mar", "ten", "vi", "sto", "ra", "bel", "quin", "dor", "fe", "lix", "an", "tro", "zen"]
+PREFIXES = ["Debit Card Purchase", "POS PURCHASE", "RECURRING DEBIT CARD", "VISA", "Direct Deposit -", ""]
+SUFFIXES = ["PPD", "ID: 4471", "#332", "Club Fees", "NFLX.COM", "AUTH", ""]
+
+
+def make_descriptions(size, merchant_count, rng):
+    """
+    `size` raw descriptions over `merchant_count` merchants, each with a
+    handful of store numbers and posting dates.
+    """
+    merchants = []
+    for _ in range(merchant_count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randrange(2, 4))).upper()
+        variants = [
+            f"{rng.choice(PREFIXES)} {rng.randrange(1, 13):02d}/{rng.randrange(1, 29):02d} "
+            f"{name} {rng.randrange(10000, 99999)} {rng.choice(SUFFIXES)}"
+            for _ in range(rng.randrange(1, 8))
+        ]
+        merchants.append(variants)
+    return [rng.choice(rng.choice(merchants)) for _ in range(size)]
+
+
+def previous(descriptions):
+    """
+    What the detectors did per transaction before: both chains plus the
+    keyword loop.
+    """
+    results = []
+    for desc in descriptions:
+        keywords = [keyword for keyword in RECURRING_KEYWORDS if keyword.lower() in desc.lower()]
+        results.append((reference_merchant_name(desc), reference_clean_description(desc), tuple(keywords)))
+    return results
+
+
+def shared(descriptions, normalizer):
+    return [
+        (normalizer.merchant_name(desc), normalizer.clean_description(desc), normalizer.recurring_keywords(desc))
+        for desc in descriptions
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merchant normalization benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--merchants", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(SEED)
+    print(f"{'descriptions':>12} {'previous (s)':>13} {'shared (s)':>11} {'speedup':>8} {'hit ratio':>10}  same")
+    for size in args.sizes:
+        descriptions = make_descriptions(size, args.merchants, rng)
+
+        started = time.perf_counter()
+        expected = previous(descriptions)
+        before = time.perf_counter() - started
+
+        normalizer = MerchantNormalizer()
+        started = time.perf_counter()
+        results = shared(descriptions, normalizer)
+        after = time.perf_counter() - started
+
+        ratio = normalizer.stats()["hit_ratio"]
+        print(f"{size:>12} {before:>13.3f} {after:>11.3f} {before / after:>7.1f}x {ratio:>10.4f}  {results == expected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark date/amount normalization: the per-row conversion the parsers did
+(split + date() per date, str.replace chain + float() per amount) against
+one bulk StatementCalendar / amounts_to_cents step, and check both agree.
+
+Usage: python benchmark_normalize.py [rows ...]
+"""
+
+import random
+import sys
+import time
+
+from backend.parsers.normalize import StatementCalendar, amounts_to_cents
+from backend.transactions import month_day_ordinal, parse_cents
+
+
+def build_captures(count, seed=0):
+    """Captured (MM/DD, amount) strings as the text parsers' regexes produce them, ~1% invalid dates."""
+    rng = random.Random(seed)
+    dates, amounts = [], []
+    for _ in range(count):
+        dates.append(f"{rng.randint(1, 12):02d}/{rng.randint(1, 31 if rng.random() < 0.01 else 28):02d}")
+        amount = f"{rng.randint(0, 25000):,}.{rng.randint(0, 99):02d}"
+        roll = rng.random()
+        amounts.append(f"${amount}" if roll < 0.3 else (f"({amount})" if roll < 0.4 else amount))
+    return dates, amounts
+
+
+def per_row(dates, amounts, year):
+    results = []
+    for date_str, amount_str in zip(dates, amounts):
+        try:
+            results.append((month_day_ordinal(date_str, year), parse_cents(amount_str)))
+        except ValueError:
+            results.append(None)
+    return results
+
+
+def bulk(dates, amounts, year):
+    ordinals, dates_ok = StatementCalendar(year).month_day_ordinals(dates)
+    cents, amounts_ok = amounts_to_cents(amounts)
+    return [
+        (ordinal, amount) if ok else None
+        for ordinal, amount, ok in zip(ordinals.tolist(), cents.tolist(), (dates_ok & amounts_ok).tolist())
+    ]
+
+
+def best_of(function, *args, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(sizes):
+    bulk([], [], 2025)  # Import numpy outside the timings
+    print(f"{'rows':>8} {'per-row ms':>11} {'bulk ms':>9} {'speedup':>8} {'agree':>6}")
+    for size in sizes:
+        dates, amounts = build_captures(size)
+        agree = per_row(dates, amounts, 2025) == bulk(dates, amounts, 2025)
+        slow = best_of(per_row, dates, amounts, 2025)
+        fast = best_of(bulk, dates, amounts, 2025)
+        print(f"{size:>8} {slow * 1000:>11.2f} {fast * 1000:>9.2f} {slow / fast:>7.2f}x {str(agree):>6}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [50, 1000, 100000])
@@ -0,0 +1,79 @@
+"""
+Benchmark page skipping (see backend/parsers/page_planner.py): each parser
+parses a generated statement whose transaction pages are followed by as many
+disclosure pages, with PARSE_PAGE_SKIPPING off and on, in a fresh
+interpreter per run. Reports the best of --repeat parse times and whether
+both runs extracted the same transactions.
+
+Usage: python benchmark_page_skipping.py [--pages 5 20] [--parsers pnc brute_force ...]
+                                         [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from backend.parse_executor import PARSERS
+from backend.synthetic_statements import generate_statement
+
+PAGE_COUNTS = [5, 20]
+SEED = 7
+# Layout each parser reads
+LAYOUT_FOR = {"generic_tables": "table", "generic_loose": "table"}
+
+PARSE_SNIPPET = """
+import contextlib, io, json, sys, time
+from backend.parse_executor import _run_parser, warm_up_parsers
+from backend.transactions import as_batch
+with contextlib.redirect_stdout(io.StringIO()):
+    warm_up_parsers()
+    seconds = float("inf")
+    for _ in range(int(sys.argv[3])):
+        started = time.perf_counter()
+        try:
+            batch = as_batch(_run_parser(sys.argv[1], sys.argv[2])[0]["transactions"])
+            pairs = sorted(zip(batch.dates, batch.cents))
+        except ValueError:
+            pairs = []
+        seconds = min(seconds, time.perf_counter() - started)
+print(json.dumps({"seconds": seconds, "pairs": pairs}))
+"""
+
+
+def run_parser(parser_name, path, repeat, skipping):
+    output = subprocess.run(
+        [sys.executable, "-c", PARSE_SNIPPET, parser_name, path, str(repeat)],
+        env=dict(os.environ, PARSE_PAGE_WORKERS="0", PARSE_PAGE_SKIPPING=str(int(skipping))),
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Page skipping benchmark")
+    parser.add_argument("--pages", type=int, nargs="+", default=PAGE_COUNTS,
+                        help="Transaction pages; as many disclosure pages follow them")
+    parser.add_argument("--parsers", nargs="+", default=list(PARSERS), choices=list(PARSERS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'pages':>5} {'parser':<15} {'off (s)':>8} {'on (s)':>8} {'speedup':>8}  same result")
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in args.pages:
+            for parser_name in args.parsers:
+                layout = LAYOUT_FOR.get(parser_name, "pnc")
+                statement = generate_statement(pages, layout, seed=SEED, boilerplate_pages=pages)
+                path = statement.write(os.path.join(directory, f"{layout}_{pages}.pdf"))
+                off = run_parser(parser_name, path, args.repeat, skipping=False)
+                on = run_parser(parser_name, path, args.repeat, skipping=True)
+                print(
+                    f"{statement.pages:>5} {parser_name:<15} {off['seconds']:>8.3f} {on['seconds']:>8.3f} "
+                    f"{off['seconds'] / max(on['seconds'], 1e-9):>7.2f}x  {off['pairs'] == on['pairs']}"
+                )
+
+
+if __name__ == "__main__":
+    main()
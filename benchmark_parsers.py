@@ -0,0 +1,172 @@
+"""
+Benchmark every registered parser on generated statements (see
+backend/synthetic_statements.py): pages/sec, transactions/sec, peak RSS and
+accuracy against the generator's ground truth.
+
+Each parser runs in a fresh interpreter, so peak RSS is its parse's alone;
+the reported time is the best of --repeat parses.
+Accuracy compares (date, signed amount) pairs as a multiset: precision is
+the share of extracted transactions that are real, recall the share of real
+transactions extracted.
+
+Results can be saved as a baseline and later runs compared against it; a
+run that is slower or uses more memory than the baseline by more than
+--tolerance, or is less accurate at all, is reported as a regression and
+the script exits with status 1. Timings only compare meaningfully on the
+machine the baseline was recorded on.
+
+Usage: python benchmark_parsers.py [--pages 1 10 100] [--layouts pnc table]
+                                   [--parsers pnc brute_force ...]
+                                   [--save] [--baseline PATH] [--tolerance 0.25]
+                                   [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+
+from backend.parse_executor import PARSERS
+from backend.synthetic_statements import LAYOUTS, generate_statement
+
+PAGE_COUNTS = [1, 10, 100]
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baselines.json")
+SEED = 7
+
+# Runs one parser the way a parse worker does (without the parse cache)
+# `repeat` times and prints the best time, peak RSS and the extracted
+# (ordinal, cents) pairs as JSON
+PARSE_SNIPPET = """
+import contextlib, io, json, resource, sys, time
+from backend.parse_executor import _run_parser, warm_up_parsers
+from backend.transactions import as_batch
+with contextlib.redirect_stdout(io.StringIO()):
+    warm_up_parsers()
+    seconds = float("inf")
+    for _ in range(int(sys.argv[3])):
+        started = time.perf_counter()
+        try:
+            result = _run_parser(sys.argv[1], sys.argv[2])[0]
+            batch = as_batch(result["transactions"])
+            pairs, error = list(zip(batch.dates, batch.cents)), None
+        except Exception as e:
+            pairs, error = [], f"{type(e).__name__}: {e}"
+        seconds = min(seconds, time.perf_counter() - started)
+max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+print(json.dumps({"seconds": seconds, "peak_rss_bytes": max_rss, "pairs": pairs, "error": error}))
+"""
+
+
+def run_parser(parser_name, path, repeat):
+    output = subprocess.run(
+        [sys.executable, "-c", PARSE_SNIPPET, parser_name, path, str(repeat)],
+        env=dict(os.environ, PARSE_PAGE_WORKERS="0"), capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def score(statement, run):
+    """
+    Throughput and accuracy figures of one parser run.
+    """
+    truth = Counter(zip(statement.transactions.dates, statement.transactions.cents))
+    found = Counter(tuple(pair) for pair in run["pairs"])
+    matched = sum((truth & found).values())
+    seconds = max(run["seconds"], 1e-9)
+    return {
+        "seconds": round(run["seconds"], 4),
+        "pages_per_sec": round(statement.pages / seconds, 2),
+        "transactions_per_sec": round(len(run["pairs"]) / seconds, 1),
+        "peak_rss_mb": round(run["peak_rss_bytes"] / 2 ** 20, 1),
+        "transactions": len(run["pairs"]),
+        "precision": round(matched / len(run["pairs"]), 4) if run["pairs"] else 0.0,
+        "recall": round(matched / len(statement.transactions), 4),
+        "error": run["error"],
+    }
+
+
+def regressions(result, baseline, tolerance):
+    """
+    Ways `result` is worse than `baseline` (an empty list if it isn't).
+    """
+    found = []
+    if result["pages_per_sec"] < baseline["pages_per_sec"] * (1 - tolerance):
+        found.append(f"pages/sec {baseline['pages_per_sec']} -> {result['pages_per_sec']}")
+    if result["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        found.append(f"peak RSS {baseline['peak_rss_mb']}MB -> {result['peak_rss_mb']}MB")
+    for key in ("precision", "recall"):
+        if result[key] < baseline[key]:
+            found.append(f"{key} {baseline[key]} -> {result[key]}")
+    return found
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(path, results):
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "seed": SEED,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser throughput and accuracy benchmark")
+    parser.add_argument("--pages", type=int, nargs="+", default=PAGE_COUNTS)
+    parser.add_argument("--layouts", nargs="+", default=list(LAYOUTS), choices=LAYOUTS)
+    parser.add_argument("--parsers", nargs="+", default=list(PARSERS), choices=list(PARSERS))
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="Record this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--repeat", type=int, default=3, help="Parses per run; the fastest is reported")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    results = {}
+    failed = []
+    print(
+        f"{'layout':<6} {'pages':>5} {'parser':<15} {'pages/s':>8} {'tx/s':>9} "
+        f"{'peak MB':>8} {'precision':>9} {'recall':>7}  vs baseline"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for layout in args.layouts:
+            for pages in args.pages:
+                statement = generate_statement(pages, layout, seed=SEED)
+                path = statement.write(os.path.join(directory, f"{layout}_{pages}.pdf"))
+                for parser_name in args.parsers:
+                    key = f"{layout}/{pages}/{parser_name}"
+                    result = results[key] = score(statement, run_parser(parser_name, path, args.repeat))
+                    worse = regressions(result, baseline[key], args.tolerance) if key in baseline else None
+                    if worse:
+                        failed.append((key, worse))
+                    status = "-" if worse is None else ("REGRESSION: " + "; ".join(worse) if worse else "ok")
+                    print(
+                        f"{layout:<6} {pages:>5} {parser_name:<15} {result['pages_per_sec']:>8.2f} "
+                        f"{result['transactions_per_sec']:>9.1f} {result['peak_rss_mb']:>8.1f} "
+                        f"{result['precision']:>9.4f} {result['recall']:>7.4f}  {status}"
+                    )
+
+    if args.save:
+        save_baseline(args.baseline, {**baseline, **results})
+        print(f"Saved baseline to {args.baseline}")
+    if failed:
+        print(f"{len(failed)} regression(s) against {args.baseline}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
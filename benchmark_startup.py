@@ -0,0 +1,52 @@
+"""
+Benchmark cold import times with lazy heavy imports against eager ones
+(LAZY_IMPORTS=0), each measured in a fresh interpreter, plus the warm-up
+that loads the deferred dependencies.
+
+Usage: python benchmark_startup.py [module ...]
+"""
+
+import os
+import subprocess
+import sys
+
+MODULES = [
+    "backend.main",
+    "backend.parse_executor",
+    "backend.parser",
+    "backend.parsers.brute_force_parser",
+    "backend.parsers.strategies.registry",
+    "backend.detective",
+    "backend.ocr_service",
+]
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+WARM_UP_SNIPPET = (
+    "import time; from backend.parse_executor import warm_up_parsers; "
+    "started = time.perf_counter(); warm_up_parsers(); print(time.perf_counter() - started)"
+)
+
+
+def run_timed(snippet, lazy, repeat=5):
+    """Best of `repeat` fresh interpreters: seconds printed on the snippet's last line."""
+    env = dict(os.environ, LAZY_IMPORTS=str(int(lazy)))
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", snippet], env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def main(modules):
+    print(f"{'module':<40} {'eager ms':>9} {'lazy ms':>9} {'speedup':>8}")
+    for module in modules:
+        eager = run_timed(IMPORT_SNIPPET.format(module=module), lazy=False)
+        lazy = run_timed(IMPORT_SNIPPET.format(module=module), lazy=True)
+        print(f"{module:<40} {eager * 1000:>9.1f} {lazy * 1000:>9.1f} {eager / lazy:>7.2f}x")
+    print(f"{'warm_up_parsers() after lazy import':<40} {'':>9} {run_timed(WARM_UP_SNIPPET, lazy=True) * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or MODULES)
@@ -6,9 +6,10 @@ import sys
 from backend.parsers.pdf_parser import GenericParser
 from backend.parsers.brute_force_parser import BruteForceParser
 from backend.parsers.generic_parser import GenericPDFParser
+from backend.parsers.strategies.registry import strategy_registry
 
 def test_parsers(pdf_path):
-    """Test all three parsers against the PDF."""
+    """Test all three parsers, and the strategy registry, against the PDF."""
     
     print("=" * 80)
     print("TESTING PDF PARSERS")
@@ -60,6 +61,20 @@ def test_parsers(pdf_path):
     except Exception as e:
         print(f"✗ FAILED: {type(e).__name__}: {str(e)}")
     
+    # Test 4: Strategy registry (fingerprint, then the cheapest likely parser)
+    print("\n" + "=" * 80)
+    print("TEST 4: Strategy registry (auto)")
+    print("=" * 80)
+    try:
+        result = strategy_registry.parse(pdf_path)
+        strategy = result["meta"]["strategy"]
+        print(f"✓ Fingerprint: {strategy['fingerprint']}")
+        for attempt in strategy["attempts"]:
+            print(f"  {attempt['strategy']}: {'ok' if attempt['ok'] else 'failed'} in {attempt['seconds']:.3f}s")
+        print(f"✓ Chosen strategy: {strategy['name']} ({len(result['transactions'])} transactions)")
+    except Exception as e:
+        print(f"✗ FAILED: {type(e).__name__}: {str(e)}")
+    
     print("\n" + "=" * 80)
     print("TESTING COMPLETE")
     print("=" * 80)